@@ -1,13 +1,24 @@
 package main
 
 import (
+	"bytes"
+	"compress/gzip"
+	"container/list"
+	"crypto/sha1"
+	"crypto/sha256"
 	"database/sql"
+	"encoding/base64"
+	"encoding/hex"
 	"encoding/json"
 	"fmt"
+	"io"
 	"log"
 	"net/http"
 	"os"
+	"sort"
 	"strconv"
+	"strings"
+	"sync"
 	"time"
 
 	"github.com/gorilla/mux"
@@ -79,6 +90,25 @@ type PomodoroDetail struct {
 	PauseCount    int        `json:"pause_count"` // Number of times paused during session
 }
 
+// Bulk sync payloads
+type BulkItemResult struct {
+	OK    bool   `json:"ok"`
+	ID    int    `json:"id,omitempty"`
+	Error string `json:"error,omitempty"`
+}
+
+type DayBundle struct {
+	Day       Day              `json:"day"`
+	Tasks     []DailyTask      `json:"tasks"`
+	Pomodoros []PomodoroDetail `json:"pomodoros"`
+}
+
+type DayBundleResult struct {
+	Day       Day              `json:"day"`
+	Tasks     []BulkItemResult `json:"tasks"`
+	Pomodoros []BulkItemResult `json:"pomodoros"`
+}
+
 type Statistics struct {
 	TotalSessions     int     `json:"total_sessions"`
 	CompletedSessions int     `json:"completed_sessions"`
@@ -181,7 +211,107 @@ func initDB() error {
 	CREATE INDEX IF NOT EXISTS idx_daily_tasks_planning ON daily_tasks(day_id, planned_at, added_mid_day);
 	`
 
-	_, err = db.Exec(schema)
+	if _, err = db.Exec(schema); err != nil {
+		return err
+	}
+	return initSyncSchema()
+}
+
+// Delta sync: triggers stamp every day/daily_tasks/pomo write with a value
+// from a global counter and record deletions as tombstones, so clients can
+// pull only what changed after their last watermark (see getChanges).
+// Pomodoro start times, their natural key, go out as
+// strftime('%Y-%m-%dT%H:%M:%SZ') in both the feed and the tombstones.
+const syncSchema = `
+	CREATE TABLE IF NOT EXISTS change_seq (
+		id INTEGER PRIMARY KEY CHECK (id = 1),
+		value INTEGER NOT NULL
+	);
+	INSERT OR IGNORE INTO change_seq (id, value) VALUES (1, 0);
+
+	CREATE TABLE IF NOT EXISTS sync_tombstones (
+		rev INTEGER PRIMARY KEY,
+		kind TEXT NOT NULL,
+		row_id INTEGER NOT NULL,
+		day_date TEXT,
+		natural_key TEXT
+	);
+
+	CREATE TRIGGER IF NOT EXISTS daily_tasks_tombstone AFTER DELETE ON daily_tasks BEGIN
+		UPDATE change_seq SET value = value + 1 WHERE id = 1;
+		INSERT INTO sync_tombstones (rev, kind, row_id, day_date, natural_key)
+		VALUES ((SELECT value FROM change_seq WHERE id = 1), 'daily_task', OLD.id,
+		        (SELECT date FROM day WHERE id = OLD.day_id), OLD.task_name);
+	END;
+
+	-- Recreated so databases with the raw start_time version pick this one up
+	DROP TRIGGER IF EXISTS pomo_tombstone;
+	CREATE TRIGGER pomo_tombstone AFTER DELETE ON pomo BEGIN
+		UPDATE change_seq SET value = value + 1 WHERE id = 1;
+		INSERT INTO sync_tombstones (rev, kind, row_id, day_date, natural_key)
+		VALUES ((SELECT value FROM change_seq WHERE id = 1), 'pomodoro', OLD.id,
+		        (SELECT date FROM day WHERE id = OLD.day_id),
+		        strftime('%Y-%m-%dT%H:%M:%SZ', OLD.start_time));
+	END;
+`
+
+const revTriggers = `
+	CREATE TRIGGER IF NOT EXISTS %[1]s_rev_insert AFTER INSERT ON %[1]s BEGIN
+		UPDATE change_seq SET value = value + 1 WHERE id = 1;
+		UPDATE %[1]s SET rev = (SELECT value FROM change_seq WHERE id = 1) WHERE id = NEW.id;
+	END;
+
+	CREATE TRIGGER IF NOT EXISTS %[1]s_rev_update AFTER UPDATE ON %[1]s WHEN NEW.rev = OLD.rev BEGIN
+		UPDATE change_seq SET value = value + 1 WHERE id = 1;
+		UPDATE %[1]s SET rev = (SELECT value FROM change_seq WHERE id = 1) WHERE id = NEW.id;
+	END;
+
+	CREATE INDEX IF NOT EXISTS idx_%[1]s_rev ON %[1]s(rev);
+`
+
+var syncedTables = []string{"day", "daily_tasks", "pomo"}
+
+func initSyncSchema() error {
+	if _, err := db.Exec(syncSchema); err != nil {
+		return err
+	}
+	for _, table := range syncedTables {
+		if err := ensureColumn(table, "rev", "INTEGER NOT NULL DEFAULT 0"); err != nil {
+			return err
+		}
+		if _, err := db.Exec(fmt.Sprintf(revTriggers, table)); err != nil {
+			return err
+		}
+		// Stamp rows written before delta sync existed (fires the update trigger)
+		if _, err := db.Exec(fmt.Sprintf("UPDATE %s SET id = id WHERE rev = 0", table)); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+func ensureColumn(table, column, decl string) error {
+	rows, err := db.Query(fmt.Sprintf("PRAGMA table_info(%s)", table))
+	if err != nil {
+		return err
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var cid, notNull, pk int
+		var name, colType string
+		var dflt sql.NullString
+		if err := rows.Scan(&cid, &name, &colType, &notNull, &dflt, &pk); err != nil {
+			return err
+		}
+		if name == column {
+			return nil
+		}
+	}
+	if err := rows.Err(); err != nil {
+		return err
+	}
+	rows.Close()
+	_, err = db.Exec(fmt.Sprintf("ALTER TABLE %s ADD COLUMN %s %s", table, column, decl))
 	return err
 }
 
@@ -296,25 +426,22 @@ func deleteTask(w http.ResponseWriter, r *http.Request) {
 
 func getSessions(w http.ResponseWriter, r *http.Request) {
 	taskID := r.URL.Query().Get("task_id")
-	
-	var rows *sql.Rows
-	var err error
-	
+	limit, cursor, err := parsePage(r)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	query := `SELECT id, task_id, start_time, end_time, duration, completed, CAST(start_time AS TEXT)
+	          FROM pomodoro_sessions WHERE 1=1`
+	args := []interface{}{}
 	if taskID != "" {
-		rows, err = db.Query(`
-			SELECT id, task_id, start_time, end_time, duration, completed 
-			FROM pomodoro_sessions 
-			WHERE task_id = ?
-			ORDER BY start_time DESC
-		`, taskID)
-	} else {
-		rows, err = db.Query(`
-			SELECT id, task_id, start_time, end_time, duration, completed 
-			FROM pomodoro_sessions 
-			ORDER BY start_time DESC
-		`)
+		query += " AND task_id = ?"
+		args = append(args, taskID)
 	}
-	
+	query, args = pageClause(query, args, limit, cursor)
+
+	rows, err := db.Query(query, args...)
 	if err != nil {
 		http.Error(w, err.Error(), http.StatusInternalServerError)
 		return
@@ -322,10 +449,12 @@ func getSessions(w http.ResponseWriter, r *http.Request) {
 	defer rows.Close()
 
 	sessions := []PomodoroSession{}
+	var lastKey string
 	for rows.Next() {
 		var session PomodoroSession
 		var endTime sql.NullTime
-		err := rows.Scan(&session.ID, &session.TaskID, &session.StartTime, &endTime, &session.Duration, &session.Completed)
+		err := rows.Scan(&session.ID, &session.TaskID, &session.StartTime, &endTime, &session.Duration,
+			&session.Completed, &lastKey)
 		if err != nil {
 			http.Error(w, err.Error(), http.StatusInternalServerError)
 			return
@@ -336,6 +465,9 @@ func getSessions(w http.ResponseWriter, r *http.Request) {
 		sessions = append(sessions, session)
 	}
 
+	if limit > 0 && len(sessions) == limit {
+		w.Header().Set("X-Next-Cursor", encodeCursor(lastKey, sessions[len(sessions)-1].ID))
+	}
 	w.Header().Set("Content-Type", "application/json")
 	json.NewEncoder(w).Encode(sessions)
 }
@@ -655,6 +787,87 @@ func updateDailyTask(w http.ResponseWriter, r *http.Request) {
 	json.NewEncoder(w).Encode(task)
 }
 
+// Columns a PATCH may set; everything else (id, date, day_id, rev) is
+// fixed once the row exists.
+var (
+	dayPatchColumns = map[string]bool{
+		"target_pomos": true, "finished_pomos": true, "start_time": true, "end_time": true,
+		"planned_at": true, "comment": true, "day_rating": true, "main_distraction": true,
+		"reflection_notes": true, "reward": true,
+	}
+	dailyTaskPatchColumns = map[string]bool{
+		"task_name": true, "planned_pomodoros": true, "planned_at": true, "plan_priority": true,
+		"pomodoros_spent": true, "completed": true, "completed_at": true, "added_mid_day": true,
+		"reason_added": true,
+	}
+)
+
+// patchRow updates only the columns present in the JSON body and replies
+// with the whole row, so a client can send one changed counter without
+// re-uploading long text fields.
+func patchRow(w http.ResponseWriter, r *http.Request, table string, allowed map[string]bool) {
+	id, err := strconv.Atoi(mux.Vars(r)["id"])
+	if err != nil {
+		http.Error(w, "Invalid ID", http.StatusBadRequest)
+		return
+	}
+
+	var fields map[string]interface{}
+	if err := json.NewDecoder(r.Body).Decode(&fields); err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	names := make([]string, 0, len(fields))
+	for name := range fields {
+		if !allowed[name] {
+			http.Error(w, "Unknown or read-only field: "+name, http.StatusBadRequest)
+			return
+		}
+		names = append(names, name)
+	}
+	sort.Strings(names)
+
+	if len(names) > 0 {
+		assignments := make([]string, len(names))
+		args := make([]interface{}, 0, len(names)+1)
+		for i, name := range names {
+			assignments[i] = name + " = ?"
+			args = append(args, fields[name])
+		}
+		args = append(args, id)
+		_, err = db.Exec("UPDATE "+table+" SET "+strings.Join(assignments, ", ")+" WHERE id = ?", args...)
+		if err != nil {
+			http.Error(w, err.Error(), http.StatusInternalServerError)
+			return
+		}
+	}
+
+	rows, err := db.Query("SELECT * FROM "+table+" WHERE id = ?", id)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	found, err := scanMaps(rows)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	if len(found) == 0 {
+		http.Error(w, "Not found", http.StatusNotFound)
+		return
+	}
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(found[0])
+}
+
+func patchDay(w http.ResponseWriter, r *http.Request) {
+	patchRow(w, r, "day", dayPatchColumns)
+}
+
+func patchDailyTask(w http.ResponseWriter, r *http.Request) {
+	patchRow(w, r, "daily_tasks", dailyTaskPatchColumns)
+}
+
 func deleteDailyTask(w http.ResponseWriter, r *http.Request) {
 	vars := mux.Vars(r)
 	id, err := strconv.Atoi(vars["id"])
@@ -705,8 +918,15 @@ func getPomodoros(w http.ResponseWriter, r *http.Request) {
 	startDate := r.URL.Query().Get("start_date")
 	endDate := r.URL.Query().Get("end_date")
 
+	limit, cursor, err := parsePage(r)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
 	query := `SELECT id, day_id, start_time, end_time, duration_sec, aborted, 
-	                 focus_score, reason, note, task, context_switch, pause_count 
+	                 focus_score, reason, note, task, context_switch, pause_count,
+	                 CAST(start_time AS TEXT)
 	          FROM pomo WHERE 1=1`
 	args := []interface{}{}
 
@@ -720,7 +940,7 @@ func getPomodoros(w http.ResponseWriter, r *http.Request) {
 		args = append(args, startDate, endDate)
 	}
 
-	query += " ORDER BY start_time DESC"
+	query, args = pageClause(query, args, limit, cursor)
 
 	rows, err := db.Query(query, args...)
 	if err != nil {
@@ -730,10 +950,12 @@ func getPomodoros(w http.ResponseWriter, r *http.Request) {
 	defer rows.Close()
 
 	var pomodoros []PomodoroDetail
+	var lastKey string
 	for rows.Next() {
 		var p PomodoroDetail
 		err := rows.Scan(&p.ID, &p.DayID, &p.StartTime, &p.EndTime, &p.DurationSec,
-			&p.Aborted, &p.FocusScore, &p.Reason, &p.Note, &p.Task, &p.ContextSwitch, &p.PauseCount)
+			&p.Aborted, &p.FocusScore, &p.Reason, &p.Note, &p.Task, &p.ContextSwitch, &p.PauseCount,
+			&lastKey)
 		if err != nil {
 			http.Error(w, err.Error(), http.StatusInternalServerError)
 			return
@@ -745,10 +967,632 @@ func getPomodoros(w http.ResponseWriter, r *http.Request) {
 		pomodoros = []PomodoroDetail{}
 	}
 
+	if limit > 0 && len(pomodoros) == limit {
+		w.Header().Set("X-Next-Cursor", encodeCursor(lastKey, pomodoros[len(pomodoros)-1].ID))
+	}
 	w.Header().Set("Content-Type", "application/json")
 	json.NewEncoder(w).Encode(pomodoros)
 }
 
+// Keyset pagination for the history listings: ?limit=N&cursor=<opaque>.
+// Rows are ordered by (start_time, id) descending; when a page is full the
+// X-Next-Cursor header holds the position to continue from. Unlike OFFSET,
+// each page costs the same however deep into the history it is.
+type pageCursor struct {
+	StartTime string
+	ID        int
+}
+
+func parsePage(r *http.Request) (int, *pageCursor, error) {
+	limit := 0
+	if v := r.URL.Query().Get("limit"); v != "" {
+		parsed, err := strconv.Atoi(v)
+		if err != nil || parsed < 1 {
+			return 0, nil, fmt.Errorf("invalid limit")
+		}
+		if parsed > 5000 {
+			parsed = 5000
+		}
+		limit = parsed
+	}
+	v := r.URL.Query().Get("cursor")
+	if v == "" {
+		return limit, nil, nil
+	}
+	raw, err := base64.RawURLEncoding.DecodeString(v)
+	sep := bytes.LastIndexByte(raw, '|')
+	if err != nil || sep < 0 {
+		return 0, nil, fmt.Errorf("invalid cursor")
+	}
+	id, err := strconv.Atoi(string(raw[sep+1:]))
+	if err != nil {
+		return 0, nil, fmt.Errorf("invalid cursor")
+	}
+	return limit, &pageCursor{StartTime: string(raw[:sep]), ID: id}, nil
+}
+
+func encodeCursor(startTime string, id int) string {
+	return base64.RawURLEncoding.EncodeToString([]byte(startTime + "|" + strconv.Itoa(id)))
+}
+
+// pageClause appends the keyset condition, ordering and limit to query.
+func pageClause(query string, args []interface{}, limit int, cursor *pageCursor) (string, []interface{}) {
+	if cursor != nil {
+		query += " AND (start_time, id) < (?, ?)"
+		args = append(args, cursor.StartTime, cursor.ID)
+	}
+	query += " ORDER BY start_time DESC, id DESC"
+	if limit > 0 {
+		query += " LIMIT ?"
+		args = append(args, limit)
+	}
+	return query, args
+}
+
+// Bulk sync handlers
+
+// execer is satisfied by both *sql.DB and *sql.Tx
+type execer interface {
+	Exec(query string, args ...interface{}) (sql.Result, error)
+	QueryRow(query string, args ...interface{}) *sql.Row
+}
+
+func insertPomodoro(ex execer, pomo *PomodoroDetail) error {
+	result, err := ex.Exec(`
+		INSERT INTO pomo (day_id, start_time, end_time, duration_sec, aborted, 
+		                 focus_score, reason, note, task, context_switch, pause_count)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+	`, pomo.DayID, pomo.StartTime, pomo.EndTime, pomo.DurationSec, pomo.Aborted,
+		pomo.FocusScore, pomo.Reason, pomo.Note, pomo.Task, pomo.ContextSwitch, pomo.PauseCount)
+	if err != nil {
+		return err
+	}
+	id, _ := result.LastInsertId()
+	pomo.ID = int(id)
+	return nil
+}
+
+func upsertDailyTask(ex execer, task *DailyTask) error {
+	_, err := ex.Exec(`
+		INSERT INTO daily_tasks (day_id, task_name, planned_pomodoros, planned_at, plan_priority,
+		                        pomodoros_spent, completed, created_at, added_mid_day, reason_added)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+		ON CONFLICT(day_id, task_name) DO UPDATE SET
+			planned_pomodoros = excluded.planned_pomodoros,
+			planned_at = excluded.planned_at,
+			plan_priority = excluded.plan_priority,
+			pomodoros_spent = excluded.pomodoros_spent,
+			completed = excluded.completed,
+			added_mid_day = excluded.added_mid_day,
+			reason_added = excluded.reason_added
+	`, task.DayID, task.TaskName, task.PlannedPomodoros, task.PlannedAt, task.PlanPriority,
+		task.PomodorosSpent, task.Completed, time.Now(), task.AddedMidDay, task.ReasonAdded)
+	if err != nil {
+		return err
+	}
+	return ex.QueryRow("SELECT id FROM daily_tasks WHERE day_id = ? AND task_name = ?",
+		task.DayID, task.TaskName).Scan(&task.ID)
+}
+
+func upsertDay(ex execer, day *Day) error {
+	_, err := ex.Exec(`
+		INSERT INTO day (date, target_pomos, finished_pomos, start_time, end_time, planned_at, comment, reward)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+		ON CONFLICT(date) DO UPDATE SET
+			target_pomos = excluded.target_pomos,
+			finished_pomos = excluded.finished_pomos,
+			start_time = excluded.start_time,
+			end_time = excluded.end_time,
+			planned_at = excluded.planned_at,
+			comment = excluded.comment,
+			reward = excluded.reward
+	`, day.Date, day.TargetPomos, day.FinishedPomos, day.StartTime, day.EndTime, day.PlannedAt, day.Comment, day.Reward)
+	if err != nil {
+		return err
+	}
+	return ex.QueryRow("SELECT id FROM day WHERE date = ?", day.Date).Scan(&day.ID)
+}
+
+func bulkResult(id int, err error) BulkItemResult {
+	if err != nil {
+		return BulkItemResult{OK: false, Error: err.Error()}
+	}
+	return BulkItemResult{OK: true, ID: id}
+}
+
+func createPomodorosBulk(w http.ResponseWriter, r *http.Request) {
+	var payload struct {
+		Pomodoros []PomodoroDetail `json:"pomodoros"`
+	}
+	if err := json.NewDecoder(r.Body).Decode(&payload); err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	tx, err := db.Begin()
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	defer tx.Rollback()
+
+	results := make([]BulkItemResult, 0, len(payload.Pomodoros))
+	for i := range payload.Pomodoros {
+		pomo := &payload.Pomodoros[i]
+		err := insertPomodoro(tx, pomo)
+		results = append(results, bulkResult(pomo.ID, err))
+	}
+
+	if err := tx.Commit(); err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string][]BulkItemResult{"results": results})
+}
+
+func upsertDayBundle(w http.ResponseWriter, r *http.Request) {
+	var bundle DayBundle
+	if err := json.NewDecoder(r.Body).Decode(&bundle); err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	if bundle.Day.Date == "" {
+		http.Error(w, "day.date is required", http.StatusBadRequest)
+		return
+	}
+
+	tx, err := db.Begin()
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	defer tx.Rollback()
+
+	if err := upsertDay(tx, &bundle.Day); err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+
+	result := DayBundleResult{
+		Day:       bundle.Day,
+		Tasks:     make([]BulkItemResult, 0, len(bundle.Tasks)),
+		Pomodoros: make([]BulkItemResult, 0, len(bundle.Pomodoros)),
+	}
+	for i := range bundle.Tasks {
+		task := &bundle.Tasks[i]
+		task.DayID = bundle.Day.ID
+		err := upsertDailyTask(tx, task)
+		result.Tasks = append(result.Tasks, bulkResult(task.ID, err))
+	}
+	for i := range bundle.Pomodoros {
+		pomo := &bundle.Pomodoros[i]
+		pomo.DayID = bundle.Day.ID
+		err := insertPomodoro(tx, pomo)
+		result.Pomodoros = append(result.Pomodoros, bulkResult(pomo.ID, err))
+	}
+
+	if err := tx.Commit(); err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(result)
+}
+
+// Delta sync handlers
+
+// ChangeFeed is one page of GET /api/changes.
+type ChangeFeed struct {
+	Days       []map[string]interface{} `json:"days"`
+	DailyTasks []map[string]interface{} `json:"daily_tasks"`
+	Pomodoros  []map[string]interface{} `json:"pomodoros"`
+	Deleted    []map[string]interface{} `json:"deleted"`
+	Watermark  string                   `json:"watermark"`
+	HasMore    bool                     `json:"has_more"`
+}
+
+// scanMaps reads every row into a column-name keyed map, so the feed
+// carries whatever columns the table has.
+func scanMaps(rows *sql.Rows) ([]map[string]interface{}, error) {
+	defer rows.Close()
+	cols, err := rows.Columns()
+	if err != nil {
+		return nil, err
+	}
+	out := []map[string]interface{}{}
+	for rows.Next() {
+		values := make([]interface{}, len(cols))
+		ptrs := make([]interface{}, len(cols))
+		for i := range values {
+			ptrs[i] = &values[i]
+		}
+		if err := rows.Scan(ptrs...); err != nil {
+			return nil, err
+		}
+		row := make(map[string]interface{}, len(cols))
+		for i, col := range cols {
+			if b, ok := values[i].([]byte); ok {
+				row[col] = string(b)
+			} else {
+				row[col] = values[i]
+			}
+		}
+		out = append(out, row)
+	}
+	return out, rows.Err()
+}
+
+// getChanges returns rows written after ?updated_since=<watermark>, at most
+// ?limit changes per page, in revision order.
+func getChanges(w http.ResponseWriter, r *http.Request) {
+	var since int64
+	if v := r.URL.Query().Get("updated_since"); v != "" {
+		parsed, err := strconv.ParseInt(v, 10, 64)
+		if err != nil || parsed < 0 {
+			http.Error(w, "Invalid updated_since", http.StatusBadRequest)
+			return
+		}
+		since = parsed
+	}
+	limit := 500
+	if v := r.URL.Query().Get("limit"); v != "" {
+		parsed, err := strconv.Atoi(v)
+		if err != nil || parsed < 1 {
+			http.Error(w, "Invalid limit", http.StatusBadRequest)
+			return
+		}
+		if parsed > 5000 {
+			parsed = 5000
+		}
+		limit = parsed
+	}
+
+	// One transaction so every query sees the same snapshot
+	tx, err := db.Begin()
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	defer tx.Rollback()
+
+	var current int64
+	if err := tx.QueryRow(`SELECT value FROM change_seq WHERE id = 1`).Scan(&current); err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	if since > current {
+		since = 0 // Cursor from before a database reset: start over
+	}
+
+	// The page ends at the limit-th changed revision, if there are that many
+	until := current
+	hasMore := false
+	err = tx.QueryRow(`
+		SELECT rev FROM (
+			SELECT rev FROM day WHERE rev > ?1
+			UNION ALL SELECT rev FROM daily_tasks WHERE rev > ?1
+			UNION ALL SELECT rev FROM pomo WHERE rev > ?1
+			UNION ALL SELECT rev FROM sync_tombstones WHERE rev > ?1
+		) ORDER BY rev LIMIT 1 OFFSET ?2
+	`, since, limit-1).Scan(&until)
+	switch {
+	case err == sql.ErrNoRows:
+		until = current
+	case err != nil:
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	default:
+		hasMore = until < current
+	}
+
+	feed := ChangeFeed{Watermark: strconv.FormatInt(until, 10), HasMore: hasMore}
+	queries := []struct {
+		dest  *[]map[string]interface{}
+		query string
+	}{
+		{&feed.Days, `SELECT * FROM day WHERE rev > ? AND rev <= ? ORDER BY rev`},
+		{&feed.DailyTasks, `SELECT t.*, d.date AS day_date FROM daily_tasks t
+			JOIN day d ON d.id = t.day_id WHERE t.rev > ? AND t.rev <= ? ORDER BY t.rev`},
+		// start_time is the pomodoro's natural key: sent in the same text
+		// form as its tombstones (the later column wins in scanMaps)
+		{&feed.Pomodoros, `SELECT p.*, strftime('%Y-%m-%dT%H:%M:%SZ', p.start_time) AS start_time,
+			d.date AS day_date FROM pomo p
+			JOIN day d ON d.id = p.day_id WHERE p.rev > ? AND p.rev <= ? ORDER BY p.rev`},
+		{&feed.Deleted, `SELECT rev, kind, row_id AS id, day_date, natural_key
+			FROM sync_tombstones WHERE rev > ? AND rev <= ? ORDER BY rev`},
+	}
+	for _, q := range queries {
+		rows, err := tx.Query(q.query, since, until)
+		if err != nil {
+			http.Error(w, err.Error(), http.StatusInternalServerError)
+			return
+		}
+		if *q.dest, err = scanMaps(rows); err != nil {
+			http.Error(w, err.Error(), http.StatusInternalServerError)
+			return
+		}
+	}
+
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(feed)
+}
+
+// Conditional GET support
+
+// bufferedResponse captures a handler's output so it can be hashed
+type bufferedResponse struct {
+	header http.Header
+	status int
+	body   bytes.Buffer
+}
+
+func (b *bufferedResponse) Header() http.Header { return b.header }
+
+func (b *bufferedResponse) WriteHeader(status int) { b.status = status }
+
+func (b *bufferedResponse) Write(p []byte) (int, error) { return b.body.Write(p) }
+
+// etagMiddleware adds a content-hash ETag to successful GET responses and
+// answers 304 Not Modified when the client already holds that version.
+func etagMiddleware(next http.Handler) http.Handler {
+	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		if r.Method != http.MethodGet {
+			next.ServeHTTP(w, r)
+			return
+		}
+
+		buf := &bufferedResponse{header: http.Header{}, status: http.StatusOK}
+		next.ServeHTTP(buf, r)
+		for key, values := range buf.header {
+			w.Header()[key] = values
+		}
+		if buf.status != http.StatusOK {
+			w.WriteHeader(buf.status)
+			w.Write(buf.body.Bytes())
+			return
+		}
+
+		sum := sha1.Sum(buf.body.Bytes())
+		etag := `"` + hex.EncodeToString(sum[:8]) + `"`
+		w.Header().Set("ETag", etag)
+		if r.Header.Get("If-None-Match") == etag {
+			w.WriteHeader(http.StatusNotModified)
+			return
+		}
+		w.WriteHeader(http.StatusOK)
+		w.Write(buf.body.Bytes())
+	})
+}
+
+// idempotentReply is the response remembered for one Idempotency-Key.
+type idempotentReply struct {
+	fingerprint string // requestFingerprint of the request the key was first used for
+	status      int
+	header      http.Header
+	body        []byte
+	expires     time.Time
+	done        chan struct{} // closed once the first request has been answered
+	key         string
+	elem        *list.Element // position in idempotencyLRU
+}
+
+const (
+	idempotencyTTL     = 24 * time.Hour
+	idempotencyMaxKeys = 100000 // least recently used keys are evicted beyond this
+)
+
+// Remembered replies by key, and the same replies most recently used
+// first. Expired entries are dropped when looked up or when they reach the
+// back of the list; no request ever scans the whole store.
+var (
+	idempotencyMu   sync.Mutex
+	idempotencyKeys = map[string]*idempotentReply{}
+	idempotencyLRU  = list.New()
+)
+
+// lookupIdempotent returns the live entry for key, marking it recently
+// used. The caller holds idempotencyMu.
+func lookupIdempotent(key string, now time.Time) *idempotentReply {
+	reply, ok := idempotencyKeys[key]
+	if !ok {
+		return nil
+	}
+	if reply.body != nil && now.After(reply.expires) {
+		forgetIdempotent(reply)
+		return nil
+	}
+	idempotencyLRU.MoveToFront(reply.elem)
+	return reply
+}
+
+// rememberIdempotent stores a new entry, then evicts expired entries from
+// the back of the list and the least recently used ones over the cap. The
+// caller holds idempotencyMu.
+func rememberIdempotent(reply *idempotentReply, now time.Time) {
+	idempotencyKeys[reply.key] = reply
+	reply.elem = idempotencyLRU.PushFront(reply)
+	for idempotencyLRU.Len() > 1 {
+		oldest := idempotencyLRU.Back().Value.(*idempotentReply)
+		expired := oldest.body != nil && now.After(oldest.expires)
+		if !expired && idempotencyLRU.Len() <= idempotencyMaxKeys {
+			break
+		}
+		forgetIdempotent(oldest)
+	}
+}
+
+// forgetIdempotent drops an entry. Requests already waiting on it still
+// get its reply. The caller holds idempotencyMu.
+func forgetIdempotent(reply *idempotentReply) {
+	if idempotencyKeys[reply.key] == reply {
+		delete(idempotencyKeys, reply.key)
+		idempotencyLRU.Remove(reply.elem)
+	}
+}
+
+// requestFingerprint binds an Idempotency-Key to one request: method, path
+// and the body's canonical JSON (re-encoded, so key order and spacing do
+// not matter). The body is put back for the handler.
+func requestFingerprint(r *http.Request) (string, error) {
+	body, err := io.ReadAll(r.Body)
+	if err != nil {
+		return "", err
+	}
+	r.Body = io.NopCloser(bytes.NewReader(body))
+	canonical := body
+	var value interface{}
+	if json.Unmarshal(body, &value) == nil {
+		canonical, _ = json.Marshal(value)
+	}
+	sum := sha256.Sum256(canonical)
+	return r.Method + " " + r.URL.Path + " " + hex.EncodeToString(sum[:]), nil
+}
+
+// idempotencyMiddleware applies each write carrying an Idempotency-Key
+// once: a retry or replay with the same key gets the stored reply back
+// (marked Idempotent-Replayed) instead of creating the row again; the same
+// key with another method, path or body is rejected with 422. A retry
+// arriving while the first request is still running waits for its reply;
+// 5xx replies are forgotten so the write can be retried.
+func idempotencyMiddleware(next http.Handler) http.Handler {
+	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		key := r.Header.Get("Idempotency-Key")
+		if key == "" || r.Method == http.MethodGet || r.Method == http.MethodHead || r.Method == http.MethodOptions {
+			next.ServeHTTP(w, r)
+			return
+		}
+		fingerprint, err := requestFingerprint(r)
+		if err != nil {
+			http.Error(w, "Could not read request body", http.StatusBadRequest)
+			return
+		}
+
+		var mine *idempotentReply
+		for {
+			idempotencyMu.Lock()
+			now := time.Now()
+			reply := lookupIdempotent(key, now)
+			if reply == nil {
+				mine = &idempotentReply{fingerprint: fingerprint, done: make(chan struct{}), key: key}
+				rememberIdempotent(mine, now)
+				idempotencyMu.Unlock()
+				break
+			}
+			idempotencyMu.Unlock()
+
+			<-reply.done
+			if reply.body == nil {
+				continue // The first attempt failed and was forgotten
+			}
+			if reply.fingerprint != fingerprint {
+				http.Error(w, "Idempotency-Key reused for another request", http.StatusUnprocessableEntity)
+				return
+			}
+			for k, values := range reply.header {
+				w.Header()[k] = values
+			}
+			w.Header().Set("Idempotent-Replayed", "true")
+			w.WriteHeader(reply.status)
+			w.Write(reply.body)
+			return
+		}
+
+		buf := &bufferedResponse{header: http.Header{}, status: http.StatusOK}
+		next.ServeHTTP(buf, r)
+
+		idempotencyMu.Lock()
+		if buf.status >= 500 {
+			forgetIdempotent(mine)
+		} else {
+			mine.status, mine.header = buf.status, buf.header
+			mine.body = append([]byte{}, buf.body.Bytes()...)
+			mine.expires = time.Now().Add(idempotencyTTL)
+		}
+		close(mine.done)
+		idempotencyMu.Unlock()
+
+		for k, values := range buf.header {
+			w.Header()[k] = values
+		}
+		w.WriteHeader(buf.status)
+		w.Write(buf.body.Bytes())
+	})
+}
+
+// gzipResponseWriter compresses the body once the handler has picked a
+// status that carries one.
+type gzipResponseWriter struct {
+	http.ResponseWriter
+	gz          *gzip.Writer
+	wroteHeader bool
+}
+
+func (g *gzipResponseWriter) WriteHeader(status int) {
+	if g.wroteHeader {
+		return
+	}
+	g.wroteHeader = true
+	h := g.ResponseWriter.Header()
+	if status != http.StatusNoContent && status != http.StatusNotModified && h.Get("Content-Encoding") == "" {
+		h.Set("Content-Encoding", "gzip")
+		h.Del("Content-Length")
+		g.gz = gzip.NewWriter(g.ResponseWriter)
+	}
+	g.ResponseWriter.WriteHeader(status)
+}
+
+func (g *gzipResponseWriter) Write(p []byte) (int, error) {
+	if !g.wroteHeader {
+		g.WriteHeader(http.StatusOK)
+	}
+	if g.gz != nil {
+		return g.gz.Write(p)
+	}
+	return g.ResponseWriter.Write(p)
+}
+
+func (g *gzipResponseWriter) Close() error {
+	if g.gz != nil {
+		return g.gz.Close()
+	}
+	return nil
+}
+
+// gzipMiddleware inflates gzip request bodies and compresses responses for
+// clients that send Accept-Encoding: gzip.
+func gzipMiddleware(next http.Handler) http.Handler {
+	return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		switch r.Header.Get("Content-Encoding") {
+		case "", "identity":
+		case "gzip":
+			body, err := gzip.NewReader(r.Body)
+			if err != nil {
+				http.Error(w, "corrupt gzip body", http.StatusBadRequest)
+				return
+			}
+			defer body.Close()
+			r.Body = body
+			r.Header.Del("Content-Encoding")
+			r.ContentLength = -1
+		default:
+			http.Error(w, "unsupported Content-Encoding", http.StatusUnsupportedMediaType)
+			return
+		}
+
+		w.Header().Add("Vary", "Accept-Encoding")
+		if !strings.Contains(r.Header.Get("Accept-Encoding"), "gzip") {
+			next.ServeHTTP(w, r)
+			return
+		}
+		gw := &gzipResponseWriter{ResponseWriter: w}
+		defer gw.Close()
+		next.ServeHTTP(gw, r)
+	})
+}
+
 func main() {
 	// Initialize database
 	if err := initDB(); err != nil {
@@ -776,23 +1620,36 @@ func main() {
 	// Day routes
 	r.HandleFunc("/api/days/{date}", getDay).Methods("GET")
 	r.HandleFunc("/api/days", createOrUpdateDay).Methods("POST")
+	r.HandleFunc("/api/days/bundle", upsertDayBundle).Methods("POST")
 	r.HandleFunc("/api/days/{id}/reflection", updateDayReflection).Methods("PUT")
+	r.HandleFunc("/api/days/{id:[0-9]+}", patchDay).Methods("PATCH")
 	
 	// Daily task routes
 	r.HandleFunc("/api/days/{day_id}/tasks", getDailyTasks).Methods("GET")
 	r.HandleFunc("/api/days/{day_id}/tasks", createDailyTask).Methods("POST")
 	r.HandleFunc("/api/daily-tasks/{id}", updateDailyTask).Methods("PUT")
+	r.HandleFunc("/api/daily-tasks/{id}", patchDailyTask).Methods("PATCH")
 	r.HandleFunc("/api/daily-tasks/{id}", deleteDailyTask).Methods("DELETE")
 	
 	// Enhanced pomodoro routes
 	r.HandleFunc("/api/pomodoros", getPomodoros).Methods("GET")
 	r.HandleFunc("/api/pomodoros", createPomodoro).Methods("POST")
+	r.HandleFunc("/api/pomodoros/bulk", createPomodorosBulk).Methods("POST")
+
+	// Delta sync
+	r.HandleFunc("/api/changes", getChanges).Methods("GET")
+
+	// Outermost first: the ETag is computed on the uncompressed body
+	r.Use(gzipMiddleware)
+	r.Use(etagMiddleware)
+	r.Use(idempotencyMiddleware)
 
 	// CORS
 	c := cors.New(cors.Options{
 		AllowedOrigins:   []string{"*"},
-		AllowedMethods:   []string{"GET", "POST", "PUT", "DELETE", "OPTIONS"},
+		AllowedMethods:   []string{"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"},
 		AllowedHeaders:   []string{"*"},
+		ExposedHeaders:   []string{"ETag", "X-Next-Cursor", "Idempotent-Replayed"},
 		AllowCredentials: true,
 	})
 
@@ -4,60 +4,522 @@ Handles communication with the Go REST API with offline fallback
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import List, Dict, Optional
+import time
+from typing import Callable, Iterator, List, Dict, Optional
 from datetime import datetime
 import os
+import uuid
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from hardmode.core.models import DailyTask, Day, Pomodoro, Statistics, to_records
+from hardmode.net import bulk, compression, unix
+from hardmode.net.breaker import OPEN, CircuitBreaker
+from hardmode.net.cache import ResponseCache
+from hardmode.net.codec import JSONCodec, get_codec
+from hardmode.net.idempotency import HEADER as IDEMPOTENCY_HEADER, idempotency_key
+from hardmode.net.metrics import RequestEvent, RequestMetrics, endpoint_template
+from hardmode.net.outbox import MUTATING_METHODS, Outbox, OutboxFull
+from hardmode.net.pipeline import WriteBatch, batch_write
+from hardmode.net.ratelimit import RateLimiter
+from hardmode.net.retry import RetryPolicy, parse_retry_after
+from hardmode.net.singleflight import SingleFlight, request_key
+from hardmode.net.stream import iter_json_array
+
+
+class EndpointNotSupported(Exception):
+    """The server does not implement the requested route (404/405)"""
+
+
+def _wire_bytes(response: requests.Response, stream: bool) -> int:
+    """Response body size on the wire (compressed size if gzipped)"""
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit():
+        return int(length)
+    # Reading a streamed body here would consume it before the caller
+    return 0 if stream else len(response.content)
+
+
+def _route_missing(probe, status: int) -> bool:
+    """Whether a reply to a probe request means the route does not exist"""
+    if not probe:
+        return False
+    return status in ((404, 405) if probe is True else probe)
+
+
+_REFLECTION_FIELDS = frozenset({'day_rating', 'main_distraction', 'reflection_notes'})
+
+
+def _day_upsert_args(day: Day) -> Dict:
+    """create_or_update_day arguments carrying a whole Day record"""
+    return bulk.compact({
+        'date': day.date,
+        'target_pomos': day.target_pomos,
+        'finished_pomos': day.finished_pomos,
+        'start_time': day.start_time,
+        'end_time': day.end_time,
+        'comment': day.comment or "",
+        'day_rating': day.day_rating,
+        'main_distraction': day.main_distraction or "",
+        'reflection_notes': day.reflection_notes or "",
+    })
+
+
+def _task_put_body(task: DailyTask) -> Dict:
+    """Full-record PUT body for a DailyTask"""
+    data = task.to_dict()
+    for name in ('id', 'day_id', 'created_at'):
+        del data[name]
+    return bulk.compact(data)
 
 
 class APIClient:
     """Client for communicating with the Hardmode Pomodoro API"""
     
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, timeout: float = 5,
+                 retry: RetryPolicy = None, pool_maxsize: int = 4,
+                 session: requests.Session = None,
+                 bulk_max_bytes: int = bulk.DEFAULT_MAX_BYTES,
+                 cache: ResponseCache = None, outbox: Outbox = None,
+                 breaker: CircuitBreaker = None,
+                 compress_min_bytes: Optional[int] = compression.DEFAULT_MIN_BYTES,
+                 metrics: RequestMetrics = None,
+                 on_request: Callable[[RequestEvent], None] = None,
+                 codec: JSONCodec = None, single_flight: bool = True,
+                 rate_limit: RateLimiter = None, device_id: str = None):
         """
         Initialize the API client
         
         Args:
-            base_url: Base URL of the API (defaults to localhost:8080)
+            base_url: Base URL of the API (defaults to localhost:8080);
+                ``unix:///path/to.sock`` talks to a backend listening on
+                a Unix domain socket
+            timeout: Per-request timeout in seconds
+            retry: Retry/backoff policy for idempotent requests
+            pool_maxsize: Maximum pooled keep-alive connections per host
+            session: Pre-configured requests session (mainly for tests)
+            bulk_max_bytes: Payload size above which bulk calls are chunked
+            cache: Response cache for reads (default: revalidate every
+                read with ETag/Last-Modified; pass max_entries=0 to disable)
+            outbox: Durable queue for writes made while the API is unreachable
+            breaker: Circuit breaker that fails fast while the API is down
+            compress_min_bytes: gzip JSON request bodies at least this
+                large (None disables request compression)
+            metrics: Registry for per-endpoint request metrics (may be
+                shared between clients)
+            on_request: Called with a RequestEvent after every request
+            codec: JSON encoder/decoder (default: orjson if installed)
+            single_flight: Coalesce concurrent identical GETs into one
+                request (counts in ``self.inflight.stats()``)
+            rate_limit: Token buckets pacing every request attempt, and
+                holding requests for a random delay after an outage
+            device_id: This install's id (see idempotency.load_device_id),
+                part of every key derived from a local row; default: a
+                random id per client
         """
         self.base_url = base_url or os.getenv('API_URL', 'http://localhost:8080')
-        self.timeout = 5  # seconds
+        self.socket_path = unix.socket_path(self.base_url)
+        if self.socket_path is not None:
+            self.base_url = unix.http_url(self.socket_path)
+        self.timeout = timeout  # seconds
+        self.retry = retry or RetryPolicy()
+        self.bulk_max_bytes = bulk_max_bytes
+        self._bulk_supported = True  # Cleared when the server lacks bulk routes
+        self._patch_supported = True  # Cleared when the server lacks PATCH routes
+        self.cache = cache if cache is not None else ResponseCache()
+        self.outbox = outbox
+        # Jittered cool-down: a fleet that lost the API together must not
+        # all probe it again in the same second
+        self.breaker = breaker or CircuitBreaker(jitter=0.5)
+        self.rate_limit = rate_limit
+        self.device_id = device_id or uuid.uuid4().hex
+        self.compress_min_bytes = compress_min_bytes
+        self.codec = codec or get_codec()
+        self.inflight = SingleFlight() if single_flight else None
+        self._gzip_requests = True  # Cleared if the server answers 415
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        if on_request is not None:
+            self.metrics.add_hook(on_request)
         self._online = True
+        self._owns_session = session is None
+        self.session = session or self._make_session(pool_maxsize)
+        if self.socket_path is not None and self.session is not None:
+            self.session.mount(f'{unix.SCHEME}://', unix.UnixAdapter(pool_maxsize))
+    
+    @staticmethod
+    def _make_session(pool_maxsize: int) -> requests.Session:
+        """Create a keep-alive session with a bounded per-host pool."""
+        session = requests.Session()
+        # Retries are handled in _request so they follow RetryPolicy
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize,
+                              max_retries=0, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self) -> None:
+        """Close pooled connections held by this client"""
+        if self._owns_session:
+            self.session.close()
+    
+    def __enter__(self) -> 'APIClient':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
         
     def _request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
         """
         Make an HTTP request to the API
         
+        Idempotent methods are retried with exponential backoff on
+        connection errors, timeouts and retryable statuses (429/5xx).
+        Writes carry an Idempotency-Key header, and are retried too when
+        the retry policy has keyed_writes set.
+        A GET identical to one already in flight (same path, params and
+        options) waits for it and shares its result.
+        
         Args:
             method: HTTP method (GET, POST, PUT, DELETE)
             endpoint: API endpoint path
+            probe: Raise EndpointNotSupported on 404/405 (or on the
+                statuses given as a tuple) instead of returning None
+                (used to detect optional routes)
+            cache_tags: Make a GET cacheable, labelled with these tags
+                (or a callable deriving them from the response data)
+            invalidates: Cache tags made stale by this request
+            queue: Store writes in the outbox if the API is unreachable
+            strict: Raise requests.HTTPError on 4xx/5xx instead of
+                returning None
+            model: Record class (see hardmode.core.models) to decode
+                the response object(s) into
+            local_id: Identity of the local row a write comes from; its
+                Idempotency-Key is derived from it (default: random key)
+            idempotency_key: Explicit key for a write (outbox replays)
             **kwargs: Additional arguments for requests
             
         Returns:
             Response data as dict, or None if request failed
         """
+        if self.inflight is not None and method.upper() == 'GET':
+            # Identical reads already in flight share that request's result
+            key = request_key(endpoint, kwargs.get('params'), kwargs.get('model'),
+                              kwargs.get('probe', False), kwargs.get('strict', False))
+            return self.inflight.do(
+                key, lambda: self._perform_request(method, endpoint, **kwargs))
+        return self._perform_request(method, endpoint, **kwargs)
+    
+    def _attach_idempotency_key(self, method: str, endpoint: str, kwargs: Dict) -> Optional[str]:
+        """Pop local_id/idempotency_key from kwargs and send the key header on writes"""
+        local_id = kwargs.pop('local_id', None)
+        key = kwargs.pop('idempotency_key', None)
+        if method.upper() not in MUTATING_METHODS:
+            return None
+        key = key or idempotency_key(method, endpoint, local_id, self.device_id)
+        kwargs['headers'] = {**kwargs.get('headers', {}), IDEMPOTENCY_HEADER: key}
+        return key
+    
+    def _enqueue(self, method: str, endpoint: str, body: Optional[Dict],
+                 write_key: Optional[str]) -> None:
+        """Queue a write in the outbox; a full outbox refuses it"""
+        write = batch_write.get()
+        if write is not None:
+            # A WriteBatch replays it, and queues it only if every replay fails
+            write.queued = (method, endpoint, body, write_key)
+            return
+        try:
+            self.outbox.enqueue(method, endpoint, body, write_key)
+        except OutboxFull as e:
+            print(f"API write not queued: {e}")
+    
+    def _perform_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
+        """One request, without read coalescing (see _request)"""
         url = f"{self.base_url}{endpoint}"
+        cache_tags = kwargs.pop('cache_tags', None)
+        invalidates = kwargs.pop('invalidates', ())
+        model = kwargs.pop('model', None)
+        strict = kwargs.pop('strict', False)
+        queueable = (kwargs.pop('queue', True) and self.outbox is not None
+                     and method.upper() in MUTATING_METHODS)
+        write_key = self._attach_idempotency_key(method, endpoint, kwargs)
         kwargs['timeout'] = kwargs.get('timeout', self.timeout)
         
+        if queueable and len(self.outbox) and batch_write.get() is None:
+            # Earlier writes are still queued: stay behind them
+            self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            if invalidates:
+                self.cache.invalidate(*invalidates)
+            return None
+        
+        key = entry = None
+        if cache_tags is not None and self.cache.enabled:
+            key = self.cache.key(method, url, kwargs.get('params'))
+            entry = self.cache.lookup(key)
+            if entry is not None and self.cache.is_fresh(entry):
+                return to_records(model, self.cache.hit(entry))
+            if entry is not None:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **entry.validators()}
+        
         try:
-            response = requests.request(method, url, **kwargs)
-            response.raise_for_status()
-            self._online = True
-            
-            if response.status_code == 204:  # No content
-                return {}
-            
-            return response.json()
+            response = self._send(method, url, strict=strict or queueable, **kwargs)
+        except requests.exceptions.HTTPError as e:
+            if strict:
+                raise
+            print(f"API request failed: {e}")
+            self._online = False
+            if queueable and e.response is not None and e.response.status_code >= 500:
+                # The server is failing, not refusing: replay the write later
+                self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            # A 4xx rejected the write; queueing it would not help
+            return None
+        finally:
+            # Invalidate even on failure: a timed-out write may have landed
+            if invalidates:
+                self.cache.invalidate(*invalidates)
+        if response is None:
+            if queueable:
+                self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            return None
+        if response.status_code == 204:  # No content
+            return {}
+        if response.status_code == 304 and entry is not None:
+            return to_records(model, self.cache.not_modified(key, entry))
+        
+        try:
+            data = self.codec.loads(response.content)
+        except ValueError as e:
+            print(f"API request failed: {e}")
+            self._online = False
+            return None
+        if key is not None:
+            tags = cache_tags(data) if callable(cache_tags) else cache_tags
+            self.cache.store(key, data, response.headers, tags)
+        return to_records(model, data)
+    
+    def _send(self, method: str, url: str, probe: bool = False, strict: bool = False,
+              **kwargs) -> Optional[requests.Response]:
+        """
+        Send a request, retrying per RetryPolicy, and record its metrics
+        
+        Returns:
+            The successful (< 400) response, or None if the request failed
+            or the circuit breaker is open (with strict=True, None means
+            the API could not be reached)
+        """
+        event = RequestEvent(method.upper(), endpoint_template(urlsplit(url).path))
+        started = time.perf_counter()
+        try:
+            return self._send_attempts(event, method, url, probe, strict, **kwargs)
+        except Exception as e:
+            event.error = event.error or type(e).__name__
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - started
+            self.metrics.record(event)
+    
+    def _send_attempts(self, event: RequestEvent, method: str, url: str,
+                       probe: bool, strict: bool, **kwargs) -> Optional[requests.Response]:
+        """The retry loop behind _send, filling in ``event`` as it goes"""
+        if not self.breaker.allow():
+            self._online = False  # Fail fast while the API is known to be down
+            event.error = 'circuit_open'
+            return None
+        keyed = IDEMPOTENCY_HEADER in kwargs.get('headers', {})
+        retries = self.retry.max_retries if self.retry.allows(method, keyed) else 0
+        plain = kwargs
+        kwargs, compressed = self._encode_body(kwargs)
+        
+        attempt = 0
+        while True:
+            retry_after = None
+            event.retries = attempt
+            event.bytes_out += len(kwargs.get('data') or b'')
+            if self.rate_limit is not None:
+                self.rate_limit.acquire(method, urlsplit(url).path)
+            try:
+                response = self.session.request(method, url, **kwargs)
+                event.status = response.status_code
+                event.bytes_in += _wire_bytes(response, kwargs.get('stream', False))
+                if compressed and response.status_code == 415:
+                    # Server cannot read gzip bodies: send them plain from now on
+                    response.close()
+                    self._gzip_requests = False
+                    kwargs, compressed = self._encode_body(plain)
+                    continue
+                if attempt < retries and self.retry.should_retry_status(response.status_code):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    response.close()
+                elif _route_missing(probe, response.status_code):
+                    self._record_outcome(response.status_code)
+                    raise EndpointNotSupported(url)
+                else:
+                    self._record_outcome(response.status_code)
+                    response.raise_for_status()
+                    return response
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                if isinstance(e, requests.exceptions.Timeout):
+                    event.timeouts += 1
+                if attempt >= retries:
+                    print(f"API request failed: {e}")
+                    event.error = type(e).__name__
+                    self._record_outcome(None)
+                    return None
+            except requests.exceptions.HTTPError as e:
+                self._online = False
+                if strict:
+                    raise
+                print(f"API request failed: {e}")
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"API request failed: {e}")
+                event.error = type(e).__name__
+                self._record_outcome(None)
+                return None
+            time.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+    
+    def _encode_body(self, kwargs: Dict) -> tuple:
+        """Serialise a json= payload, gzipping large bodies"""
+        if kwargs.get('json') is None:
+            return kwargs, False
+        min_bytes = self.compress_min_bytes if self._gzip_requests else None
+        body, headers = compression.encode_json(kwargs['json'], min_bytes,
+                                               dumps=self.codec.dumps)
+        encoded = {k: v for k, v in kwargs.items() if k != 'json'}
+        encoded['data'] = body
+        encoded['headers'] = {**kwargs.get('headers', {}), **headers}
+        return encoded, 'Content-Encoding' in headers
+    
+    def _iter_json(self, endpoint: str, params: Optional[Dict] = None,
+                   chunk_size: int = 64 * 1024, model: type = None) -> Iterator[Dict]:
+        """
+        Stream the elements of a JSON array response
+        
+        Yields nothing if the request fails up front. A connection lost
+        mid-stream is re-raised, since the rows seen so far are incomplete.
+        """
+        url = f"{self.base_url}{endpoint}"
+        response = self._send('GET', url, params=params, stream=True, timeout=self.timeout)
+        if response is None:
+            return
+        try:
+            items = iter_json_array(response.iter_content(chunk_size))
+            if model is not None:
+                items = map(model.from_dict, items)
+            yield from items
         except requests.exceptions.RequestException as e:
+            print(f"API request failed: {e}")
+            self._record_outcome(None)
+            raise
+        finally:
+            response.close()
+    
+    def _iter_pages(self, endpoint: str, params: Dict, page_size: int,
+                    model: type = None) -> Iterator[Dict]:
+        """
+        Iterate over a keyset-paginated listing, prefetching the next page
+        
+        Each request carries the opaque cursor from the previous page's
+        X-Next-Cursor header; a page without one is the last. The next page
+        is fetched on a worker thread while the caller consumes the current
+        one. Closing the generator early abandons the pending fetch.
+        """
+        params = {**params, 'limit': page_size}
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-prefetch')
+        pending = executor.submit(self._fetch_page, endpoint, params, model)
+        try:
+            first = True
+            while pending is not None:
+                page = pending.result()
+                if page is None:
+                    if first:
+                        return  # Offline: nothing to yield, as with _request
+                    raise requests.exceptions.ConnectionError(
+                        f"Lost the API while paging {endpoint}")
+                rows, cursor = page
+                pending = None
+                if cursor:
+                    pending = executor.submit(self._fetch_page, endpoint,
+                                              {**params, 'cursor': cursor}, model)
+                first = False
+                yield from rows
+        finally:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+    
+    def _fetch_page(self, endpoint: str, params: Dict,
+                    model: type = None) -> Optional[tuple]:
+        """Fetch one page: (rows, next cursor or None), or None on failure"""
+        url = f"{self.base_url}{endpoint}"
+        response = self._send('GET', url, params=params, timeout=self.timeout)
+        if response is None:
+            return None
+        try:
+            rows = to_records(model, self.codec.loads(response.content))
+        except ValueError as e:
             print(f"API request failed: {e}")
             self._online = False
             return None
+        return rows, response.headers.get('x-next-cursor')
+    
+    def _record_outcome(self, status: Optional[int]) -> None:
+        """Feed a request outcome to the breaker (None = no response)"""
+        if status is None or status >= 500:
+            self._online = False
+            self.breaker.record_failure()
+        else:
+            # Any answer below 500, even a 404, proves the API is up
+            self._online = True
+            if self.breaker.record_success() and self.rate_limit is not None:
+                self.rate_limit.after_outage()
+    
+    def metrics_snapshot(self) -> Dict[str, Dict]:
+        """
+        Per-endpoint request counts, errors, retries, timeouts, bytes and
+        latency percentiles (see RequestMetrics.snapshot)
+        """
+        return self.metrics.snapshot()
     
     def is_online(self) -> bool:
-        """Check if the API is reachable"""
+        """
+        Whether the API is believed reachable, from recent request outcomes
+        
+        Does no I/O, so it is safe to call from the GUI thread.
+        """
+        return self.breaker.state != OPEN
+    
+    def check_health(self) -> bool:
+        """Actively probe GET /health (subject to the circuit breaker)"""
         result = self._request('GET', '/health')
         return result is not None
     
+    # Delta sync
+    def get_changes(self, updated_since: Optional[str] = None,
+                    limit: int = 500) -> Optional[Dict]:
+        """
+        Get days, daily tasks, pomodoros and deletions changed after a watermark
+        
+        Args:
+            updated_since: Watermark returned by the previous call (None
+                fetches everything)
+            limit: Maximum number of changes in this page
+            
+        Returns:
+            Dict with days, daily_tasks, pomodoros, deleted, watermark and
+            has_more, or None if the request failed
+            
+        Raises:
+            EndpointNotSupported: If the server has no change feed
+        """
+        params = {'limit': limit}
+        if updated_since is not None:
+            params['updated_since'] = updated_since
+        return self._request('GET', '/api/changes', params=params, probe=True)
+    
     # Task methods
     def get_tasks(self) -> Optional[List[Dict]]:
         """Get all tasks"""
@@ -78,7 +540,8 @@ class APIClient:
             'name': name,
             'description': description
         }
-        return self._request('POST', '/api/tasks', json=data)
+        return self._request('POST', '/api/tasks', json=data,
+                             invalidates=('stats',))
     
     def update_task(self, task_id: int, name: str = None, description: str = None, 
                    is_completed: bool = None, completed_at: str = None) -> Optional[Dict]:
@@ -105,7 +568,8 @@ class APIClient:
         if completed_at is not None:
             data['completed_at'] = completed_at
             
-        return self._request('PUT', f'/api/tasks/{task_id}', json=data)
+        return self._request('PUT', f'/api/tasks/{task_id}', json=data,
+                             invalidates=('stats',))
     
     def delete_task(self, task_id: int) -> bool:
         """
@@ -117,7 +581,8 @@ class APIClient:
         Returns:
             True if deleted successfully
         """
-        result = self._request('DELETE', f'/api/tasks/{task_id}')
+        result = self._request('DELETE', f'/api/tasks/{task_id}',
+                               invalidates=('stats',))
         return result is not None
     
     # Session methods
@@ -132,7 +597,26 @@ class APIClient:
             List of sessions
         """
         params = {'task_id': task_id} if task_id else {}
-        return self._request('GET', '/api/sessions', params=params)
+        return self._request('GET', '/api/sessions', params=params,
+                             cache_tags=('sessions',))
+    
+    def iter_sessions(self, task_id: Optional[int] = None,
+                      page_size: Optional[int] = 500) -> Iterator[Dict]:
+        """
+        Iterate over pomodoro sessions, newest first, without loading them all
+        
+        Args:
+            task_id: Optional task ID to filter sessions
+            page_size: Sessions per keyset-paginated request; None streams
+                a single unpaginated response instead
+            
+        Yields:
+            Sessions, decoded one at a time
+        """
+        params = {'task_id': task_id} if task_id else {}
+        if page_size is None:
+            return self._iter_json('/api/sessions', params=params)
+        return self._iter_pages('/api/sessions', params, page_size)
     
     def create_session(self, task_id: int, duration: int, completed: bool = False,
                       start_time: str = None, end_time: str = None) -> Optional[Dict]:
@@ -164,30 +648,38 @@ class APIClient:
             end = now + timedelta(minutes=duration)
             data['end_time'] = end.isoformat() + 'Z'
             
-        return self._request('POST', '/api/sessions', json=data)
+        return self._request('POST', '/api/sessions', json=data,
+                             invalidates=('sessions', 'stats'))
     
     # Statistics methods
-    def get_statistics(self) -> Optional[Dict]:
+    def get_statistics(self, records: bool = False) -> Optional[Dict]:
         """
         Get overall statistics
         
+        Args:
+            records: Return a Statistics record instead of a dict
+            
         Returns:
             Statistics data including total sessions, completed sessions, etc.
         """
-        return self._request('GET', '/api/statistics')
+        return self._request('GET', '/api/statistics', cache_tags=('stats',),
+                             model=Statistics if records else None)
     
     # Day methods
-    def get_day(self, date: str) -> Optional[Dict]:
+    def get_day(self, date: str, records: bool = False) -> Optional[Dict]:
         """
         Get day by date (YYYY-MM-DD)
         
         Args:
             date: Date in YYYY-MM-DD format
+            records: Return a Day record instead of a dict
             
         Returns:
             Day data including target_pomos, finished_pomos, reflection, etc.
         """
-        return self._request('GET', f'/api/days/{date}')
+        return self._request('GET', f'/api/days/{date}',
+                             cache_tags=lambda day: (f'date:{date}', f"day:{(day or {}).get('id')}"),
+                             model=Day if records else None)
     
     def create_or_update_day(self, date: str, target_pomos: int = 0, finished_pomos: int = 0,
                             start_time: str = None, end_time: str = None, comment: str = "",
@@ -225,7 +717,8 @@ class APIClient:
         if day_rating is not None:
             data['day_rating'] = day_rating
             
-        return self._request('POST', '/api/days', json=data)
+        return self._request('POST', '/api/days', json=data,
+                             invalidates=(f'date:{date}', 'stats'))
     
     def update_day_reflection(self, day_id: int, day_rating: int, 
                              main_distraction: str = "", reflection_notes: str = "") -> Optional[Dict]:
@@ -246,24 +739,86 @@ class APIClient:
             'main_distraction': main_distraction,
             'reflection_notes': reflection_notes,
         }
-        return self._request('PUT', f'/api/days/{day_id}/reflection', json=data)
+        return self._request('PUT', f'/api/days/{day_id}/reflection', json=data,
+                             invalidates=(f'day:{day_id}',))
+    
+    def patch_day(self, day_id: int, fields: Dict) -> Optional[Dict]:
+        """
+        Update only the given fields of a day
+        
+        Args:
+            day_id: Day ID
+            fields: Changed fields (target_pomos, finished_pomos, comment,
+                reflection_notes, ...); the others are left untouched
+            
+        Returns:
+            The whole updated day
+            
+        Raises:
+            EndpointNotSupported: The server has no PATCH route, i.e.
+                answered 405 (see save_day); a missing day is a 404
+        """
+        return self._request('PATCH', f'/api/days/{day_id}', json=fields, probe=(405,),
+                             invalidates=(f'day:{day_id}', 'stats'))
+    
+    def save_day(self, day: Day) -> Optional[Dict]:
+        """
+        Send the fields of a Day record changed since it was loaded
+        
+        Only the dirty fields travel (see hardmode.core.models.Tracked);
+        servers without PATCH get the whole day through the upsert and
+        reflection routes instead (which cannot carry planned_at and
+        reward). The fields sent are marked clean once the server has them.
+        
+        Args:
+            day: Day record that exists on the server (has an id)
+            
+        Returns:
+            Updated day data ({} if nothing changed), or None on failure
+        """
+        if day.id is None:
+            raise ValueError("save_day needs a day with an id; create it first")
+        changes = day.changes()
+        if not changes:
+            return {}
+        if self._patch_supported:
+            try:
+                result = self.patch_day(day.id, changes)
+            except EndpointNotSupported:
+                self._patch_supported = False
+            else:
+                if result is not None:
+                    day.mark_clean(changes)
+                return result
+        result = self.create_or_update_day(**_day_upsert_args(day))
+        if result is not None and changes.keys() & _REFLECTION_FIELDS:
+            result = self.update_day_reflection(day.id, day.day_rating,
+                                                day.main_distraction or "",
+                                                day.reflection_notes or "")
+        if result is not None:
+            day.mark_clean(changes)
+        return result
     
     # Daily Task methods
-    def get_daily_tasks(self, day_id: int) -> Optional[List[Dict]]:
+    def get_daily_tasks(self, day_id: int, records: bool = False) -> Optional[List[Dict]]:
         """
         Get all daily tasks for a day
         
         Args:
             day_id: Day ID
+            records: Return DailyTask records instead of dicts
             
         Returns:
             List of daily tasks with planning and execution data
         """
-        return self._request('GET', f'/api/days/{day_id}/tasks')
+        return self._request('GET', f'/api/days/{day_id}/tasks',
+                             cache_tags=lambda tasks: [f'tasks:{day_id}'] + [
+                                 f"task:{t.get('id')}" for t in tasks if isinstance(t, dict)],
+                             model=DailyTask if records else None)
     
     def create_daily_task(self, day_id: int, task_name: str, planned_pomodoros: int = 0,
                          plan_priority: int = None, added_mid_day: bool = False,
-                         reason_added: str = "") -> Optional[Dict]:
+                         reason_added: str = "", local_id: int = None) -> Optional[Dict]:
         """
         Create a daily task
         
@@ -274,6 +829,8 @@ class APIClient:
             plan_priority: Priority (1st, 2nd, 3rd...)
             added_mid_day: Whether added mid-day (vs planned)
             reason_added: Reason for mid-day addition (category | details)
+            local_id: Local daily_tasks row id; retries and replays of
+                the same row are then deduplicated by the server
             
         Returns:
             Created daily task data
@@ -287,7 +844,9 @@ class APIClient:
         if plan_priority is not None:
             data['plan_priority'] = plan_priority
             
-        return self._request('POST', f'/api/days/{day_id}/tasks', json=data)
+        return self._request('POST', f'/api/days/{day_id}/tasks', json=data,
+                             invalidates=(f'tasks:{day_id}', 'stats'),
+                             local_id=None if local_id is None else ('daily_task', local_id))
     
     def update_daily_task(self, task_id: int, task_name: str = None, 
                          planned_pomodoros: int = None, pomodoros_spent: int = None,
@@ -318,7 +877,60 @@ class APIClient:
         if completed_at is not None:
             data['completed_at'] = completed_at
             
-        return self._request('PUT', f'/api/daily-tasks/{task_id}', json=data)
+        return self._request('PUT', f'/api/daily-tasks/{task_id}', json=data,
+                             invalidates=(f'task:{task_id}', 'stats'))
+    
+    def patch_daily_task(self, task_id: int, fields: Dict) -> Optional[Dict]:
+        """
+        Update only the given fields of a daily task
+        
+        Args:
+            task_id: Daily task ID
+            fields: Changed fields; the others are left untouched
+            
+        Returns:
+            The whole updated daily task
+            
+        Raises:
+            EndpointNotSupported: The server has no PATCH route, i.e.
+                answered 405 (see save_daily_task)
+        """
+        return self._request('PATCH', f'/api/daily-tasks/{task_id}', json=fields, probe=(405,),
+                             invalidates=(f'task:{task_id}', 'stats'))
+    
+    def save_daily_task(self, task: DailyTask) -> Optional[Dict]:
+        """
+        Send the fields of a DailyTask record changed since it was loaded
+        
+        Like save_day: dirty fields only, or the whole task through PUT on
+        servers without PATCH.
+        
+        Args:
+            task: DailyTask record that exists on the server (has an id)
+            
+        Returns:
+            Updated task data ({} if nothing changed), or None on failure
+        """
+        if task.id is None:
+            raise ValueError("save_daily_task needs a task with an id; create it first")
+        changes = task.changes()
+        if not changes:
+            return {}
+        if self._patch_supported:
+            try:
+                result = self.patch_daily_task(task.id, changes)
+            except EndpointNotSupported:
+                self._patch_supported = False
+            else:
+                if result is not None:
+                    task.mark_clean(changes)
+                return result
+        # The Go PUT route overwrites every column, so send them all
+        result = self._request('PUT', f'/api/daily-tasks/{task.id}', json=_task_put_body(task),
+                               invalidates=(f'task:{task.id}', 'stats'))
+        if result is not None:
+            task.mark_clean(changes)
+        return result
     
     def delete_daily_task(self, task_id: int) -> bool:
         """
@@ -330,14 +942,44 @@ class APIClient:
         Returns:
             True if deleted successfully
         """
-        result = self._request('DELETE', f'/api/daily-tasks/{task_id}')
+        result = self._request('DELETE', f'/api/daily-tasks/{task_id}',
+                               invalidates=(f'task:{task_id}', 'stats'))
         return result is not None
     
     # Enhanced Pomodoro methods
+    def iter_pomodoros(self, start_date: str = None, end_date: str = None,
+                       day_id: int = None, page_size: Optional[int] = 500,
+                       records: bool = False) -> Iterator[Dict]:
+        """
+        Iterate over pomodoros, newest first, without loading the whole history
+        
+        Args:
+            start_date: First date to include (YYYY-MM-DD); needs end_date
+            end_date: Last date to include (YYYY-MM-DD)
+            day_id: Only pomodoros of this day
+            page_size: Pomodoros per keyset-paginated request; None
+                streams a single unpaginated response instead
+            records: Yield Pomodoro records instead of dicts
+            
+        Yields:
+            Pomodoros, decoded one at a time
+        """
+        params = {}
+        if day_id is not None:
+            params['day_id'] = day_id
+        if start_date and end_date:
+            params['start_date'] = start_date
+            params['end_date'] = end_date
+        model = Pomodoro if records else None
+        if page_size is None:
+            return self._iter_json('/api/pomodoros', params=params, model=model)
+        return self._iter_pages('/api/pomodoros', params, page_size, model)
+    
     def create_pomodoro(self, day_id: int, start_time: str, duration_sec: int,
                        aborted: bool = False, end_time: str = None,
                        focus_score: int = None, reason: str = "", note: str = "",
-                       task: str = "", context_switch: bool = False) -> Optional[Dict]:
+                       task: str = "", context_switch: bool = False,
+                       local_id: int = None) -> Optional[Dict]:
         """
         Create an enhanced pomodoro with rich tracking data
         
@@ -352,6 +994,8 @@ class APIClient:
             note: Optional note
             task: Task name
             context_switch: Whether a context switch occurred
+            local_id: Local pomo row id; retries and replays of the same
+                row are then deduplicated by the server
             
         Returns:
             Created pomodoro data
@@ -371,7 +1015,113 @@ class APIClient:
         if focus_score is not None:
             data['focus_score'] = focus_score
             
-        return self._request('POST', '/api/pomodoros', json=data)
+        return self._request('POST', '/api/pomodoros', json=data, invalidates=('stats',),
+                             local_id=None if local_id is None else ('pomo', local_id))
+    
+    # Bulk sync methods
+    def create_pomodoros_bulk(self, pomodoros: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Create many pomodoros with as few requests as possible
+        
+        Items use the create_pomodoro keyword names (including day_id) and
+        are chunked to stay under bulk_max_bytes. Servers without the bulk
+        route get one create_pomodoro call per item instead.
+        
+        Args:
+            pomodoros: Pomodoro dicts
+            
+        Returns:
+            One {'ok': bool, 'id' | 'error': ...} result per item, in order,
+            or None if the API could not be reached
+        """
+        results: List[Dict] = []
+        for chunk in bulk.chunk_by_size([bulk.compact(p) for p in pomodoros],
+                                        self.bulk_max_bytes):
+            chunk_results = self._send_pomodoro_chunk(chunk)
+            if chunk_results is None:
+                return None
+            results.extend(chunk_results)
+        return results
+    
+    def upsert_day_bundle(self, date: str, day: Dict, tasks: List[Dict] = (),
+                          pomodoros: List[Dict] = ()) -> Optional[Dict]:
+        """
+        Create/update a day together with its tasks and pomodoros
+        
+        The whole day normally travels in one request. Pomodoros that do not
+        fit in bulk_max_bytes are sent afterwards through the bulk pomodoro
+        route. Servers without the bundle route fall back to
+        create_or_update_day, create_daily_task and create_pomodoro.
+        
+        Args:
+            date: Date in YYYY-MM-DD format
+            day: create_or_update_day keyword arguments (minus date)
+            tasks: create_daily_task keyword arguments (minus day_id)
+            pomodoros: create_pomodoro keyword arguments (minus day_id)
+            
+        Returns:
+            {'day': day data, 'tasks': [...], 'pomodoros': [...]} with one
+            result per item, or None if the day itself could not be synced
+        """
+        day_data = bulk.compact({**day, 'date': date})
+        task_items = [bulk.compact(t) for t in tasks]
+        pomo_items = [bulk.compact(p) for p in pomodoros]
+        if self._bulk_supported:
+            payload, overflow = bulk.split_bundle(day_data, task_items, pomo_items,
+                                                  self.bulk_max_bytes)
+            try:
+                result = self._request('POST', '/api/days/bundle', json=payload, probe=True,
+                                       invalidates=(f'date:{date}', 'stats'))
+            except EndpointNotSupported:
+                self._bulk_supported = False
+            else:
+                if result is None:
+                    return None
+                day_id = result['day']['id']
+                self.cache.invalidate(f'tasks:{day_id}', f'day:{day_id}')
+                for chunk in overflow:
+                    chunk_results = self._send_pomodoro_chunk(
+                        [{**p, 'day_id': day_id} for p in chunk])
+                    if chunk_results is None:
+                        chunk_results = bulk.item_results([None] * len(chunk))
+                    result['pomodoros'].extend(chunk_results)
+                return result
+        
+        cloud_day = self.create_or_update_day(**day_data)
+        if cloud_day is None:
+            return None
+        day_id = cloud_day['id']
+        return {
+            'day': cloud_day,
+            'tasks': bulk.item_results(
+                [self.create_daily_task(day_id, **t) for t in task_items]),
+            'pomodoros': bulk.item_results(
+                [self.create_pomodoro(day_id=day_id, **p) for p in pomo_items]),
+        }
+    
+    def pipeline(self, max_in_flight: int = 4, attempts: int = 3) -> WriteBatch:
+        """
+        Start a batch of writes sent without waiting for each response
+        
+        Used as a context manager, the batch is flushed on exit: failed
+        writes are replayed with their original idempotency keys, and
+        those still failing are queued in the outbox (see
+        hardmode.net.pipeline.WriteBatch).
+        """
+        return WriteBatch(self, max_in_flight, attempts)
+    
+    def _send_pomodoro_chunk(self, chunk: List[Dict]) -> Optional[List[Dict]]:
+        """Send one chunk of pomodoros, per item if bulk is unsupported"""
+        if self._bulk_supported:
+            try:
+                result = self._request('POST', '/api/pomodoros/bulk',
+                                       json={'pomodoros': chunk}, probe=True,
+                                       invalidates=('stats',))
+            except EndpointNotSupported:
+                self._bulk_supported = False
+            else:
+                return None if result is None else result['results']
+        return bulk.item_results([self.create_pomodoro(**p) for p in chunk])
 
 
 # Example usage
@@ -380,7 +1130,7 @@ if __name__ == '__main__':
     client = APIClient()
     
     # Check connectivity
-    print(f"API Online: {client.is_online()}")
+    print(f"API Online: {client.check_health()}")
     
     # Create a task
     task = client.create_task("Test Task", "This is a test task")
@@ -402,3 +1152,5 @@ if __name__ == '__main__':
     # Get statistics
     stats = client.get_statistics()
     print(f"Statistics: {stats}")
+    
+    client.close()
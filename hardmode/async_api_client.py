@@ -0,0 +1,533 @@
+"""
+Asyncio API Client for Hardmode Pomodoro Backend
+Same surface as APIClient, but every endpoint method is awaitable so
+independent requests (a day's tasks and pomodoros) can run concurrently
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from hardmode.api_client import (
+    _REFLECTION_FIELDS, APIClient, EndpointNotSupported, _day_upsert_args, _route_missing,
+    _task_put_body,
+)
+from hardmode.core.models import DailyTask, Day, to_records
+from hardmode.net import bulk
+from hardmode.net.aio_http import AsyncHTTPTransport, AsyncResponse, TransportError
+from hardmode.net.idempotency import HEADER as IDEMPOTENCY_HEADER
+from hardmode.net.metrics import RequestEvent, endpoint_template
+from hardmode.net.outbox import MUTATING_METHODS
+from hardmode.net.pipeline import AsyncWriteBatch, batch_write
+from hardmode.net.retry import parse_retry_after
+from hardmode.net.singleflight import AsyncSingleFlight, request_key
+from hardmode.net.stream import iter_json_array
+
+
+def _http_error(status: int, url: str) -> requests.HTTPError:
+    """The HTTPError APIClient raises for a strict request answered with ``status``"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    return requests.HTTPError(f"{status} for url: {url}", response=response)
+
+
+class AsyncAPIClient(APIClient):
+    """Asyncio client for the Hardmode Pomodoro API
+
+    Endpoint methods are inherited from APIClient: they return
+    ``self._request(...)`` directly, so here they return coroutines.
+    Methods that post-process the response are overridden below.
+
+    At most ``pool_maxsize`` endpoint calls run at once, however deeply
+    gather() calls are nested; the rest wait their turn.
+    """
+
+    def __init__(self, base_url: str = None, pool_maxsize: int = 4,
+                 concurrency: int = 8, transport: AsyncHTTPTransport = None,
+                 **options):
+        """
+        Initialize the async API client
+
+        Args:
+            base_url: Base URL of the API (defaults to localhost:8080, or
+                ``unix:///path/to.sock``)
+            pool_maxsize: Maximum pooled keep-alive connections per host,
+                and of requests in flight
+            concurrency: Default number of awaitables gather() runs at once
+            transport: Pre-configured transport (mainly for tests)
+            **options: Other APIClient options (timeout, retry, bulk_max_bytes,
+                single_flight, ...)
+        """
+        super().__init__(base_url, **options)
+        self.concurrency = concurrency
+        self._request_slots = asyncio.Semaphore(pool_maxsize)
+        if self.inflight is not None:
+            self.inflight = AsyncSingleFlight()
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncHTTPTransport(
+            limit_per_host=pool_maxsize, compress_min_bytes=self.compress_min_bytes,
+            dumps=self.codec.dumps)
+
+    @staticmethod
+    def _make_session(pool_maxsize: int) -> None:
+        """The async client talks through its transport, not requests"""
+        return None
+
+    async def close(self) -> None:
+        """Close pooled connections held by this client"""
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def __aenter__(self) -> 'AsyncAPIClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
+        """
+        Make an HTTP request to the API
+
+        Mirrors APIClient._request: idempotent methods are retried with
+        backoff, cacheable reads go through the response cache, identical
+        concurrent reads are coalesced, writes that cannot reach the API
+        are queued in the outbox, and any final failure marks the client
+        offline and returns None. Takes the same options (queue, strict,
+        local_id, ...).
+        """
+        if self.inflight is not None and method.upper() == 'GET':
+            key = request_key(endpoint, kwargs.get('params'), kwargs.get('model'),
+                              kwargs.get('probe', False), kwargs.get('strict', False))
+            return await self.inflight.do(
+                key, lambda: self._bounded_request(method, endpoint, **kwargs))
+        return await self._bounded_request(method, endpoint, **kwargs)
+
+    async def _bounded_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
+        """_perform_request, once one of the pool_maxsize request slots is free"""
+        async with self._request_slots:
+            return await self._perform_request(method, endpoint, **kwargs)
+
+    async def _perform_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
+        """One request, without read coalescing"""
+        url = f"{self.base_url}{endpoint}"
+        cache_tags = kwargs.pop('cache_tags', None)
+        invalidates = kwargs.pop('invalidates', ())
+        model = kwargs.pop('model', None)
+        strict = kwargs.pop('strict', False)
+        queueable = (kwargs.pop('queue', True) and self.outbox is not None
+                     and method.upper() in MUTATING_METHODS)
+        write_key = self._attach_idempotency_key(method, endpoint, kwargs)
+        kwargs['timeout'] = kwargs.get('timeout', self.timeout)
+
+        if queueable and len(self.outbox) and batch_write.get() is None:
+            # Earlier writes are still queued: stay behind them
+            self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            if invalidates:
+                self.cache.invalidate(*invalidates)
+            return None
+
+        key = entry = None
+        if cache_tags is not None and self.cache.enabled:
+            key = self.cache.key(method, url, kwargs.get('params'))
+            entry = self.cache.lookup(key)
+            if entry is not None and self.cache.is_fresh(entry):
+                return to_records(model, self.cache.hit(entry))
+            if entry is not None:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **entry.validators()}
+
+        try:
+            response = await self._send(method, url, strict=strict or queueable, **kwargs)
+        except requests.HTTPError as e:
+            if strict:
+                raise
+            print(f"API request failed: {e}")
+            if queueable and e.response.status_code >= 500:
+                # The server is failing, not refusing: replay the write later
+                self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            return None
+        finally:
+            if invalidates:
+                self.cache.invalidate(*invalidates)
+        if response is None:
+            if queueable:
+                self._enqueue(method, endpoint, kwargs.get('json'), write_key)
+            return None
+        if response.status == 204:  # No content
+            return {}
+        if response.status == 304 and entry is not None:
+            return to_records(model, self.cache.not_modified(key, entry))
+
+        try:
+            data = self.codec.loads(response.body) if response.body else None
+        except ValueError as e:  # Malformed JSON body
+            print(f"API request failed: {e}")
+            self._online = False
+            return None
+        if key is not None:
+            tags = cache_tags(data) if callable(cache_tags) else cache_tags
+            self.cache.store(key, data, response.headers, tags)
+        return to_records(model, data)
+
+    async def _send(self, method: str, url: str, probe: bool = False, strict: bool = False,
+                    **kwargs) -> Optional[AsyncResponse]:
+        """Send a request, retrying per RetryPolicy (see APIClient._send)"""
+        event = RequestEvent(method.upper(), endpoint_template(urlsplit(url).path))
+        started = time.perf_counter()
+        try:
+            return await self._send_attempts(event, method, url, probe, strict, **kwargs)
+        except Exception as e:
+            event.error = event.error or type(e).__name__
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - started
+            self.metrics.record(event)
+
+    async def _send_attempts(self, event: RequestEvent, method: str, url: str,
+                             probe: bool, strict: bool, **kwargs) -> Optional[AsyncResponse]:
+        if not self.breaker.allow():
+            self._online = False
+            event.error = 'circuit_open'
+            return None
+        keyed = IDEMPOTENCY_HEADER in (kwargs.get('headers') or {})
+        retries = self.retry.max_retries if self.retry.allows(method, keyed) else 0
+
+        attempt = 0
+        while True:
+            retry_after = None
+            event.retries = attempt
+            if self.rate_limit is not None:
+                await asyncio.sleep(self.rate_limit.delay(method, urlsplit(url).path))
+            try:
+                response = await self.transport.request(method, url, **kwargs)
+                event.status = response.status
+                event.bytes_out += response.bytes_out
+                event.bytes_in += response.bytes_in
+                if attempt < retries and self.retry.should_retry_status(response.status):
+                    retry_after = parse_retry_after(response.headers.get('retry-after'))
+                elif _route_missing(probe, response.status):
+                    self._record_outcome(response.status)
+                    raise EndpointNotSupported(url)
+                elif response.status >= 400:
+                    self._record_outcome(response.status)
+                    self._online = False
+                    if strict:
+                        break  # Raised below: HTTPError is an OSError
+                    print(f"API request failed: {response.status} for url: {url}")
+                    return None
+                else:
+                    self._record_outcome(response.status)
+                    return response
+            except (OSError, asyncio.TimeoutError, TransportError) as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    event.timeouts += 1
+                if attempt >= retries:
+                    print(f"API request failed: {e!r}")
+                    event.error = type(e).__name__
+                    self._record_outcome(None)
+                    return None
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+        raise _http_error(response.status, url)
+
+    async def gather(self, *aws: Awaitable, limit: int = None) -> List[Any]:
+        """
+        Await independent requests concurrently
+
+        At most ``limit`` (default: ``self.concurrency``) awaitables run at
+        once. Results are returned in argument order; failed requests
+        appear as None, as with the single-request methods.
+
+        Args:
+            *aws: Coroutines, usually from this client's endpoint methods
+            limit: Maximum number of requests in flight
+
+        Returns:
+            List of results
+        """
+        semaphore = asyncio.Semaphore(limit or self.concurrency)
+
+        async def bounded(aw: Awaitable) -> Any:
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+    def pipeline(self, max_in_flight: int = 4, attempts: int = 3) -> AsyncWriteBatch:
+        """
+        Start a batch of writes awaited concurrently on the event loop
+
+        Used with ``async with``, the batch is flushed on exit: failed
+        writes are replayed with their original idempotency keys (see
+        hardmode.net.pipeline.AsyncWriteBatch).
+        """
+        return AsyncWriteBatch(self, max_in_flight, attempts)
+
+    async def _iter_json(self, endpoint: str, params: Optional[Dict] = None,
+                         chunk_size: int = 64 * 1024,
+                         model: type = None) -> AsyncIterator[Dict]:
+        """Async-iterate the elements of a JSON array response
+
+        The transport buffers the whole body, so this saves building the
+        full list of rows rather than the raw bytes.
+        """
+        url = f"{self.base_url}{endpoint}"
+        response = await self._send('GET', url, params=params, timeout=self.timeout)
+        if response is None:
+            return
+        body = response.body
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        for item in iter_json_array(chunks):
+            yield item if model is None else model.from_dict(item)
+
+    async def _iter_pages(self, endpoint: str, params: Dict, page_size: int,
+                          model: type = None) -> AsyncIterator[Dict]:
+        """Async-iterate a keyset-paginated listing (see APIClient._iter_pages)
+
+        The next page is requested as a task while the caller consumes the
+        current one.
+        """
+        params = {**params, 'limit': page_size}
+        pending = asyncio.ensure_future(self._fetch_page(endpoint, params, model))
+        try:
+            first = True
+            while pending is not None:
+                page = await pending
+                pending = None
+                if page is None:
+                    if first:
+                        return
+                    raise ConnectionError(f"Lost the API while paging {endpoint}")
+                rows, cursor = page
+                if cursor:
+                    pending = asyncio.ensure_future(
+                        self._fetch_page(endpoint, {**params, 'cursor': cursor}, model))
+                first = False
+                for row in rows:
+                    yield row
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _fetch_page(self, endpoint: str, params: Dict,
+                          model: type = None) -> Optional[tuple]:
+        """Fetch one page: (rows, next cursor or None), or None on failure"""
+        url = f"{self.base_url}{endpoint}"
+        response = await self._send('GET', url, params=params, timeout=self.timeout)
+        if response is None:
+            return None
+        try:
+            rows = to_records(model, self.codec.loads(response.body) if response.body else None)
+        except ValueError as e:
+            print(f"API request failed: {e}")
+            self._online = False
+            return None
+        return rows, response.headers.get('x-next-cursor')
+
+    async def check_health(self) -> bool:
+        """Actively probe GET /health (is_online() stays synchronous)"""
+        result = await self._request('GET', '/health')
+        return result is not None
+
+    async def delete_task(self, task_id: int) -> bool:
+        """Delete a task"""
+        result = await self._request('DELETE', f'/api/tasks/{task_id}',
+                                     invalidates=('stats',))
+        return result is not None
+
+    async def delete_daily_task(self, task_id: int) -> bool:
+        """Delete a daily task"""
+        result = await self._request('DELETE', f'/api/daily-tasks/{task_id}',
+                                     invalidates=(f'task:{task_id}', 'stats'))
+        return result is not None
+
+    async def save_day(self, day: Day) -> Optional[Dict]:
+        """Send the changed fields of a Day record (see APIClient)"""
+        if day.id is None:
+            raise ValueError("save_day needs a day with an id; create it first")
+        changes = day.changes()
+        if not changes:
+            return {}
+        if self._patch_supported:
+            try:
+                result = await self.patch_day(day.id, changes)
+            except EndpointNotSupported:
+                self._patch_supported = False
+            else:
+                if result is not None:
+                    day.mark_clean(changes)
+                return result
+        result = await self.create_or_update_day(**_day_upsert_args(day))
+        if result is not None and changes.keys() & _REFLECTION_FIELDS:
+            result = await self.update_day_reflection(day.id, day.day_rating,
+                                                      day.main_distraction or "",
+                                                      day.reflection_notes or "")
+        if result is not None:
+            day.mark_clean(changes)
+        return result
+
+    async def save_daily_task(self, task: DailyTask) -> Optional[Dict]:
+        """Send the changed fields of a DailyTask record (see APIClient)"""
+        if task.id is None:
+            raise ValueError("save_daily_task needs a task with an id; create it first")
+        changes = task.changes()
+        if not changes:
+            return {}
+        if self._patch_supported:
+            try:
+                result = await self.patch_daily_task(task.id, changes)
+            except EndpointNotSupported:
+                self._patch_supported = False
+            else:
+                if result is not None:
+                    task.mark_clean(changes)
+                return result
+        result = await self._request('PUT', f'/api/daily-tasks/{task.id}',
+                                     json=_task_put_body(task),
+                                     invalidates=(f'task:{task.id}', 'stats'))
+        if result is not None:
+            task.mark_clean(changes)
+        return result
+
+    # Bulk sync methods
+    async def create_pomodoros_bulk(self, pomodoros: List[Dict]) -> Optional[List[Dict]]:
+        """Create many pomodoros in size-bounded chunks (see APIClient)"""
+        chunks = list(bulk.chunk_by_size([bulk.compact(p) for p in pomodoros],
+                                         self.bulk_max_bytes))
+        chunk_results = await self.gather(*(self._send_pomodoro_chunk(c) for c in chunks))
+        if any(r is None for r in chunk_results):
+            return None
+        return [item for r in chunk_results for item in r]
+
+    async def upsert_day_bundle(self, date: str, day: Dict, tasks: List[Dict] = (),
+                                pomodoros: List[Dict] = ()) -> Optional[Dict]:
+        """Create/update a day with its tasks and pomodoros (see APIClient)"""
+        day_data = bulk.compact({**day, 'date': date})
+        task_items = [bulk.compact(t) for t in tasks]
+        pomo_items = [bulk.compact(p) for p in pomodoros]
+        if self._bulk_supported:
+            payload, overflow = bulk.split_bundle(day_data, task_items, pomo_items,
+                                                  self.bulk_max_bytes)
+            try:
+                result = await self._request('POST', '/api/days/bundle',
+                                             json=payload, probe=True,
+                                             invalidates=(f'date:{date}', 'stats'))
+            except EndpointNotSupported:
+                self._bulk_supported = False
+            else:
+                if result is None:
+                    return None
+                day_id = result['day']['id']
+                self.cache.invalidate(f'tasks:{day_id}', f'day:{day_id}')
+                overflow_results = await self.gather(*(
+                    self._send_pomodoro_chunk([{**p, 'day_id': day_id} for p in chunk])
+                    for chunk in overflow
+                ))
+                for chunk, chunk_results in zip(overflow, overflow_results):
+                    if chunk_results is None:
+                        chunk_results = bulk.item_results([None] * len(chunk))
+                    result['pomodoros'].extend(chunk_results)
+                return result
+
+        cloud_day = await self.create_or_update_day(**day_data)
+        if cloud_day is None:
+            return None
+        day_id = cloud_day['id']
+        outcomes = await self.gather(
+            *(self.create_daily_task(day_id, **t) for t in task_items),
+            *(self.create_pomodoro(day_id=day_id, **p) for p in pomo_items),
+        )
+        return {
+            'day': cloud_day,
+            'tasks': bulk.item_results(outcomes[:len(task_items)]),
+            'pomodoros': bulk.item_results(outcomes[len(task_items):]),
+        }
+
+    async def _send_pomodoro_chunk(self, chunk: List[Dict]) -> Optional[List[Dict]]:
+        """Send one chunk of pomodoros, per item if bulk is unsupported"""
+        if self._bulk_supported:
+            try:
+                result = await self._request('POST', '/api/pomodoros/bulk',
+                                             json={'pomodoros': chunk}, probe=True,
+                                             invalidates=('stats',))
+            except EndpointNotSupported:
+                self._bulk_supported = False
+            else:
+                return None if result is None else result['results']
+        outcomes = await self.gather(*(self.create_pomodoro(**p) for p in chunk))
+        return bulk.item_results(outcomes)
+
+    # Sync helpers
+    async def push_day(self, date: str, day: Dict, tasks: Iterable[Dict] = (),
+                       pomodoros: Iterable[Dict] = (), limit: int = None) -> Dict:
+        """
+        Push one day with its tasks and pomodoros
+
+        The day is created first (tasks and pomodoros need its id), then
+        all tasks and pomodoros are sent concurrently.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+            day: Keyword arguments for create_or_update_day (minus date)
+            tasks: Keyword arguments for create_daily_task (minus day_id)
+            pomodoros: Keyword arguments for create_pomodoro (minus day_id)
+            limit: Maximum number of requests in flight
+
+        Returns:
+            Result dict shaped like DataManager.push_to_cloud's
+        """
+        result = {'success': False, 'day_synced': False,
+                  'tasks_synced': 0, 'pomos_synced': 0}
+        cloud_day = await self.create_or_update_day(date, **day)
+        if not cloud_day:
+            result['error'] = 'Failed to sync day'
+            return result
+        day_id = cloud_day['id']
+        tasks = list(tasks)
+        writes = [self.create_daily_task(day_id, **task) for task in tasks]
+        writes += [self.create_pomodoro(day_id, **pomo) for pomo in pomodoros]
+        outcomes = await self.gather(*writes, limit=limit)
+        result['day_synced'] = True
+        result['tasks_synced'] = sum(1 for r in outcomes[:len(tasks)] if r is not None)
+        result['pomos_synced'] = sum(1 for r in outcomes[len(tasks):] if r is not None)
+        result['success'] = all(r is not None for r in outcomes)
+        return result
+
+    async def push_days(self, days: Dict[str, Dict], limit: int = None) -> Dict:
+        """
+        Push several days concurrently (the async counterpart of auto_sync)
+
+        Args:
+            days: Mapping of date -> {'day': ..., 'tasks': [...], 'pomodoros': [...]}
+            limit: Maximum number of requests in flight per day
+
+        Returns:
+            Aggregated result dict with days/tasks/pomos synced counts
+        """
+        results = await self.gather(*(
+            self.push_day(date, bundle.get('day', {}), bundle.get('tasks', ()),
+                          bundle.get('pomodoros', ()), limit=limit)
+            for date, bundle in days.items()
+        ))
+        return {
+            'success': all(r['success'] for r in results),
+            'days_synced': sum(1 for r in results if r['day_synced']),
+            'tasks_synced': sum(r['tasks_synced'] for r in results),
+            'pomos_synced': sum(r['pomos_synced'] for r in results),
+        }
+
+
+# Example usage
+if __name__ == '__main__':
+    async def _demo() -> None:
+        async with AsyncAPIClient() as client:
+            print(f"API Online: {await client.check_health()}")
+            day, stats = await client.gather(
+                client.get_day('2024-01-01'), client.get_statistics())
+            print(f"Day: {day}")
+            print(f"Statistics: {stats}")
+
+    asyncio.run(_demo())
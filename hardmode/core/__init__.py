@@ -1,4 +1,4 @@
 # SPDX-License-Identifier: MIT
 """Core application logic (state machines, scheduling, etc.)."""
 
-__all__ = ["timer_fsm", "eta"]
+__all__ = ["timer_fsm", "timer_host", "timer_wheel", "clock", "journal", "eta", "eta_model", "models"]
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: MIT
+"""Clocks the timer logic reads time from.
+
+``SystemClock`` is the real thing. ``VirtualClock`` only moves when told
+to, so tests and simulations can jump hours ahead instantly and replay
+the same run exactly.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Protocol
+
+
+class Clock(Protocol):
+    """Source of monotonic and wall-clock time."""
+
+    def monotonic(self) -> float:
+        """Seconds on a clock that never goes back (for deadlines)."""
+        ...
+
+    def time(self) -> float:
+        """Wall-clock seconds since the epoch (for timestamps)."""
+        ...
+
+
+class SystemClock:
+    """The process clocks (``time.monotonic`` and ``time.time``)."""
+
+    __slots__ = ()
+
+    monotonic = staticmethod(time.monotonic)
+    time = staticmethod(time.time)
+
+
+class VirtualClock:
+    """Manually advanced clock; wall time moves in step with monotonic time."""
+
+    __slots__ = ("_now", "_wall_offset")
+
+    def __init__(self, start: float = 0.0, wall: float = 0.0) -> None:
+        """
+        Args:
+            start: Initial monotonic reading
+            wall: Wall-clock time (epoch seconds) at ``start``
+        """
+        self._now = start
+        self._wall_offset = wall - start
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._now + self._wall_offset
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("a virtual clock cannot go back")
+        self._now += seconds
+
+    def set(self, monotonic: float) -> None:
+        """Move to an absolute monotonic reading (not earlier than now)."""
+        self.advance(monotonic - self._now)
@@ -1,12 +1,24 @@
 # SPDX-License-Identifier: MIT
-"""Helpers for estimating completion times and progress."""
+"""Helpers for estimating completion times and progress.
+
+``estimate_completion`` handles one day; ``estimate_completion_batch``
+computes the same finish times for whole arrays of days or candidate
+schemes at once, vectorised with NumPy when it is installed.
+"""
 
 from __future__ import annotations
 
+import itertools
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 from hardmode.core.timer_fsm import Scheme
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
 
 def estimate_completion(
     start: datetime,
@@ -25,3 +37,126 @@ def estimate_completion(
         + long_breaks * scheme.long_min
     )
     return start + timedelta(minutes=total_minutes)
+
+
+def _column(value: Any, default: Any) -> Any:
+    return default if value is None else value
+
+
+def completion_minutes(
+    remaining_focus_blocks: Any,
+    work_min: Any = 25,
+    short_min: Any = 5,
+    long_min: Any = 15,
+    cadence: Any = 4,
+    *,
+    use_numpy: Optional[bool] = None,
+) -> Any:
+    """Minutes of work and breaks left, for many rows at once.
+
+    Every argument is a scalar or a sequence/array (scalars broadcast);
+    row ``i`` gets exactly the minutes ``estimate_completion`` adds for
+    that row. Returns a NumPy array when NumPy is used, a list otherwise.
+
+    Args:
+        use_numpy: Force (True) or avoid (False) NumPy; by default it is
+            used when installed
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    elif use_numpy and np is None:
+        raise RuntimeError("NumPy is not installed")
+    if use_numpy:
+        return _minutes_numpy(remaining_focus_blocks, work_min, short_min, long_min, cadence)
+    return _minutes_python(remaining_focus_blocks, work_min, short_min, long_min, cadence)
+
+
+def _minutes_numpy(remaining: Any, work: Any, short: Any, long: Any, cadence: Any) -> Any:
+    n, work, short, long, cadence = np.broadcast_arrays(
+        np.asarray(remaining), np.asarray(work), np.asarray(short),
+        np.asarray(long), np.asarray(cadence))
+    active = n > 0
+    if np.any(active & (cadence == 0)):
+        raise ZeroDivisionError("integer division or modulo by zero")
+    n = np.where(active, n, 0)
+    # Rows with nothing left divide by 1 and are zeroed anyway
+    long_breaks = np.where(active, np.maximum(0, (n - 1) // np.where(active, cadence, 1)), 0)
+    short_breaks = n - long_breaks
+    return n * work + short_breaks * short + long_breaks * long
+
+
+def _minutes_python(remaining: Any, work: Any, short: Any, long: Any, cadence: Any) -> List[Any]:
+    # Plain Python numbers, like the scalar function gets
+    columns = [c.tolist() if hasattr(c, "tolist") else c
+               for c in (remaining, work, short, long, cadence)]
+    rows = max((len(c) for c in columns if _is_sequence(c)), default=1)
+    for index, column in enumerate(columns):
+        if not _is_sequence(column):
+            columns[index] = itertools.repeat(column, rows)
+        elif len(column) != rows:
+            raise ValueError("batch arguments have different lengths")
+    minutes = []
+    for n, w, s, l, c in zip(*columns):
+        if n <= 0:
+            minutes.append(0)
+            continue
+        long_breaks = max(0, (n - 1) // c)
+        minutes.append(n * w + (n - long_breaks) * s + long_breaks * l)
+    return minutes
+
+
+def _is_sequence(value: Any) -> bool:
+    return hasattr(value, "__len__") and not isinstance(value, (str, bytes))
+
+
+def estimate_completion_batch(
+    starts: Any,
+    remaining_focus_blocks: Any,
+    scheme: Scheme | None = None,
+    *,
+    work_min: Any = None,
+    short_min: Any = None,
+    long_min: Any = None,
+    cadence: Any = None,
+    use_numpy: Optional[bool] = None,
+) -> Any:
+    """``estimate_completion`` for many rows in one pass.
+
+    ``starts`` is either a NumPy ``datetime64`` array, giving a
+    ``datetime64`` array back with no per-row Python work, or a sequence
+    of ``datetime``, giving a list of ``datetime``. Remaining blocks and
+    the scheme fields may each be a scalar or a per-row sequence (e.g.
+    to backtest candidate schemes); ``scheme`` supplies the ones not
+    given. Results equal ``estimate_completion`` row for row.
+    """
+    scheme = scheme or Scheme()
+    minutes = completion_minutes(
+        remaining_focus_blocks,
+        _column(work_min, scheme.work_min),
+        _column(short_min, scheme.short_min),
+        _column(long_min, scheme.long_min),
+        _column(cadence, scheme.cadence),
+        use_numpy=use_numpy,
+    )
+    if np is not None and isinstance(starts, np.ndarray) and starts.dtype.kind == "M":
+        minutes = np.broadcast_to(np.asarray(minutes), starts.shape)
+        if minutes.dtype.kind in "iub":
+            return starts + minutes.astype("timedelta64[m]")
+        # Fractional minutes: round to microseconds as timedelta does
+        return starts + np.round(minutes * 60_000_000).astype("timedelta64[us]")
+    if isinstance(minutes, list):
+        if len(minutes) == 1 and len(starts) != 1:
+            minutes = minutes * len(starts)
+    else:
+        minutes = np.broadcast_to(minutes, (len(starts),)).tolist()
+    if len(minutes) != len(starts):
+        raise ValueError("batch arguments have different lengths")
+    # Few distinct durations recur across rows: build each timedelta once
+    deltas: Dict[Any, timedelta] = {}
+    finishes = []
+    for start, m in zip(starts, minutes):
+        delta = deltas.get(m)
+        if delta is None:
+            delta = deltas[m] = timedelta(minutes=m)
+        finishes.append(start + delta)
+    return finishes
@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: MIT
+"""Finish-time estimates calibrated on the user's own pomodoro history.
+
+``estimate_completion`` assumes every break ends on time and nothing is
+ever aborted. ``ETAModel`` learns, from the ``pomo`` table, how things
+actually go:
+
+* break overruns: the gap between one pomodoro ending and the next one
+  starting (review and dawdling included), minus the scheduled break
+* the abort rate, and the time an aborted attempt costs before the
+  next start
+
+Each row is folded into streaming sketches in O(1) time (a Welford
+mean and variance, and a log-linear histogram for the quantiles), so the
+model is built once from history and then kept current as pomodoros
+finish::
+
+    model = ETAModel.from_db(conn, scheme)
+    model.observe_pomo(day_id, started, ended)
+    eta = model.estimate(datetime.now(), remaining_focus_blocks=5, done_today=3)
+    eta.point, eta.p10, eta.p90
+
+The p10/p90 band combines the per-gap spread (taken from the quantile
+sketches, so a skewed overrun distribution gives a skewed band) and the
+abort variance over the remaining blocks, assuming independent gaps.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import Any, Iterable, List, Optional
+
+from hardmode.core.models import Pomodoro
+from hardmode.core.timer_fsm import Scheme
+from hardmode.net.metrics import LatencyHistogram
+
+_Z90 = NormalDist().inv_cdf(0.9)  # p10/p90 are this many sigmas from the mean
+
+
+class RunningStats:
+    """Streaming count, mean and variance (Welford's algorithm)."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 below two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+@dataclass(slots=True)
+class ETAEstimate:
+    """Expected finish time with a p10-p90 band."""
+
+    point: datetime
+    p10: datetime
+    p90: datetime
+
+
+class ETAModel:
+    """Streaming model of how long the remaining pomodoros will really take."""
+
+    def __init__(self, scheme: Optional[Scheme] = None, min_samples: int = 5,
+                 max_gap: float = 3 * 3600) -> None:
+        """
+        Args:
+            scheme: Work and break durations the timer runs on
+            min_samples: Observations needed before a learned term is
+                used; until then the plain scheme durations apply
+            max_gap: Longer gaps between pomodoros (seconds) are taken as
+                the day being interrupted, not as a break overrun
+        """
+        self.scheme = scheme or Scheme()
+        self.min_samples = min_samples
+        self.max_gap = max_gap
+        self.overrun = RunningStats()  # Seconds past the scheduled break
+        # The histogram only takes values >= 0: overruns are shifted by
+        # the longest break, as a break cannot be shorter than nothing
+        self._shift = max(self.scheme.short_min, self.scheme.long_min) * 60.0
+        self.overrun_spread = LatencyHistogram()
+        self.abort_cost = RunningStats()  # Seconds from an aborted start to the next start
+        self.starts = 0
+        self.aborts = 0
+        self._day: Any = None
+        self._completed = 0  # Pomodoros finished so far on _day
+        self._last_end: Optional[datetime] = None
+        self._last_aborted = False
+        self._last_start: Optional[datetime] = None
+
+    # ----- learning -----
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], scheme: Optional[Scheme] = None,
+                  **kwargs: Any) -> "ETAModel":
+        """Build a model from ``pomo`` rows (dicts, ``sqlite3.Row`` or ``Pomodoro``)."""
+        model = cls(scheme, **kwargs)
+        for row in rows:
+            model.observe(row)
+        return model
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection, scheme: Optional[Scheme] = None,
+                since: Optional[date] = None, **kwargs: Any) -> "ETAModel":
+        """Build a model from the ``pomo`` table, optionally from ``since`` on."""
+        query = ("SELECT day_id, start_time, end_time, duration_sec, aborted FROM pomo"
+                 " WHERE (end_time IS NOT NULL OR aborted = 1)")
+        params: List[Any] = []
+        if since is not None:
+            query += " AND start_time >= ?"
+            params.append(since.isoformat())
+        cursor = conn.execute(query + " ORDER BY start_time", params)
+        cursor.row_factory = sqlite3.Row
+        return cls.from_rows(cursor, scheme, **kwargs)
+
+    def observe(self, row: Any) -> None:
+        """Fold in one ``pomo`` row; rows must come in start-time order.
+
+        Rows still running (no end time, not aborted) are skipped.
+        """
+        pomo = row if isinstance(row, Pomodoro) else Pomodoro.from_dict(row)
+        start = _parse(pomo.start_time)
+        if start is None:
+            return
+        end = _parse(pomo.end_time) if pomo.end_time else None
+        if end is None:
+            if not pomo.aborted:
+                return
+            end = start + timedelta(seconds=pomo.duration_sec)
+        self.observe_pomo(pomo.day_id, start, end, pomo.aborted)
+
+    def observe_pomo(self, day_id: Any, start: datetime, end: datetime,
+                     aborted: bool = False) -> None:
+        """Fold in one finished or aborted pomodoro, in O(1)."""
+        if day_id != self._day:
+            self._day, self._completed, self._last_end = day_id, 0, None
+        gap = (start - self._last_end).total_seconds() if self._last_end else None
+        if gap is not None and 0 <= gap <= self.max_gap:
+            if self._last_aborted:
+                self.abort_cost.add((start - self._last_start).total_seconds())
+            elif self._completed:
+                overrun = gap - self._scheduled_break(self._completed)
+                self.overrun.add(overrun)
+                self.overrun_spread.record(overrun + self._shift)
+        self.starts += 1
+        if aborted:
+            self.aborts += 1
+        else:
+            self._completed += 1
+        self._last_start, self._last_end, self._last_aborted = start, end, aborted
+
+    def overrun_quantile(self, quantile: float) -> float:
+        """Break overrun (seconds) below which ``quantile`` of breaks fall."""
+        return self.overrun_spread.value_at(quantile) - self._shift
+
+    @property
+    def abort_rate(self) -> float:
+        """Share of started pomodoros that were aborted (0 until calibrated)."""
+        if self.starts < self.min_samples:
+            return 0.0
+        return min(self.aborts / self.starts, 0.95)
+
+    # ----- estimating -----
+
+    def estimate(self, start: datetime, remaining_focus_blocks: int, done_today: int = 0,
+                 break_first: bool = False) -> ETAEstimate:
+        """When the last of ``remaining_focus_blocks`` pomodoros should end.
+
+        Unlike ``estimate_completion``, no break is counted after the
+        last pomodoro.
+
+        Args:
+            start: When the first of them can start (or its break starts)
+            remaining_focus_blocks: Pomodoros still to complete
+            done_today: Pomodoros completed before ``start`` (places the
+                long breaks)
+            break_first: A break (the one after pomodoro ``done_today``)
+                comes before the first block, e.g. during a review
+        """
+        blocks = max(0, remaining_focus_blocks)
+        if blocks == 0:
+            return ETAEstimate(start, start, start)
+        scheme = self.scheme
+        first = done_today if break_first else done_today + 1
+        after = range(first, done_today + blocks)  # Completions followed by a gap
+        gaps = len(after)
+        seconds = blocks * scheme.work_min * 60.0
+        seconds += sum(self._scheduled_break(n) for n in after)
+        var_low = var_high = 0.0
+        if self.overrun.count >= self.min_samples:
+            mean = self.overrun.mean
+            seconds += gaps * mean
+            spread_low = max(mean - self.overrun_quantile(0.1), 0.0) / _Z90
+            spread_high = max(self.overrun_quantile(0.9) - mean, 0.0) / _Z90
+            var_low += gaps * spread_low ** 2
+            var_high += gaps * spread_high ** 2
+        rate = self.abort_rate
+        if rate and self.abort_cost.count:
+            # Aborted attempts per completion are geometric: mean r, variance r(1+r)
+            r = rate / (1 - rate)
+            cost = self.abort_cost
+            seconds += blocks * r * cost.mean
+            var = blocks * (r * cost.variance + r * (1 + r) * cost.mean ** 2)
+            var_low += var
+            var_high += var
+        point = start + timedelta(seconds=seconds)
+        earliest = start + timedelta(minutes=blocks * scheme.work_min)  # Breaks skipped entirely
+        return ETAEstimate(
+            point=point,
+            p10=max(point - timedelta(seconds=_Z90 * math.sqrt(var_low)), earliest),
+            p90=point + timedelta(seconds=_Z90 * math.sqrt(var_high)),
+        )
+
+    def _scheduled_break(self, completed: int) -> float:
+        # Break after the ``completed``-th pomodoro of the day, in seconds
+        scheme = self.scheme
+        minutes = scheme.long_min if completed % scheme.cadence == 0 else scheme.short_min
+        return minutes * 60.0
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    # Local rows are naive local time; rows pulled from the server carry an
+    # offset ("...Z"). Compare them all as naive local time.
+    try:
+        parsed = datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: MIT
+"""Crash-safe journal of ``TimerFSM`` transitions.
+
+Every transition appends one JSON line holding the fields it changed
+(state, task, count, context switch, deadline...). Deadlines are stored
+as wall-clock times, because monotonic readings mean nothing after a
+restart. Every ``snapshot_every`` records the whole state is written to
+a snapshot file, replacing it atomically, and the journal is truncated.
+Recovery therefore reads one snapshot and at most ``snapshot_every``
+short lines, however long the app has been running::
+
+    journal = TimerJournal("timer.journal")
+    app_fields = journal.restore(fsm)  # None when there is nothing to resume
+    journal.attach(fsm)                # Journal every transition from now on
+
+A record cut short by a crash is ignored, and so are the records after it.
+Records hold absolute field values, so a record that also made it into
+the snapshot can be applied twice without harm.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from hardmode.core.timer_fsm import COUNTDOWN_STATES, State, TimerFSM, TimerHooks
+
+FORMAT_VERSION = 1
+
+
+class TimerJournal:
+    """Append-only transition log plus snapshot for one ``TimerFSM``."""
+
+    def __init__(self, path: Path | str, snapshot_every: int = 64, fsync: bool = True) -> None:
+        """
+        Args:
+            path: Journal file; the snapshot goes next to it (``.snap``)
+            snapshot_every: Records between snapshots (bounds recovery reads)
+            fsync: Flush every record to disk before returning
+        """
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_name(self.path.name + ".snap")
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.records = 0  # Since the last snapshot
+        self._last: Dict[str, Any] = {}
+        self._app: Dict[str, Any] = {}
+        self._deadline_key: Optional[float] = None  # Monotonic deadline of _last
+        self._fsm: Optional[TimerFSM] = None
+        self._file = None
+
+    def attach(self, fsm: TimerFSM) -> None:
+        """Record ``fsm`` from now on: wrap its hooks and snapshot it."""
+        self._fsm = fsm
+        fsm.hooks = _JournalHooks(fsm.hooks, self)
+        self.snapshot()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ----- writing -----
+
+    def record(self, event: str) -> None:
+        """Append the fields changed since the last record."""
+        if self._fsm is None:
+            return
+        state = self._capture(self._fsm)
+        delta = {k: v for k, v in state.items() if self._last.get(k, _MISSING) != v}
+        if not delta:
+            return
+        self._last.update(delta)
+        self._append({"e": event, "t": round(self._fsm.clock.time(), 3), **delta})
+
+    def note(self, **fields: Any) -> None:
+        """Journal application fields restored along with the FSM (e.g. a row id).
+
+        Ignored until ``attach``, so the journal being restored from is
+        not overwritten first.
+        """
+        if self._fsm is None or all(self._app.get(k, _MISSING) == v for k, v in fields.items()):
+            return
+        self._app.update(fields)
+        self._append({"e": "note", "app": dict(self._app)})
+
+    def snapshot(self) -> None:
+        """Write the whole state to the snapshot file and empty the journal."""
+        if self._fsm is None:
+            return
+        self._last = self._capture(self._fsm)
+        data = {"v": FORMAT_VERSION, "t": round(self._fsm.clock.time(), 3),
+                "state": self._last, "app": self._app}
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # A crash right here only leaves records the snapshot already holds
+        self.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.records = 0
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.records += 1
+        if self.records >= self.snapshot_every:
+            self.snapshot()
+
+    def _capture(self, fsm: TimerFSM) -> Dict[str, Any]:
+        counting = fsm.deadline is not None and fsm.state in COUNTDOWN_STATES
+        if not counting:
+            deadline = None
+        elif fsm.deadline == self._deadline_key:
+            deadline = self._last.get("deadline")  # Same deadline, same wall time
+        else:
+            deadline = round(fsm.clock.time() + (fsm.deadline - fsm.clock.monotonic()), 3)
+        self._deadline_key = fsm.deadline if counting else None
+        return {
+            "state": fsm.state.name,
+            "task": fsm.current_task,
+            "done": fsm.done_today,
+            "target": fsm.target,
+            "switch": fsm.context_switch,
+            "started_at": fsm.started_at,
+            "deadline": deadline,
+            "seconds_left": None if counting else fsm.seconds_left,
+        }
+
+    # ----- recovery -----
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The last journaled state (with ``app`` and ``t`` keys), or None."""
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            snap = None
+        if snap is not None and snap.get("v") != FORMAT_VERSION:
+            snap = None
+        state: Dict[str, Any] = dict(snap["state"]) if snap else {}
+        app: Dict[str, Any] = dict(snap.get("app", {})) if snap else {}
+        written = snap["t"] if snap else None
+        for record in self._read_records():
+            if record.get("e") == "note":
+                app = record.get("app", {})
+            else:
+                state.update({k: v for k, v in record.items() if k not in ("e", "t")})
+            written = record.get("t", written)
+        if "state" not in state:
+            return None
+        return {**state, "app": app, "t": written}
+
+    def restore(self, fsm: TimerFSM, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Put ``fsm`` back in the journaled state, without firing hooks.
+
+        A countdown that was running gets its remaining time from the
+        journaled wall-clock deadline; it may well be over, so call
+        ``fsm.poll()`` afterwards to make the transitions that came due.
+
+        Args:
+            fsm: Machine to restore into
+            since: Ignore a journal last written before this wall time
+                (e.g. the start of today)
+
+        Returns:
+            The application fields saved with ``note``, or None if there
+            was nothing to restore
+        """
+        saved = self.load()
+        if saved is None or (since is not None and (saved["t"] or 0) < since):
+            return None
+        fsm.state = State[saved["state"]]
+        fsm.current_task = saved.get("task", "")
+        fsm.done_today = saved.get("done", 0)
+        fsm.target = saved.get("target", 0)
+        fsm.context_switch = saved.get("switch", False)
+        fsm.started_at = saved.get("started_at")
+        deadline = saved.get("deadline")
+        if deadline is not None and fsm.state in COUNTDOWN_STATES:
+            remaining = deadline - fsm.clock.time()
+            fsm.deadline = fsm.clock.monotonic() + remaining
+            fsm.seconds_left = max(0, math.ceil(remaining))
+        else:
+            fsm.deadline = None
+            fsm.seconds_left = saved.get("seconds_left") or 0
+        self._app = dict(saved["app"])
+        return self._app
+
+    def _read_records(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:  # Torn write: nothing after it can be trusted
+                break
+        return records
+
+
+class _JournalHooks:
+    """Journal each transition, then pass the callback on."""
+
+    def __init__(self, inner: TimerHooks, journal: TimerJournal) -> None:
+        self.inner = inner
+        self.journal = journal
+
+    def on_state(self, state: State) -> None:
+        # Before the inner hook: it may open a dialog and block for minutes
+        self.journal.record("state")
+        self.inner.on_state(state)
+
+    def on_tick(self, seconds_left: int) -> None:
+        self.inner.on_tick(seconds_left)  # Derived from the deadline: not journaled
+
+    def on_task_update(self, task: str) -> None:
+        self.journal.record("task")
+        self.inner.on_task_update(task)
+
+
+_MISSING = object()
+
+
+def midnight(now: Optional[float] = None) -> float:
+    """Wall time of the start of the local day containing ``now``."""
+    t = time.localtime(time.time() if now is None else now)
+    return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))
@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: MIT
+"""Typed records for the data exchanged with the API and the local database.
+
+Each record is a slotted dataclass, so a long history pull keeps one
+compact object per row instead of a dict. ``from_dict`` accepts API JSON
+objects and ``sqlite3.Row`` rows alike; unknown keys are ignored and
+missing ones take the field default, so older servers and databases
+still decode.
+
+``Day`` and ``DailyTask`` also remember which fields were assigned since
+they were loaded (or last synced), so only those need to be sent::
+
+    day = client.get_day(date, records=True)
+    day.finished_pomos += 1
+    client.save_day(day)  # PATCH {"finished_pomos": ...}
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
+
+from hardmode.net.codec import JSONCodec, get_codec
+
+R = TypeVar("R", bound="Record")
+
+
+class Record:
+    """Mixin with dict conversion for the dataclasses below."""
+
+    __slots__ = ()
+    _names: tuple = ()
+    _bools: frozenset = frozenset()
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Any) -> R:
+        keys = data.keys()  # sqlite3.Row has keys() but no get()
+        values = {name: data[name] for name in cls._names if name in keys}
+        for name in cls._bools:
+            if name in values:
+                values[name] = bool(values[name])
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Tracked(Record):
+    """Record that tracks the fields assigned since it was created.
+
+    Records start clean, however they were built. Assigning a field a
+    different value marks it dirty until ``mark_clean``.
+    """
+
+    __slots__ = ("_dirty",)
+    _immutable: frozenset = frozenset({"id"})  # Never sent in a partial update
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_dirty", set())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        try:
+            dirty = self._dirty
+        except AttributeError:  # Still inside __init__
+            pass
+        else:
+            if getattr(self, name) != value and name not in self._immutable:
+                dirty.add(name)
+        object.__setattr__(self, name, value)
+
+    @property
+    def dirty_fields(self) -> frozenset:
+        return frozenset(self._dirty)
+
+    def changes(self) -> Dict[str, Any]:
+        """Dirty fields and their current values."""
+        return {name: getattr(self, name) for name in self._names if name in self._dirty}
+
+    def mark_dirty(self, *names: str) -> None:
+        """Force fields to be sent with the next partial update."""
+        unknown = set(names) - set(self._names)
+        if unknown:
+            raise AttributeError(f"{type(self).__name__} has no field(s) {sorted(unknown)}")
+        self._dirty.update(names)
+
+    def mark_clean(self, sent: Optional[Dict[str, Any]] = None) -> None:
+        """Forget dirty fields once they reached the server.
+
+        Args:
+            sent: The fields that were sent (e.g. an earlier ``changes()``);
+                a field assigned again since then stays dirty. None
+                clears every field.
+        """
+        if sent is None:
+            self._dirty.clear()
+            return
+        for name, value in sent.items():
+            if getattr(self, name) == value:
+                self._dirty.discard(name)
+
+
+def _finish(cls: type) -> type:
+    # Cache field names for from_dict; bools are stored as 0/1 in SQLite
+    cls._names = tuple(f.name for f in fields(cls))
+    cls._bools = frozenset(f.name for f in fields(cls) if f.type in ("bool", bool))
+    return cls
+
+
+@_finish
+@dataclass(slots=True)
+class Day(Tracked):
+    """A work day with its target and end-of-day reflection."""
+
+    date: str
+    id: Optional[int] = None
+    target_pomos: int = 0
+    finished_pomos: int = 0
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    planned_at: Optional[str] = None
+    comment: Optional[str] = None
+    day_rating: Optional[int] = None
+    main_distraction: Optional[str] = None
+    reflection_notes: Optional[str] = None
+    reward: Optional[str] = None
+
+    _immutable = frozenset({"id", "date"})
+
+
+@_finish
+@dataclass(slots=True)
+class DailyTask(Tracked):
+    """A task planned (or added) for one day."""
+
+    task_name: str
+    id: Optional[int] = None
+    day_id: Optional[int] = None
+    planned_pomodoros: int = 0
+    planned_at: Optional[str] = None
+    plan_priority: Optional[int] = None
+    pomodoros_spent: int = 0
+    completed: bool = False
+    created_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    added_mid_day: bool = False
+    reason_added: Optional[str] = None
+
+    _immutable = frozenset({"id", "day_id", "created_at"})
+
+
+@_finish
+@dataclass(slots=True)
+class Pomodoro(Record):
+    """One pomodoro, finished or aborted."""
+
+    start_time: str
+    id: Optional[int] = None
+    day_id: Optional[int] = None
+    end_time: Optional[str] = None
+    duration_sec: int = 0
+    aborted: bool = False
+    focus_score: Optional[int] = None
+    reason: Optional[str] = None
+    note: Optional[str] = None
+    task: str = ""
+    context_switch: bool = False
+    pause_count: int = 0
+
+
+@_finish
+@dataclass(slots=True)
+class Statistics(Record):
+    """Overall totals from ``GET /api/statistics``."""
+
+    total_sessions: int = 0
+    completed_sessions: int = 0
+    total_minutes: int = 0
+    tasks_completed: int = 0
+    average_focus_time: float = 0.0
+
+
+def to_records(model: Optional[Type[R]], data: Any) -> Any:
+    """Convert a decoded object or list of objects to ``model`` records.
+
+    ``data`` is returned unchanged if ``model`` is None or it is not JSON
+    object(s), e.g. the None of a failed request.
+    """
+    if model is None:
+        return data
+    if isinstance(data, list):
+        return [model.from_dict(item) for item in data]
+    if isinstance(data, dict):
+        return model.from_dict(data)
+    return data
+
+
+def decode_records(model: Type[R], body: Union[bytes, str],
+                   codec: JSONCodec = None) -> Union[R, List[R]]:
+    """Decode a JSON body straight into ``model`` records."""
+    return to_records(model, (codec or get_codec()).loads(body))
+
+
+def iter_records(model: Type[R], rows: Iterable[Any]) -> Iterable[R]:
+    """Lazily convert decoded objects (or database rows) to records."""
+    return (model.from_dict(row) for row in rows)
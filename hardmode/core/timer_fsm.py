@@ -1,13 +1,26 @@
 # SPDX-License-Identifier: MIT
-"""Finite state machine controlling the Pomodoro timer flow."""
+"""Finite state machine controlling the Pomodoro timer flow.
+
+Countdowns are deadline based: starting a pomodoro or a break records
+when it ends on the monotonic clock, and ``poll`` derives the remaining
+time from it, so a stalled event loop never makes the timer drift. The
+caller wakes the FSM when ``poll`` says the displayed second (or the
+state) will next change, and not at all while no countdown runs::
+
+    delay = fsm.poll()
+    if delay is not None:
+        schedule(fsm.poll, delay)
+"""
 
 from __future__ import annotations
 
-import time
+import math
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Optional, Protocol
 
+from hardmode.core.clock import Clock, SystemClock
+
 
 class State(Enum):
     """High-level phases of a work day."""
@@ -21,6 +34,10 @@ class State(Enum):
     DAY_CLOSED = auto()
 
 
+BREAK_STATES = frozenset({State.SHORT_BREAK, State.LONG_BREAK})
+COUNTDOWN_STATES = frozenset({State.POMO}) | BREAK_STATES
+
+
 @dataclass(slots=True)
 class Scheme:
     """Configuration for work and break durations."""
@@ -71,6 +88,8 @@ class TimerFSM:
     done_today: int = 0
     target: int = 0
     context_switch: bool = False
+    clock: Clock = field(default_factory=SystemClock)
+    deadline: Optional[float] = None  # clock.monotonic() when the countdown ends
 
     def start_day(self, target: int, window: Optional[object] = None) -> None:
         """Enter the planning phase for the day."""
@@ -85,21 +104,93 @@ class TimerFSM:
         cleaned = task.strip()
         if not cleaned:
             raise ValueError("Task is required")
-        self.current_task = cleaned
+        self._begin_pomo(cleaned, self.clock.monotonic())
+
+    def _begin_pomo(self, task: str, start: float) -> None:
+        # start: monotonic time the pomodoro began, earlier than now when
+        # poll catches up on a break that ended during a stall
+        self.current_task = task
         self.state = State.POMO
-        self.started_at = time.time()
+        self.started_at = self.clock.time() - (self.clock.monotonic() - start)
         self.seconds_left = self.scheme.work_min * 60
+        self.deadline = start + self.seconds_left
         self.context_switch = False
         self.hooks.on_state(self.state)
         self.hooks.on_task_update(self.current_task)
 
+    def remaining(self) -> Optional[float]:
+        """Exact seconds left in the running countdown, None if none runs."""
+        if self.deadline is None or self.state not in COUNTDOWN_STATES:
+            return None
+        return self.deadline - self.clock.monotonic()
+
+    def next_wakeup(self) -> Optional[float]:
+        """Seconds until ``poll`` has something to do, None if never.
+
+        That is when the displayed (rounded-up) second next changes, or
+        the countdown ends.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+        if remaining <= 0:
+            return 0.0
+        return remaining - (math.ceil(remaining) - 1)
+
+    def poll(self) -> Optional[float]:
+        """Bring the FSM up to date with the clock.
+
+        Fires ``on_tick`` once if the displayed second changed, however
+        long since the last poll, and makes every transition that came
+        due meanwhile: a pomodoro that ended moves to REVIEW, a break that
+        ended starts the next pomodoro from the moment it ended.
+
+        Returns:
+            Seconds until the next wake-up is needed, or None while no
+            countdown runs (IDLE, PLANNING, REVIEW, DAY_CLOSED)
+        """
+        while (remaining := self.remaining()) is not None:
+            shown = max(0, math.ceil(remaining))
+            if shown != self.seconds_left:
+                self.seconds_left = shown
+                self.hooks.on_tick(shown)
+            if remaining > 0:
+                break
+            self._expire()
+        return self.next_wakeup()
+
+    def _expire(self) -> None:
+        deadline, self.deadline = self.deadline, None
+        if self.state is State.POMO:
+            self.state = State.REVIEW
+            self.hooks.on_state(self.state)
+        else:
+            self._begin_pomo(self.current_task, deadline)
+
+    def abort(self) -> None:
+        """Drop the running pomodoro and return to planning."""
+        if self.state is not State.POMO:
+            raise RuntimeError("Can only abort an active pomodoro.")
+        self.state = State.PLANNING
+        self.seconds_left = 0
+        self.deadline = None
+        self.current_task = ""
+        self.context_switch = False
+        self.hooks.on_state(self.state)
+
     def tick(self) -> None:
-        """Advance the running pomodoro clock by one second."""
+        """Step the running pomodoro clock by one second.
+
+        Manual stepping for callers that count seconds themselves; the
+        deadline moves along with ``seconds_left``. Prefer ``poll``.
+        """
         if self.state is not State.POMO:
             return
         self.seconds_left -= 1
+        self.deadline = self.clock.monotonic() + self.seconds_left
         self.hooks.on_tick(self.seconds_left)
         if self.seconds_left <= 0:
+            self.deadline = None
             self.state = State.REVIEW
             self.hooks.on_state(self.state)
 
@@ -114,13 +205,16 @@ class TimerFSM:
         else:
             self.state = State.SHORT_BREAK
             self.seconds_left = self.scheme.short_min * 60
+        self.deadline = self.clock.monotonic() + self.seconds_left
         self.hooks.on_state(self.state)
 
     def break_tick(self) -> None:
-        """Advance the break timer and restart the current task when done."""
-        if self.state not in {State.SHORT_BREAK, State.LONG_BREAK}:
+        """Step the break timer by one second (see ``tick``) and restart
+        the current task when done."""
+        if self.state not in BREAK_STATES:
             return
         self.seconds_left -= 1
+        self.deadline = self.clock.monotonic() + self.seconds_left
         self.hooks.on_tick(self.seconds_left)
         if self.seconds_left <= 0:
             self.start_pomo(self.current_task)
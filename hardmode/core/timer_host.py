@@ -0,0 +1,262 @@
+# SPDX-License-Identifier: MIT
+"""Many Pomodoro timers driven by one timing wheel.
+
+``TimerFSM`` suits the desktop app: one machine, its own hooks and clock,
+woken for every displayed second. A sync server hosting every user's
+timer cannot afford that. ``TimerHost`` keeps each timer as a small
+slotted ``SlotTimer`` record (state, task, counters and deadline; the
+scheme, clock and hooks are shared) and files each running countdown in
+a ``TimingWheel`` by the tick it ends on. ``advance`` only touches the
+timers whose pomodoro or break is over, so the cost per wake-up follows
+the number of transitions, not the number of timers::
+
+    host = TimerHost(hooks=push_to_clients)
+    tid = host.add()
+    host.start_day(tid, target=8)
+    host.start_pomo(tid, "Write report")
+    while True:
+        delay = host.advance()
+        sleep(delay if delay is not None else 1.0)
+
+Transitions follow ``TimerFSM`` exactly, including a break that ended
+during a stall starting the next pomodoro from the moment it ended.
+Hooks are dispatched in batches: every state change and task update is
+queued and handed over as one list per kind at the end of ``advance``
+(or ``flush``), each list in the order things happened. There is no
+per-second tick; clients derive the countdown from ``remaining``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Protocol, Tuple
+
+from hardmode.core.clock import Clock, SystemClock
+from hardmode.core.timer_fsm import BREAK_STATES, COUNTDOWN_STATES, Scheme, State
+from hardmode.core.timer_wheel import TimingWheel
+
+
+@dataclass(slots=True)
+class SlotTimer:
+    """Per-timer fields of ``TimerFSM``, without the shared scheme, clock and hooks."""
+
+    state: State = State.IDLE
+    current_task: str = ""
+    started_at: Optional[float] = None
+    done_today: int = 0
+    target: int = 0
+    context_switch: bool = False
+    deadline: Optional[float] = None  # clock.monotonic() when the countdown ends
+    gen: int = 0  # Bumped with every deadline change; older wheel entries are stale
+
+
+class HostHooks(Protocol):
+    """Batched callbacks from ``TimerHost``; each entry starts with the timer id."""
+
+    def on_states(self, changes: List[Tuple[int, State]]) -> None:
+        ...
+
+    def on_task_updates(self, changes: List[Tuple[int, str]]) -> None:
+        ...
+
+
+class NullHostHooks:
+    """No-op implementation to keep hooks optional."""
+
+    def on_states(self, changes: List[Tuple[int, State]]) -> None:
+        pass
+
+    def on_task_updates(self, changes: List[Tuple[int, str]]) -> None:
+        pass
+
+
+class TimerHost:
+    """Run any number of timers off a shared clock and timing wheel."""
+
+    def __init__(self, scheme: Optional[Scheme] = None, hooks: Optional[HostHooks] = None,
+                 clock: Optional[Clock] = None, resolution: float = 1.0) -> None:
+        """
+        Args:
+            scheme: Work and break durations shared by every timer
+            hooks: Receive the batched state changes and task updates
+            clock: Time source (a ``VirtualClock`` for simulations)
+            resolution: Wheel tick in seconds; transitions fire up to
+                this late
+        """
+        self.scheme = scheme or Scheme()
+        self.hooks = hooks or NullHostHooks()
+        self.clock = clock or SystemClock()
+        self.resolution = resolution
+        self.timers: List[Optional[SlotTimer]] = []
+        self._free: List[Tuple[int, int]] = []  # (id, last gen) of removed timers
+        self._wheel = TimingWheel(tick=math.floor(self.clock.monotonic() / resolution))
+        self._states: List[Tuple[int, State]] = []
+        self._tasks: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.timers) - len(self._free)
+
+    # ----- timers -----
+
+    def add(self) -> int:
+        """Create an IDLE timer; returns its id."""
+        if self._free:
+            # Carry the generation on, or the old timer's wheel entries
+            # would fire for the new one
+            tid, gen = self._free.pop()
+            self.timers[tid] = SlotTimer(gen=gen + 1)
+        else:
+            tid = len(self.timers)
+            self.timers.append(SlotTimer())
+        return tid
+
+    def remove(self, tid: int) -> None:
+        """Drop a timer; its id may be handed out again by ``add``."""
+        timer = self._get(tid)
+        self.timers[tid] = None
+        self._free.append((tid, timer.gen))
+
+    def timer(self, tid: int) -> SlotTimer:
+        return self._get(tid)
+
+    def remaining(self, tid: int) -> Optional[float]:
+        """Exact seconds left in the timer's countdown, None if none runs."""
+        timer = self._get(tid)
+        if timer.deadline is None or timer.state not in COUNTDOWN_STATES:
+            return None
+        return timer.deadline - self.clock.monotonic()
+
+    def seconds_left(self, tid: int) -> int:
+        """The countdown as ``TimerFSM`` displays it (whole seconds, rounded up)."""
+        remaining = self.remaining(tid)
+        return 0 if remaining is None else max(0, math.ceil(remaining))
+
+    # ----- transitions (as in TimerFSM) -----
+
+    def start_day(self, tid: int, target: int) -> None:
+        """Enter the planning phase for the day."""
+        timer = self._get(tid)
+        timer.target = target
+        self._set_state(tid, timer, State.PLANNING)
+
+    def start_pomo(self, tid: int, task: str) -> None:
+        """Begin a focus session for the given task."""
+        timer = self._get(tid)
+        if timer.state not in {State.PLANNING, State.SHORT_BREAK, State.LONG_BREAK}:
+            raise RuntimeError("Cannot start a pomodoro from the current state.")
+        cleaned = task.strip()
+        if not cleaned:
+            raise ValueError("Task is required")
+        self._begin_pomo(tid, timer, cleaned, self.clock.monotonic())
+
+    def change_task(self, tid: int, task: str) -> None:
+        """Change the active task mid-pomodoro, flagging a context switch."""
+        timer = self._get(tid)
+        if timer.state is not State.POMO:
+            raise RuntimeError("Can only change task during an active pomodoro.")
+        cleaned = task.strip()
+        if not cleaned:
+            raise ValueError("Task is required")
+        if cleaned == timer.current_task:
+            return
+        timer.current_task = cleaned
+        timer.context_switch = True
+        self._tasks.append((tid, cleaned))
+
+    def save_review(self, tid: int, focus: int, reason: str, note: str) -> None:
+        """Count the finished pomodoro and start the next break."""
+        timer = self._get(tid)
+        if timer.state is not State.REVIEW:
+            raise RuntimeError("Review can only be saved after a pomodoro.")
+        timer.done_today += 1
+        if timer.done_today % self.scheme.cadence == 0:
+            state, minutes = State.LONG_BREAK, self.scheme.long_min
+        else:
+            state, minutes = State.SHORT_BREAK, self.scheme.short_min
+        self._arm(tid, timer, self.clock.monotonic() + minutes * 60)
+        self._set_state(tid, timer, state)
+
+    def abort(self, tid: int) -> None:
+        """Drop the running pomodoro and return to planning."""
+        timer = self._get(tid)
+        if timer.state is not State.POMO:
+            raise RuntimeError("Can only abort an active pomodoro.")
+        self._disarm(timer)
+        timer.current_task = ""
+        timer.context_switch = False
+        self._set_state(tid, timer, State.PLANNING)
+
+    # ----- driving -----
+
+    def advance(self) -> Optional[float]:
+        """Make every transition that came due, then dispatch the hooks.
+
+        Returns:
+            Seconds until the next wheel tick, or None while no countdown
+            is pending
+        """
+        now = self.clock.monotonic()
+        wheel, timers = self._wheel, self.timers
+        due = wheel.advance(math.floor(now / self.resolution))
+        while due:
+            for tid, gen in due:
+                timer = timers[tid]
+                if timer is None or timer.gen != gen:
+                    continue  # Aborted, reviewed early or removed meanwhile
+                if timer.deadline > now:  # Rounding at the tick edge: next tick
+                    wheel.schedule(wheel.tick + 1, (tid, gen))
+                    continue
+                self._expire(tid, timer)
+            # A break that ended long ago starts a pomodoro that may be
+            # over too; it was filed as due now
+            due = wheel.advance(wheel.tick)
+        self.flush()
+        if not len(wheel):
+            return None
+        return (wheel.tick + 1) * self.resolution - now
+
+    def flush(self) -> None:
+        """Hand the queued state changes and task updates to the hooks."""
+        if self._states:
+            states, self._states = self._states, []
+            self.hooks.on_states(states)
+        if self._tasks:
+            tasks, self._tasks = self._tasks, []
+            self.hooks.on_task_updates(tasks)
+
+    def _expire(self, tid: int, timer: SlotTimer) -> None:
+        deadline = timer.deadline
+        if timer.state is State.POMO:
+            self._disarm(timer)
+            self._set_state(tid, timer, State.REVIEW)
+        elif timer.state in BREAK_STATES:
+            self._begin_pomo(tid, timer, timer.current_task, deadline)
+
+    def _begin_pomo(self, tid: int, timer: SlotTimer, task: str, start: float) -> None:
+        timer.current_task = task
+        timer.started_at = self.clock.time() - (self.clock.monotonic() - start)
+        timer.context_switch = False
+        self._arm(tid, timer, start + self.scheme.work_min * 60)
+        self._set_state(tid, timer, State.POMO)
+        self._tasks.append((tid, task))
+
+    def _arm(self, tid: int, timer: SlotTimer, deadline: float) -> None:
+        timer.deadline = deadline
+        timer.gen += 1
+        self._wheel.schedule(math.ceil(deadline / self.resolution), (tid, timer.gen))
+
+    @staticmethod
+    def _disarm(timer: SlotTimer) -> None:
+        timer.deadline = None
+        timer.gen += 1
+
+    def _set_state(self, tid: int, timer: SlotTimer, state: State) -> None:
+        timer.state = state
+        self._states.append((tid, state))
+
+    def _get(self, tid: int) -> SlotTimer:
+        timer = self.timers[tid] if 0 <= tid < len(self.timers) else None
+        if timer is None:
+            raise KeyError(f"no timer {tid}")
+        return timer
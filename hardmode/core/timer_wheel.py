@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: MIT
+"""Hierarchical timing wheel.
+
+Items are filed by expiry tick into a few levels of slot arrays: level
+0 holds the next 256 ticks one slot per tick, and each level above
+covers 64 slots of the whole level below. Advancing one tick empties a
+single level-0 slot; every 256 ticks one higher-level slot is cascaded
+down. Scheduling and expiry are O(1) however many items are pending, and
+a tick with nothing due costs a couple of list lookups (see Varghese &
+Lauck, "Hashed and Hierarchical Timing Wheels").
+
+Cancelling is left to the caller: keep a generation number with each
+item and ignore the stale ones when they come out.
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Sequence, Tuple
+
+DEFAULT_LEVEL_BITS = (8, 6, 6, 6)  # 2**26 ticks (~2 years at 1 s) before wrapping
+
+
+class TimingWheel:
+    """Multi-level timing wheel of arbitrary items keyed by integer tick."""
+
+    __slots__ = ("tick", "_levels", "_shifts", "_masks", "_due", "_count")
+
+    def __init__(self, tick: int = 0, level_bits: Sequence[int] = DEFAULT_LEVEL_BITS) -> None:
+        """
+        Args:
+            tick: Current tick; items due at or before it fire on the
+                next ``advance``
+            level_bits: log2 of the slot count of each level
+        """
+        self.tick = tick
+        self._levels: List[List[List[Tuple[int, Any]]]] = [
+            [[] for _ in range(1 << bits)] for bits in level_bits]
+        shifts, shift = [], 0
+        for bits in level_bits:
+            shifts.append(shift)
+            shift += bits
+        self._shifts = tuple(shifts)
+        self._masks = tuple((1 << bits) - 1 for bits in level_bits)
+        self._due: List[Any] = []
+        self._count = 0  # Items in the levels (not in _due)
+
+    def __len__(self) -> int:
+        return self._count + len(self._due)
+
+    def schedule(self, tick: int, item: Any) -> None:
+        """File ``item`` to come out of ``advance`` once ``tick`` is reached."""
+        delta = tick - self.tick
+        if delta <= 0:
+            self._due.append(item)
+            return
+        top = len(self._levels) - 1
+        for level, shift in enumerate(self._shifts):
+            if level == top or delta < 1 << (shift + self._masks[level].bit_length()):
+                # Beyond the top level's range the item is re-filed at
+                # every cascade until it comes within range
+                slot = (tick >> shift) & self._masks[level]
+                self._levels[level][slot].append((tick, item))
+                self._count += 1
+                return
+
+    def advance(self, tick: int) -> List[Any]:
+        """Move to ``tick``; returns every item due by then (earliest tick first)."""
+        fired, self._due = self._due, []
+        wheel0, mask0 = self._levels[0], self._masks[0]
+        while self.tick < tick:
+            if not self._count:
+                self.tick = tick  # Nothing pending: skip the empty ticks
+                break
+            self.tick += 1
+            index = self.tick & mask0
+            if index == 0:
+                self._cascade(1)
+                if self._due:  # Cascaded items due this very tick
+                    fired.extend(self._due)
+                    self._due = []
+            slot = wheel0[index]
+            if slot:
+                wheel0[index] = []
+                self._count -= len(slot)
+                fired.extend(item for _, item in slot)
+        return fired
+
+    def _cascade(self, level: int) -> None:
+        # Re-file one slot of ``level`` into the levels below, and carry
+        # on upwards when this level wrapped too
+        if level >= len(self._levels):
+            return
+        index = (self.tick >> self._shifts[level]) & self._masks[level]
+        if index == 0:
+            self._cascade(level + 1)
+        entries = self._levels[level][index]
+        if not entries:
+            return
+        self._levels[level][index] = []
+        self._count -= len(entries)
+        for tick, item in entries:
+            self.schedule(tick, item)
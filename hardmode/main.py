@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import sys
 import atexit
+from pathlib import Path
 
 try:
     from PySide6 import QtWidgets
@@ -13,6 +14,7 @@ except ImportError as exc:  # pragma: no cover - optional dependency
         "PySide6 must be installed to run the Hardmode Pomodoro app."
     ) from exc
 
+from hardmode.core.journal import TimerJournal
 from hardmode.core.timer_fsm import TimerFSM
 from hardmode.data.db import (
     DEFAULT_DB_PATH,
@@ -20,6 +22,9 @@ from hardmode.data.db import (
     initialize_database,
 )
 from hardmode.data.manager import DataManager
+from hardmode.net.delta import DeltaSync
+from hardmode.net.idempotency import load_device_id
+from hardmode.net.outbox import Outbox, OutboxWorker
 from hardmode.ui.main_window import MainWindow
 from hardmode.single_instance import check_single_instance
 
@@ -38,14 +43,32 @@ def main() -> None:
     # Use DataManager instead of PomodoroRepository
     # This gives you both local storage AND API sync!
     data_manager = DataManager(conn)
+    # Idempotency keys must not collide with another install's
+    data_manager.api.device_id = load_device_id(conn)
+    
+    # Queue writes made while offline and replay them when the API is back
+    outbox = Outbox.open(DEFAULT_DB_PATH)
+    data_manager.api.outbox = outbox
+    outbox_worker = OutboxWorker(outbox, data_manager.api)
+    outbox_worker.start()
+    
+    # Startup pulls only what changed since the last sync
+    data_manager.delta_sync = DeltaSync(conn, data_manager.api)
     timer = TimerFSM()
+    # Transition journal next to the database: a killed app resumes the
+    # running pomodoro where it was
+    journal = TimerJournal(Path(DEFAULT_DB_PATH).with_suffix('.journal'))
 
     app = QtWidgets.QApplication(sys.argv)
-    window = MainWindow(timer=timer, repository=data_manager)
+    window = MainWindow(timer=timer, repository=data_manager, journal=journal)
     window.show()
     exit_code = app.exec()
     
     # Cleanup
+    journal.close()
+    outbox_worker.stop()
+    outbox.conn.close()
+    data_manager.api.close()  # Release pooled HTTP connections
     conn.close()
     instance_lock.release()
     
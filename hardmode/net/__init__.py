@@ -0,0 +1,6 @@
+# SPDX-License-Identifier: MIT
+"""Networking helpers shared by the API clients (retries, transports, etc.)."""
+
+__all__ = ["retry", "aio_http", "bulk", "cache", "outbox", "breaker",
+           "compression", "stream", "delta", "metrics", "codec",
+           "singleflight", "ratelimit", "unix", "idempotency", "pipeline"]
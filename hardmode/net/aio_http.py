@@ -0,0 +1,262 @@
+# SPDX-License-Identifier: MIT
+"""Minimal keep-alive HTTP/1.1 client built directly on asyncio streams.
+
+Only what the API clients need is implemented: JSON bodies (gzipped when
+large), query parameters, ``Content-Length`` and chunked responses with
+gzip/deflate decoding, and a per-host pool of idle connections bounded by
+a semaphore. ``http+unix`` URLs (see ``hardmode.net.unix``) connect over
+a Unix domain socket.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json as jsonlib
+import zlib
+import ssl
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from hardmode.net import compression, unix
+from hardmode.net.idempotency import HEADER as IDEMPOTENCY_HEADER
+from hardmode.net.retry import IDEMPOTENT_METHODS
+
+_Key = Tuple[str, str, int]
+_Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class TransportError(Exception):
+    """Raised when the connection fails or the response is malformed."""
+
+
+class _NoResponse(TransportError):
+    """The connection failed before any byte of the response arrived."""
+
+
+@dataclass(slots=True)
+class AsyncResponse:
+    """A fully read HTTP response.
+
+    ``bytes_out`` and ``bytes_in`` are the request and response body sizes
+    as sent over the wire (before decompression).
+    """
+
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    bytes_out: int = 0
+    bytes_in: int = 0
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body) if self.body else None
+
+
+class AsyncHTTPTransport:
+    """Pooled HTTP/1.1 transport; one instance per event loop."""
+
+    def __init__(self, limit_per_host: int = 4,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 compress_min_bytes: Optional[int] = compression.DEFAULT_MIN_BYTES,
+                 dumps: Optional[Callable[[Any], bytes]] = None) -> None:
+        self.limit_per_host = limit_per_host
+        self.compress_min_bytes = compress_min_bytes
+        self.dumps = dumps
+        self._ssl = ssl_context
+        self._idle: Dict[_Key, List[_Conn]] = {}
+        self._slots: Dict[_Key, asyncio.Semaphore] = {}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncResponse:
+        """Send one request and return the decoded response.
+
+        A gzipped body rejected with 415 is resent uncompressed, and
+        compression stays off for this transport afterwards.
+        """
+        min_bytes = self.compress_min_bytes
+        response = await self._request(method, url, params, json, headers, timeout, min_bytes)
+        if response.status == 415 and json is not None and min_bytes is not None:
+            self.compress_min_bytes = None
+            sent = response.bytes_out
+            response = await self._request(method, url, params, json, headers, timeout, None)
+            response.bytes_out += sent
+        return response
+
+    async def _request(self, method: str, url: str, params: Optional[Mapping[str, Any]],
+                       json: Any, headers: Optional[Mapping[str, str]],
+                       timeout: Optional[float],
+                       min_bytes: Optional[int]) -> AsyncResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        if scheme == unix.SCHEME:
+            # The host part is the percent-encoded socket path
+            key = (scheme, unix.netloc_path(parts.netloc), 0)
+            host = "localhost"
+        else:
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname or "localhost", port)
+            host = parts.netloc
+        target = parts.path or "/"
+        query = [parts.query] if parts.query else []
+        if params:
+            query.append(urlencode({k: v for k, v in params.items() if v is not None}))
+        if any(query):
+            target += "?" + "&".join(q for q in query if q)
+
+        body = b""
+        head = {"Host": host, "Connection": "keep-alive",
+                "Accept": "application/json",
+                "Accept-Encoding": compression.ACCEPT_ENCODING}
+        if json is not None:
+            body, body_headers = compression.encode_json(json, min_bytes, dumps=self.dumps)
+            head.update(body_headers)
+        if body or method.upper() in {"POST", "PUT", "PATCH"}:
+            head["Content-Length"] = str(len(body))
+        head.update(headers or {})
+        lines = [f"{method.upper()} {target} HTTP/1.1"]
+        lines += [f"{name}: {value}" for name, value in head.items()]
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        # Only these may be resent when a reused connection turns out dead:
+        # the server may have applied the request before it dropped
+        replayable = (method.upper() in IDEMPOTENT_METHODS
+                      or any(name.lower() == IDEMPOTENCY_HEADER.lower() for name in head))
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = asyncio.Semaphore(self.limit_per_host)
+        async with slot:
+            coro = self._exchange(key, method.upper(), raw, replayable)
+            response = await asyncio.wait_for(coro, timeout)
+        response.bytes_out = len(body)
+        response.bytes_in = len(response.body)
+        # Decoded only once the exchange is over, so a bad body is never
+        # mistaken for a stale pooled connection and resent
+        try:
+            response.body = compression.decode_body(
+                response.body, response.headers.get("content-encoding"))
+        except (OSError, ValueError, zlib.error) as exc:
+            raise TransportError(f"undecodable response body: {exc}") from exc
+        return response
+
+    async def close(self) -> None:
+        """Close every idle pooled connection."""
+        for conns in self._idle.values():
+            for _, writer in conns:
+                writer.close()
+        self._idle.clear()
+
+    async def _exchange(self, key: _Key, method: str, raw: bytes,
+                        replayable: bool) -> AsyncResponse:
+        idle = self._idle.setdefault(key, [])
+        # A pooled connection may have been closed by the server while idle.
+        # If it failed before any of the response arrived, a replayable
+        # request falls through to the next connection; anything else is
+        # reported, as the server may have acted on it.
+        while idle:
+            reader, writer = idle.pop()
+            try:
+                return await self._roundtrip(key, reader, writer, method, raw)
+            except _NoResponse:
+                if not replayable:
+                    raise
+        reader, writer = await self._connect(key)
+        return await self._roundtrip(key, reader, writer, method, raw)
+
+    async def _connect(self, key: _Key) -> _Conn:
+        scheme, host, port = key
+        if scheme == unix.SCHEME:
+            return await asyncio.open_unix_connection(host)
+        ctx = None
+        if scheme == "https":
+            ctx = self._ssl or ssl.create_default_context()
+        return await asyncio.open_connection(host, port, ssl=ctx)
+
+    async def _roundtrip(self, key: _Key, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter, method: str,
+                         raw: bytes) -> AsyncResponse:
+        try:
+            try:
+                writer.write(raw)
+                await writer.drain()
+            except ConnectionError as exc:
+                raise _NoResponse(f"connection lost while sending: {exc}") from exc
+            response, reusable = await _read_response(reader, method)
+        except BaseException:
+            writer.close()
+            raise
+        if reusable:
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        return response
+
+
+async def _read_response(reader: asyncio.StreamReader,
+                         method: str) -> Tuple[AsyncResponse, bool]:
+    try:
+        status_line = await reader.readline()
+    except ConnectionError as exc:
+        raise _NoResponse(f"connection lost before the response: {exc}") from exc
+    if not status_line:
+        raise _NoResponse("server closed the connection")
+    try:
+        return await _read_rest(reader, method, status_line)
+    except (asyncio.IncompleteReadError, ConnectionError) as exc:
+        raise TransportError("connection closed mid-response") from exc
+    except ValueError as exc:  # e.g. a bad Content-Length
+        raise TransportError(f"malformed response: {exc}") from exc
+
+
+async def _read_rest(reader: asyncio.StreamReader, method: str,
+                     status_line: bytes) -> Tuple[AsyncResponse, bool]:
+    try:
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        code = int(status)
+    except ValueError as exc:
+        raise TransportError(f"bad status line: {status_line!r}") from exc
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    reusable = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+        body = b""
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        reusable = False
+    return AsyncResponse(code, headers, body), reusable
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+        except ValueError as exc:
+            raise TransportError(f"bad chunk size line: {size_line!r}") from exc
+        if size == 0:
+            # Skip optional trailers up to the terminating blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+"""Circuit breaker that tracks API health from real request outcomes."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker fed by request outcomes.
+
+    The breaker starts closed. ``failure_threshold`` consecutive failures
+    open it, after which ``allow()`` refuses requests so callers fail fast
+    instead of waiting out a timeout. Once ``reset_timeout`` seconds have
+    passed, a single trial request is let through (half-open): success
+    closes the breaker, failure re-opens it for another cool-down.
+
+    With ``jitter`` each cool-down is stretched by a random factor in
+    ``[1, 1 + jitter]``, so clients that lost the API together do not all
+    send their trial request at the same moment.
+
+    Reading ``state`` never does I/O, so it is safe on a GUI thread.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic, jitter: float = 0.0,
+                 rand: Callable[[], float] = random.random) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.jitter = jitter
+        self._clock = clock
+        self._rand = rand
+        self._cooldown = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker past its cool-down reads half-open."""
+        with self._lock:
+            if self._state == OPEN and self._cooled_down():
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now.
+
+        In half-open state only one trial is in flight at a time; a trial
+        that never reports back is replaced after another cool-down.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._cooled_down():
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                now = self._clock()
+                if (self._trial_started is None
+                        or now - self._trial_started >= self._cooldown):
+                    self._trial_started = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> bool:
+        """Close the breaker; True if it was open or half-open (API recovered)."""
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+            return recovered
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._cooldown = self.reset_timeout * (1.0 + self.jitter * self._rand())
+                self._trial_started = None
+
+    def reset(self) -> None:
+        """Force the breaker closed, e.g. after the user changes the API URL."""
+        self.record_success()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+    def _cooled_down(self) -> bool:
+        return self._clock() - self._opened_at >= self._cooldown
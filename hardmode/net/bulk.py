@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: MIT
+"""Payload planning for the bulk sync endpoints."""
+
+from __future__ import annotations
+
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_MAX_BYTES = 256 * 1024
+
+
+def encoded_size(item: object) -> int:
+    """Size in bytes of ``item`` once serialised to JSON."""
+    return len(json.dumps(item, separators=(",", ":")).encode())
+
+
+def chunk_by_size(items: Iterable[Dict], max_bytes: int) -> Iterator[List[Dict]]:
+    """Split ``items`` into lists whose JSON array stays under ``max_bytes``.
+
+    An item larger than ``max_bytes`` on its own is still sent, alone in
+    its chunk, rather than dropped.
+    """
+    chunk: List[Dict] = []
+    size = 2  # the enclosing brackets
+    for item in items:
+        item_size = encoded_size(item) + 1  # plus separating comma
+        if chunk and size + item_size > max_bytes:
+            yield chunk
+            chunk, size = [], 2
+        chunk.append(item)
+        size += item_size
+    if chunk:
+        yield chunk
+
+
+def split_bundle(
+    day: Dict, tasks: Sequence[Dict], pomodoros: Sequence[Dict], max_bytes: int
+) -> tuple[Dict, List[List[Dict]]]:
+    """Build the day-bundle payload and the pomodoro chunks that overflow it.
+
+    The day and all of its tasks always travel in the bundle (tasks are
+    small and pomodoros reference the day); pomodoros fill the remaining
+    budget and anything left over is returned as chunks for the bulk
+    pomodoro route.
+    """
+    bundle = {"day": day, "tasks": list(tasks), "pomodoros": []}
+    budget = max_bytes - encoded_size(bundle)
+    fitted: List[Dict] = []
+    index = 0
+    used = 0
+    for index, pomo in enumerate(pomodoros):
+        item_size = encoded_size(pomo) + 1
+        if used + item_size > budget:
+            break
+        fitted.append(pomo)
+        used += item_size
+    else:
+        index = len(pomodoros)
+    bundle["pomodoros"] = fitted
+    overflow = list(chunk_by_size(pomodoros[index:], max_bytes))
+    return bundle, overflow
+
+
+def item_results(results: Iterable[Optional[Dict]]) -> List[Dict]:
+    """Convert per-item responses from single-item calls to bulk results."""
+    return [
+        {"ok": True, "id": r.get("id")} if r is not None
+        else {"ok": False, "error": "request failed"}
+        for r in results
+    ]
+
+
+def compact(item: Dict) -> Dict:
+    """Drop unset (None) fields so the payload only carries real values."""
+    return {k: v for k, v in item.items() if v is not None}
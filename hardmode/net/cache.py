@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: MIT
+"""Client-side HTTP response cache with TTL, LRU eviction and revalidation."""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Mapping, Optional
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached JSON body together with its HTTP validators."""
+
+    data: Any
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    tags: FrozenSet[str] = field(default_factory=frozenset)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that revalidate this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """LRU cache of GET responses keyed by method, URL and query params.
+
+    Entries younger than ``ttl`` seconds are served without touching the
+    network. Older entries that carry an ``ETag`` or ``Last-Modified``
+    header are revalidated with a conditional request, and a
+    ``304 Not Modified`` reply is answered from the cache. Each entry is
+    labelled with tags (``"stats"``, ``"day:12"``...) so writes can drop
+    exactly the reads they affect.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> Hashable:
+        """Cache key for a request; parameter order does not matter."""
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()
+                             if v is not None))
+        return (method.upper(), url, items)
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for ``key`` (fresh or stale) and mark it recent."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self._clock() - entry.stored_at < self.ttl
+
+    def hit(self, entry: CacheEntry) -> Any:
+        """Count a fresh hit and return a private copy of its data."""
+        with self._lock:
+            self.hits += 1
+        return copy.deepcopy(entry.data)
+
+    def not_modified(self, key: Hashable, entry: CacheEntry) -> Any:
+        """Handle a 304 reply: restart the entry's TTL and return its data."""
+        with self._lock:
+            self.revalidations += 1
+            entry.stored_at = self._clock()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return copy.deepcopy(entry.data)
+
+    def store(self, key: Hashable, data: Any, headers: Mapping[str, str],
+              tags: Iterable[str]) -> None:
+        """Record a full response (a cache miss) and evict beyond capacity."""
+        entry = CacheEntry(
+            data=copy.deepcopy(data),
+            stored_at=self._clock(),
+            etag=headers.get("ETag") or headers.get("etag"),
+            last_modified=headers.get("Last-Modified") or headers.get("last-modified"),
+            tags=frozenset(tags),
+        )
+        with self._lock:
+            self.misses += 1
+            if self.ttl <= 0 and not (entry.etag or entry.last_modified):
+                return  # Could never be served or revalidated
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry labelled with any of ``tags``; return the count."""
+        wanted = set(tags)
+        with self._lock:
+            doomed = [k for k, e in self._entries.items() if e.tags & wanted]
+            for k in doomed:
+                del self._entries[k]
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for hits, misses, 304 revalidations and evictions."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
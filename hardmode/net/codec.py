@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: MIT
+"""Pluggable JSON codec: orjson when installed, the stdlib otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class JSONCodec:
+    """A named pair of ``dumps`` (to UTF-8 bytes) and ``loads`` functions."""
+
+    __slots__ = ("name", "dumps", "loads")
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes],
+                 loads: Callable[[Union[bytes, str]], Any]) -> None:
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"JSONCodec({self.name!r})"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode()
+
+
+STDLIB = JSONCodec("json", _stdlib_dumps, json.loads)
+ORJSON: Optional[JSONCodec] = (
+    JSONCodec("orjson", orjson.dumps, orjson.loads) if orjson is not None else None
+)
+
+_default = ORJSON or STDLIB
+
+
+def get_codec() -> JSONCodec:
+    """The codec new API clients use unless given one explicitly."""
+    return _default
+
+
+def set_codec(codec: JSONCodec) -> None:
+    """Replace the process-wide default codec (e.g. ``STDLIB`` in tests)."""
+    global _default
+    _default = codec
@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: MIT
+"""gzip encoding of JSON request bodies and decoding of compressed replies."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bodies smaller than this are sent as-is; gzip gains little on tiny payloads
+DEFAULT_MIN_BYTES = 1024
+
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+def encode_json(payload: Any, min_bytes: Optional[int] = DEFAULT_MIN_BYTES,
+                level: int = 6,
+                dumps: Callable[[Any], bytes] = None) -> Tuple[bytes, Dict[str, str]]:
+    """Serialise ``payload``, gzipping it when it is at least ``min_bytes``.
+
+    Args:
+        dumps: Serialiser returning UTF-8 bytes (default: stdlib json)
+
+    Returns:
+        The request body and the headers that describe it
+    """
+    body = dumps(payload) if dumps is not None else json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json"}
+    if min_bytes is not None and len(body) >= min_bytes:
+        body = gzip.compress(body, compresslevel=level)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def decode_body(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Undo a ``gzip`` or ``deflate`` Content-Encoding."""
+    encoding = (content_encoding or "").strip().lower()
+    if not body or encoding in ("", "identity"):
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:  # Raw deflate stream without a zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    raise ValueError(f"unsupported Content-Encoding: {content_encoding}")
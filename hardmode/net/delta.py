@@ -0,0 +1,287 @@
+# SPDX-License-Identifier: MIT
+"""Incremental pull of server-side changes into the local SQLite database.
+
+The server stamps every day, daily task and pomodoro write with a global
+revision number and records deletions as tombstones. ``DeltaSync`` asks
+``GET /api/changes`` for everything after the last revision it applied
+(the watermark, kept in the ``settings`` table) and applies each page in
+one transaction together with the new watermark, so an interrupted pull
+resumes exactly where it stopped.
+
+Rows are matched to local ones by natural key (day date; day + task name;
+day + pomodoro start time) since local and server ids differ. The server
+wins on conflict, except over local edits still waiting in the client's
+outbox: the outbox is drained before the pull, and rows whose writes are
+still queued after that keep their local values. Start times are compared in one canonical form
+(``TIMESTAMP_FORMAT``, UTC, whole seconds): the server sends them as
+RFC 3339 while the local rows keep whatever text was written.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from hardmode.api_client import EndpointNotSupported
+
+if TYPE_CHECKING:  # pragma: no cover
+    from hardmode.api_client import APIClient
+    from hardmode.net.outbox import Outbox
+
+WATERMARK_KEY = "sync_watermark"
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"  # Same as strftime() in SQLite and the server
+
+_DAY_FIELDS = ("target_pomos", "finished_pomos", "start_time", "end_time", "planned_at",
+               "comment", "day_rating", "main_distraction", "reflection_notes", "reward")
+_TASK_FIELDS = ("planned_pomodoros", "planned_at", "plan_priority", "pomodoros_spent",
+                "completed", "created_at", "completed_at", "added_mid_day", "reason_added")
+# Server resource an outbox endpoint writes to: (kind, server id)
+_HELD_ROUTES = (
+    (re.compile(r"^/api/days/(\d+)(?:/reflection)?$"), "day"),
+    (re.compile(r"^/api/daily-tasks/(\d+)$"), "task"),
+)
+_POMO_FIELDS = ("end_time", "duration_sec", "aborted", "focus_score", "reason", "note",
+                "task", "context_switch", "pause_count")
+
+
+class DeltaSync:
+    """Pull changes since the stored watermark and apply them locally."""
+
+    def __init__(self, conn: sqlite3.Connection, client: "APIClient",
+                 page_size: int = 500, watermark_key: str = WATERMARK_KEY,
+                 outbox: Optional["Outbox"] = None) -> None:
+        """
+        Args:
+            conn: Local database connection (schema.sql layout)
+            client: API client used to fetch the change feed
+            page_size: Maximum changes requested per round trip
+            watermark_key: ``settings`` key holding the last applied revision
+            outbox: Queue of local writes not yet on the server (defaults
+                to ``client.outbox``)
+        """
+        self.conn = conn
+        self.client = client
+        self.outbox = outbox if outbox is not None else getattr(client, "outbox", None)
+        self.page_size = page_size
+        self.watermark_key = watermark_key
+        self._columns: Dict[str, Set[str]] = {}
+        self._held: Set[Tuple[str, Any]] = set()
+
+    @property
+    def watermark(self) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT value FROM settings WHERE key = ?", (self.watermark_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def reset(self) -> None:
+        """Forget the watermark so the next pull fetches everything."""
+        with self.conn:
+            self.conn.execute("DELETE FROM settings WHERE key = ?", (self.watermark_key,))
+
+    def pull(self, max_pages: int = 1000) -> Dict[str, Any]:
+        """
+        Fetch and apply every change after the watermark
+
+        Queued outbox writes are sent first; rows that still have one
+        queued afterwards are not overwritten (counted as ``held``).
+
+        Returns:
+            Dict with success, supported (False if the server has no change
+            feed), per-kind counts, the dates touched and the new watermark
+        """
+        result: Dict[str, Any] = {
+            "success": False, "supported": True, "days": 0, "tasks": 0,
+            "pomodoros": 0, "deleted": 0, "skipped": 0, "held": 0, "dates": set(),
+            "watermark": self.watermark,
+        }
+        if self.outbox is not None and len(self.outbox):
+            self.outbox.drain(self.client)
+        self._held = self._held_rows()
+        for _ in range(max_pages):
+            try:
+                page = self.client.get_changes(result["watermark"], limit=self.page_size)
+            except EndpointNotSupported:
+                result["supported"] = False
+                return result
+            if page is None:
+                return result  # Offline: what was applied so far is kept
+            self._apply_page(page, result)
+            result["watermark"] = page["watermark"]
+            if not page.get("has_more"):
+                break
+        result["success"] = True
+        return result
+
+    # ----- applying -----
+
+    def _apply_page(self, page: Dict, result: Dict[str, Any]) -> None:
+        # Days first so tasks and pomodoros of a re-stamped day find it;
+        # everything else in revision order so delete-then-recreate holds
+        changes: List[tuple] = []
+        changes += [(row.get("rev", 0), "task", row) for row in page.get("daily_tasks", [])]
+        changes += [(row.get("rev", 0), "pomodoro", row) for row in page.get("pomodoros", [])]
+        changes += [(row.get("rev", 0), "deleted", row) for row in page.get("deleted", [])]
+        changes.sort(key=lambda change: change[0])
+
+        held = self._held
+        with self.conn:
+            for day in page.get("days", []):
+                if ("day", day.get("id")) in held or ("date", day.get("date")) in held:
+                    result["held"] += 1
+                    continue
+                try:
+                    self._apply_day(day)
+                except sqlite3.IntegrityError as e:  # e.g. local CHECK constraints
+                    print(f"Delta sync: skipping day {day.get('date')}: {e}")
+                    result["skipped"] += 1
+                    continue
+                result["days"] += 1
+                result["dates"].add(day["date"])
+            for _, kind, row in changes:
+                day_id = self._local_day_id(row.get("day_date"))
+                if day_id is None:
+                    result["skipped"] += 1
+                    continue
+                if kind != "deleted" and self._is_held(kind, row):
+                    result["held"] += 1
+                    continue
+                try:
+                    if kind == "task":
+                        self._apply_task(day_id, row)
+                    elif kind == "pomodoro":
+                        self._apply_pomodoro(day_id, row)
+                    else:
+                        self._apply_tombstone(day_id, row)
+                except sqlite3.IntegrityError as e:
+                    print(f"Delta sync: skipping {kind} change: {e}")
+                    result["skipped"] += 1
+                    continue
+                result[{"task": "tasks", "pomodoro": "pomodoros"}.get(kind, kind)] += 1
+                result["dates"].add(row["day_date"])
+            self.conn.execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (self.watermark_key, str(page["watermark"])),
+            )
+
+    def _apply_day(self, row: Dict) -> None:
+        fields = self._fields("day", _DAY_FIELDS, row)
+        fields.setdefault("target_pomos", 0)
+        self._upsert("day", {"date": row["date"], **fields}, ("date",))
+
+    def _apply_task(self, day_id: int, row: Dict) -> None:
+        fields = self._fields("daily_tasks", _TASK_FIELDS, row)
+        fields.setdefault("created_at", datetime.now().isoformat())
+        self._upsert("daily_tasks",
+                     {"day_id": day_id, "task_name": row["task_name"], **fields},
+                     ("day_id", "task_name"))
+
+    def _apply_pomodoro(self, day_id: int, row: Dict) -> None:
+        fields = self._fields("pomo", _POMO_FIELDS, row)
+        existing = self.conn.execute(
+            "SELECT id FROM pomo WHERE day_id = ? AND strftime(?, start_time) = ?",
+            (day_id, TIMESTAMP_FORMAT, normalize_timestamp(row["start_time"])),
+        ).fetchone()
+        if existing is None:
+            fields.setdefault("task", "")
+            self._insert("pomo", {"day_id": day_id, "start_time": row["start_time"], **fields})
+        elif fields:
+            assignments = ", ".join(f"{name} = ?" for name in fields)
+            self.conn.execute(f"UPDATE pomo SET {assignments} WHERE id = ?",
+                              (*fields.values(), existing[0]))
+
+    def _apply_tombstone(self, day_id: int, row: Dict) -> None:
+        if row.get("kind") == "daily_task":
+            self.conn.execute("DELETE FROM daily_tasks WHERE day_id = ? AND task_name = ?",
+                              (day_id, row.get("natural_key")))
+        elif row.get("kind") == "pomodoro":
+            self.conn.execute(
+                "DELETE FROM pomo WHERE day_id = ? AND strftime(?, start_time) = ?",
+                (day_id, TIMESTAMP_FORMAT, normalize_timestamp(row.get("natural_key"))))
+
+    # ----- local edits not yet pushed -----
+
+    def _held_rows(self) -> Set[Tuple[str, Any]]:
+        # (kind, server id or natural key) of every row with a queued write
+        held: Set[Tuple[str, Any]] = set()
+        if self.outbox is None or not len(self.outbox):
+            return held
+        for entry in self.outbox.pending():
+            body = entry.body if isinstance(entry.body, dict) else {}
+            if entry.endpoint == "/api/days":
+                held.add(("date", body.get("date")))
+            elif entry.endpoint == "/api/pomodoros":
+                held.add(("pomodoro", (body.get("day_id"),
+                                       normalize_timestamp(body.get("start_time")))))
+            else:
+                for pattern, kind in _HELD_ROUTES:
+                    match = pattern.match(entry.endpoint)
+                    if match:
+                        held.add((kind, int(match.group(1))))
+                        break
+        return held
+
+    def _is_held(self, kind: str, row: Dict) -> bool:
+        if kind == "task":
+            return ("task", row.get("id")) in self._held
+        return ("pomodoro", (row.get("day_id"),
+                             normalize_timestamp(row.get("start_time")))) in self._held
+
+    # ----- SQL helpers -----
+
+    def _local_day_id(self, date: Optional[str]) -> Optional[int]:
+        if not date:
+            return None
+        row = self.conn.execute("SELECT id FROM day WHERE date = ?", (date,)).fetchone()
+        return row[0] if row else None
+
+    def _fields(self, table: str, names: tuple, row: Dict) -> Dict[str, Any]:
+        # Older local databases may predate some columns (see migrations/)
+        columns = self._table_columns(table)
+        return {name: row[name] for name in names if name in row and name in columns}
+
+    def _table_columns(self, table: str) -> Set[str]:
+        if table not in self._columns:
+            rows = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            self._columns[table] = {r[1] for r in rows}
+        return self._columns[table]
+
+    def _insert(self, table: str, values: Dict[str, Any]) -> None:
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        self.conn.execute(f"INSERT INTO {table} ({names}) VALUES ({marks})",
+                          tuple(values.values()))
+
+    def _upsert(self, table: str, values: Dict[str, Any], key: tuple) -> None:
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        updates = ", ".join(f"{n} = excluded.{n}" for n in values if n not in key)
+        conflict = "DO UPDATE SET " + updates if updates else "DO NOTHING"
+        self.conn.execute(
+            f"INSERT INTO {table} ({names}) VALUES ({marks}) "
+            f"ON CONFLICT({', '.join(key)}) {conflict}",
+            tuple(values.values()),
+        )
+
+
+def normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """``value`` in ``TIMESTAMP_FORMAT``, as SQLite's ``strftime`` would give it.
+
+    Offsets are converted to UTC and naive times taken as UTC; fractions of
+    a second are dropped. Unparseable values come back unchanged.
+    """
+    if not value:
+        return value
+    text = str(value).strip()
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(TIMESTAMP_FORMAT)
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: MIT
+"""Idempotency keys for API writes.
+
+Every mutating request carries an ``Idempotency-Key`` header. The backend
+remembers the reply it sent for each key (for ``KEY_TTL`` seconds) and
+sends the same reply again when the key comes back, instead of applying
+the write twice. A create that timed out can then be retried, replayed
+from the outbox or pipelined without risking duplicate rows.
+
+Keys for rows that exist locally are derived from this install's device
+id and the local row identity, so they survive restarts: the pomodoro
+stored as local row 42 is always created with the same key. The device
+id (``load_device_id``, kept in the ``settings`` table) keeps two
+desktops, or one install after its database was reset, from sending each
+other's keys and being answered with the other's reply. Other writes get
+a random key per call, which stays the same across that call's retries.
+
+The server fingerprints method, path and body with the key: a key sent
+again with a different body is rejected with 422, never answered with
+the reply to another write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import uuid
+from typing import Any, Optional
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_TTL = 24 * 3600  # How long the Go backend remembers a key, seconds
+DEVICE_ID_SETTING = "device_id"
+
+
+def idempotency_key(method: str, endpoint: str, local_id: Optional[Any] = None,
+                    device_id: Optional[str] = None) -> str:
+    """Key for one logical write.
+
+    Args:
+        method: HTTP method
+        endpoint: API path the write goes to
+        local_id: Identity of the local row being written, e.g.
+            ``("pomo", 42)``; None for a fresh random key
+        device_id: Id of the install the row lives in
+    """
+    if local_id is None:
+        return uuid.uuid4().hex
+    material = f"{device_id or ''} {method.upper()} {endpoint} {local_id!r}".encode()
+    return hashlib.sha256(material).hexdigest()[:32]
+
+
+def load_device_id(conn: sqlite3.Connection) -> str:
+    """This install's device id, created in the ``settings`` table on first use."""
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    query = "SELECT value FROM settings WHERE key = ?"
+    row = conn.execute(query, (DEVICE_ID_SETTING,)).fetchone()
+    if row is None:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                         (DEVICE_ID_SETTING, uuid.uuid4().hex))
+        row = conn.execute(query, (DEVICE_ID_SETTING,)).fetchone()
+    return row[0]
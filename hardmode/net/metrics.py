@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: MIT
+"""Per-endpoint request metrics with HDR-style latency histograms."""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Path segments replaced by placeholders so /api/days/2024-03-01 and
+# /api/days/2024-03-02 are counted as the same endpoint
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_NUMBER = re.compile(r"^\d+$")
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse ids and dates in a URL path: ``/api/days/{id}/tasks``."""
+    segments = []
+    for segment in path.split("?", 1)[0].split("/"):
+        if _NUMBER.match(segment):
+            segment = "{id}"
+        elif _DATE.match(segment):
+            segment = "{date}"
+        segments.append(segment)
+    return "/".join(segments)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations, in the style of HdrHistogram.
+
+    Values are recorded in microseconds. Each power-of-two range is split
+    into ``2 ** (precision_bits - 1)`` linear sub-buckets, so quantiles are
+    accurate to about ``2 ** -(precision_bits - 1)`` (under 1% by default)
+    whatever the magnitude, in memory proportional to the spread of values.
+    """
+
+    def __init__(self, precision_bits: int = 8) -> None:
+        self.precision_bits = precision_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self.precision_bits)
+        return (shift << self.precision_bits) | (value >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        shift = index >> self.precision_bits
+        sub = index & ((1 << self.precision_bits) - 1)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def value_at(self, quantile: float) -> float:
+        """Duration in seconds below which ``quantile`` of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(quantile * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, float]:
+        """p50/p95/p99/max/mean in milliseconds."""
+        return {
+            "p50": self.value_at(0.50) * 1000,
+            "p95": self.value_at(0.95) * 1000,
+            "p99": self.value_at(0.99) * 1000,
+            "max": self.max / 1000,
+            "mean": self.total / self.count / 1000 if self.count else 0.0,
+        }
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    """Outcome of one logical request (all retries included)."""
+
+    method: str
+    endpoint: str
+    status: Optional[int] = None
+    elapsed: float = 0.0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    count: int = 0
+    errors: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    short_circuited: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class RequestMetrics:
+    """Thread-safe registry of ``EndpointStats`` keyed by method and template.
+
+    Hooks registered with ``add_hook`` (or passed as ``on_request`` to the
+    API client) are called with each ``RequestEvent`` after it is recorded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self.hooks: List[Callable[[RequestEvent], None]] = []
+
+    def add_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        self.hooks.append(hook)
+
+    def record(self, event: RequestEvent) -> None:
+        key = f"{event.method} {event.endpoint}"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+            stats.count += 1
+            stats.retries += event.retries
+            stats.timeouts += event.timeouts
+            stats.bytes_out += event.bytes_out
+            stats.bytes_in += event.bytes_in
+            if event.error == "circuit_open":
+                # Never hit the network: counted, but kept out of latency
+                stats.short_circuited += 1
+                stats.errors += 1
+            else:
+                if event.error is not None or (event.status or 0) >= 400:
+                    stats.errors += 1
+                stats.latency.record(event.elapsed)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:  # a broken hook must not break requests
+                print(f"Metrics hook failed: {e}")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Per-endpoint counters and latency percentiles (ms)
+
+        Endpoints are ordered by total time spent, slowest first, and a
+        ``"total"`` entry aggregates them all.
+        """
+        with self._lock:
+            items = list(self._endpoints.items())
+            combined = EndpointStats()
+            result = {}
+            for key, stats in sorted(items, key=lambda kv: -kv[1].latency.total):
+                result[key] = _describe(stats)
+                for name in ("count", "errors", "retries", "timeouts",
+                             "short_circuited", "bytes_out", "bytes_in"):
+                    setattr(combined, name, getattr(combined, name) + getattr(stats, name))
+                combined.latency.merge(stats.latency)
+            result["total"] = _describe(combined)
+            return result
+
+
+def _describe(stats: EndpointStats) -> Dict:
+    return {
+        "count": stats.count,
+        "errors": stats.errors,
+        "retries": stats.retries,
+        "timeouts": stats.timeouts,
+        "short_circuited": stats.short_circuited,
+        "bytes_out": stats.bytes_out,
+        "bytes_in": stats.bytes_in,
+        "total_ms": stats.latency.total / 1000,
+        "latency_ms": stats.latency.summary(),
+    }
@@ -0,0 +1,289 @@
+# SPDX-License-Identifier: MIT
+"""Durable outbox for API mutations made while the backend is unreachable.
+
+Failed writes are stored in the ``api_outbox`` table of the local SQLite
+database and replayed in order by ``OutboxWorker`` once the API answers
+again. Writes that supersede an earlier queued write to the same resource
+are folded into the earlier row, so a long offline stretch leaves one
+request per resource rather than one per edit. A queued DELETE is final:
+later updates to the deleted resource are discarded.
+
+The queue is bounded; once full, new writes are refused with
+``OutboxFull`` rather than dropping queued ones that later writes may
+depend on.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+import requests
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle at runtime
+    from hardmode.api_client import APIClient
+
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_outbox (
+id INTEGER PRIMARY KEY,
+method TEXT NOT NULL,
+endpoint TEXT NOT NULL,
+body TEXT, -- JSON payload
+coalesce_key TEXT, -- same key = same remote resource
+created_at TEXT NOT NULL,
+revision INTEGER NOT NULL DEFAULT 0, -- bumped when a later write is folded in
+attempts INTEGER NOT NULL DEFAULT 0,
+last_error TEXT,
+idempotency_key TEXT -- resent with every replay of the write
+);
+CREATE INDEX IF NOT EXISTS idx_api_outbox_key ON api_outbox(coalesce_key);
+"""
+
+
+class OutboxFull(Exception):
+    """The outbox holds ``max_entries`` writes and cannot take another."""
+
+
+@dataclass(slots=True)
+class OutboxEntry:
+    """A queued API mutation."""
+
+    id: int
+    method: str
+    endpoint: str
+    body: Any
+    coalesce_key: Optional[str]
+    revision: int = 0
+    attempts: int = 0
+    idempotency_key: Optional[str] = None
+
+
+def coalesce_key(method: str, endpoint: str, body: Any) -> Optional[str]:
+    """Identify the remote resource a write replaces, if it replaces one.
+
+    PUT and DELETE address a resource by URL; ``POST /api/days`` is an
+    upsert keyed by date. Other POSTs create new rows and never coalesce.
+    """
+    if method in ("PUT", "PATCH", "DELETE"):
+        return endpoint
+    if method == "POST" and endpoint == "/api/days" and isinstance(body, dict):
+        return f"{endpoint}#{body.get('date')}"
+    return None
+
+
+class Outbox:
+    """Ordered, bounded, coalescing queue of pending API writes."""
+
+    def __init__(self, conn: sqlite3.Connection, max_entries: int = 500) -> None:
+        """
+        Args:
+            conn: SQLite connection; it is used from the worker thread too,
+                so open it with ``check_same_thread=False``
+            max_entries: Queue bound; ``enqueue`` raises ``OutboxFull``
+                rather than exceed it
+        """
+        self.conn = conn
+        self.max_entries = max_entries
+        self.dropped = 0
+        self.wakeup = threading.Event()
+        self._lock = threading.RLock()
+        # Held for a whole drain: a second drainer (the worker, a startup
+        # sync) must not resend the entry the first one has in flight
+        self._drain_lock = threading.Lock()
+        with self._lock:
+            self.conn.executescript(OUTBOX_SCHEMA)
+            self._pending = self.conn.execute("SELECT COUNT(*) FROM api_outbox").fetchone()[0]
+
+    @classmethod
+    def open(cls, db_path: Path | str, **kwargs: Any) -> "Outbox":
+        """Open a dedicated thread-safe connection to ``db_path``."""
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        return cls(conn, **kwargs)
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def enqueue(self, method: str, endpoint: str, body: Any = None,
+                idempotency_key: Optional[str] = None) -> int:
+        """Queue a write, folding it into a superseded entry when possible.
+
+        A folded entry takes the key of the newest write, since the server
+        must apply the merged body rather than replay an earlier reply.
+        Writes to a resource with a queued DELETE are discarded.
+
+        Returns:
+            Row id of the entry now holding the write
+
+        Raises:
+            OutboxFull: The write needs a new row and the queue is full
+        """
+        method = method.upper()
+        key = coalesce_key(method, endpoint, body)
+        with self._lock:
+            row = None
+            if key is not None:
+                row = self.conn.execute(
+                    "SELECT id, method, body FROM api_outbox WHERE coalesce_key = ? "
+                    "ORDER BY id DESC LIMIT 1",
+                    (key,),
+                ).fetchone()
+            if row is not None:
+                entry_id, old_method, old_body = row
+                if old_method == "DELETE":
+                    # The resource is gone for good; updating it would only 404
+                    return entry_id
+                if method in ("PUT", "PATCH") and old_method == method and old_body:
+                    # Partial updates: later fields win, earlier ones survive
+                    body = {**json.loads(old_body), **(body or {})}
+                # Keep the earlier row's position so creates stay ahead of
+                # the updates that depend on them
+                self.conn.execute(
+                    "UPDATE api_outbox SET method = ?, body = ?, attempts = 0, "
+                    "revision = revision + 1, idempotency_key = ? WHERE id = ?",
+                    (method, _dumps(body), idempotency_key, entry_id),
+                )
+            else:
+                if self._pending >= self.max_entries:
+                    raise OutboxFull(f"outbox holds {self._pending} writes; "
+                                     f"refusing {method} {endpoint}")
+                cursor = self.conn.execute(
+                    "INSERT INTO api_outbox (method, endpoint, body, coalesce_key, created_at, "
+                    "idempotency_key) VALUES (?, ?, ?, ?, ?, ?)",
+                    (method, endpoint, _dumps(body), key, datetime.now().isoformat(),
+                     idempotency_key),
+                )
+                entry_id = cursor.lastrowid
+                self._pending += 1
+            self.conn.commit()
+        self.wakeup.set()
+        return entry_id
+
+    def pending(self, limit: Optional[int] = None) -> List[OutboxEntry]:
+        """Queued entries, oldest first."""
+        query = ("SELECT id, method, endpoint, body, coalesce_key, revision, attempts, "
+                 "idempotency_key FROM api_outbox ORDER BY id")
+        params: Tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            OutboxEntry(r[0], r[1], r[2], json.loads(r[3]) if r[3] else None, r[4], r[5], r[6],
+                        r[7])
+            for r in rows
+        ]
+
+    def drain(self, client: "APIClient", limit: Optional[int] = None) -> int:
+        """Replay queued writes in order until one fails to reach the API.
+
+        Entries the server rejects with a 4xx status are dropped (they would
+        fail forever); connection errors and 5xx replies stop the drain and
+        leave the entry queued. Concurrent drains run one after the other.
+
+        Returns:
+            Number of entries delivered
+        """
+        with self._drain_lock:
+            return self._drain(client, limit)
+
+    def _drain(self, client: "APIClient", limit: Optional[int]) -> int:
+        delivered = 0
+        for entry in self.pending(limit):
+            try:
+                result = client._request(entry.method, entry.endpoint,
+                                         json=entry.body, queue=False, strict=True,
+                                         idempotency_key=entry.idempotency_key)
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                if 400 <= status < 500:
+                    print(f"Outbox: dropping {entry.method} {entry.endpoint}: {e}")
+                    self._remove(entry)
+                    self.dropped += 1
+                    continue
+                self._record_failure(entry.id, str(e))
+                break
+            if result is None:
+                self._record_failure(entry.id, "API unreachable")
+                break
+            self._remove(entry)
+            delivered += 1
+        return delivered
+
+    def _remove(self, entry: OutboxEntry) -> None:
+        # A write folded in while this entry was in flight bumps the
+        # revision, and must stay queued
+        with self._lock:
+            deleted = self.conn.execute(
+                "DELETE FROM api_outbox WHERE id = ? AND revision = ?",
+                (entry.id, entry.revision),
+            ).rowcount
+            self.conn.commit()
+            self._pending -= deleted
+
+    def _record_failure(self, entry_id: int, error: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE api_outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                (error, entry_id),
+            )
+            self.conn.commit()
+
+
+class OutboxWorker:
+    """Background thread that drains an ``Outbox`` whenever the API is back."""
+
+    def __init__(self, outbox: Outbox, client: "APIClient", interval: float = 30.0) -> None:
+        """
+        Args:
+            outbox: Queue to drain
+            client: API client used to replay writes
+            interval: Seconds between retries while the API stays unreachable
+        """
+        self.outbox = outbox
+        self.client = client
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="api-outbox", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Drain now instead of at the next interval."""
+        self.outbox.wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.outbox.wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.outbox.wakeup.wait(self.interval)
+            self.outbox.wakeup.clear()
+            if self._stop.is_set():
+                break
+            if not len(self.outbox):
+                continue
+            try:
+                self.outbox.drain(self.client)
+            except Exception as e:  # keep the worker alive
+                print(f"Outbox drain failed: {e}")
+            if len(self.outbox):
+                # Still unreachable: ignore wake-ups until the next interval
+                self._stop.wait(self.interval)
+                self.outbox.wakeup.clear()
+
+
+def _dumps(body: Any) -> Optional[str]:
+    return None if body is None else json.dumps(body)
@@ -0,0 +1,300 @@
+# SPDX-License-Identifier: MIT
+"""Pipelined API writes with whole-batch replay.
+
+A ``WriteBatch`` sends each queued write as soon as it is added, over the
+client's pooled keep-alive connections, without waiting for the previous
+response. Every write keeps the idempotency key it was first sent with,
+so after a failure the batch can be replayed: writes that already
+landed, even those whose reply was lost, are answered from the server's
+idempotency store instead of being applied twice::
+
+    with WriteBatch(client) as batch:
+        for row in unsynced_pomodoros:
+            batch.create_pomodoro(day_id, row["start_time"], 1500, local_id=row["id"])
+    if batch.failed():
+        ...  # Still unreachable after the replays; the rows stay unsynced
+
+Writes in one batch run concurrently and must not depend on each other
+(create the day first, then batch its tasks and pomodoros).
+
+A write the client would queue in its outbox is held by the batch
+instead, and sent directly on replay. Writes still failing when the
+batch is flushed or closed are queued then, once each.
+
+``AsyncWriteBatch`` is the same for ``AsyncAPIClient``: writes run as
+tasks on the event loop, at most ``max_in_flight`` at a time, and the
+batch is used with ``async with``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from contextvars import ContextVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle at runtime
+    from hardmode.api_client import APIClient
+    from hardmode.async_api_client import AsyncAPIClient
+
+# Client write methods a batch exposes as its own methods
+PIPELINED_METHODS = frozenset({
+    "create_pomodoro", "create_daily_task", "update_daily_task", "delete_daily_task",
+    "create_or_update_day", "update_day_reflection",
+})
+# Methods taking local_id: given a key of their own when the caller has no row id
+_KEYED_METHODS = frozenset({"create_pomodoro", "create_daily_task"})
+# The batch write being sent in this thread or task; the client hands it
+# the request it would otherwise queue (see APIClient._enqueue)
+batch_write: ContextVar[Optional["_Write"]] = ContextVar("batch_write", default=None)
+
+
+@dataclass(slots=True)
+class _Write:
+    method: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    future: Optional[Future] = None  # asyncio.Task in an AsyncWriteBatch
+    result: Any = None
+    attempts: int = 0
+    queued: Optional[Tuple[str, str, Any, Optional[str]]] = None  # For the outbox, if it fails
+
+
+class WriteBatch:
+    """Concurrent, replayable writes through one ``APIClient``."""
+
+    def __init__(self, client: "APIClient", max_in_flight: int = 4,
+                 attempts: int = 3) -> None:
+        """
+        Args:
+            client: Client whose write methods are called
+            max_in_flight: Writes sent concurrently; keep it at or below
+                the client's pool_maxsize
+            attempts: Sends per write when the batch is flushed (first
+                send plus replays)
+        """
+        self.client = client
+        self.attempts = attempts
+        self.writes: List[_Write] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight,
+                                            thread_name_prefix="api-pipeline")
+
+    def __getattr__(self, name: str) -> Callable[..., int]:
+        if name in PIPELINED_METHODS:
+            return lambda *args, **kwargs: self.add(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        try:
+            if exc_info[0] is None:
+                self.flush()
+        finally:
+            self.close()
+
+    def add(self, method: str, *args: Any, **kwargs: Any) -> int:
+        """Send ``client.<method>(*args, **kwargs)`` now; returns its index."""
+        write = _new_write(method, args, kwargs)
+        self.writes.append(write)
+        self._submit(write)
+        return len(self.writes) - 1
+
+    def wait(self) -> List[Any]:
+        """Wait for every write in flight; returns the results in order."""
+        for write in self.writes:
+            if write.future is not None:
+                write.result = write.future.result()
+                write.future = None
+        return self.results
+
+    @property
+    def results(self) -> List[Any]:
+        """Result per write (None: failed or still in flight)."""
+        return [write.result for write in self.writes]
+
+    def failed(self) -> List[int]:
+        """Indices of the writes that have not succeeded (after ``wait``)."""
+        return [i for i, write in enumerate(self.writes) if not _succeeded(write.result)]
+
+    def replay(self, only_failed: bool = True) -> List[int]:
+        """Send writes again and wait for them; returns the indices still failing.
+
+        With ``only_failed=False`` the whole batch is resent; writes that
+        already landed are answered from the server's idempotency store.
+        """
+        self.wait()
+        targets = self.failed() if only_failed else range(len(self.writes))
+        for index in targets:
+            self._submit(self.writes[index])
+        self.wait()
+        return self.failed()
+
+    def flush(self) -> List[int]:
+        """Wait, then replay failed writes up to ``attempts`` sends each.
+
+        Rounds of replays are spaced by the client's retry backoff.
+        Writes that still failed go to the client's outbox, if it would
+        have queued them. Returns their indices.
+        """
+        self.wait()
+        failed = self.failed()
+        replays = 0
+        while failed and min(self.writes[i].attempts for i in failed) < self.attempts:
+            time.sleep(self.client.retry.delay(replays))
+            replays += 1
+            for index in failed:
+                if self.writes[index].attempts < self.attempts:
+                    self._submit(self.writes[index])
+            self.wait()
+            failed = self.failed()
+        _queue_failed(self.client, self.writes)
+        return failed
+
+    def close(self) -> None:
+        """Wait for the writes in flight, and queue the ones that failed."""
+        self._executor.shutdown(wait=True)
+        self.wait()
+        _queue_failed(self.client, self.writes)
+
+    def _submit(self, write: _Write) -> None:
+        write.attempts += 1
+        write.result = write.queued = None
+        write.future = self._executor.submit(self._send, write)
+
+    def _send(self, write: _Write) -> Any:
+        token = batch_write.set(write)
+        try:
+            return getattr(self.client, write.method)(*write.args, **write.kwargs)
+        finally:
+            batch_write.reset(token)
+
+
+class AsyncWriteBatch:
+    """Concurrent, replayable writes through one ``AsyncAPIClient``.
+
+    Must be created and used inside a running event loop.
+    """
+
+    def __init__(self, client: "AsyncAPIClient", max_in_flight: int = 4,
+                 attempts: int = 3) -> None:
+        """
+        Args:
+            client: Client whose write coroutines are awaited
+            max_in_flight: Writes awaited concurrently
+            attempts: Sends per write when the batch is flushed (first
+                send plus replays)
+        """
+        self.client = client
+        self.attempts = attempts
+        self.writes: List[_Write] = []
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    def __getattr__(self, name: str) -> Callable[..., int]:
+        if name in PIPELINED_METHODS:
+            return lambda *args, **kwargs: self.add(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    async def __aenter__(self) -> "AsyncWriteBatch":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if exc_info[0] is None:
+            await self.flush()
+        else:
+            await self.close()
+
+    def add(self, method: str, *args: Any, **kwargs: Any) -> int:
+        """Schedule ``client.<method>(*args, **kwargs)`` now; returns its index."""
+        write = _new_write(method, args, kwargs)
+        self.writes.append(write)
+        self._submit(write)
+        return len(self.writes) - 1
+
+    async def wait(self) -> List[Any]:
+        """Wait for every write in flight; returns the results in order."""
+        for write in self.writes:
+            if write.future is not None:
+                write.result = await write.future
+                write.future = None
+        return self.results
+
+    @property
+    def results(self) -> List[Any]:
+        """Result per write (None: failed or still in flight)."""
+        return [write.result for write in self.writes]
+
+    def failed(self) -> List[int]:
+        """Indices of the writes that have not succeeded (after ``wait``)."""
+        return [i for i, write in enumerate(self.writes) if not _succeeded(write.result)]
+
+    async def replay(self, only_failed: bool = True) -> List[int]:
+        """Send writes again and wait for them; returns the indices still failing."""
+        await self.wait()
+        targets = self.failed() if only_failed else range(len(self.writes))
+        for index in targets:
+            self._submit(self.writes[index])
+        await self.wait()
+        return self.failed()
+
+    async def flush(self) -> List[int]:
+        """Wait, then replay failed writes up to ``attempts`` sends each, and
+        queue the ones still failing (see ``WriteBatch.flush``)."""
+        await self.wait()
+        failed = self.failed()
+        replays = 0
+        while failed and min(self.writes[i].attempts for i in failed) < self.attempts:
+            await asyncio.sleep(self.client.retry.delay(replays))
+            replays += 1
+            for index in failed:
+                if self.writes[index].attempts < self.attempts:
+                    self._submit(self.writes[index])
+            await self.wait()
+            failed = self.failed()
+        _queue_failed(self.client, self.writes)
+        return failed
+
+    async def close(self) -> None:
+        """Cancel the writes still in flight, and queue the ones that failed."""
+        for write in self.writes:
+            if write.future is not None:
+                write.future.cancel()
+        await asyncio.gather(*(w.future for w in self.writes if w.future is not None),
+                             return_exceptions=True)
+        for write in self.writes:
+            write.future = None
+        _queue_failed(self.client, self.writes)
+
+    def _submit(self, write: _Write) -> None:
+        write.attempts += 1
+        write.result = write.queued = None
+        write.future = asyncio.ensure_future(self._send(write))
+
+    async def _send(self, write: _Write) -> Any:
+        async with self._semaphore:
+            batch_write.set(write)  # Tasks run in a copy of the context
+            return await getattr(self.client, write.method)(*write.args, **write.kwargs)
+
+
+def _new_write(method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> _Write:
+    if method in _KEYED_METHODS and kwargs.get("local_id") is None:
+        # Pin a key so replays of this write are recognised
+        kwargs["local_id"] = f"batch:{uuid.uuid4().hex}"
+    return _Write(method, args, kwargs)
+
+
+def _queue_failed(client: Any, writes: List[_Write]) -> None:
+    # Hand the failed writes the client held back to its outbox, once each
+    for write in writes:
+        if write.queued is not None and not _succeeded(write.result):
+            client._enqueue(*write.queued)
+        write.queued = None
+
+
+def _succeeded(result: Any) -> bool:
+    # delete_* methods return a bool, the others the response data or None
+    return result is not None and result is not False
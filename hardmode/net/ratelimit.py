@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: MIT
+"""Client-side token-bucket rate limiting for API requests.
+
+A ``RateLimiter`` holds one global bucket and optional buckets per
+endpoint class (reads, writes, bulk uploads, delta pulls...). Every
+request attempt reserves a token from each bucket that applies and waits
+until the reservations are due, so a client that suddenly has a backlog
+(startup sync, outbox replay, auto-sync of several days) sends it at a
+bounded rate instead of all at once.
+
+After an outage the limiter can also hold requests for a random delay
+(``reconnect_spread``), so a fleet of desktops whose circuit breakers
+all see the API come back does not reconnect in the same second.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+def endpoint_class(method: str, path: str) -> str:
+    """Bucket name for a request: health, sync, bulk, read or write."""
+    if path.endswith("/health"):
+        return "health"
+    if path.endswith("/api/changes"):
+        return "sync"
+    if "/bulk" in path:
+        return "bulk"
+    return "read" if method.upper() in ("GET", "HEAD") else "write"
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second up to ``burst``.
+
+    ``reserve`` always takes its tokens, letting the level go negative,
+    and returns how long the caller must wait for them to have been
+    refilled. Concurrent callers are therefore served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` and return the seconds to wait before using them."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= tokens
+        return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """Global and per-endpoint-class token buckets shared by a client.
+
+    Thread-safe; may be shared by several clients talking to the same
+    API. ``delay`` does the bookkeeping and returns the wait so both the
+    blocking and the asyncio client can sleep their own way.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None,
+                 classes: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+                 reconnect_spread: float = 0.0,
+                 classify: Callable[[str, str], str] = endpoint_class,
+                 clock: Callable[[], float] = time.monotonic,
+                 rand: Callable[[], float] = random.random) -> None:
+        """
+        Args:
+            rate: Requests per second across all endpoints (None: no global limit)
+            burst: Requests allowed back to back (default: ``rate``, at least 1)
+            classes: ``{class: (rate, burst)}`` limits per endpoint class,
+                e.g. ``{"bulk": (0.5, 2), "sync": (1, 1)}``
+            reconnect_spread: After an outage, hold requests for a random
+                delay of up to this many seconds
+            classify: Maps (method, path) to an endpoint class
+            clock: Monotonic time source
+            rand: Random source in [0, 1) for the reconnect delay
+        """
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._rand = rand
+        self.classify = classify
+        self.reconnect_spread = reconnect_spread
+        self._global = TokenBucket(rate, burst, clock) if rate else None
+        self._classes = {name: TokenBucket(r, b, clock)
+                         for name, (r, b) in (classes or {}).items()}
+        self._resume_at = 0.0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def delay(self, method: str, path: str) -> float:
+        """Reserve a request slot and return the seconds to wait for it."""
+        with self._lock:
+            wait = max(0.0, self._resume_at - self._clock())
+            bucket = self._classes.get(self.classify(method, path))
+            for bucket in (self._global, bucket):
+                if bucket is not None:
+                    wait = max(wait, bucket.reserve())
+            if wait > 0:
+                self.throttled += 1
+                self.waited += wait
+            return wait
+
+    def acquire(self, method: str, path: str) -> float:
+        """Block until a request may be sent; returns the time waited."""
+        wait = self.delay(method, path)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def after_outage(self) -> float:
+        """Hold requests for a random part of ``reconnect_spread``; returns the delay."""
+        hold = self.reconnect_spread * self._rand()
+        with self._lock:
+            self._resume_at = max(self._resume_at, self._clock() + hold)
+        return hold
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"throttled": self.throttled, "waited": self.waited}
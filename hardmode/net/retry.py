@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: MIT
+"""Retry policy with exponential backoff and jitter for API requests."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, Optional
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+)
+RETRY_STATUSES: FrozenSet[int] = frozenset({429, 502, 503, 504})
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """Decide whether a failed request is retried and how long to wait.
+
+    The delay for attempt ``n`` (0-based) is
+    ``min(backoff_max, backoff_factor * 2 ** n)`` stretched by a random
+    factor in ``[1, 1 + jitter]`` so a fleet of clients does not retry in
+    lock-step.
+
+    Writes are only retried when ``keyed_writes`` is set and the request
+    carries an idempotency key, i.e. when the server is known to
+    deduplicate them (see ``hardmode.net.idempotency``).
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.3
+    backoff_max: float = 10.0
+    jitter: float = 0.5
+    methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    statuses: FrozenSet[int] = RETRY_STATUSES
+    keyed_writes: bool = False
+    rand: Callable[[], float] = field(default=random.random, repr=False)
+
+    def allows(self, method: str, keyed: bool = False) -> bool:
+        """Return True if requests with this HTTP method may be retried.
+
+        ``keyed`` says the request carries an idempotency key.
+        """
+        if self.max_retries <= 0:
+            return False
+        return method.upper() in self.methods or (keyed and self.keyed_writes)
+
+    def should_retry_status(self, status: int) -> bool:
+        """Return True if the response status is worth another attempt."""
+        return status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to sleep before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.backoff_max)
+        base = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        return base * (1.0 + self.jitter * self.rand())
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric ``Retry-After`` header; HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
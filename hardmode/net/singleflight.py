@@ -0,0 +1,115 @@
+# SPDX-License-Identifier: MIT
+"""Collapse concurrent identical reads into a single request.
+
+While a call for a key is in flight, further callers with the same key
+wait for it and share its outcome instead of starting their own. Once
+the call finishes the key is forgotten, so this never serves stale data:
+it only merges requests that overlap in time (caching is ResponseCache's
+job).
+
+Callers that shared an outcome each get their own deep copy, so one of
+them mutating the returned dict cannot affect the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional
+
+
+def request_key(endpoint: str, params: Optional[Mapping[str, Any]] = None,
+                *extra: Hashable) -> tuple:
+    """Key identifying a read by path, query parameters and options."""
+    query = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None))
+    return (endpoint, query, *extra)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe single-flight group for blocking calls."""
+
+    def __init__(self, clone: Callable[[Any], Any] = copy.deepcopy) -> None:
+        self._clone = clone
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0  # Calls that went to the network
+        self.collapsed = 0  # Calls that joined one already in flight
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn()``, or wait for the identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.collapsed += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._clone(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+        # Followers copy from call.result, so the leader must not hand it out
+        return self._clone(call.result) if shared else call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "collapsed": self.collapsed,
+                    "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Single-flight group for coroutines on one event loop."""
+
+    def __init__(self, clone: Callable[[Any], Any] = copy.deepcopy) -> None:
+        self._clone = clone
+        self._calls: Dict[Hashable, list] = {}  # key -> [task, waiters]
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``factory()``, or the identical call already running."""
+        call = self._calls.get(key)
+        if call is not None:
+            call[1] += 1
+            self.collapsed += 1
+            # Shielded so a cancelled follower does not cancel the shared call
+            return self._clone(await asyncio.shield(call[0]))
+
+        task = asyncio.ensure_future(factory())
+        call = self._calls[key] = [task, 0]
+        self.calls += 1
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        return self._clone(result) if call[1] else result
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "collapsed": self.collapsed,
+                "in_flight": len(self._calls)}
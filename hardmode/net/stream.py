@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MIT
+"""Incremental decoding of large JSON array responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Union
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]],
+                    decoder: json.JSONDecoder = None) -> Iterator[Any]:
+    """Yield the elements of a JSON array as its text arrives.
+
+    Only the element being decoded and the unread tail of the current
+    chunk are held in memory, so peak usage depends on the chunk and row
+    size rather than on the length of the array.
+
+    Args:
+        chunks: Body fragments, e.g. ``response.iter_content(65536)``;
+            UTF-8 bytes may be split anywhere
+        decoder: JSON decoder to use for each element
+
+    Raises:
+        ValueError: If the body is not a well-formed JSON array
+    """
+    decoder = decoder or json.JSONDecoder()
+    pieces = _iter_text(chunks)
+    buf = ""
+    pos = 0
+
+    def fill() -> bool:
+        # Append the next non-empty piece, dropping what has been consumed
+        nonlocal buf, pos
+        for piece in pieces:
+            if piece:
+                buf = buf[pos:] + piece
+                pos = 0
+                return True
+        return False
+
+    def peek() -> str:
+        # Next significant character, or "" at end of input
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    if peek() != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+    first = True
+    while True:
+        char = peek()
+        if char == "]":
+            return
+        if char == "":
+            raise ValueError("truncated JSON array")
+        if not first:
+            if char != ",":
+                raise ValueError(f"expected ',' between array elements, got {char!r}")
+            pos += 1
+            peek()
+        first = False
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number or literal ending exactly at the buffer edge may
+            # continue in the next chunk
+            if end == len(buf) and fill():
+                continue
+            break
+        pos = end
+        yield item
+
+
+def _iter_text(chunks: Iterable[Union[bytes, str]]) -> Iterator[str]:
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        yield chunk if isinstance(chunk, str) else utf8.decode(chunk)
+    yield utf8.decode(b"", final=True)
@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: MIT
+"""HTTP over Unix domain sockets for co-located backends.
+
+A base URL of ``unix:///run/hardmode/api.sock`` makes the API clients
+talk to a backend listening on that socket instead of going through the
+TCP stack. Internally request URLs use the ``http+unix`` scheme with the
+percent-encoded socket path as host (``http+unix://%2Frun%2F...sock/api``),
+which ``UnixAdapter`` routes to a keep-alive connection pool per socket.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+from typing import Dict, Optional
+from urllib.parse import quote, unquote, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+SCHEME = "http+unix"
+_PREFIX = "unix://"
+
+
+def socket_path(base_url: str) -> Optional[str]:
+    """Socket path of a ``unix://`` base URL, None for any other URL."""
+    if not base_url.startswith(_PREFIX):
+        return None
+    path = base_url[len(_PREFIX):].rstrip("/")
+    if not path:
+        raise ValueError(f"no socket path in {base_url!r}")
+    return path
+
+
+def http_url(path: str) -> str:
+    """Request base URL for the socket at ``path``."""
+    return f"{SCHEME}://{quote(path, safe='')}"
+
+
+def netloc_path(netloc: str) -> str:
+    """Socket path encoded in the host part of an ``http+unix`` URL."""
+    return unquote(netloc)
+
+
+class _UnixConnection(HTTPConnection):
+    def __init__(self, path: str, **kwargs: object) -> None:
+        super().__init__("localhost", **kwargs)
+        self.socket_path = path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+
+class _UnixConnectionPool(HTTPConnectionPool):
+    def __init__(self, path: str, **kwargs: object) -> None:
+        super().__init__("localhost", **kwargs)
+        self.socket_path = path
+
+    def _new_conn(self) -> _UnixConnection:
+        self.num_connections += 1
+        return _UnixConnection(self.socket_path, timeout=self.timeout.connect_timeout,
+                               **self.conn_kw)
+
+
+class UnixAdapter(HTTPAdapter):
+    """requests adapter keeping a bounded keep-alive pool per socket path."""
+
+    def __init__(self, pool_maxsize: int = 4, pool_block: bool = True) -> None:
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize,
+                         max_retries=0, pool_block=pool_block)
+        self._pools: Dict[str, _UnixConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool(request.url)
+
+    def get_connection(self, url, proxies=None):
+        return self._pool(url)
+
+    def request_url(self, request, proxies) -> str:
+        return request.path_url
+
+    def close(self) -> None:
+        super().close()
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+    def _pool(self, url: str) -> _UnixConnectionPool:
+        path = netloc_path(urlsplit(url).netloc)
+        with self._pools_lock:
+            pool = self._pools.get(path)
+            if pool is None:
+                pool = self._pools[path] = _UnixConnectionPool(
+                    path, maxsize=self._pool_maxsize, block=self._pool_block)
+            return pool
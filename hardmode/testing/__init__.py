@@ -0,0 +1,5 @@
+# SPDX-License-Identifier: MIT
+"""In-process test doubles for the sync backend (fake servers, tooling)."""
+
+__all__ = ["fake_server", "sqlite_backend", "fixtures", "loadgen", "netem", "sync_bench", "eta_bench",
+           "timer_host_bench", "timer_sim", "transport_bench"]
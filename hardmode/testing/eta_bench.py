@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+"""Speed of batch ETAs against the per-row ``estimate_completion``.
+
+Builds ``rows`` random (start, remaining blocks, scheme) rows, as a
+backtest over history and candidate schemes would, and times::
+
+    scalar      estimate_completion once per row
+    python      estimate_completion_batch without NumPy (lists)
+    numpy       estimate_completion_batch on lists of datetime
+    datetime64  estimate_completion_batch on datetime64 arrays
+
+Every variant is checked against the scalar results. Run
+``python -m hardmode.testing.eta_bench --rows 100000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from hardmode.core import eta
+from hardmode.core.eta import estimate_completion, estimate_completion_batch
+from hardmode.core.timer_fsm import Scheme
+
+SCHEMES = [Scheme(25, 5, 15, 4), Scheme(50, 10, 30, 2), Scheme(45, 15, 30, 3), Scheme(15, 3, 10, 6)]
+
+
+def make_rows(rows: int, seed: int = 0) -> Dict[str, List[Any]]:
+    rng = random.Random(seed)
+    origin = datetime(2023, 1, 1, 8, 0)
+    schemes = [rng.choice(SCHEMES) for _ in range(rows)]
+    return {
+        "starts": [origin + timedelta(days=rng.randrange(730), minutes=rng.randrange(600))
+                   for _ in range(rows)],
+        "remaining": [rng.randrange(-1, 17) for _ in range(rows)],
+        "work_min": [s.work_min for s in schemes],
+        "short_min": [s.short_min for s in schemes],
+        "long_min": [s.long_min for s in schemes],
+        "cadence": [s.cadence for s in schemes],
+    }
+
+
+def run_bench(rows: int = 100_000, seed: int = 0) -> Dict[str, Any]:
+    """Time each variant on the same rows; returns seconds per variant."""
+    data = make_rows(rows, seed)
+    params = {k: data[k] for k in ("work_min", "short_min", "long_min", "cadence")}
+    timings: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    expected = [estimate_completion(start, n, Scheme(w, s, l, c))
+                for start, n, w, s, l, c in zip(data["starts"], data["remaining"], *params.values())]
+    timings["scalar"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = estimate_completion_batch(data["starts"], data["remaining"], use_numpy=False, **params)
+    timings["python"] = time.perf_counter() - started
+    _check(result, expected, "python")
+
+    if eta.np is not None:
+        np = eta.np
+        started = time.perf_counter()
+        result = estimate_completion_batch(data["starts"], data["remaining"], use_numpy=True, **params)
+        timings["numpy"] = time.perf_counter() - started
+        _check(result, expected, "numpy")
+
+        starts64 = np.array(data["starts"], dtype="datetime64[us]")
+        arrays = {k: np.asarray(v) for k, v in params.items()}
+        remaining = np.asarray(data["remaining"])
+        started = time.perf_counter()
+        result = estimate_completion_batch(starts64, remaining, **arrays)
+        timings["datetime64"] = time.perf_counter() - started
+        _check(result.tolist(), expected, "datetime64")
+    return {"rows": rows, "seconds": timings,
+            "speedup": {k: timings["scalar"] / v for k, v in timings.items() if v}}
+
+
+def _check(result: List[datetime], expected: List[datetime], variant: str) -> None:
+    if result != expected:
+        raise AssertionError(f"{variant} batch differs from estimate_completion")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batch ETA computation")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    report = run_bench(args.rows)
+    print(f"{report['rows']} rows (all variants match estimate_completion):")
+    for variant, seconds in report["seconds"].items():
+        print(f"  {variant:<11} {seconds * 1000:8.1f} ms  x{report['speedup'][variant]:.1f}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
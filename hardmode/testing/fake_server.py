@@ -0,0 +1,715 @@
+# SPDX-License-Identifier: MIT
+"""In-process fake of the Hardmode REST API.
+
+``FakeBackend`` holds the state and implements the routes as plain
+methods; ``FakeServer`` exposes a backend over HTTP on a background
+thread so the real API clients can be exercised without the Go server::
+
+    with FakeServer() as server:
+        client = APIClient(base_url=server.url)
+
+``Faults`` adds artificial latency, error replies and dropped connections
+in front of any backend (see also ``hardmode.testing.sqlite_backend``), and
+``FakeServer(idempotency=True)`` deduplicates writes by idempotency key.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import socketserver
+import stat
+import threading
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from hardmode.net.compression import DEFAULT_MIN_BYTES, decode_body
+from hardmode.net.idempotency import HEADER as IDEMPOTENCY_HEADER, REPLAYED_HEADER
+
+# (status, payload) or (status, payload, extra response headers)
+Reply = Union[Tuple[int, Any], Tuple[int, Any, Dict[str, str]]]
+
+_DAY_DEFAULTS = {
+    "target_pomos": 0,
+    "finished_pomos": 0,
+    "start_time": None,
+    "end_time": None,
+    "planned_at": None,
+    "comment": "",
+    "day_rating": None,
+    "main_distraction": "",
+    "reflection_notes": "",
+    "reward": "",
+}
+_TASK_DEFAULTS = {
+    "planned_pomodoros": 0,
+    "planned_at": None,
+    "plan_priority": None,
+    "pomodoros_spent": 0,
+    "completed": False,
+    "completed_at": None,
+    "added_mid_day": False,
+    "reason_added": "",
+}
+# Fields a PATCH may set (id, date, day_id and rev are fixed)
+_DAY_PATCH_FIELDS = frozenset(_DAY_DEFAULTS)
+_TASK_PATCH_FIELDS = frozenset({"task_name", *_TASK_DEFAULTS})
+_POMO_DEFAULTS = {
+    "end_time": None,
+    "aborted": False,
+    "focus_score": None,
+    "reason": "",
+    "note": "",
+    "task": "",
+    "context_switch": False,
+    "pause_count": 0,
+}
+
+
+@dataclass
+class Faults:
+    """Latency and failures injected by ``FakeServer`` before routing.
+
+    Fields may be changed while the server runs, e.g. ``error_rate = 1.0``
+    to simulate an outage and back to 0 to end it.
+    """
+
+    latency: float = 0.0  # Seconds added to every matching request
+    jitter: float = 0.0  # Up to this many extra seconds, uniformly drawn
+    error_rate: float = 0.0  # Fraction answered with error_status
+    error_status: int = 503
+    drop_rate: float = 0.0  # Fraction whose connection is closed unanswered
+    lose_rate: float = 0.0  # Fraction processed, then closed unanswered (reply lost)
+    match: Optional[str] = None  # Regex on "METHOD /path"; None matches all
+    seed: Optional[int] = None
+    injected: int = 0  # Errors, drops and lost replies injected so far
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def draw(self, method: str, path: str) -> Tuple[float, Optional[str]]:
+        """Pick this request's delay and fault: None, "error", "drop" or "lose"."""
+        if self.match is not None and not re.search(self.match, f"{method} {path}"):
+            return 0.0, None
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._rng.random()
+            fault = None
+            if roll < self.drop_rate:
+                fault = "drop"
+            elif roll < self.drop_rate + self.error_rate:
+                fault = "error"
+            elif roll < self.drop_rate + self.error_rate + self.lose_rate:
+                fault = "lose"
+            if fault:
+                self.injected += 1
+        return delay, fault
+
+
+def request_fingerprint(method: str, path: str, body: Any) -> str:
+    """What a key is bound to: method, path and the body's canonical JSON."""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return f"{method} {path} {hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+class IdempotencyStore:
+    """Replies remembered per ``Idempotency-Key``, as the Go backend keeps them.
+
+    A key seen again with the same fingerprint (method, path and body, see
+    ``request_fingerprint``) gets the stored reply, flagged with an
+    ``Idempotent-Replayed`` header, without reaching the backend; reused
+    for another request it is rejected with 422.
+    A request arriving while the first one with its key is still being
+    processed waits for that reply. 5xx replies are not remembered, so
+    the write can be retried.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._replies: Dict[str, Tuple[str, Reply]] = {}
+        self._pending: Dict[str, threading.Event] = {}
+        self.replayed = 0
+
+    def __len__(self) -> int:
+        return len(self._replies)
+
+    def run(self, key: str, fingerprint: str, dispatch: Callable[[], Reply]) -> Reply:
+        """Reply for ``key``: the remembered one, or ``dispatch()``'s."""
+        while True:
+            with self._lock:
+                stored = self._replies.get(key)
+                if stored is not None:
+                    if stored[0] != fingerprint:
+                        return 422, {"error": "Idempotency-Key reused for another request"}
+                    self.replayed += 1
+                    status, payload, *extra = stored[1]
+                    return status, payload, {**(extra[0] if extra else {}),
+                                             REPLAYED_HEADER: "true"}
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+        try:
+            reply = dispatch()
+            if reply[0] < 500:
+                with self._lock:
+                    self._replies[key] = (fingerprint, reply)
+            return reply
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+
+class FakeBackend:
+    """State and route handlers of the fake API (no networking)."""
+
+    def __init__(self, bulk: bool = True, gzip: bool = True, delta: bool = True,
+                 patch: bool = True) -> None:
+        """
+        Args:
+            bulk: Serve the bulk sync routes; False mimics an older server
+            gzip: Accept gzip request bodies and compress large replies;
+                False answers compressed requests with 415
+            delta: Serve the ``/api/changes`` feed (``updated_since`` filter)
+            patch: Serve the PATCH routes that merge partial day and task
+                updates; False mimics an older server
+        """
+        self.bulk = bulk
+        self.gzip = gzip
+        self.delta = delta
+        self.patch = patch
+        self.compressed_requests = 0
+        self.tasks: Dict[int, Dict] = {}
+        self.days: Dict[int, Dict] = {}
+        self.daily_tasks: Dict[int, Dict] = {}
+        self.pomodoros: Dict[int, Dict] = {}
+        self.sessions: Dict[int, Dict] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.lock = threading.RLock()
+        self._next_id = 0
+        self.rev = 0  # Global change counter, as kept by the Go backend's triggers
+        self.tombstones: List[Dict] = []
+        self.routes: List[Tuple[str, re.Pattern, Callable[..., Reply]]] = []
+        self._add_routes()
+
+    def _add_routes(self) -> None:
+        self.route("GET", r"/health", self.health)
+        self.route("GET", r"/api/statistics", self.get_statistics)
+        self.route("GET", r"/api/tasks", self.get_tasks)
+        self.route("POST", r"/api/tasks", self.create_task)
+        self.route("PUT", r"/api/tasks/(?P<task_id>\d+)", self.update_task)
+        self.route("DELETE", r"/api/tasks/(?P<task_id>\d+)", self.delete_task)
+        self.route("POST", r"/api/days", self.create_or_update_day)
+        self.route("POST", r"/api/days/bundle", self.upsert_day_bundle, bulk=True)
+        self.route("GET", r"/api/days/(?P<date>[^/]+)", self.get_day)
+        self.route("PUT", r"/api/days/(?P<day_id>\d+)/reflection", self.update_day_reflection)
+        if self.patch:
+            self.route("PATCH", r"/api/days/(?P<day_id>\d+)", self.patch_day)
+        self.route("GET", r"/api/days/(?P<day_id>\d+)/tasks", self.get_daily_tasks)
+        self.route("POST", r"/api/days/(?P<day_id>\d+)/tasks", self.create_daily_task)
+        self.route("PUT", r"/api/daily-tasks/(?P<task_id>\d+)", self.update_daily_task)
+        if self.patch:
+            self.route("PATCH", r"/api/daily-tasks/(?P<task_id>\d+)", self.patch_daily_task)
+        self.route("DELETE", r"/api/daily-tasks/(?P<task_id>\d+)", self.delete_daily_task)
+        self.route("GET", r"/api/sessions", self.get_sessions)
+        self.route("POST", r"/api/sessions", self.create_session)
+        self.route("GET", r"/api/pomodoros", self.get_pomodoros)
+        self.route("POST", r"/api/pomodoros", self.create_pomodoro)
+        self.route("POST", r"/api/pomodoros/bulk", self.create_pomodoros_bulk, bulk=True)
+        if self.delta:
+            self.route("GET", r"/api/changes", self.get_changes)
+
+    def route(self, method: str, pattern: str, handler: Callable[..., Reply],
+              bulk: bool = False) -> None:
+        """Register ``handler`` for ``method`` requests matching ``pattern``."""
+        if bulk and not self.bulk:
+            return
+        self.routes.append((method, re.compile(pattern + "$"), handler))
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str],
+                 body: Any) -> Reply:
+        """Route one request and return ``(status, payload)``."""
+        with self.lock:
+            self.requests.append((method, path))
+            allowed = False
+            for route_method, pattern, handler in self.routes:
+                match = pattern.match(path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed = True
+                    continue
+                return handler(body=body, query=query, **match.groupdict())
+            if allowed:
+                return 405, {"error": "method not allowed"}
+            return 404, {"error": "not found"}
+
+    # ----- helpers -----
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _touch(self, row: Dict) -> None:
+        self.rev += 1
+        row["rev"] = self.rev
+
+    def _day_by_date(self, date: str) -> Optional[Dict]:
+        return next((d for d in self.days.values() if d["date"] == date), None)
+
+    def _upsert_day(self, data: Dict) -> Tuple[int, Dict]:
+        day = self._day_by_date(data["date"])
+        if day is None:
+            day = {"id": self._new_id(), **_DAY_DEFAULTS}
+            status = 201
+        else:
+            status = 200
+        for key in ("date", "target_pomos", "finished_pomos", "start_time",
+                    "end_time", "planned_at", "comment", "reward"):
+            if key in data:
+                day[key] = data[key]
+        self._touch(day)
+        self.days[day["id"]] = day
+        return status, dict(day)
+
+    def _insert_task(self, day_id: int, data: Dict, upsert: bool = False) -> Reply:
+        existing = next(
+            (t for t in self.daily_tasks.values()
+             if t["day_id"] == day_id and t["task_name"] == data.get("task_name")),
+            None,
+        )
+        if existing is not None and not upsert:
+            return 500, {"error": "UNIQUE constraint failed: daily_tasks.day_id, daily_tasks.task_name"}
+        if not data.get("task_name"):
+            return 400, {"error": "task_name is required"}
+        task = existing or {"id": self._new_id(), "day_id": day_id, **_TASK_DEFAULTS,
+                            "created_at": _now()}
+        task.update({k: v for k, v in data.items() if k not in ("id", "day_id", "rev")})
+        self._touch(task)
+        self.daily_tasks[task["id"]] = task
+        return 201, dict(task)
+
+    def _merge(self, row: Dict, body: Any, allowed: frozenset) -> Reply:
+        # PATCH: set the fields present in the body, keep the others
+        error = _check_patch(body, allowed)
+        if error is not None:
+            return 400, {"error": error}
+        row.update(body)
+        self._touch(row)
+        return 200, dict(row)
+
+    def _insert_pomodoro(self, data: Dict) -> Reply:
+        missing = [k for k in ("day_id", "start_time", "duration_sec") if k not in data]
+        if missing:
+            return 400, {"error": f"missing fields: {', '.join(missing)}"}
+        if data["day_id"] not in self.days:
+            return 400, {"error": "unknown day_id"}
+        pomo = {"id": self._new_id(), **_POMO_DEFAULTS}
+        pomo.update({k: v for k, v in data.items() if k not in ("id", "rev")})
+        self._touch(pomo)
+        self.pomodoros[pomo["id"]] = pomo
+        return 201, dict(pomo)
+
+    # ----- route handlers -----
+
+    def health(self, **_: Any) -> Reply:
+        return 200, {"status": "healthy"}
+
+    def get_statistics(self, **_: Any) -> Reply:
+        pomos = list(self.pomodoros.values())
+        completed = [p for p in pomos if not p["aborted"]]
+        minutes = sum(p["duration_sec"] for p in completed) // 60
+        return 200, {
+            "total_sessions": len(pomos),
+            "completed_sessions": len(completed),
+            "total_minutes": minutes,
+            "tasks_completed": sum(1 for t in self.daily_tasks.values() if t["completed"]),
+            "average_focus_time": minutes / len(completed) if completed else 0.0,
+        }
+
+    def get_tasks(self, **_: Any) -> Reply:
+        tasks = sorted(self.tasks.values(), key=lambda t: (t["created_at"], t["id"]),
+                       reverse=True)
+        return 200, [dict(t) for t in tasks]
+
+    def create_task(self, body: Dict, **_: Any) -> Reply:
+        data = body or {}
+        task = {"id": self._new_id(), "name": data.get("name", ""),
+                "description": data.get("description", ""), "created_at": _now(),
+                "completed_at": None, "is_completed": False}
+        self.tasks[task["id"]] = task
+        return 201, dict(task)
+
+    def update_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        task = self.tasks.get(int(task_id))
+        if task is None:
+            return 404, {"error": "Task not found"}
+        # Like the Go handler, a PUT replaces every field it may set
+        task.update(_task_put_fields(body))
+        return 200, dict(task)
+
+    def delete_task(self, task_id: str, **_: Any) -> Reply:
+        if self.tasks.pop(int(task_id), None) is None:
+            return 404, {"error": "Task not found"}
+        return 204, None
+
+    def get_day(self, date: str, **_: Any) -> Reply:
+        day = self._day_by_date(date)
+        if day is None:
+            return 404, {"error": "Day not found"}
+        return 200, dict(day)
+
+    def create_or_update_day(self, body: Dict, **_: Any) -> Reply:
+        if not body or "date" not in body:
+            return 400, {"error": "date is required"}
+        return self._upsert_day(body)
+
+    def update_day_reflection(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        day = self.days.get(int(day_id))
+        if day is None:
+            return 404, {"error": "Day not found"}
+        for key in ("day_rating", "main_distraction", "reflection_notes"):
+            if key in body:
+                day[key] = body[key]
+        self._touch(day)
+        return 200, dict(day)
+
+    def patch_day(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        day = self.days.get(int(day_id))
+        if day is None:
+            return 404, {"error": "Day not found"}
+        return self._merge(day, body, _DAY_PATCH_FIELDS)
+
+    def get_daily_tasks(self, day_id: str, **_: Any) -> Reply:
+        tasks = [dict(t) for t in self.daily_tasks.values() if t["day_id"] == int(day_id)]
+        return 200, tasks
+
+    def create_daily_task(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        if int(day_id) not in self.days:
+            return 400, {"error": "unknown day_id"}
+        return self._insert_task(int(day_id), body or {})
+
+    def update_daily_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        task = self.daily_tasks.get(int(task_id))
+        if task is None:
+            return 404, {"error": "Task not found"}
+        task.update({k: v for k, v in (body or {}).items() if k not in ("id", "day_id", "rev")})
+        self._touch(task)
+        return 200, dict(task)
+
+    def patch_daily_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        task = self.daily_tasks.get(int(task_id))
+        if task is None:
+            return 404, {"error": "Task not found"}
+        return self._merge(task, body, _TASK_PATCH_FIELDS)
+
+    def delete_daily_task(self, task_id: str, **_: Any) -> Reply:
+        task = self.daily_tasks.pop(int(task_id), None)
+        if task is None:
+            return 404, {"error": "Task not found"}
+        tombstone = {"kind": "daily_task", "id": task["id"],
+                     "day_date": self.days[task["day_id"]]["date"],
+                     "natural_key": task["task_name"]}
+        self._touch(tombstone)
+        self.tombstones.append(tombstone)
+        return 204, None
+
+    def get_pomodoros(self, query: Dict[str, str], **_: Any) -> Reply:
+        pomos = list(self.pomodoros.values())
+        if "day_id" in query:
+            pomos = [p for p in pomos if str(p["day_id"]) == query["day_id"]]
+        if "start_date" in query and "end_date" in query:
+            pomos = [p for p in pomos
+                     if query["start_date"] <= p["start_time"][:10] <= query["end_date"]]
+        return _page(pomos, query)
+
+    def get_sessions(self, query: Dict[str, str], **_: Any) -> Reply:
+        sessions = list(self.sessions.values())
+        if query.get("task_id"):
+            sessions = [s for s in sessions if str(s["task_id"]) == query["task_id"]]
+        return _page(sessions, query)
+
+    def create_session(self, body: Dict, **_: Any) -> Reply:
+        if not body or "task_id" not in body or "duration" not in body:
+            return 400, {"error": "task_id and duration are required"}
+        session = {"id": self._new_id(), "end_time": None, "completed": False,
+                   "start_time": _now(), **body}
+        self.sessions[session["id"]] = session
+        return 201, dict(session)
+
+    def get_changes(self, query: Dict[str, str], **_: Any) -> Reply:
+        try:
+            since = int(query.get("updated_since", 0))
+            limit = max(1, min(int(query.get("limit", 500)), 5000))
+        except ValueError:
+            return 400, {"error": "invalid updated_since or limit"}
+        if since > self.rev:
+            since = 0  # Cursor from a reset server: start over
+
+        def dated(row: Dict) -> Dict:
+            return {**row, "day_date": self.days[row["day_id"]]["date"]}
+
+        changes = sorted(
+            [("days", dict(d)) for d in self.days.values() if d["rev"] > since]
+            + [("daily_tasks", dated(t)) for t in self.daily_tasks.values() if t["rev"] > since]
+            + [("pomodoros", dated(p)) for p in self.pomodoros.values() if p["rev"] > since]
+            + [("deleted", dict(t)) for t in self.tombstones if t["rev"] > since],
+            key=lambda change: change[1]["rev"],
+        )
+        page = changes[:limit]
+        feed: Dict[str, Any] = {"days": [], "daily_tasks": [], "pomodoros": [], "deleted": []}
+        for kind, row in page:
+            feed[kind].append(row)
+        feed["has_more"] = len(changes) > limit
+        feed["watermark"] = str(page[-1][1]["rev"] if feed["has_more"] else self.rev)
+        return 200, feed
+
+    def create_pomodoro(self, body: Dict, **_: Any) -> Reply:
+        return self._insert_pomodoro(body or {})
+
+    def create_pomodoros_bulk(self, body: Dict, **_: Any) -> Reply:
+        results = [_item_result(*self._insert_pomodoro(p)) for p in body.get("pomodoros", [])]
+        return 200, {"results": results}
+
+    def upsert_day_bundle(self, body: Dict, **_: Any) -> Reply:
+        day_data = body.get("day") or {}
+        if "date" not in day_data:
+            return 400, {"error": "day.date is required"}
+        _, day = self._upsert_day(day_data)
+        tasks = [_item_result(*self._insert_task(day["id"], t, upsert=True))
+                 for t in body.get("tasks", [])]
+        pomodoros = [_item_result(*self._insert_pomodoro({**p, "day_id": day["id"]}))
+                     for p in body.get("pomodoros", [])]
+        return 200, {"day": day, "tasks": tasks, "pomodoros": pomodoros}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: without TCP_NODELAY every
+    # reply waits out the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    server: "Union[_HTTPServer, _UnixHTTPServer]"
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _handle(self) -> None:
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        encoding = self.headers.get("Content-Encoding")
+        try:
+            if encoding and not self.server.backend.gzip:
+                raise ValueError(encoding)
+            raw = decode_body(raw, encoding)
+        except ValueError:
+            self._reply(415, {"error": "unsupported Content-Encoding"})
+            return
+        except OSError:
+            self._reply(400, {"error": "corrupt gzip body"})
+            return
+        if encoding:
+            with self.server.backend.lock:
+                self.server.backend.compressed_requests += 1
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        delay, fault = self.server.faults.draw(self.command, parts.path)
+        if delay:
+            time.sleep(delay)
+        if fault == "drop":
+            self.close_connection = True  # Client sees the connection reset
+            return
+        if fault == "error":
+            self._reply(self.server.faults.error_status, {"error": "injected fault"})
+            return
+
+        def dispatch() -> Reply:
+            return self.server.backend.dispatch(self.command, parts.path, query, body)
+
+        key = self.headers.get(IDEMPOTENCY_HEADER)
+        store = self.server.idempotency
+        if key and store is not None and self.command in ("POST", "PUT", "PATCH", "DELETE"):
+            reply = store.run(key, request_fingerprint(self.command, parts.path, body), dispatch)
+        else:
+            reply = dispatch()
+        if fault == "lose":
+            self.close_connection = True  # Applied, but the client never hears back
+            return
+        self._reply(*reply)
+
+    def _reply(self, status: int, payload: Any,
+               headers: Optional[Dict[str, str]] = None) -> None:
+        body = b"" if status == 204 else json.dumps(payload).encode()
+        etag = None
+        if self.command == "GET" and status == 200:
+            # Same scheme as the Go backend's etagMiddleware
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body:
+            self.send_header("Content-Type", "application/json")
+            if (self.server.backend.gzip and len(body) >= DEFAULT_MIN_BYTES
+                    and "gzip" in self.headers.get("Accept-Encoding", "")):
+                body = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Vary", "Accept-Encoding")
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    backend: FakeBackend
+    faults: Faults
+    idempotency: Optional[IdempotencyStore]
+
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False  # No TCP options on a Unix socket
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    backend: FakeBackend
+    faults: Faults
+    idempotency: Optional[IdempotencyStore]
+
+
+class FakeServer:
+    """Serve a ``FakeBackend`` over HTTP on localhost in a background thread.
+
+    With ``unix_socket`` the server listens on that Unix domain socket
+    path instead of a TCP port, and ``url`` is a ``unix://`` URL. With
+    ``idempotency`` writes are deduplicated by their ``Idempotency-Key``
+    (see ``IdempotencyStore``, exposed as ``server.idempotency``).
+    """
+
+    def __init__(self, backend: Optional[FakeBackend] = None,
+                 host: str = "127.0.0.1", port: int = 0,
+                 faults: Optional[Faults] = None,
+                 unix_socket: Optional[str] = None,
+                 idempotency: bool = False) -> None:
+        self.backend = backend or FakeBackend()
+        self.faults = faults or Faults()
+        self.unix_socket = unix_socket
+        self.idempotency = IdempotencyStore() if idempotency else None
+        if unix_socket is not None:
+            if os.path.exists(unix_socket) and stat.S_ISSOCK(os.stat(unix_socket).st_mode):
+                os.unlink(unix_socket)  # Left behind by a server that crashed
+            self._httpd = _UnixHTTPServer(unix_socket, _UnixHandler)
+        else:
+            self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.backend = self.backend
+        self._httpd.faults = self.faults
+        self._httpd.idempotency = self.idempotency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self.unix_socket is not None:
+            return f"unix://{self.unix_socket}"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        if self.unix_socket is not None and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+def _item_result(status: int, payload: Dict) -> Dict:
+    if status < 300:
+        return {"ok": True, "id": payload["id"]}
+    return {"ok": False, "error": payload.get("error", f"status {status}")}
+
+
+def _page(rows: List[Dict], query: Dict[str, str]) -> Reply:
+    # Keyset pagination as in the Go backend: (start_time, id) descending,
+    # with ?limit and an opaque ?cursor; X-Next-Cursor marks a full page
+    rows = sorted(rows, key=lambda r: (r["start_time"], r["id"]), reverse=True)
+    try:
+        limit = max(1, min(int(query["limit"]), 5000)) if "limit" in query else 0
+        if query.get("cursor"):
+            position = _decode_cursor(query["cursor"])
+            rows = [r for r in rows if (r["start_time"], r["id"]) < position]
+    except ValueError:
+        return 400, {"error": "invalid limit or cursor"}
+    if limit:
+        rows = rows[:limit]
+    return 200, [dict(r) for r in rows], _next_cursor(rows, limit)
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    start, _, row_id = urlsafe_b64decode(cursor + "==").decode().rpartition("|")
+    return start, int(row_id)
+
+
+def _next_cursor(rows: List[Dict], limit: int) -> Dict[str, str]:
+    # X-Next-Cursor header if the page is full, pointing past its last row
+    if not limit or len(rows) != limit:
+        return {}
+    token = f"{rows[-1]['start_time']}|{rows[-1]['id']}".encode()
+    return {"X-Next-Cursor": urlsafe_b64encode(token).decode().rstrip("=")}
+
+
+def _check_patch(body: Any, allowed: frozenset) -> Optional[str]:
+    """Error message for an invalid PATCH body, or None."""
+    if not isinstance(body, dict):
+        return "expected a JSON object"
+    unknown = sorted(set(body) - allowed)
+    if unknown:
+        return f"unknown or read-only field(s): {', '.join(unknown)}"
+    return None
+
+
+def _task_put_fields(body: Any) -> Dict[str, Any]:
+    # Fields of PUT /api/tasks/{id}; absent ones reset to their zero value
+    data = body or {}
+    return {"name": data.get("name", ""), "description": data.get("description", ""),
+            "is_completed": bool(data.get("is_completed", False)),
+            "completed_at": data.get("completed_at")}
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: MIT
+"""pytest fixtures serving the SQLite stand-in backend in-process.
+
+Import them (and the marker registration hook) into a ``conftest.py``::
+
+    from hardmode.testing.fixtures import (  # noqa: F401
+        api_backend, api_client, api_server, pytest_configure)
+
+``api_server.faults`` can be changed inside a test to add latency or
+errors. Mark a test with ``@pytest.mark.api_faults(latency=0.05)`` to
+start the server with those ``Faults`` instead.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.testing.fake_server import FakeServer, Faults
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def api_backend() -> Iterator[SQLiteBackend]:
+    """A fresh in-memory SQLite backend."""
+    backend = SQLiteBackend()
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def api_server(request: pytest.FixtureRequest,
+               api_backend: SQLiteBackend) -> Iterator[FakeServer]:
+    """``api_backend`` served over HTTP on a free localhost port."""
+    marker = request.node.get_closest_marker("api_faults")
+    faults = Faults(**marker.kwargs) if marker is not None else Faults()
+    with FakeServer(api_backend, faults=faults) as server:
+        yield server
+
+
+@pytest.fixture
+def api_client(api_server: FakeServer) -> Iterator[APIClient]:
+    """An APIClient talking to ``api_server``."""
+    with APIClient(base_url=api_server.url) as client:
+        yield client
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "api_faults(**kwargs): Faults for the api_server fixture")
@@ -0,0 +1,341 @@
+# SPDX-License-Identifier: MIT
+"""Multi-device load generator for the sync path.
+
+Spins up N simulated desktops, each with its own in-memory SQLite
+database (schema.sql), ``APIClient`` and ``DeltaSync``, and starts them
+together to reproduce the morning startup herd. Every device then
+replays realistic days: plan the day and its tasks, work through
+pomodoros, write the reflection, push, and pull what the others wrote.
+Consecutive devices share ``LoadProfile.shared_days`` of their days, so
+some writes contend for the same day and task rows.
+
+Latency is measured per ``APIClient`` method (what the app waits for,
+retries included) and per endpoint (``metrics_snapshot``)::
+
+    python -m hardmode.testing.loadgen --devices 50 --days 3
+    python -m hardmode.testing.loadgen --url http://localhost:8080
+
+Without ``--url`` the bundled SQLite stand-in is served in-process.
+
+``DataManager`` is not part of this package, so a device writes its
+local rows directly and syncs through the same client calls the app
+makes (day upsert, task creation, bulk pomodoros, reflection, delta
+pull).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from hardmode.api_client import APIClient
+from hardmode.net.delta import DeltaSync
+from hardmode.net.metrics import LatencyHistogram, RequestMetrics
+from hardmode.testing.fake_server import FakeServer, Faults
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+SCHEMA = Path(__file__).resolve().parents[2] / "schema.sql"
+
+# APIClient methods a device calls, directly or through DeltaSync
+TIMED_METHODS = ("get_changes", "get_day", "create_or_update_day", "create_daily_task",
+                 "update_daily_task", "create_pomodoros_bulk", "update_day_reflection",
+                 "get_statistics")
+
+_TASKS = ("Write spec", "Review PRs", "Fix flaky test", "Plan sprint", "Refactor parser",
+          "Answer email", "Update docs", "Profile sync")
+
+
+@dataclass(slots=True)
+class LoadProfile:
+    """Shape of the work each simulated device replays."""
+
+    days: int = 2
+    shared_days: int = 1  # Days each device replays together with the next one
+    tasks_per_day: int = 4
+    pomodoros_per_day: int = 8
+    pulls_per_day: int = 2
+    think_time: float = 0.0  # Pause between steps, seconds
+    start_jitter: float = 0.0  # Spread of device start times, seconds
+
+
+class MethodTimer:
+    """Latency histograms and error counts per client method name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+
+    def instrument(self, client: APIClient, names=TIMED_METHODS) -> APIClient:
+        """Replace ``names`` on ``client`` with timed wrappers."""
+        for name in names:
+            setattr(client, name, self._timed(name, getattr(client, name)))
+        return client
+
+    def _timed(self, name: str, method: Callable) -> Callable:
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            result = error = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.latency.setdefault(name, LatencyHistogram()).record(elapsed)
+                    if error is not None or result is None:
+                        self.errors[name] = self.errors.get(name, 0) + 1
+        return timed
+
+
+class Device:
+    """One simulated desktop: a local database plus its sync client."""
+
+    def __init__(self, index: int, base_url: str, timer: MethodTimer,
+                 metrics: RequestMetrics, profile: LoadProfile, seed: int = 0,
+                 **client_kwargs: Any) -> None:
+        self.index = index
+        self.profile = profile
+        self.rng = random.Random(seed * 1000 + index)
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.executescript(SCHEMA.read_text())
+        self.client = timer.instrument(
+            APIClient(base_url=base_url, metrics=metrics, **client_kwargs))
+        self.sync = DeltaSync(self.conn, self.client)
+        self.failures = 0
+
+    def close(self) -> None:
+        self.client.close()
+        self.conn.close()
+
+    def run(self, first_day: date) -> None:
+        time.sleep(self.rng.uniform(0, self.profile.start_jitter))
+        self._pull()  # Startup sync
+        for offset in range(self.profile.days):
+            self.replay_day((first_day + timedelta(days=offset)).isoformat())
+
+    def replay_day(self, day: str) -> None:
+        profile = self.profile
+        start = datetime.fromisoformat(f"{day}T08:00:00")
+        target = profile.pomodoros_per_day
+
+        # Planning; the day and its tasks may already have been pulled from
+        # a device sharing this day
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO day (date, target_pomos, start_time) VALUES (?, ?, ?) "
+                "ON CONFLICT(date) DO UPDATE SET target_pomos = excluded.target_pomos",
+                (day, target, start.isoformat()))
+        local_day = self.conn.execute("SELECT id FROM day WHERE date = ?", (day,)).fetchone()[0]
+        remote = self.client.create_or_update_day(day, target_pomos=target,
+                                                  start_time=start.isoformat())
+        if remote is None:
+            self.failures += 1
+            return
+        tasks = self.rng.sample(_TASKS, min(profile.tasks_per_day, len(_TASKS)))
+        remote_tasks = self._remote_tasks(remote["id"], tasks)
+        for priority, name in enumerate(tasks, 1):
+            planned = self.rng.randint(1, 3)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO daily_tasks (day_id, task_name, planned_pomodoros, "
+                    "plan_priority, created_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(day_id, task_name) DO UPDATE SET "
+                    "planned_pomodoros = excluded.planned_pomodoros, "
+                    "plan_priority = excluded.plan_priority",
+                    (local_day, name, planned, priority, start.isoformat()))
+            if name in remote_tasks:
+                continue  # Created by a device sharing the day: work on its row
+            created = self.client.create_daily_task(remote["id"], name, planned_pomodoros=planned,
+                                                    plan_priority=priority)
+            if created is not None:
+                remote_tasks[name] = created["id"]
+        if len(remote_tasks) < len(tasks):  # Lost a race to create some of them
+            remote_tasks.update(self._remote_tasks(remote["id"], tasks))
+        self._pause()
+
+        # Work, with pulls spread through the day
+        pomos: List[Dict] = []
+        spent: Dict[str, int] = {}
+        pull_every = max(1, target // max(1, profile.pulls_per_day))
+        for n in range(target):
+            begin = start + timedelta(minutes=30 * n)
+            task = self.rng.choice(tasks)
+            aborted = self.rng.random() < 0.1
+            pomo = {"day_id": remote["id"], "start_time": begin.isoformat(),
+                    "end_time": (begin + timedelta(minutes=25)).isoformat(),
+                    "duration_sec": 1500, "task": task, "aborted": aborted,
+                    "focus_score": self.rng.randint(1, 5)}
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO pomo (day_id, start_time, end_time, duration_sec, aborted, "
+                    "focus_score, task) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (local_day, pomo["start_time"], pomo["end_time"], 1500, int(aborted),
+                     pomo["focus_score"], task))
+            pomos.append(pomo)
+            if (n + 1) % pull_every == 0:
+                self._push(pomos, remote_tasks, spent)
+                pomos = []
+                self._pull()
+            self._pause()
+        self._push(pomos, remote_tasks, spent)
+
+        # Reflection
+        rating = self.rng.randint(1, 5)
+        with self.conn:
+            self.conn.execute("UPDATE day SET day_rating = ?, finished_pomos = ? WHERE id = ?",
+                              (rating, target, local_day))
+        if self.client.update_day_reflection(remote["id"], rating,
+                                             reflection_notes="load test") is None:
+            self.failures += 1
+        self._pull()
+
+    def _remote_tasks(self, day_id: int, names: List[str]) -> Dict[str, int]:
+        # Server ids of the tasks among ``names`` that the day already has
+        rows = self.client.get_daily_tasks(day_id) or ()
+        return {row["task_name"]: row["id"] for row in rows if row["task_name"] in names}
+
+    def _push(self, pomos: List[Dict], remote_tasks: Dict[str, int],
+              spent: Dict[str, int]) -> None:
+        if not pomos:
+            return
+        if self.client.create_pomodoros_bulk(pomos) is None:
+            self.failures += 1
+        touched = {pomo["task"] for pomo in pomos}
+        for pomo in pomos:
+            spent[pomo["task"]] = spent.get(pomo["task"], 0) + 1
+        for name in touched & remote_tasks.keys():
+            self.client.update_daily_task(remote_tasks[name], pomodoros_spent=spent[name])
+
+    def _pull(self) -> None:
+        if not self.sync.pull()["success"]:
+            self.failures += 1
+
+    def _pause(self) -> None:
+        if self.profile.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.profile.think_time))
+
+
+def run_load(base_url: Optional[str] = None, devices: int = 10,
+             profile: LoadProfile = None, faults: Faults = None,
+             first_day: date = date(2024, 3, 1), seed: int = 0) -> Dict[str, Any]:
+    """
+    Run ``devices`` simulated desktops to completion
+
+    Args:
+        base_url: API to load; None serves a SQLiteBackend in-process
+        devices: Number of concurrent devices
+        profile: Work replayed by each device
+        faults: Latency/errors for the in-process server
+        first_day: Date of the first replayed day; device i replays the
+            days starting ``i * (profile.days - profile.shared_days)``
+            days later
+        seed: Seed for task choice, aborts and ratings
+
+    Returns:
+        Report dict: wall time, per-method and per-endpoint statistics
+    """
+    profile = profile or LoadProfile()
+    server = None
+    if base_url is None:
+        server = FakeServer(SQLiteBackend(), faults=faults).start()
+        base_url = server.url
+    timer, metrics = MethodTimer(), RequestMetrics()
+    fleet = [Device(i, base_url, timer, metrics, profile, seed) for i in range(devices)]
+    start_line = threading.Barrier(devices)
+    stride = max(0, profile.days - profile.shared_days)
+
+    def drive(device: Device) -> None:
+        start_line.wait()  # Everyone starts at once, as after a network outage
+        device.run(first_day + timedelta(days=device.index * stride))
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=devices) as pool:
+            for future in [pool.submit(drive, d) for d in fleet]:
+                future.result()
+        wall = time.perf_counter() - started
+    finally:
+        for device in fleet:
+            device.close()
+        if server is not None:
+            server.stop()
+            server.backend.close()
+    return _report(wall, devices, timer, metrics, sum(d.failures for d in fleet))
+
+
+def _report(wall: float, devices: int, timer: MethodTimer, metrics: RequestMetrics,
+            failures: int) -> Dict[str, Any]:
+    methods = {}
+    for name, histogram in sorted(timer.latency.items()):
+        methods[name] = {
+            "calls": histogram.count,
+            "errors": timer.errors.get(name, 0),
+            "per_second": histogram.count / wall if wall else 0.0,
+            **{k: v for k, v in histogram.summary().items() if k in ("p50", "p95", "p99", "max")},
+        }
+    endpoints = metrics.snapshot()
+    return {
+        "devices": devices,
+        "wall_seconds": wall,
+        "failures": failures,
+        "requests": endpoints["total"]["count"],
+        "requests_per_second": endpoints["total"]["count"] / wall if wall else 0.0,
+        "methods": methods,
+        "endpoints": endpoints,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['devices']} devices, {report['wall_seconds']:.2f}s, "
+        f"{report['requests']} requests ({report['requests_per_second']:.1f}/s), "
+        f"{report['failures']} failed steps",
+        "",
+        f"{'method':<24}{'calls':>7}{'err':>5}{'/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}",
+    ]
+    for name, row in report["methods"].items():
+        lines.append(f"{name:<24}{row['calls']:>7}{row['errors']:>5}{row['per_second']:>8.1f}"
+                     f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate many devices syncing at once")
+    parser.add_argument("--url", help="API base URL (default: in-process stand-in)")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--shared-days", type=int, default=1,
+                        help="days each device replays together with the next one")
+    parser.add_argument("--tasks", type=int, default=4)
+    parser.add_argument("--pomodoros", type=int, default=8)
+    parser.add_argument("--pulls", type=int, default=2, help="pull cycles per day")
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--start-jitter", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="added server latency (in-process server only)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    profile = LoadProfile(days=args.days, shared_days=args.shared_days,
+                          tasks_per_day=args.tasks, pomodoros_per_day=args.pomodoros,
+                          pulls_per_day=args.pulls,
+                          think_time=args.think_time, start_jitter=args.start_jitter)
+    report = run_load(args.url, args.devices, profile,
+                      Faults(latency=args.latency), seed=args.seed)
+    print(format_report(report))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: MIT
+"""TCP proxy that degrades the network between a client and any backend.
+
+``FaultProxy`` listens on localhost and forwards every connection to an
+upstream server (the Go backend, a ``FakeServer``...), applying a
+``NetProfile``: added latency and jitter, a bandwidth cap, random
+stalls, connection resets and bursts of 5xx replies::
+
+    with FaultProxy("http://localhost:8080", PROFILES["hotel_wifi"]) as proxy:
+        client = APIClient(base_url=proxy.url)
+
+Latency is added once per message (when the direction of traffic on a
+connection flips), so a round trip costs about ``latency`` whatever the
+body size; the bandwidth cap then applies per byte. Resets and 5xx
+replies are decided when a new HTTP request starts on a connection. The
+profile may be swapped while the proxy runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True, slots=True)
+class NetProfile:
+    """Impairments applied by ``FaultProxy``."""
+
+    latency: float = 0.0  # Round-trip delay added to each exchange, seconds
+    jitter: float = 0.0  # Up to this much extra delay per message
+    bandwidth: Optional[float] = None  # Bytes per second each way; None = unlimited
+    stall_rate: float = 0.0  # Chance per chunk of pausing for stall_seconds
+    stall_seconds: float = 2.0
+    reset_rate: float = 0.0  # Chance per request of resetting the connection
+    error_rate: float = 0.0  # Chance per request of starting a 5xx burst
+    error_burst: int = 1  # Consecutive requests answered with error_status
+    error_status: int = 503
+
+
+PROFILES: Dict[str, NetProfile] = {
+    "lan": NetProfile(),
+    "wifi": NetProfile(latency=0.02, jitter=0.01, bandwidth=2_000_000),
+    "hotel_wifi": NetProfile(latency=0.15, jitter=0.1, bandwidth=100_000,
+                             stall_rate=0.02, stall_seconds=1.5, reset_rate=0.02),
+    "flaky": NetProfile(latency=0.05, jitter=0.05, reset_rate=0.1, error_rate=0.1,
+                        error_burst=2),
+    "outage_burst": NetProfile(latency=0.02, error_rate=0.15, error_burst=5),
+    "slow_3g": NetProfile(latency=0.4, jitter=0.1, bandwidth=50_000),
+}
+
+
+class _Connection:
+    __slots__ = ("client", "upstream", "last_direction", "awaiting_request")
+
+    def __init__(self, client: asyncio.StreamWriter, upstream: asyncio.StreamWriter) -> None:
+        self.client = client
+        self.upstream = upstream
+        self.last_direction: Optional[str] = None
+        self.awaiting_request = True
+
+    def abort(self) -> None:
+        for writer in (self.client, self.upstream):
+            writer.transport.abort()
+
+
+class FaultProxy:
+    """Impairing TCP proxy running on its own event loop thread."""
+
+    def __init__(self, upstream: str, profile: Optional[NetProfile] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            upstream: Backend URL (``http://host:port``) or ``host:port``
+            profile: Impairments to apply (default: none)
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            seed: Seed for the random impairments
+        """
+        parts = urlsplit(upstream if "//" in upstream else f"//{upstream}")
+        self.upstream: Tuple[str, int] = (parts.hostname or "127.0.0.1", parts.port or 80)
+        self.profile = profile or NetProfile()
+        self._listen = (host, port)
+        self._rng = random.Random(seed)
+        self._burst_left = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set[_Connection] = set()
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ("connections", "requests", "resets", "errors", "stalls", "bytes_up",
+             "bytes_down"), 0)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FaultProxy":
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._accept, *self._listen))
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                        name="fault-proxy")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        async def shutdown() -> None:
+            self._server.close()
+            for conn in list(self._connections):
+                conn.abort()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "FaultProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start_burst(self, requests: int) -> None:
+        """Answer the next ``requests`` requests with the profile's error status."""
+        self._burst_left = requests
+
+    def set_profile(self, profile: NetProfile, **changes: object) -> None:
+        self.profile = replace(profile, **changes) if changes else profile
+
+    # ----- forwarding -----
+
+    async def _accept(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        self.stats["connections"] += 1
+        try:
+            up_reader, up_writer = await asyncio.open_connection(*self.upstream)
+        except OSError:
+            writer.transport.abort()
+            return
+        conn = _Connection(writer, up_writer)
+        self._connections.add(conn)
+        try:
+            await asyncio.gather(self._pump(reader, up_writer, "up", conn),
+                                 self._pump(up_reader, writer, "down", conn))
+        finally:
+            self._connections.discard(conn)
+            for w in (writer, up_writer):
+                if not w.is_closing():
+                    w.close()
+
+    async def _pump(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                    direction: str, conn: _Connection) -> None:
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if direction == "up" and conn.awaiting_request:
+                    conn.awaiting_request = False
+                    if await self._intercept(conn):
+                        return
+                elif direction == "down":
+                    conn.awaiting_request = True
+                await self._shape(data, direction, conn)
+                writer.write(data)
+                await writer.drain()
+                self.stats["bytes_" + direction] += len(data)
+        except (ConnectionError, OSError):
+            conn.abort()
+        finally:
+            if direction == "up" and not writer.is_closing():
+                # Half-close so the upstream sees the client's EOF
+                try:
+                    writer.write_eof()
+                except (OSError, RuntimeError):
+                    pass
+
+    async def _intercept(self, conn: _Connection) -> bool:
+        """Apply per-request faults; True if the request was consumed."""
+        profile = self.profile
+        self.stats["requests"] += 1
+        if self._burst_left == 0 and profile.error_rate and self._rng.random() < profile.error_rate:
+            self._burst_left = profile.error_burst
+        if self._burst_left > 0:
+            self._burst_left -= 1
+            self.stats["errors"] += 1
+            await asyncio.sleep(profile.latency)
+            body = b'{"error": "injected by proxy"}'
+            conn.client.write(
+                f"HTTP/1.1 {profile.error_status} Injected\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body)
+            await conn.client.drain()
+            conn.client.close()
+            conn.upstream.close()
+            return True
+        if profile.reset_rate and self._rng.random() < profile.reset_rate:
+            self.stats["resets"] += 1
+            await asyncio.sleep(profile.latency / 2)
+            conn.abort()
+            return True
+        return False
+
+    async def _shape(self, data: bytes, direction: str, conn: _Connection) -> None:
+        profile = self.profile
+        delay = 0.0
+        if conn.last_direction != direction:
+            # First chunk of a message: half the round trip each way
+            conn.last_direction = direction
+            delay += profile.latency / 2
+            if profile.jitter:
+                delay += self._rng.uniform(0, profile.jitter)
+        if profile.bandwidth:
+            delay += len(data) / profile.bandwidth
+        if profile.stall_rate and self._rng.random() < profile.stall_rate:
+            self.stats["stalls"] += 1
+            delay += profile.stall_seconds
+        if delay:
+            await asyncio.sleep(delay)
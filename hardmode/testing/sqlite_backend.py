@@ -0,0 +1,430 @@
+# SPDX-License-Identifier: MIT
+"""Stand-in for the Go backend that keeps its data in SQLite.
+
+``SQLiteBackend`` implements the same routes as ``FakeBackend`` (and the
+Go server) but stores days, tasks, pomodoros and sessions in a SQLite
+database, so it behaves like the real thing for larger data sets and can
+persist between runs. Serve it with ``FakeServer``, optionally with
+``Faults`` for latency and error injection::
+
+    with FakeServer(SQLiteBackend(), faults=Faults(latency=0.02)) as server:
+        client = APIClient(base_url=server.url)
+
+or from the command line, to run scripts such as ``test_sync.py`` without
+Go::
+
+    python -m hardmode.testing.sqlite_backend --port 8080 --db /tmp/api.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from hardmode.testing.fake_server import (
+    _DAY_DEFAULTS, _DAY_PATCH_FIELDS, _POMO_DEFAULTS, _TASK_DEFAULTS, _TASK_PATCH_FIELDS,
+    FakeBackend, FakeServer, Faults, Reply, _check_patch, _decode_cursor, _next_cursor, _now,
+    _task_put_fields,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    is_completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS days (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL UNIQUE,
+    target_pomos INTEGER NOT NULL DEFAULT 0,
+    finished_pomos INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT, end_time TEXT, planned_at TEXT,
+    comment TEXT DEFAULT '',
+    day_rating INTEGER,
+    main_distraction TEXT DEFAULT '',
+    reflection_notes TEXT DEFAULT '',
+    reward TEXT DEFAULT '',
+    rev INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_tasks (
+    id INTEGER PRIMARY KEY,
+    day_id INTEGER NOT NULL REFERENCES days(id) ON DELETE CASCADE,
+    task_name TEXT NOT NULL,
+    planned_pomodoros INTEGER DEFAULT 0,
+    planned_at TEXT,
+    plan_priority INTEGER,
+    pomodoros_spent INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    added_mid_day INTEGER DEFAULT 0,
+    reason_added TEXT DEFAULT '',
+    rev INTEGER NOT NULL DEFAULT 0,
+    UNIQUE(day_id, task_name)
+);
+CREATE TABLE IF NOT EXISTS pomodoros (
+    id INTEGER PRIMARY KEY,
+    day_id INTEGER NOT NULL REFERENCES days(id) ON DELETE CASCADE,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    duration_sec INTEGER NOT NULL,
+    aborted INTEGER NOT NULL DEFAULT 0,
+    focus_score INTEGER,
+    reason TEXT DEFAULT '',
+    note TEXT DEFAULT '',
+    task TEXT DEFAULT '',
+    context_switch INTEGER NOT NULL DEFAULT 0,
+    pause_count INTEGER NOT NULL DEFAULT 0,
+    rev INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_pomodoros_day_start ON pomodoros(day_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_pomodoros_start ON pomodoros(start_time, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    duration INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_task_start ON sessions(task_id, start_time, id);
+CREATE TABLE IF NOT EXISTS tombstones (
+    rev INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    day_date TEXT NOT NULL,
+    natural_key TEXT NOT NULL
+);
+"""
+
+_BOOLS = frozenset({"completed", "added_mid_day", "aborted", "context_switch", "is_completed"})
+_TASK_COLUMNS = ("task_name",) + tuple(_TASK_DEFAULTS) + ("created_at",)
+_POMO_COLUMNS = ("day_id", "start_time", "duration_sec") + tuple(_POMO_DEFAULTS)
+
+
+def _row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {k: bool(row[k]) if k in _BOOLS else row[k] for k in row.keys()}
+
+
+class SQLiteBackend(FakeBackend):
+    """``FakeBackend`` routes on top of a SQLite database.
+
+    Each request runs in one transaction, so a failed bulk call leaves no
+    partial writes behind. The in-memory dicts of ``FakeBackend`` stay
+    empty; use ``count()`` or ``conn`` to inspect the data.
+    """
+
+    def __init__(self, path: str = ":memory:", **options: Any) -> None:
+        """
+        Args:
+            path: Database file, or ":memory:" for a throwaway database
+            **options: FakeBackend options (bulk, gzip, delta)
+        """
+        # Requests are serialised by self.lock, so one connection is shared
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        super().__init__(**options)
+        self.rev = self.conn.execute(
+            "SELECT MAX(r) FROM (SELECT MAX(rev) r FROM days UNION ALL "
+            "SELECT MAX(rev) FROM daily_tasks UNION ALL SELECT MAX(rev) FROM pomodoros "
+            "UNION ALL SELECT MAX(rev) FROM tombstones)").fetchone()[0] or 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def count(self, table: str) -> int:
+        """Number of rows in ``table`` (tasks, days, daily_tasks, pomodoros, sessions)."""
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str],
+                 body: Any) -> Reply:
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                reply = super().dispatch(method, path, query, body)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return reply
+
+    # ----- helpers -----
+
+    def _next_rev(self) -> int:
+        self.rev += 1
+        return self.rev
+
+    def _one(self, sql: str, *args: Any) -> Optional[Dict]:
+        row = self.conn.execute(sql, args).fetchone()
+        return _row(row) if row is not None else None
+
+    def _all(self, sql: str, *args: Any) -> List[Dict]:
+        return [_row(r) for r in self.conn.execute(sql, args)]
+
+    def _day_by_date(self, date: str) -> Optional[Dict]:
+        return self._one("SELECT * FROM days WHERE date = ?", date)
+
+    def _day_exists(self, day_id: int) -> bool:
+        row = self.conn.execute("SELECT 1 FROM days WHERE id = ?", (day_id,)).fetchone()
+        return row is not None
+
+    def _update(self, table: str, row_id: int, values: Dict[str, Any]) -> None:
+        values = {**values, "rev": self._next_rev()}
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        self.conn.execute(f"UPDATE {table} SET {assignments} WHERE id = ?",
+                          (*values.values(), row_id))
+
+    def _merge(self, table: str, row_id: int, body: Any, allowed: frozenset) -> Reply:
+        error = _check_patch(body, allowed)
+        if error is not None:
+            return 400, {"error": error}
+        self._update(table, row_id, body)
+        return 200, self._one(f"SELECT * FROM {table} WHERE id = ?", row_id)
+
+    def _insert(self, table: str, values: Dict[str, Any]) -> int:
+        values = {**values, "rev": self._next_rev()}
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        cursor = self.conn.execute(f"INSERT INTO {table} ({names}) VALUES ({marks})",
+                                   tuple(values.values()))
+        return cursor.lastrowid
+
+    def _upsert_day(self, data: Dict) -> Tuple[int, Dict]:
+        day = self._day_by_date(data["date"])
+        values = {k: data[k] for k in ("target_pomos", "finished_pomos", "start_time",
+                                       "end_time", "planned_at", "comment", "reward")
+                  if k in data}
+        if day is None:
+            day_id = self._insert("days", {**_DAY_DEFAULTS, "date": data["date"], **values})
+            status = 201
+        else:
+            day_id = day["id"]
+            self._update("days", day_id, values)
+            status = 200
+        return status, self._one("SELECT * FROM days WHERE id = ?", day_id)
+
+    def _insert_task(self, day_id: int, data: Dict, upsert: bool = False) -> Reply:
+        if not data.get("task_name"):
+            return 400, {"error": "task_name is required"}
+        values = {k: data[k] for k in _TASK_COLUMNS if k in data}
+        existing = self._one("SELECT id FROM daily_tasks WHERE day_id = ? AND task_name = ?",
+                             day_id, data["task_name"])
+        if existing is not None:
+            if not upsert:
+                return 500, {"error": "UNIQUE constraint failed: "
+                                      "daily_tasks.day_id, daily_tasks.task_name"}
+            task_id = existing["id"]
+            self._update("daily_tasks", task_id, values)
+        else:
+            task_id = self._insert("daily_tasks", {**_TASK_DEFAULTS, "created_at": _now(),
+                                                   **values, "day_id": day_id})
+        return 201, self._one("SELECT * FROM daily_tasks WHERE id = ?", task_id)
+
+    def _insert_pomodoro(self, data: Dict) -> Reply:
+        missing = [k for k in ("day_id", "start_time", "duration_sec") if k not in data]
+        if missing:
+            return 400, {"error": f"missing fields: {', '.join(missing)}"}
+        if not self._day_exists(data["day_id"]):
+            return 400, {"error": "unknown day_id"}
+        values = {k: data[k] for k in _POMO_COLUMNS if k in data}
+        pomo_id = self._insert("pomodoros", {**_POMO_DEFAULTS, **values})
+        return 201, self._one("SELECT * FROM pomodoros WHERE id = ?", pomo_id)
+
+    # ----- route handlers -----
+
+    def get_statistics(self, **_: Any) -> Reply:
+        total, completed, seconds = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(aborted = 0), 0), "
+            "COALESCE(SUM(CASE WHEN aborted = 0 THEN duration_sec END), 0) FROM pomodoros"
+        ).fetchone()
+        tasks_completed = self.conn.execute(
+            "SELECT COUNT(*) FROM daily_tasks WHERE completed").fetchone()[0]
+        minutes = seconds // 60
+        return 200, {
+            "total_sessions": total,
+            "completed_sessions": completed,
+            "total_minutes": minutes,
+            "tasks_completed": tasks_completed,
+            "average_focus_time": minutes / completed if completed else 0.0,
+        }
+
+    def get_tasks(self, **_: Any) -> Reply:
+        return 200, self._all("SELECT * FROM tasks ORDER BY created_at DESC, id DESC")
+
+    def create_task(self, body: Dict, **_: Any) -> Reply:
+        data = body or {}
+        cursor = self.conn.execute(
+            "INSERT INTO tasks (name, description, created_at) VALUES (?, ?, ?)",
+            (data.get("name", ""), data.get("description", ""), _now()))
+        return 201, self._one("SELECT * FROM tasks WHERE id = ?", cursor.lastrowid)
+
+    def update_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        values = _task_put_fields(body)
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        updated = self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?",
+                                    (*values.values(), int(task_id))).rowcount
+        if not updated:
+            return 404, {"error": "Task not found"}
+        return 200, self._one("SELECT * FROM tasks WHERE id = ?", int(task_id))
+
+    def delete_task(self, task_id: str, **_: Any) -> Reply:
+        if not self.conn.execute("DELETE FROM tasks WHERE id = ?", (int(task_id),)).rowcount:
+            return 404, {"error": "Task not found"}
+        return 204, None
+
+    def update_day_reflection(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        if not self._day_exists(int(day_id)):
+            return 404, {"error": "Day not found"}
+        values = {k: body[k] for k in ("day_rating", "main_distraction", "reflection_notes")
+                  if k in (body or {})}
+        self._update("days", int(day_id), values)
+        return 200, self._one("SELECT * FROM days WHERE id = ?", int(day_id))
+
+    def patch_day(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        if not self._day_exists(int(day_id)):
+            return 404, {"error": "Day not found"}
+        return self._merge("days", int(day_id), body, _DAY_PATCH_FIELDS)
+
+    def get_daily_tasks(self, day_id: str, **_: Any) -> Reply:
+        return 200, self._all("SELECT * FROM daily_tasks WHERE day_id = ? ORDER BY id",
+                              int(day_id))
+
+    def create_daily_task(self, day_id: str, body: Dict, **_: Any) -> Reply:
+        if not self._day_exists(int(day_id)):
+            return 400, {"error": "unknown day_id"}
+        return self._insert_task(int(day_id), body or {})
+
+    def update_daily_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        if self._one("SELECT id FROM daily_tasks WHERE id = ?", int(task_id)) is None:
+            return 404, {"error": "Task not found"}
+        values = {k: v for k, v in (body or {}).items() if k in _TASK_COLUMNS}
+        self._update("daily_tasks", int(task_id), values)
+        return 200, self._one("SELECT * FROM daily_tasks WHERE id = ?", int(task_id))
+
+    def patch_daily_task(self, task_id: str, body: Dict, **_: Any) -> Reply:
+        if self._one("SELECT id FROM daily_tasks WHERE id = ?", int(task_id)) is None:
+            return 404, {"error": "Task not found"}
+        return self._merge("daily_tasks", int(task_id), body, _TASK_PATCH_FIELDS)
+
+    def delete_daily_task(self, task_id: str, **_: Any) -> Reply:
+        task = self._one("SELECT t.id, t.task_name, d.date FROM daily_tasks t "
+                         "JOIN days d ON d.id = t.day_id WHERE t.id = ?", int(task_id))
+        if task is None:
+            return 404, {"error": "Task not found"}
+        self.conn.execute("DELETE FROM daily_tasks WHERE id = ?", (task["id"],))
+        self.conn.execute("INSERT INTO tombstones (rev, kind, id, day_date, natural_key) "
+                          "VALUES (?, 'daily_task', ?, ?, ?)",
+                          (self._next_rev(), task["id"], task["date"], task["task_name"]))
+        return 204, None
+
+    def get_pomodoros(self, query: Dict[str, str], **_: Any) -> Reply:
+        where, args = [], []
+        if "day_id" in query:
+            where.append("day_id = ?")
+            args.append(query["day_id"])
+        if "start_date" in query and "end_date" in query:
+            where.append("substr(start_time, 1, 10) BETWEEN ? AND ?")
+            args += [query["start_date"], query["end_date"]]
+        return self._keyset_page("pomodoros", where, args, query)
+
+    def get_sessions(self, query: Dict[str, str], **_: Any) -> Reply:
+        where, args = [], []
+        if query.get("task_id"):
+            where.append("task_id = ?")
+            args.append(query["task_id"])
+        return self._keyset_page("sessions", where, args, query)
+
+    def create_session(self, body: Dict, **_: Any) -> Reply:
+        if not body or "task_id" not in body or "duration" not in body:
+            return 400, {"error": "task_id and duration are required"}
+        values = {"start_time": _now(), "end_time": None, "completed": False}
+        values.update({k: body[k] for k in ("task_id", "start_time", "end_time",
+                                            "duration", "completed") if k in body})
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        cursor = self.conn.execute(f"INSERT INTO sessions ({names}) VALUES ({marks})",
+                                   tuple(values.values()))
+        return 201, self._one("SELECT * FROM sessions WHERE id = ?", cursor.lastrowid)
+
+    def get_changes(self, query: Dict[str, str], **_: Any) -> Reply:
+        try:
+            since = int(query.get("updated_since", 0))
+            limit = max(1, min(int(query.get("limit", 500)), 5000))
+        except ValueError:
+            return 400, {"error": "invalid updated_since or limit"}
+        if since > self.rev:
+            since = 0  # Cursor from a reset server: start over
+        # One extra row tells whether another page follows
+        changes = sorted(
+            [("days", r) for r in self._all(
+                "SELECT * FROM days WHERE rev > ? ORDER BY rev LIMIT ?", since, limit + 1)]
+            + [("daily_tasks", r) for r in self._all(
+                "SELECT t.*, d.date AS day_date FROM daily_tasks t JOIN days d "
+                "ON d.id = t.day_id WHERE t.rev > ? ORDER BY t.rev LIMIT ?", since, limit + 1)]
+            + [("pomodoros", r) for r in self._all(
+                "SELECT p.*, d.date AS day_date FROM pomodoros p JOIN days d "
+                "ON d.id = p.day_id WHERE p.rev > ? ORDER BY p.rev LIMIT ?", since, limit + 1)]
+            + [("deleted", r) for r in self._all(
+                "SELECT * FROM tombstones WHERE rev > ? ORDER BY rev LIMIT ?", since, limit + 1)],
+            key=lambda change: change[1]["rev"],
+        )
+        page = changes[:limit]
+        feed: Dict[str, Any] = {"days": [], "daily_tasks": [], "pomodoros": [], "deleted": []}
+        for kind, row in page:
+            feed[kind].append(row)
+        feed["has_more"] = len(changes) > limit
+        feed["watermark"] = str(page[-1][1]["rev"] if feed["has_more"] else self.rev)
+        return 200, feed
+
+    def _keyset_page(self, table: str, where: List[str], args: List[Any],
+                     query: Dict[str, str]) -> Reply:
+        # Same ordering and cursor format as fake_server._page
+        try:
+            limit = max(1, min(int(query["limit"]), 5000)) if "limit" in query else 0
+            if query.get("cursor"):
+                where = where + ["(start_time, id) < (?, ?)"]
+                args = args + list(_decode_cursor(query["cursor"]))
+        except ValueError:
+            return 400, {"error": "invalid limit or cursor"}
+        sql = f"SELECT * FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY start_time DESC, id DESC"
+        if limit:
+            sql += f" LIMIT {limit}"
+        rows = self._all(sql, *args)
+        return 200, rows, _next_cursor(rows, limit)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the Hardmode API from SQLite")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=":memory:", help="database file")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    faults = Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    server = FakeServer(SQLiteBackend(args.db), args.host, args.port, faults=faults)
+    print(f"Serving the Hardmode API on {server.url} (Ctrl+C to stop)")
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
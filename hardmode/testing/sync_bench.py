@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: MIT
+"""Sync benchmark under degraded network profiles.
+
+For every ``NetProfile`` in the scenario set, one simulated device (see
+``loadgen.Device``) replays a day against a fresh SQLite stand-in served
+behind a ``FaultProxy``: startup pull, day and task upserts, pomodoro
+pushes with task updates, reflection and a final pull. The report gives
+the end-to-end time and how many retries were spent, including the
+*wasted* ones, made for requests that failed anyway::
+
+    python -m hardmode.testing.sync_bench
+    python -m hardmode.testing.sync_bench --profile flaky --profile slow_3g
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from hardmode.net.breaker import CircuitBreaker
+from hardmode.net.metrics import RequestEvent, RequestMetrics
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeServer
+from hardmode.testing.loadgen import Device, LoadProfile, MethodTimer
+from hardmode.testing.netem import PROFILES, FaultProxy, NetProfile
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+DEFAULT_WORKLOAD = LoadProfile(days=1, tasks_per_day=4, pomodoros_per_day=8, pulls_per_day=2)
+
+
+def run_scenario(name: str, profile: NetProfile, workload: LoadProfile = DEFAULT_WORKLOAD,
+                 timeout: float = 3.0, seed: int = 0, **client_kwargs: Any) -> Dict[str, Any]:
+    """
+    Replay ``workload`` through a proxy applying ``profile``
+
+    Args:
+        name: Scenario name used in the report
+        profile: Network impairments
+        workload: Work replayed by the device
+        timeout: Client timeout; keep it below the profile's stall time
+            to measure how stalls are recovered from
+        seed: Seed for the workload and the impairments
+        client_kwargs: Extra ``APIClient`` arguments (retry policy...)
+
+    Returns:
+        Report dict for the scenario
+    """
+    client_kwargs.setdefault("retry", RetryPolicy())
+    # The default 30s cool-down would turn every burst into a fail-fast tail
+    client_kwargs.setdefault("breaker", CircuitBreaker(reset_timeout=1.0))
+    metrics, timer = RequestMetrics(), MethodTimer()
+    wasted = [0]
+
+    def count_wasted(event: RequestEvent) -> None:
+        if event.error is not None or (event.status or 0) >= 500:
+            wasted[0] += event.retries
+
+    metrics.add_hook(count_wasted)
+    backend = SQLiteBackend()
+    with FakeServer(backend) as server, \
+            FaultProxy(server.url, profile, seed=seed) as proxy:
+        device = Device(0, proxy.url, timer, metrics, workload, seed,
+                        timeout=timeout, **client_kwargs)
+        started = time.perf_counter()
+        try:
+            device.run(date(2024, 3, 1))
+        finally:
+            wall = time.perf_counter() - started
+            device.close()
+        proxy_stats = dict(proxy.stats)
+    backend.close()
+
+    total = metrics.snapshot()["total"]
+    return {
+        "profile": name,
+        "wall_seconds": wall,
+        "requests": total["count"],
+        "errors": total["errors"],
+        "short_circuited": total["short_circuited"],
+        "retries": total["retries"],
+        "wasted_retries": wasted[0],
+        "timeouts": total["timeouts"],
+        "failed_steps": device.failures,
+        "proxy": proxy_stats,
+    }
+
+
+def run_bench(names: Optional[Iterable[str]] = None, **kwargs: Any) -> List[Dict[str, Any]]:
+    """Run ``run_scenario`` for each named profile (default: all of ``PROFILES``)."""
+    return [run_scenario(name, PROFILES[name], **kwargs) for name in (names or PROFILES)]
+
+
+def format_report(reports: List[Dict[str, Any]]) -> str:
+    lines = [f"{'profile':<14}{'time s':>8}{'reqs':>6}{'err':>5}{'retry':>7}{'wasted':>8}"
+             f"{'t/o':>5}{'failed':>8}{'resets':>8}{'5xx':>5}{'stalls':>8}"]
+    for r in reports:
+        proxy = r["proxy"]
+        lines.append(f"{r['profile']:<14}{r['wall_seconds']:>8.2f}{r['requests']:>6}"
+                     f"{r['errors']:>5}{r['retries']:>7}{r['wasted_retries']:>8}"
+                     f"{r['timeouts']:>5}{r['failed_steps']:>8}{proxy['resets']:>8}"
+                     f"{proxy['errors']:>5}{proxy['stalls']:>8}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sync under network profiles")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="profile to run (repeatable; default: all)")
+    parser.add_argument("--tasks", type=int, default=DEFAULT_WORKLOAD.tasks_per_day)
+    parser.add_argument("--pomodoros", type=int, default=DEFAULT_WORKLOAD.pomodoros_per_day)
+    parser.add_argument("--timeout", type=float, default=3.0, help="client timeout, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workload = LoadProfile(days=1, tasks_per_day=args.tasks, pomodoros_per_day=args.pomodoros,
+                           pulls_per_day=DEFAULT_WORKLOAD.pulls_per_day)
+    print(format_report(run_bench(args.profile, workload=workload, timeout=args.timeout,
+                                  seed=args.seed)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
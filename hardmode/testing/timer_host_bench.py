@@ -0,0 +1,152 @@
+# SPDX-License-Identifier: MIT
+"""CPU cost of hosting many running timers.
+
+Starts ``timers`` timers at random moments of the first pomodoro and
+runs them for ``minutes`` of virtual time, waking once per second as a
+server would. Each simulated user saves the review ``review_after``
+seconds after a pomodoro ends, so every timer keeps cycling through
+pomodoros and breaks. The CPU time spent (driver included) is reported
+per 10k active timers per second of hosting::
+
+    python -m hardmode.testing.timer_host_bench --timers 100000 --minutes 60
+
+``--baseline N`` also measures N plain ``TimerFSM`` instances polled
+every second, the way one app drives its own timer, for comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from hardmode.core.clock import VirtualClock
+from hardmode.core.timer_fsm import NullHooks, Scheme, State, TimerFSM
+from hardmode.core.timer_host import TimerHost
+
+
+class _Users:
+    """Batched hooks that queue a review for every pomodoro that ended."""
+
+    def __init__(self, clock: VirtualClock, review_after: int) -> None:
+        self.clock = clock
+        self.review_after = review_after
+        self.reviews: Dict[int, List[int]] = defaultdict(list)
+        self.batches = 0
+        self.transitions = 0
+
+    def on_states(self, changes: List[Tuple[int, State]]) -> None:
+        self.batches += 1
+        self.transitions += len(changes)
+        due = self.reviews[int(self.clock.monotonic()) + self.review_after]
+        due.extend(tid for tid, state in changes if state is State.REVIEW)
+
+    def on_task_updates(self, changes: List[Tuple[int, str]]) -> None:
+        pass
+
+
+def _start_seconds(rng: random.Random, count: int, scheme: Scheme) -> Dict[int, List[int]]:
+    starts: Dict[int, List[int]] = defaultdict(list)
+    for index in range(count):
+        starts[rng.randrange(scheme.work_min * 60)].append(index)
+    return starts
+
+
+def run_bench(timers: int = 100_000, minutes: int = 60, review_after: int = 30,
+              seed: int = 0, scheme: Optional[Scheme] = None) -> Dict[str, Any]:
+    """Host ``timers`` cycling timers for ``minutes`` virtual minutes."""
+    scheme = scheme or Scheme()
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    users = _Users(clock, review_after)
+    host = TimerHost(scheme=scheme, hooks=users, clock=clock)
+    ids = [host.add() for _ in range(timers)]
+    for tid in ids:
+        host.start_day(tid, target=1_000)
+    host.flush()
+    starts = _start_seconds(rng, timers, scheme)
+    seconds = minutes * 60
+    users.batches = users.transitions = 0
+    cpu, wall = time.process_time(), time.perf_counter()
+    for second in range(1, seconds + 1):
+        clock.set(second)
+        for index in starts.pop(second, ()):
+            host.start_pomo(ids[index], "Focus")
+        for tid in users.reviews.pop(second, ()):
+            host.save_review(tid, 3, "", "")
+        host.advance()
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    return {
+        "timers": timers,
+        "virtual_seconds": seconds,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        "cpu_us_per_10k_per_second": _per_10k(cpu, timers, seconds),
+        "transitions": users.transitions,
+        "batches": users.batches,
+        "completed": sum(host.timer(tid).done_today for tid in ids),
+    }
+
+
+def run_baseline(timers: int = 10_000, minutes: int = 5, review_after: int = 30,
+                 seed: int = 0, scheme: Optional[Scheme] = None) -> Dict[str, Any]:
+    """The same load on plain ``TimerFSM`` instances polled every second."""
+    scheme = scheme or Scheme()
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    fsms = [TimerFSM(scheme=scheme, hooks=NullHooks(), clock=clock) for _ in range(timers)]
+    for fsm in fsms:
+        fsm.start_day(1_000)
+    starts = _start_seconds(rng, timers, scheme)
+    reviews: Dict[int, List[int]] = defaultdict(list)
+    queued: Set[int] = set()
+    seconds = minutes * 60
+    cpu = time.process_time()
+    for second in range(1, seconds + 1):
+        clock.set(second)
+        for index in starts.pop(second, ()):
+            fsms[index].start_pomo("Focus")
+        for index in reviews.pop(second, ()):
+            fsms[index].save_review(3, "", "")
+            queued.discard(index)
+        for index, fsm in enumerate(fsms):
+            if fsm.poll() is None and fsm.state is State.REVIEW and index not in queued:
+                queued.add(index)
+                reviews[second + review_after].append(index)
+    cpu = time.process_time() - cpu
+    return {
+        "timers": timers,
+        "virtual_seconds": seconds,
+        "cpu_seconds": cpu,
+        "cpu_us_per_10k_per_second": _per_10k(cpu, timers, seconds),
+    }
+
+
+def _per_10k(cpu: float, timers: int, seconds: int) -> float:
+    return cpu / seconds / (timers / 10_000) * 1e6 if timers and seconds else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hosting many running timers")
+    parser.add_argument("--timers", type=int, default=100_000)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--review-after", type=int, default=30)
+    parser.add_argument("--baseline", type=int, default=0,
+                        help="Also poll this many TimerFSM instances every second")
+    args = parser.parse_args(argv)
+    report = run_bench(args.timers, args.minutes, args.review_after)
+    print(f"wheel:    {report['timers']} timers for {report['virtual_seconds']}s: "
+          f"{report['cpu_seconds']:.2f}s CPU, {report['transitions']} transitions in "
+          f"{report['batches']} batches = {report['cpu_us_per_10k_per_second']:.0f} us CPU "
+          f"per 10k timers per second")
+    if args.baseline:
+        base = run_baseline(args.baseline, min(args.minutes, 5), args.review_after)
+        print(f"polling:  {base['timers']} timers for {base['virtual_seconds']}s: "
+              f"{base['cpu_seconds']:.2f}s CPU = {base['cpu_us_per_10k_per_second']:.0f} us CPU "
+              f"per 10k timers per second")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
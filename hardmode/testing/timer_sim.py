@@ -0,0 +1,264 @@
+# SPDX-License-Identifier: MIT
+"""Headless, virtual-time simulation of ``TimerFSM`` days.
+
+``TimerSimulator`` runs a real ``TimerFSM`` on a ``VirtualClock`` and
+jumps straight from one event to the next: a countdown deadline, a
+scripted action or an automatic review. A whole day takes a few dozen
+FSM calls instead of one ``tick()`` per second, so thousands of days can
+be replayed for regression and performance tests::
+
+    sim = TimerSimulator(target=8, auto_review=30)
+    sim.script([(0, "start_pomo", "Spec"), (600, "change_task", "Review")])
+    sim.run()
+    sim.summary()  # {'completed': 8, 'aborted': 0, ...}
+
+Actions are ``start_pomo(task)``, ``change_task(task)``,
+``review(focus, reason, note)`` and ``abort()``, at virtual seconds since
+the start of the day. ``on_tick`` only fires at those event boundaries,
+not for every simulated second.
+
+Run ``python -m hardmode.testing.timer_sim --days 1000`` for a
+throughput benchmark over randomised days.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hardmode.core.clock import VirtualClock
+from hardmode.core.timer_fsm import COUNTDOWN_STATES, NullHooks, Scheme, State, TimerFSM, TimerHooks
+
+ACTIONS = frozenset({"start_pomo", "change_task", "review", "abort"})
+DAY_START = datetime(2024, 3, 1, 9, 0)
+
+
+class TimerSimulator:
+    """A ``TimerFSM`` day driven by scripted actions on virtual time."""
+
+    def __init__(self, scheme: Optional[Scheme] = None, target: int = 16,
+                 hooks: Optional[TimerHooks] = None, start: datetime = DAY_START,
+                 auto_review: Optional[float] = None, strict: bool = True) -> None:
+        """
+        Args:
+            scheme: Work and break durations
+            target: Pomodoros planned for the day
+            hooks: Also receive the FSM callbacks
+            start: Wall-clock time of virtual second 0
+            auto_review: Save a review (focus 3) this many seconds after
+                each pomodoro ends; None leaves reviews to the script
+            strict: Raise when an action is invalid in the current state;
+                False counts it in ``rejected`` and carries on
+        """
+        self.clock = VirtualClock(start=0.0, wall=start.timestamp())
+        self.hooks = hooks or NullHooks()
+        self.auto_review = auto_review
+        self.strict = strict
+        self.fsm = TimerFSM(scheme=scheme or Scheme(), hooks=self, clock=self.clock)
+        self.transitions: List[Tuple[float, State]] = []
+        self.ticks = 0
+        self.aborted = 0
+        self.context_switches = 0
+        self.rejected = 0
+        self.focus_seconds = 0.0
+        self._actions: List[Tuple[float, int, str, Tuple[Any, ...]]] = []
+        self._seq = itertools.count()
+        self._review_due: Optional[float] = None
+        self._pomo_started: Optional[float] = None
+        self.fsm.start_day(target)
+
+    @property
+    def now(self) -> float:
+        """Virtual seconds since the start of the day."""
+        return self.clock.monotonic()
+
+    # ----- TimerHooks -----
+
+    def on_state(self, state: State) -> None:
+        now = self.now
+        self.transitions.append((now, state))
+        if state is State.POMO:
+            self._pomo_started = now
+        elif state is State.REVIEW and self._pomo_started is not None:
+            self.focus_seconds += now - self._pomo_started
+        self._review_due = (now + self.auto_review
+                            if state is State.REVIEW and self.auto_review is not None else None)
+        self.hooks.on_state(state)
+
+    def on_tick(self, seconds_left: int) -> None:
+        self.ticks += 1
+        self.hooks.on_tick(seconds_left)
+
+    def on_task_update(self, task: str) -> None:
+        self.hooks.on_task_update(task)
+
+    # ----- scripting -----
+
+    def at(self, when: float, action: str, *args: Any) -> None:
+        """Schedule ``action(*args)`` at virtual second ``when``."""
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action {action!r}")
+        if when < self.now:
+            raise ValueError("cannot schedule an action in the past")
+        heapq.heappush(self._actions, (when, next(self._seq), action, args))
+
+    def after(self, delay: float, action: str, *args: Any) -> None:
+        """Schedule ``action(*args)`` ``delay`` seconds from now."""
+        self.at(self.now + delay, action, *args)
+
+    def script(self, actions: Iterable[Tuple[Any, ...]]) -> None:
+        """Schedule ``(when, action, *args)`` tuples."""
+        for when, action, *args in actions:
+            self.at(when, action, *args)
+
+    # ----- running -----
+
+    def advance(self, seconds: float) -> None:
+        """Move virtual time forward, handling every event on the way."""
+        end = self.now + seconds
+        while True:
+            when = self._next_event()
+            if when is None or when > end:
+                break
+            self.clock.set(max(when, self.now))
+            self._step()
+        self.clock.set(end)
+        self.fsm.poll()
+
+    def run(self, limit: float = 24 * 3600) -> None:
+        """Run until the target is met or nothing is left to happen.
+
+        Args:
+            limit: Virtual seconds after which to stop regardless
+        """
+        end = self.now + limit
+        while self.fsm.done_today < self.fsm.target:
+            when = self._next_event()
+            if when is None or when > end:
+                break
+            self.clock.set(max(when, self.now))
+            self._step()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "completed": self.fsm.done_today,
+            "aborted": self.aborted,
+            "context_switches": self.context_switches,
+            "rejected": self.rejected,
+            "focus_seconds": self.focus_seconds,
+            "transitions": len(self.transitions),
+            "ticks": self.ticks,
+            "virtual_seconds": self.now,
+        }
+
+    def _next_event(self) -> Optional[float]:
+        candidates = []
+        if self._actions:
+            candidates.append(self._actions[0][0])
+        if self.fsm.deadline is not None and self.fsm.state in COUNTDOWN_STATES:
+            candidates.append(self.fsm.deadline)
+        if self._review_due is not None:
+            candidates.append(self._review_due)
+        return min(candidates) if candidates else None
+
+    def _step(self) -> None:
+        # Deadlines first: an action at the very second a pomodoro ends
+        # sees it in REVIEW, as it would in the app
+        self.fsm.poll()
+        now = self.now
+        while self._actions and self._actions[0][0] <= now:
+            _, _, action, args = heapq.heappop(self._actions)
+            self._apply(action, args)
+        if self._review_due is not None and self._review_due <= now:
+            self._review_due = None
+            self._apply("review", (3, "", ""))
+
+    def _apply(self, action: str, args: Tuple[Any, ...]) -> None:
+        fsm = self.fsm
+        try:
+            if action == "start_pomo":
+                fsm.start_pomo(*args)
+            elif action == "change_task":
+                switched = fsm.context_switch
+                fsm.change_task(*args)
+                self.context_switches += fsm.context_switch and not switched
+            elif action == "review":
+                fsm.save_review(*args)
+            else:
+                fsm.abort()
+                self.aborted += 1
+        except (RuntimeError, ValueError):
+            if self.strict:
+                raise
+            self.rejected += 1
+
+
+class _RandomDay(NullHooks):
+    """Drives a simulated day like a (somewhat distractible) user would."""
+
+    def __init__(self, rng: random.Random, abort_rate: float, switch_rate: float) -> None:
+        self.rng = rng
+        self.abort_rate = abort_rate
+        self.switch_rate = switch_rate
+        self.sim: Optional[TimerSimulator] = None
+
+    def on_state(self, state: State) -> None:
+        sim, rng = self.sim, self.rng
+        if state is not State.POMO or sim is None:
+            return
+        work = sim.fsm.scheme.work_min * 60
+        if rng.random() < self.abort_rate:
+            cut = rng.uniform(60, work - 60)
+            sim.after(cut, "abort")
+            sim.after(cut + rng.uniform(60, 900), "start_pomo", f"Task {rng.randrange(6)}")
+        elif rng.random() < self.switch_rate:
+            sim.after(rng.uniform(60, work - 60), "change_task", f"Task {rng.randrange(6)}")
+
+
+def simulate_day(seed: int = 0, target: int = 16, scheme: Optional[Scheme] = None,
+                 abort_rate: float = 0.1, switch_rate: float = 0.2) -> TimerSimulator:
+    """Simulate one randomised day (aborts, task changes) to its target."""
+    rng = random.Random(seed)
+    driver = _RandomDay(rng, abort_rate, switch_rate)
+    sim = TimerSimulator(scheme=scheme, target=target, hooks=driver,
+                         auto_review=rng.uniform(10, 120))
+    driver.sim = sim
+    sim.at(rng.uniform(0, 1800), "start_pomo", "Task 0")
+    sim.run()
+    return sim
+
+
+def run_bench(days: int = 1000, **kwargs: Any) -> Dict[str, Any]:
+    """Simulate ``days`` randomised days; returns throughput and totals."""
+    started = time.perf_counter()
+    sims = [simulate_day(seed, **kwargs) for seed in range(days)]
+    elapsed = time.perf_counter() - started
+    return {
+        "days": days,
+        "seconds": elapsed,
+        "us_per_day": elapsed / days * 1e6 if days else 0.0,
+        "pomodoros": sum(s.fsm.done_today for s in sims),
+        "aborted": sum(s.aborted for s in sims),
+        "virtual_hours": sum(s.now for s in sims) / 3600,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark simulated TimerFSM days")
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--target", type=int, default=16)
+    parser.add_argument("--abort-rate", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    report = run_bench(args.days, target=args.target, abort_rate=args.abort_rate)
+    print(f"{report['days']} days ({report['virtual_hours']:.0f} virtual hours, "
+          f"{report['pomodoros']} pomodoros, {report['aborted']} aborted) in "
+          f"{report['seconds']:.3f}s = {report['us_per_day']:.0f} us/day")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MIT
+"""Per-request latency over TCP versus a Unix domain socket.
+
+Serves one backend on both a localhost port and a socket, then times the
+same sequential requests through an ``APIClient`` on each::
+
+    python -m hardmode.testing.transport_bench --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from hardmode.api_client import APIClient
+from hardmode.net.metrics import LatencyHistogram
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+
+def _time_requests(base_url: str, requests: int) -> Dict[str, Any]:
+    histogram = LatencyHistogram()
+    with APIClient(base_url=base_url) as client:
+        client.check_health()  # Open the pooled connection
+        started = time.perf_counter()
+        for n in range(requests):
+            begin = time.perf_counter()
+            ok = client.get_statistics() if n % 2 else client.check_health()
+            histogram.record(time.perf_counter() - begin)
+            if not ok:
+                raise RuntimeError(f"request failed against {base_url}")
+        wall = time.perf_counter() - started
+    return {"requests": requests, "per_second": requests / wall if wall else 0.0,
+            **histogram.summary()}
+
+
+def compare(requests: int = 1000) -> Dict[str, Dict[str, Any]]:
+    """Time ``requests`` calls over each transport against one backend."""
+    backend = FakeBackend()
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeServer(backend) as tcp, \
+                FakeServer(backend, unix_socket=os.path.join(tmp, "api.sock")) as sock:
+            return {"tcp": _time_requests(tcp.url, requests),
+                    "unix": _time_requests(sock.url, requests)}
+
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'transport':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+    for name, row in report.items():
+        lines.append(f"{name:<10}{row['per_second']:>9.0f}{row['p50']:>9.3f}"
+                     f"{row['p95']:>9.3f}{row['p99']:>9.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare TCP and Unix socket latency")
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args(argv)
+    print(format_report(compare(args.requests)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
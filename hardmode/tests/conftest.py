@@ -0,0 +1,5 @@
+# SPDX-License-Identifier: MIT
+"""Shared fixtures: the in-process SQLite stand-in for the API."""
+
+from hardmode.testing.fixtures import (  # noqa: F401
+    api_backend, api_client, api_server, pytest_configure)
@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the pooled, retrying API client transport."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.net.retry import RetryPolicy
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _reply(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.peers.add(self.client_address)
+        server.hits += 1
+        if server.failures > 0:
+            server.failures -= 1
+            self._reply(503, {"error": "busy"})
+            return
+        self._reply(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        server.hits += 1
+        if server.failures > 0:
+            server.failures -= 1
+            self._reply(503, {"error": "busy"})
+            return
+        self._reply(201, {"id": 1})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.peers = set()
+    httpd.hits = 0
+    httpd.failures = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(httpd, **kwargs) -> APIClient:
+    host, port = httpd.server_address
+    policy = RetryPolicy(max_retries=2, backoff_factor=0.0)
+    return APIClient(base_url=f"http://{host}:{port}", retry=policy, **kwargs)
+
+
+def test_requests_reuse_a_keep_alive_connection(server) -> None:
+    with _client(server) as client:
+        for _ in range(5):
+            assert client.check_health()
+    assert server.hits == 5
+    assert len(server.peers) == 1
+
+
+def test_idempotent_request_is_retried_on_503(server) -> None:
+    server.failures = 2
+    with _client(server) as client:
+        assert client.get_statistics() == {"status": "ok"}
+        assert client._online is True
+    assert server.hits == 3
+
+
+def test_retries_give_up_after_policy_limit(server) -> None:
+    server.failures = 5
+    with _client(server) as client:
+        assert client.get_statistics() is None
+        assert client._online is False
+    assert server.hits == 3
+
+
+def test_post_is_not_retried(server) -> None:
+    server.failures = 1
+    with _client(server) as client:
+        assert client.create_task("Write spec") is None
+    assert server.hits == 1
+
+
+def test_connection_error_marks_client_offline() -> None:
+    policy = RetryPolicy(max_retries=1, backoff_factor=0.0)
+    client = APIClient(base_url="http://127.0.0.1:9", retry=policy, timeout=0.5)
+    assert client.get_day("2024-01-01") is None
+    assert client._online is False
+    client.close()
+
+
+def test_backoff_grows_exponentially_with_bounded_jitter() -> None:
+    policy = RetryPolicy(backoff_factor=0.5, backoff_max=3.0, jitter=0.5, rand=lambda: 1.0)
+    assert policy.delay(0) == pytest.approx(0.75)
+    assert policy.delay(1) == pytest.approx(1.5)
+    assert policy.delay(5) == pytest.approx(4.5)
+    assert policy.delay(0, retry_after=20.0) == 3.0
+    assert not policy.allows("POST")
+    assert policy.allows("put")
@@ -0,0 +1,270 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the asyncio API client and its bounded fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.aio_http import AsyncHTTPTransport, TransportError
+from hardmode.net.outbox import Outbox
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeServer, Faults
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _reply(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _track(self) -> None:
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            server.paths.append(self.path)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+    def do_GET(self) -> None:
+        self._track()
+        self._reply(200, {"path": self.path})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self._track()
+        if self.path == "/api/days":
+            self._reply(201, {"id": 7, **payload})
+        else:
+            self._reply(201, {"id": len(self.server.paths), **payload})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.lock = threading.Lock()
+    httpd.in_flight = 0
+    httpd.peak = 0
+    httpd.delay = 0.05
+    httpd.paths = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(httpd, **kwargs) -> AsyncAPIClient:
+    host, port = httpd.server_address
+    policy = RetryPolicy(max_retries=1, backoff_factor=0.0)
+    return AsyncAPIClient(base_url=f"http://{host}:{port}", retry=policy, **kwargs)
+
+
+def test_endpoint_methods_are_awaitable(server) -> None:
+    async def scenario():
+        async with _client(server) as client:
+            day = await client.get_day("2024-01-01")
+            online = await client.check_health()
+            return day, online
+
+    day, online = asyncio.run(scenario())
+    assert day == {"path": "/api/days/2024-01-01"}
+    assert online is True
+
+
+def test_gather_bounds_concurrency(server) -> None:
+    async def scenario():
+        async with _client(server, pool_maxsize=8) as client:
+            return await client.gather(
+                *(client.get_daily_tasks(i) for i in range(12)), limit=3
+            )
+
+    results = asyncio.run(scenario())
+    assert [r["path"] for r in results] == [f"/api/days/{i}/tasks" for i in range(12)]
+    assert 1 < server.peak <= 3
+
+
+def test_push_day_fans_out_tasks_and_pomodoros(server) -> None:
+    tasks = [{"task_name": f"Task {i}", "planned_pomodoros": 2} for i in range(4)]
+    pomos = [
+        {"start_time": "2024-01-01T09:00:00Z", "duration_sec": 1500, "task": "Task 0"}
+        for _ in range(4)
+    ]
+
+    async def scenario():
+        async with _client(server, concurrency=8) as client:
+            return await client.push_day("2024-01-01", {"target_pomos": 8}, tasks, pomos)
+
+    started = time.perf_counter()
+    result = asyncio.run(scenario())
+    elapsed = time.perf_counter() - started
+    assert result == {
+        "success": True,
+        "day_synced": True,
+        "tasks_synced": 4,
+        "pomos_synced": 4,
+    }
+    assert server.paths[0] == "/api/days"
+    assert server.paths.count("/api/days/7/tasks") == 4
+    assert server.peak > 1
+    # Nine sequential 50 ms round trips would take at least 450 ms
+    assert elapsed < 0.4
+
+
+class _CountingTransport(AsyncHTTPTransport):
+    """Counts requests handed to the transport, before they wait for a connection."""
+
+    in_flight = peak = 0
+
+    async def request(self, *args, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().request(*args, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_nested_fan_out_is_bounded_by_the_pool(server) -> None:
+    transport = _CountingTransport(limit_per_host=2)
+    days = {f"2024-01-0{d}": {"tasks": [{"task_name": f"Task {i}"} for i in range(4)]}
+            for d in range(1, 4)}
+
+    async def scenario():
+        async with _client(server, pool_maxsize=2, concurrency=8, transport=transport) as client:
+            return await client.push_days(days)
+
+    result = asyncio.run(scenario())
+    assert result["success"] and result["tasks_synced"] == 12
+    assert transport.peak == 2
+
+
+def test_failed_writes_are_queued_or_raised() -> None:
+    outbox = Outbox(sqlite3.connect(":memory:"))
+
+    async def scenario(url):
+        async with AsyncAPIClient(base_url=url, retry=RetryPolicy(max_retries=0),
+                                  outbox=outbox) as client:
+            assert await client.create_pomodoro(1, "2024-01-01T09:00:00", 1500) is None
+            assert await client.update_daily_task(2, completed=True) is None
+            client.breaker.reset()  # Opened by the failures above
+            with pytest.raises(requests.HTTPError) as raised:
+                await client._request("PUT", "/api/daily-tasks/2", json={}, queue=False,
+                                      strict=True)
+            assert raised.value.response.status_code == 503
+
+    with FakeServer(faults=Faults(error_rate=1.0, error_status=503)) as server:
+        asyncio.run(scenario(server.url))
+    assert [(e.method, e.endpoint) for e in outbox.pending()] == [
+        ("POST", "/api/pomodoros"), ("PUT", "/api/daily-tasks/2")]
+
+
+def test_unreachable_api_marks_client_offline() -> None:
+    async def scenario():
+        client = AsyncAPIClient(
+            base_url="http://127.0.0.1:9",
+            retry=RetryPolicy(max_retries=0),
+            timeout=0.5,
+        )
+        result = await client.get_statistics()
+        await client.close()
+        return client, result
+
+    client, result = asyncio.run(scenario())
+    assert result is None
+    assert client._online is False
+
+
+async def _scripted_server(script: list, seen: list) -> asyncio.AbstractServer:
+    """Answer each request, in arrival order, as the next ``script`` entry says."""
+    ok = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}"
+    replies = {
+        "ok": ok,
+        "drop": b"",  # Read the request, then close without a byte
+        "partial": b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n{}",
+        "bad_chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n",
+    }
+
+    async def handle(reader, writer):
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break  # The client closed the connection
+            length = [int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:")]
+            await reader.readexactly(length[0] if length else 0)
+            seen.append(head.split(b" ", 2)[:2])
+            reply = replies[script.pop(0)]
+            writer.write(reply)
+            await writer.drain()
+            if reply != ok:
+                break
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _transport_run(script: list, *requests) -> tuple:
+    seen: list = []
+
+    async def scenario():
+        server = await _scripted_server(script, seen)
+        port = server.sockets[0].getsockname()[1]
+        transport = AsyncHTTPTransport()
+        outcomes = []
+        try:
+            for method, headers in requests:
+                try:
+                    response = await transport.request(
+                        method, f"http://127.0.0.1:{port}/api/x", json={"n": 1},
+                        headers=headers, timeout=2)
+                    outcomes.append(response.status)
+                except TransportError as e:
+                    outcomes.append(type(e).__name__)
+        finally:
+            await transport.close()
+            server.close()
+        return outcomes
+
+    return asyncio.run(scenario()), seen
+
+
+def test_dead_reused_connection_resends_only_safe_requests() -> None:
+    # The second request finds its pooled connection closed without a reply
+    outcomes, seen = _transport_run(["ok", "drop"], ("POST", None), ("POST", None))
+    assert outcomes == [200, "_NoResponse"] and len(seen) == 2  # Not resent: may have landed
+
+    keyed = {"Idempotency-Key": "k1"}
+    outcomes, seen = _transport_run(["ok", "drop", "ok"], ("POST", None), ("POST", keyed))
+    assert outcomes == [200, 200] and len(seen) == 3
+
+    outcomes, seen = _transport_run(["ok", "drop", "ok"], ("GET", None), ("PUT", None))
+    assert outcomes == [200, 200] and len(seen) == 3
+
+
+def test_broken_responses_on_reused_connections_are_not_resent() -> None:
+    outcomes, seen = _transport_run(["ok", "partial"], ("GET", None), ("GET", None))
+    assert outcomes == [200, "TransportError"] and len(seen) == 2
+
+    outcomes, seen = _transport_run(["ok", "bad_chunk"], ("GET", None), ("GET", None))
+    assert outcomes == [200, "TransportError"] and len(seen) == 2
@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the bulk day/pomodoro sync methods."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.bulk import chunk_by_size, encoded_size, split_bundle
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+DATE = "2024-03-01"
+TASKS = [
+    {"task_name": "Write spec", "planned_pomodoros": 3, "plan_priority": 1},
+    {"task_name": "Fix bug", "planned_pomodoros": 1, "added_mid_day": True,
+     "reason_added": "Urgent | prod"},
+]
+
+
+def _pomos(count: int, note: str = "") -> list[dict]:
+    return [
+        {"start_time": f"{DATE}T09:{i:02d}:00Z", "duration_sec": 1500,
+         "task": "Write spec", "focus_score": 4, "note": note}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def server():
+    with FakeServer() as server:
+        yield server
+
+
+@pytest.fixture
+def legacy_server():
+    with FakeServer(FakeBackend(bulk=False)) as server:
+        yield server
+
+
+def test_day_bundle_is_a_single_request(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        result = client.upsert_day_bundle(DATE, {"target_pomos": 8}, TASKS, _pomos(16))
+    assert result["day"]["date"] == DATE
+    assert [r["ok"] for r in result["tasks"]] == [True, True]
+    assert len(result["pomodoros"]) == 16
+    assert all(r["ok"] for r in result["pomodoros"])
+    assert server.backend.requests == [("POST", "/api/days/bundle")]
+    assert len(server.backend.pomodoros) == 16
+
+
+def test_bundle_reports_per_item_failures(server) -> None:
+    pomos = _pomos(2)
+    del pomos[1]["start_time"]
+    with APIClient(base_url=server.url) as client:
+        result = client.upsert_day_bundle(DATE, {"target_pomos": 8}, [], pomos)
+    assert result["pomodoros"][0]["ok"] is True
+    assert result["pomodoros"][1]["ok"] is False
+    assert "start_time" in result["pomodoros"][1]["error"]
+
+
+def test_oversized_bundle_spills_pomodoros_into_bulk_chunks(server) -> None:
+    with APIClient(base_url=server.url, bulk_max_bytes=2048) as client:
+        result = client.upsert_day_bundle(DATE, {"target_pomos": 8}, TASKS,
+                                          _pomos(30, note="x" * 40))
+    paths = [path for _, path in server.backend.requests]
+    assert paths[0] == "/api/days/bundle"
+    assert paths.count("/api/pomodoros/bulk") >= 2
+    assert len(result["pomodoros"]) == 30
+    assert all(r["ok"] for r in result["pomodoros"])
+    assert len(server.backend.pomodoros) == 30
+
+
+def test_bulk_pomodoros_fall_back_to_single_calls(legacy_server) -> None:
+    with APIClient(base_url=legacy_server.url) as client:
+        day = client.create_or_update_day(DATE, target_pomos=4)
+        pomos = [{**p, "day_id": day["id"]} for p in _pomos(3)]
+        results = client.create_pomodoros_bulk(pomos)
+        assert client._bulk_supported is False
+    assert [r["ok"] for r in results] == [True, True, True]
+    paths = [path for _, path in legacy_server.backend.requests]
+    assert paths.count("/api/pomodoros/bulk") == 1
+    assert paths.count("/api/pomodoros") == 3
+
+
+def test_day_bundle_falls_back_to_single_calls(legacy_server) -> None:
+    with APIClient(base_url=legacy_server.url) as client:
+        result = client.upsert_day_bundle(DATE, {"target_pomos": 8}, TASKS, _pomos(2))
+    assert all(r["ok"] for r in result["tasks"] + result["pomodoros"])
+    assert len(legacy_server.backend.daily_tasks) == 2
+    assert len(legacy_server.backend.pomodoros) == 2
+
+
+def test_async_bundle_matches_sync_behaviour(server, legacy_server) -> None:
+    async def push(url: str) -> dict:
+        async with AsyncAPIClient(base_url=url, bulk_max_bytes=2048) as client:
+            return await client.upsert_day_bundle(DATE, {"target_pomos": 8}, TASKS,
+                                                  _pomos(20, note="y" * 40))
+
+    for target in (server, legacy_server):
+        result = asyncio.run(push(target.url))
+        assert len(result["pomodoros"]) == 20
+        assert all(r["ok"] for r in result["tasks"] + result["pomodoros"])
+        assert len(target.backend.pomodoros) == 20
+
+
+def test_chunking_respects_payload_budget() -> None:
+    items = [{"note": "z" * 50, "n": i} for i in range(40)]
+    chunks = list(chunk_by_size(items, 500))
+    assert sum(len(c) for c in chunks) == 40
+    assert all(encoded_size(c) <= 500 for c in chunks)
+    bundle, overflow = split_bundle({"date": DATE}, [], items, 500)
+    assert encoded_size(bundle) <= 500
+    assert len(bundle["pomodoros"]) + sum(len(c) for c in overflow) == 40
@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the API circuit breaker and passive health tracking."""
+
+from __future__ import annotations
+
+import socket
+import time
+
+from hardmode.api_client import APIClient
+from hardmode.net.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeServer
+
+
+def _dead_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_breaker_opens_after_consecutive_failures() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_admits_a_single_trial() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Trial still in flight
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_lost_trial_is_replaced_after_cool_down() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10.0
+    assert breaker.allow()
+    now[0] = 15.0
+    assert not breaker.allow()
+    now[0] = 20.0
+    assert breaker.allow()
+
+
+def test_client_fails_fast_while_open() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = APIClient(base_url=_dead_url(), timeout=1, breaker=breaker,
+                       retry=RetryPolicy(max_retries=0))
+    client.get_statistics()
+    client.get_statistics()
+    assert not client.is_online()
+
+    started = time.monotonic()
+    for _ in range(20):
+        assert client.get_statistics() is None
+    assert time.monotonic() - started < 0.5
+    assert breaker.stats()["rejected"] == 20
+    client.close()
+
+
+def test_client_recovers_through_half_open_trial() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+    with FakeServer() as server, APIClient(base_url=server.url, breaker=breaker) as client:
+        breaker.record_failure()
+        assert client.get_statistics() is None
+        assert server.backend.requests == []
+        now[0] = 30.0
+        assert client.get_statistics() is not None
+        assert breaker.state == CLOSED
+        assert client.is_online()
+
+
+def test_client_errors_do_not_trip_the_breaker() -> None:
+    breaker = CircuitBreaker(failure_threshold=1)
+    with FakeServer() as server, APIClient(base_url=server.url, breaker=breaker) as client:
+        assert client.get_day("2024-03-01") is None  # 404
+        assert client.update_daily_task(99, completed=True) is None
+    assert breaker.state == CLOSED
+
+
+def test_is_online_does_no_io() -> None:
+    with FakeServer() as server, APIClient(base_url=server.url) as client:
+        assert client.is_online()
+        assert server.backend.requests == []
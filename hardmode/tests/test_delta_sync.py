@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the incremental (watermark) pull from the change feed."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.net.delta import DeltaSync, normalize_timestamp
+from hardmode.net.outbox import Outbox
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeBackend, FakeServer, Faults
+
+SCHEMA = Path(__file__).resolve().parents[2] / "schema.sql"
+DATE = "2024-03-01"
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA.read_text())
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def server():
+    with FakeServer() as server:
+        yield server
+
+
+def _seed(client: APIClient) -> dict:
+    day = client.create_or_update_day(DATE, target_pomos=8)
+    client.create_daily_task(day["id"], "Write spec", planned_pomodoros=3)
+    client.create_daily_task(day["id"], "Fix bug", planned_pomodoros=1)
+    client.create_pomodoro(day["id"], f"{DATE}T09:00:00Z", 1500, task="Write spec")
+    return day
+
+
+def _tasks(conn: sqlite3.Connection) -> dict:
+    return dict(conn.execute("SELECT task_name, pomodoros_spent FROM daily_tasks"))
+
+
+def test_first_pull_fetches_everything(conn, server) -> None:
+    with APIClient(base_url=server.url) as client:
+        _seed(client)
+        result = DeltaSync(conn, client).pull()
+    assert result["success"]
+    assert (result["days"], result["tasks"], result["pomodoros"]) == (1, 2, 1)
+    assert result["dates"] == {DATE}
+    assert _tasks(conn) == {"Write spec": 0, "Fix bug": 0}
+    assert conn.execute("SELECT target_pomos FROM day WHERE date = ?", (DATE,)).fetchone() == (8,)
+    stored = conn.execute("SELECT value FROM settings WHERE key = 'sync_watermark'").fetchone()
+    assert stored == (str(server.backend.rev),)
+
+
+def test_second_pull_applies_only_new_changes(conn, server) -> None:
+    with APIClient(base_url=server.url) as client:
+        day = _seed(client)
+        sync = DeltaSync(conn, client)
+        sync.pull()
+        tasks = {t["task_name"]: t["id"] for t in client.get_daily_tasks(day["id"])}
+        client.update_daily_task(tasks["Write spec"], pomodoros_spent=2)
+        client.delete_daily_task(tasks["Fix bug"])
+
+        result = sync.pull()
+        assert (result["days"], result["tasks"], result["pomodoros"]) == (0, 1, 0)
+        assert result["deleted"] == 1
+        assert _tasks(conn) == {"Write spec": 2}
+
+        assert sync.pull()["tasks"] == 0  # Nothing new
+    requested = [q for m, q in server.backend.requests if q == "/api/changes"]
+    assert len(requested) == 3
+
+
+def test_pull_pages_through_large_feeds(conn, server) -> None:
+    with APIClient(base_url=server.url) as client:
+        day = client.create_or_update_day(DATE, target_pomos=8)
+        for minute in range(7):
+            client.create_pomodoro(day["id"], f"{DATE}T09:{minute:02d}:00Z", 1500, task="Spec")
+        result = DeltaSync(conn, client, page_size=2).pull()
+    assert result["pomodoros"] == 7
+    assert conn.execute("SELECT COUNT(*) FROM pomo").fetchone() == (7,)
+    assert [m for m, q in server.backend.requests if q == "/api/changes"] == ["GET"] * 4
+
+
+def test_interrupted_pull_keeps_applied_pages(conn, server) -> None:
+    class FlakyClient(APIClient):
+        calls = 0
+
+        def get_changes(self, updated_since=None, limit=500):
+            self.calls += 1
+            if self.calls > 1:
+                return None  # Connection lost after the first page
+            return super().get_changes(updated_since, limit)
+
+    with FlakyClient(base_url=server.url) as client:
+        _seed(client)
+        sync = DeltaSync(conn, client, page_size=3)
+        result = sync.pull()
+        assert not result["success"]
+        assert sync.watermark == "3"
+        assert conn.execute("SELECT COUNT(*) FROM daily_tasks").fetchone() == (2,)
+
+        client.calls = -10
+        assert sync.pull()["pomodoros"] == 1
+        assert sync.watermark == str(server.backend.rev)
+
+
+def test_server_without_change_feed_is_reported(conn) -> None:
+    with FakeServer(FakeBackend(delta=False)) as server, APIClient(base_url=server.url) as client:
+        result = DeltaSync(conn, client).pull()
+    assert result["supported"] is False
+    assert not result["success"]
+
+
+def test_updated_since_filters_the_feed() -> None:
+    backend = FakeBackend()
+    backend.dispatch("POST", "/api/days", {}, {"date": DATE, "target_pomos": 4})
+    backend.dispatch("POST", "/api/days", {}, {"date": "2024-03-02", "target_pomos": 5})
+    status, feed = backend.dispatch("GET", "/api/changes", {"updated_since": "1"}, None)
+    assert status == 200
+    assert [d["date"] for d in feed["days"]] == ["2024-03-02"]
+    assert feed["watermark"] == "2"
+    assert feed["has_more"] is False
+
+
+def test_pomodoro_start_times_match_across_text_forms(conn) -> None:
+    # The Go server's SQLite driver writes a TIMESTAMP as "2024-03-01 10:00:00+00:00";
+    # feed rows and tombstones go out through strftime as in backend/main.go
+    server = sqlite3.connect(":memory:")
+    server.executescript("""
+        CREATE TABLE pomo (id INTEGER PRIMARY KEY, start_time TIMESTAMP NOT NULL);
+        CREATE TABLE sync_tombstones (natural_key TEXT);
+        CREATE TRIGGER pomo_tombstone AFTER DELETE ON pomo BEGIN
+            INSERT INTO sync_tombstones VALUES (strftime('%Y-%m-%dT%H:%M:%SZ', OLD.start_time));
+        END;
+    """)
+    server.execute("INSERT INTO pomo (start_time) VALUES (?)",
+                   (str(datetime(2024, 3, 1, 10, tzinfo=timezone.utc)),))
+    (start,), = server.execute("SELECT strftime('%Y-%m-%dT%H:%M:%SZ', start_time) FROM pomo")
+    server.execute("DELETE FROM pomo")
+    (natural_key,), = server.execute("SELECT natural_key FROM sync_tombstones")
+
+    class FeedClient:
+        pages = [
+            {"watermark": "2", "days": [{"date": DATE, "target_pomos": 8}],
+             "pomodoros": [{"rev": 2, "day_date": DATE, "start_time": start, "focus_score": 4}]},
+            {"watermark": "3", "deleted": [{"rev": 3, "kind": "pomodoro", "day_date": DATE,
+                                            "natural_key": natural_key}]},
+        ]
+
+        def get_changes(self, updated_since=None, limit=500):
+            return self.pages.pop(0)
+
+    conn.execute("INSERT INTO day (id, date, target_pomos) VALUES (1, ?, 8)", (DATE,))
+    conn.execute("INSERT INTO pomo (day_id, start_time, duration_sec, task) "
+                 "VALUES (1, '2024-03-01T10:00:00.250000', 1500, 'Spec')")
+    sync = DeltaSync(conn, FeedClient())
+    sync.pull()
+    assert conn.execute("SELECT COUNT(*), MAX(focus_score) FROM pomo").fetchone() == (1, 4)
+    assert sync.pull()["deleted"] == 1
+    assert conn.execute("SELECT COUNT(*) FROM pomo").fetchone() == (0,)
+    assert normalize_timestamp("2024-03-01 11:00:00+01:00") == "2024-03-01T10:00:00Z"
+    assert normalize_timestamp("not a time") == "not a time"
+
+
+def test_pull_keeps_local_edits_still_in_the_outbox(conn) -> None:
+    faults = Faults(match=r"^PUT /api/daily-tasks/")
+    outbox = Outbox(sqlite3.connect(":memory:", check_same_thread=False))
+    with FakeServer(faults=faults) as server, \
+            APIClient(base_url=server.url, outbox=outbox,
+                      retry=RetryPolicy(max_retries=0)) as client, \
+            APIClient(base_url=server.url) as other:
+        day = _seed(other)
+        sync = DeltaSync(conn, client)
+        assert sync.outbox is outbox
+        sync.pull()
+        tasks = {t["task_name"]: t["id"] for t in other.get_daily_tasks(day["id"])}
+
+        # A local edit the server keeps refusing, and remote edits to both tasks
+        conn.execute("UPDATE daily_tasks SET pomodoros_spent = 5 WHERE task_name = 'Write spec'")
+        outbox.enqueue("PUT", f"/api/daily-tasks/{tasks['Write spec']}", {"pomodoros_spent": 5})
+        other.update_daily_task(tasks["Write spec"], pomodoros_spent=1)
+        other.update_daily_task(tasks["Fix bug"], pomodoros_spent=2)
+        faults.error_rate = 1.0
+        result = sync.pull()
+        assert (result["tasks"], result["held"]) == (1, 1)
+        assert _tasks(conn) == {"Write spec": 5, "Fix bug": 2}
+        assert len(outbox) == 1
+
+        # Once it goes through, the next pull is sent first and the server agrees
+        faults.error_rate = 0.0
+        other.update_daily_task(tasks["Fix bug"], pomodoros_spent=3)
+        result = sync.pull()
+        assert len(outbox) == 0 and result["held"] == 0
+        assert _tasks(conn) == {"Write spec": 5, "Fix bug": 3}
+        assert server.backend.daily_tasks[tasks["Write spec"]]["pomodoros_spent"] == 5
+    outbox.conn.close()
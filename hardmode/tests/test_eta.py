@@ -5,8 +5,11 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from hardmode.core.eta import estimate_completion
+import pytest
+
+from hardmode.core.eta import completion_minutes, estimate_completion, estimate_completion_batch
 from hardmode.core.timer_fsm import Scheme
+from hardmode.testing.eta_bench import make_rows
 
 
 def test_estimate_completion_with_defaults() -> None:
@@ -20,3 +23,34 @@ def test_estimate_completion_with_defaults() -> None:
 def test_estimate_completion_zero_remaining() -> None:
     start = datetime(2024, 1, 1, 9, 0, 0)
     assert estimate_completion(start, 0) == start
+
+
+def test_batch_matches_scalar_without_numpy() -> None:
+    data = make_rows(500, seed=4)
+    params = {k: data[k] for k in ("work_min", "short_min", "long_min", "cadence")}
+    expected = [estimate_completion(start, n, Scheme(w, s, l, c))
+                for start, n, w, s, l, c in zip(data["starts"], data["remaining"], *params.values())]
+    assert estimate_completion_batch(data["starts"], data["remaining"], use_numpy=False,
+                                     **params) == expected
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    scheme = Scheme(work_min=50, short_min=10, long_min=30, cadence=2)
+    assert estimate_completion_batch([start, start], 3, scheme, use_numpy=False) == \
+        [estimate_completion(start, 3, scheme)] * 2
+    with pytest.raises(ValueError):
+        estimate_completion_batch([start], [1, 2], use_numpy=False)
+    with pytest.raises(ZeroDivisionError):
+        completion_minutes([0, 2], cadence=[0, 0], use_numpy=False)
+
+
+def test_batch_with_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    data = make_rows(500, seed=5)
+    params = {k: np.asarray(data[k]) for k in ("work_min", "short_min", "long_min", "cadence")}
+    expected = estimate_completion_batch(data["starts"], data["remaining"], use_numpy=False, **params)
+    assert estimate_completion_batch(data["starts"], data["remaining"], use_numpy=True,
+                                     **params) == expected
+    starts = np.array(data["starts"], dtype="datetime64[us]")
+    finishes = estimate_completion_batch(starts, np.asarray(data["remaining"]), **params)
+    assert finishes.dtype == starts.dtype and finishes.tolist() == expected
+    assert completion_minutes([0, 1, 4, 5], 25, 5, 15, 4).tolist() == [0, 30, 120, 160]
+    assert completion_minutes(np.array([2.5]), use_numpy=True).tolist() == [75.0]
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the history-calibrated ETA model."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from hardmode.core.eta_model import ETAModel, RunningStats
+from hardmode.core.timer_fsm import Scheme
+
+SCHEME = Scheme(work_min=25, short_min=5, long_min=15, cadence=4)
+
+
+def history(days: int = 20, overrun: float = 120.0, abort_every: int = 0,
+            seed: int = 1) -> list:
+    """Rows of ``pomo``: six pomodoros a day, breaks overrunning by ``overrun`` +- 60 s."""
+    rng = random.Random(seed)
+    rows = []
+    for day in range(days):
+        t = datetime(2024, 3, 1, 9) + timedelta(days=day)
+        completed = 0
+        while completed < 6:
+            start = t
+            if abort_every and len(rows) % abort_every == abort_every - 1:
+                end = start + timedelta(minutes=10)
+                rows.append({"day_id": day, "start_time": start.isoformat(),
+                             "end_time": end.isoformat(), "duration_sec": 1500, "aborted": 1})
+                t = end + timedelta(minutes=5)
+                continue
+            end = start + timedelta(minutes=25)
+            rows.append({"day_id": day, "start_time": start.isoformat(),
+                         "end_time": end.isoformat(), "duration_sec": 1500, "aborted": 0})
+            completed += 1
+            scheduled = 15 if completed % 4 == 0 else 5
+            t = end + timedelta(minutes=scheduled, seconds=overrun + rng.uniform(-60, 60))
+    return rows
+
+
+def test_streaming_sketches() -> None:
+    rng = random.Random(2)
+    values = [rng.gauss(10, 3) for _ in range(5000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    model = ETAModel(SCHEME)
+    day = datetime(2024, 3, 1, 9)
+    for count, value in enumerate(values, 1):  # Overruns of gauss(0, 1) minutes
+        end = day + timedelta(minutes=25)
+        model.observe_pomo(1, day, end)
+        day = end + timedelta(minutes=(15 if count % 4 == 0 else 5) + (value - 10) / 3)
+    overruns = sorted((v - 10) / 3 * 60 for v in values[:-1])
+    assert model.overrun_quantile(0.1) == pytest.approx(overruns[500], abs=10)
+    assert model.overrun_quantile(0.9) == pytest.approx(overruns[4499], abs=10)
+
+
+def test_uncalibrated_model_uses_the_scheme() -> None:
+    start = datetime(2024, 3, 1, 9)
+    eta = ETAModel(SCHEME).estimate(start, remaining_focus_blocks=5)
+    # 5 x 25 work, breaks after 1-3 short and after 4 long; none after the last
+    assert eta.point == start + timedelta(minutes=125 + 15 + 15)
+    assert eta.p10 == eta.point == eta.p90
+    during_review = ETAModel(SCHEME).estimate(start, 1, done_today=4, break_first=True)
+    assert during_review.point == start + timedelta(minutes=15 + 25)
+    assert ETAModel(SCHEME).estimate(start, 0).point == start
+
+
+def test_learns_overruns_and_aborts() -> None:
+    model = ETAModel.from_rows(history(overrun=120, abort_every=7), SCHEME)
+    assert model.overrun.mean == pytest.approx(120, abs=15)
+    assert model.aborts == model.starts // 7
+    assert model.abort_rate == pytest.approx(1 / 7, abs=0.01)
+    assert model.abort_cost.mean == pytest.approx(15 * 60)
+    start = datetime(2024, 4, 1, 9)
+    plain = ETAModel(SCHEME).estimate(start, 6).point
+    eta = model.estimate(start, 6)
+    r = model.abort_rate / (1 - model.abort_rate)
+    expected = (plain - start).total_seconds() + 5 * model.overrun.mean + 6 * r * 900
+    assert (eta.point - start).total_seconds() == pytest.approx(expected)
+    assert eta.p10 < eta.point < eta.p90
+    assert eta.p10 >= start + timedelta(minutes=6 * 25)
+
+
+def test_from_db_and_incremental_updates_agree() -> None:
+    rows = history(days=5, overrun=300)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE pomo (id INTEGER PRIMARY KEY, day_id INTEGER NOT NULL,"
+                 " start_time TEXT NOT NULL, end_time TEXT, duration_sec INTEGER NOT NULL,"
+                 " aborted INTEGER NOT NULL DEFAULT 0, task TEXT NOT NULL DEFAULT '')")
+    conn.executemany("INSERT INTO pomo (day_id, start_time, end_time, duration_sec, aborted)"
+                     " VALUES (:day_id, :start_time, :end_time, :duration_sec, :aborted)", rows)
+    conn.execute("INSERT INTO pomo (day_id, start_time, duration_sec) VALUES (9, '2024-04-01T09:00:00', 1500)")
+    model = ETAModel.from_db(conn, SCHEME)
+    assert model.starts == len(rows)  # The running pomodoro is skipped
+    assert model.overrun.count == 5 * 5  # No gap across days
+    incremental = ETAModel(SCHEME)
+    for row in rows:
+        incremental.observe_pomo(row["day_id"], datetime.fromisoformat(row["start_time"]),
+                                 datetime.fromisoformat(row["end_time"]))
+    assert incremental.overrun.mean == pytest.approx(model.overrun.mean)
+    assert ETAModel.from_db(conn, SCHEME, since=datetime(2024, 3, 4).date()).starts == 12
+
+
+def test_local_and_pulled_start_times_mix() -> None:
+    rows = history(days=3)
+    # Rows pulled from the server are in UTC with a "Z" suffix
+    mixed = [dict(row) for row in rows]
+    for row in mixed[1::2]:
+        for column in ("start_time", "end_time"):
+            utc = datetime.fromisoformat(row[column]).astimezone(timezone.utc)
+            row[column] = utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+    model = ETAModel.from_rows(mixed, SCHEME)
+    assert model.overrun.mean == pytest.approx(ETAModel.from_rows(rows, SCHEME).overrun.mean,
+                                               abs=1)
+    last_end = datetime.fromisoformat(rows[-1]["end_time"])
+    model.observe_pomo(2, last_end + timedelta(minutes=5), last_end + timedelta(minutes=30))
+    assert model.starts == len(rows) + 1
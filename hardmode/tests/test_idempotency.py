@@ -0,0 +1,219 @@
+# SPDX-License-Identifier: MIT
+"""Tests for idempotency keys, the deduplicating fake server and pipelined writes."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.breaker import CircuitBreaker
+from hardmode.net.idempotency import idempotency_key, load_device_id
+from hardmode.net.outbox import Outbox
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeServer, Faults, IdempotencyStore
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "migrations"
+DATE = "2024-03-01"
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+@pytest.fixture
+def server():
+    with FakeServer(idempotency=True) as server:
+        yield server
+
+
+def _day(client: APIClient) -> int:
+    return client.create_or_update_day(DATE, target_pomos=8)["id"]
+
+
+def test_keys_follow_the_local_row() -> None:
+    key = idempotency_key("POST", "/api/pomodoros", ("pomo", 7), "dev-a")
+    assert key == idempotency_key("post", "/api/pomodoros", ("pomo", 7), "dev-a")
+    assert key != idempotency_key("POST", "/api/pomodoros", ("pomo", 8), "dev-a")
+    assert key != idempotency_key("POST", "/api/pomodoros", ("pomo", 7), "dev-b")
+    assert idempotency_key("PUT", "/x") != idempotency_key("PUT", "/x")  # Random
+
+
+def test_device_id_is_kept_in_settings() -> None:
+    conn = sqlite3.connect(":memory:")
+    device = load_device_id(conn)
+    assert load_device_id(conn) == device
+    assert conn.execute("SELECT value FROM settings WHERE key = 'device_id'").fetchone() == (device,)
+    assert load_device_id(sqlite3.connect(":memory:")) != device  # A reset database is a new install
+
+
+def test_two_devices_with_the_same_local_id(server) -> None:
+    with APIClient(base_url=server.url, retry=NO_RETRY, device_id="desk") as desk, \
+            APIClient(base_url=server.url, retry=NO_RETRY, device_id="laptop") as laptop:
+        day_id = _day(desk)
+        first = desk.create_pomodoro(day_id, f"{DATE}T09:00:00", 1500, task="A work", local_id=1)
+        second = laptop.create_pomodoro(day_id, f"{DATE}T10:00:00", 1500, task="B work",
+                                        local_id=1)
+    assert first["id"] != second["id"] and second["task"] == "B work"
+    assert len(server.backend.pomodoros) == 2 and server.idempotency.replayed == 0
+
+
+def test_lost_reply_is_not_applied_twice(server) -> None:
+    with APIClient(base_url=server.url, retry=NO_RETRY) as client:
+        day_id = _day(client)
+        server.faults.lose_rate = 1.0
+        assert client.create_pomodoro(day_id, f"{DATE}T09:00:00", 1500, local_id=7) is None
+        server.faults.lose_rate = 0.0
+        pomo = client.create_pomodoro(day_id, f"{DATE}T09:00:00", 1500, local_id=7)
+        assert pomo is not None
+        # Same key again: answered from the store
+        again = client.create_pomodoro(day_id, f"{DATE}T09:00:00", 1500, local_id=7)
+        assert again["id"] == pomo["id"]
+        # Same key, different body: rejected, not answered with the old reply
+        assert client.create_pomodoro(day_id, f"{DATE}T09:00:00", 1200, local_id=7) is None
+        client.create_pomodoro(day_id, f"{DATE}T09:30:00", 1500, local_id=8)
+    assert len(server.backend.pomodoros) == 2
+    assert server.idempotency.replayed == 2
+
+
+def test_keyed_writes_are_retried_when_enabled() -> None:
+    assert not RetryPolicy().allows("POST", keyed=True)
+    policy = RetryPolicy(max_retries=3, backoff_factor=0.0, keyed_writes=True)
+    assert policy.allows("POST", keyed=True) and not policy.allows("POST")
+    faults = Faults(lose_rate=0.5, match=r"^POST /api/days/\d+/tasks", seed=3)
+    with FakeServer(faults=faults, idempotency=True) as server, \
+            APIClient(base_url=server.url, retry=policy) as client:
+        day_id = _day(client)
+        created = [client.create_daily_task(day_id, f"Task {n}", local_id=n) for n in range(10)]
+        retries = client.metrics_snapshot()["POST /api/days/{id}/tasks"]["retries"]
+    assert all(created) and retries > 0
+    assert len(server.backend.daily_tasks) == 10  # No UNIQUE failures, no duplicates
+
+
+def test_outbox_replays_with_the_original_key(server) -> None:
+    outbox = Outbox(sqlite3.connect(":memory:"))
+    with APIClient(base_url=server.url, retry=NO_RETRY, outbox=outbox) as client:
+        day_id = _day(client)
+        server.faults.lose_rate = 1.0  # The write lands but looks failed
+        assert client.create_pomodoro(day_id, f"{DATE}T09:00:00", 1500, local_id=7) is None
+        server.faults.lose_rate = 0.0
+        entry, = outbox.pending()
+        assert entry.idempotency_key == idempotency_key("POST", "/api/pomodoros", ("pomo", 7),
+                                                        client.device_id)
+        assert outbox.drain(client) == 1
+    assert len(server.backend.pomodoros) == 1 and server.idempotency.replayed == 1
+
+
+def test_migration_adds_the_key_column_to_old_queues() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript((MIGRATIONS / "004_add_api_outbox.sql").read_text())
+    conn.executescript((MIGRATIONS / "005_add_outbox_idempotency_key.sql").read_text())
+    outbox = Outbox(conn)
+    outbox.enqueue("POST", "/api/pomodoros", {"n": 1}, "k1")
+    assert outbox.pending()[0].idempotency_key == "k1"
+
+
+def test_store_rejects_reuse_and_serialises_duplicates() -> None:
+    store = IdempotencyStore()
+    release = threading.Event()
+    calls = []
+
+    def slow_dispatch():
+        calls.append(1)
+        release.wait(5)
+        return 201, {"id": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        store.run("k", "POST /api/pomodoros", slow_dispatch))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and store.replayed == 2
+    assert sorted(r[0] for r in results) == [201, 201, 201]
+    assert store.run("k", "POST /api/days", slow_dispatch)[0] == 422
+    assert store.run("e", "POST /x", lambda: (503, {}))[0] == 503
+    assert len(store) == 1  # The 5xx reply was not remembered
+
+
+def test_pipelined_batch_replays_until_every_write_lands() -> None:
+    faults = Faults(lose_rate=0.4, drop_rate=0.2, match=r"^POST /api/pomodoros$", seed=5)
+    # A breaker that never opens, so every replay reaches the flaky server
+    with FakeServer(faults=faults, idempotency=True) as server, \
+            APIClient(base_url=server.url, retry=RetryPolicy(max_retries=0, backoff_factor=0.0),
+                      breaker=CircuitBreaker(failure_threshold=1000)) as client:
+        day_id = _day(client)
+        with client.pipeline(attempts=10) as batch:
+            for n in range(12):
+                batch.create_pomodoro(day_id, f"{DATE}T{8 + n:02d}:00:00", 1500)
+        assert batch.failed() == [] and all(batch.results)
+        assert len(server.backend.pomodoros) == 12
+        assert faults.injected > 0
+
+        faults.lose_rate = faults.drop_rate = 0.0
+        replayed = server.idempotency.replayed
+        batch = client.pipeline()
+        for n in range(3):
+            batch.create_pomodoro(day_id, f"{DATE}T20:{n:02d}:00", 1500)
+        batch.wait()
+        assert batch.replay(only_failed=False) == []  # Whole batch, nothing duplicated
+        batch.close()
+    assert len(server.backend.pomodoros) == 15
+    assert server.idempotency.replayed == replayed + 3
+
+
+def test_failed_batch_writes_are_queued_once() -> None:
+    outbox = Outbox(sqlite3.connect(":memory:", check_same_thread=False))
+    with FakeServer() as server:
+        url = server.url  # Stopped on exit: every write is refused
+    policy = RetryPolicy(max_retries=0, backoff_factor=0.0)
+    with APIClient(base_url=url, timeout=1, retry=policy, outbox=outbox,
+                   breaker=CircuitBreaker(failure_threshold=1000)) as client:
+        with client.pipeline(attempts=3) as batch:
+            for n in range(4):
+                batch.create_pomodoro(1, f"{DATE}T{8 + n:02d}:00:00", 1500)
+            batch.update_daily_task(2, completed=True)
+        assert len(batch.failed()) == 5
+        assert all(write.attempts == 3 for write in batch.writes)
+    assert len(outbox) == 5
+    assert {entry.idempotency_key for entry in outbox.pending()[:4]} == {
+        idempotency_key("POST", "/api/pomodoros", ("pomo", write.kwargs["local_id"]),
+                        client.device_id)
+        for write in batch.writes[:4]}
+
+
+def test_async_pipeline_awaits_its_writes() -> None:
+    faults = Faults(lose_rate=0.4, match=r"^POST /api/pomodoros$", seed=3)
+
+    async def scenario():
+        async with AsyncAPIClient(base_url=server.url,
+                                  retry=RetryPolicy(max_retries=0, backoff_factor=0.0),
+                                  breaker=CircuitBreaker(failure_threshold=1000)) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=8)
+            async with client.pipeline(max_in_flight=2, attempts=10) as batch:
+                for n in range(6):
+                    batch.create_pomodoro(day["id"], f"{DATE}T{8 + n:02d}:00:00", 1500)
+            return batch
+
+    with FakeServer(faults=faults, idempotency=True) as server:
+        batch = asyncio.run(scenario())
+    assert batch.failed() == []
+    assert all(isinstance(result, dict) for result in batch.results)  # Not coroutines
+    assert len(server.backend.pomodoros) == 6
+    assert faults.injected > 0
+
+
+def test_async_client_sends_keys(server) -> None:
+    async def scenario() -> None:
+        async with AsyncAPIClient(base_url=server.url) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=2)
+            await client.gather(*(client.create_pomodoro(day["id"], f"{DATE}T09:00:00", 1500,
+                                                         local_id=1) for _ in range(3)))
+
+    asyncio.run(scenario())
+    assert len(server.backend.pomodoros) == 1
+    assert len(server.idempotency) == 2  # The day upsert and the pomodoro
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the TimerFSM transition journal and crash recovery."""
+
+from __future__ import annotations
+
+from hardmode.core.clock import VirtualClock
+from hardmode.core.journal import TimerJournal
+from hardmode.core.timer_fsm import Scheme, State, TimerFSM
+
+WALL = 1_709_280_000.0  # 2024-03-01 08:00 UTC
+
+
+def _app(path, wall: float = WALL, **kwargs) -> tuple:
+    # A fresh process: new monotonic origin, same wall clock
+    clock = VirtualClock(start=123.0, wall=wall)
+    fsm = TimerFSM(scheme=Scheme(work_min=25, short_min=5), clock=clock)
+    return fsm, clock, TimerJournal(path, fsync=False, **kwargs)
+
+
+def test_killed_mid_pomodoro_resumes_exactly(tmp_path) -> None:
+    path = tmp_path / "timer.journal"
+    fsm, clock, journal = _app(path)
+    assert journal.restore(fsm) is None  # Nothing journaled yet
+    journal.attach(fsm)
+    fsm.start_day(target=6)
+    fsm.done_today = 2
+    fsm.start_pomo("Spec")
+    journal.note(pomo_id=42)
+    clock.advance(300)
+    fsm.change_task("Review")
+    clock.advance(300)  # Killed here, without close()
+
+    fsm, clock, journal = _app(path, wall=WALL + 600 + 60)  # Restarted a minute later
+    assert journal.restore(fsm) == {"pomo_id": 42}
+    assert (fsm.state, fsm.current_task, fsm.done_today, fsm.target) == (
+        State.POMO, "Review", 2, 6)
+    assert fsm.context_switch is True
+    assert fsm.seconds_left == 1500 - 660
+    assert fsm.deadline == clock.monotonic() + 840
+    assert fsm.started_at == WALL
+
+
+def test_countdown_that_ended_while_down_moves_on(tmp_path) -> None:
+    path = tmp_path / "timer.journal"
+    fsm, _, journal = _app(path)
+    journal.attach(fsm)
+    fsm.start_day(target=4)
+    fsm.start_pomo("Spec")
+
+    fsm, _, journal = _app(path, wall=WALL + 3600)
+    journal.restore(fsm)
+    assert fsm.seconds_left == 0
+    assert fsm.poll() is None and fsm.state is State.REVIEW
+
+
+def test_snapshots_bound_the_journal(tmp_path) -> None:
+    path = tmp_path / "timer.journal"
+    fsm, clock, journal = _app(path, snapshot_every=4)
+    journal.attach(fsm)
+    fsm.start_day(target=20)
+    for n in range(10):
+        fsm.start_pomo(f"Task {n}")
+        clock.advance(1500)
+        fsm.poll()
+        fsm.save_review(focus=4, reason="", note="")
+        clock.advance(1)  # Next task started from the break
+    assert len(path.read_text().splitlines()) < 4
+    with open(path, "a") as f:
+        f.write('{"e":"state","state":"PO')  # Torn write from a crash
+
+    restored, _, again = _app(path, wall=WALL + 10 * 1501)
+    again.restore(restored)
+    assert (restored.state, restored.done_today, restored.current_task) == (
+        State.SHORT_BREAK, 10, "Task 9")
+
+
+def test_stale_journal_is_ignored(tmp_path) -> None:
+    path = tmp_path / "timer.journal"
+    fsm, _, journal = _app(path)
+    journal.attach(fsm)
+    fsm.start_day(target=4)
+    fsm.start_pomo("Yesterday")
+    fsm, _, journal = _app(path, wall=WALL + 86400)
+    assert journal.restore(fsm, since=WALL + 3600) is None
+    assert fsm.state is State.IDLE
@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the multi-device sync load generator."""
+
+from __future__ import annotations
+
+from hardmode.testing.fake_server import FakeServer
+from hardmode.testing.loadgen import LoadProfile, format_report, run_load
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+
+def test_devices_replay_days_against_the_in_process_server() -> None:
+    profile = LoadProfile(days=2, shared_days=0, tasks_per_day=2, pomodoros_per_day=4,
+                          pulls_per_day=2)
+    report = run_load(devices=3, profile=profile)
+    assert report["failures"] == 0
+    methods = report["methods"]
+    assert methods["create_or_update_day"]["calls"] == 6
+    assert methods["create_daily_task"]["calls"] == 12
+    # Startup pull, two pulls during each day and one after each reflection
+    assert methods["get_changes"]["calls"] == 3 * (1 + 2 * 3)
+    assert all(row["errors"] == 0 for row in methods.values())
+    assert methods["create_pomodoros_bulk"]["p50"] <= methods["create_pomodoros_bulk"]["p99"]
+    assert report["requests"] == report["endpoints"]["total"]["count"] > 0
+    assert "get_changes" in format_report(report)
+
+
+def test_load_can_target_an_external_server() -> None:
+    backend = SQLiteBackend()
+    with FakeServer(backend) as server:
+        run_load(server.url, devices=2,
+                 profile=LoadProfile(days=1, shared_days=0, pomodoros_per_day=2))
+        assert backend.count("days") == 2
+        assert backend.count("pomodoros") == 4
+    backend.close()
+
+
+def test_devices_sharing_days_contend_without_failing() -> None:
+    backend = SQLiteBackend()
+    profile = LoadProfile(days=2, shared_days=1, tasks_per_day=3, pomodoros_per_day=4)
+    with FakeServer(backend) as server:
+        report = run_load(server.url, devices=4, profile=profile)
+        assert report["failures"] == 0
+        assert backend.count("days") == 5  # Each device shares a day with the next
+        assert backend.count("pomodoros") == 4 * 2 * 4
+        # Tasks both devices planned on a shared day exist once
+        assert backend.count("daily_tasks") < 4 * 2 * 3
+    backend.close()
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+"""Tests for per-endpoint request metrics and latency histograms."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.breaker import CircuitBreaker
+from hardmode.net.metrics import LatencyHistogram, RequestEvent, RequestMetrics, endpoint_template
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+DATE = "2024-03-01"
+
+
+def test_paths_collapse_to_templates() -> None:
+    assert endpoint_template(f"/api/days/{DATE}") == "/api/days/{date}"
+    assert endpoint_template("/api/days/12/tasks") == "/api/days/{id}/tasks"
+    assert endpoint_template("/api/pomodoros?day_id=3") == "/api/pomodoros"
+
+
+def test_histogram_quantiles_are_within_precision() -> None:
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(-4, 1) for _ in range(5000))
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    for quantile in (0.5, 0.95, 0.99):
+        exact = samples[int(quantile * len(samples)) - 1]
+        assert abs(histogram.value_at(quantile) - exact) <= exact * 0.01 + 1e-6
+    assert histogram.value_at(1.0) == int(samples[-1] * 1_000_000) / 1_000_000
+    assert LatencyHistogram().value_at(0.5) == 0.0
+
+
+def test_client_records_counts_bytes_and_errors() -> None:
+    events: list[RequestEvent] = []
+    with FakeServer() as server, APIClient(base_url=server.url, on_request=events.append) as client:
+        client.create_or_update_day(DATE, target_pomos=8)
+        client.get_day(DATE)
+        client.get_day("2024-03-02")  # 404
+        snapshot = client.metrics_snapshot()
+
+    day = snapshot["GET /api/days/{date}"]
+    assert (day["count"], day["errors"]) == (2, 1)
+    assert day["bytes_in"] > 0 and day["bytes_out"] == 0
+    assert snapshot["POST /api/days"]["bytes_out"] > 0
+    assert set(day["latency_ms"]) == {"p50", "p95", "p99", "max", "mean"}
+    assert snapshot["total"]["count"] == 3
+    assert [(e.method, e.status) for e in events][1:] == [("GET", 200), ("GET", 404)]
+
+
+def test_retries_are_counted_once_per_request() -> None:
+    backend = FakeBackend()
+    calls = []
+
+    def flaky(**_):
+        calls.append(1)
+        return (503, {"error": "busy"}) if len(calls) < 3 else (200, {"ok": True})
+
+    backend.route("GET", r"/api/flaky", flaky)
+    policy = RetryPolicy(max_retries=3, backoff_factor=0.0)
+    with FakeServer(backend) as server, APIClient(base_url=server.url, retry=policy) as client:
+        assert client._request("GET", "/api/flaky") == {"ok": True}
+        stats = client.metrics_snapshot()["GET /api/flaky"]
+    assert (stats["count"], stats["retries"], stats["errors"]) == (1, 2, 0)
+
+
+def test_timeouts_and_open_circuit_are_counted() -> None:
+    backend = FakeBackend()
+
+    def slow(**_):
+        time.sleep(0.3)
+        return 200, {"ok": True}
+
+    backend.route("GET", r"/api/slow", slow)
+    policy = RetryPolicy(max_retries=1, backoff_factor=0.0)
+    with FakeServer(backend) as server, APIClient(
+            base_url=server.url, timeout=0.05, retry=policy,
+            breaker=CircuitBreaker(failure_threshold=1)) as client:
+        assert client._request("GET", "/api/slow") is None
+        assert client._request("GET", "/api/slow") is None  # Rejected by the breaker
+        stats = client.metrics_snapshot()["GET /api/slow"]
+    assert (stats["count"], stats["errors"], stats["short_circuited"]) == (2, 2, 1)
+    assert (stats["retries"], stats["timeouts"]) == (1, 2)
+
+
+def test_hook_errors_do_not_break_requests() -> None:
+    metrics = RequestMetrics()
+    metrics.add_hook(lambda event: 1 / 0)
+    metrics.record(RequestEvent("GET", "/health", status=200, elapsed=0.01))
+    assert metrics.snapshot()["GET /health"]["count"] == 1
+
+
+def test_async_client_shares_metrics() -> None:
+    metrics = RequestMetrics()
+
+    async def scenario(server: FakeServer) -> None:
+        async with AsyncAPIClient(base_url=server.url, metrics=metrics,
+                                  single_flight=False) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=4)
+            await client.gather(*(client.get_daily_tasks(day["id"]) for _ in range(5)))
+
+    with FakeServer() as server:
+        asyncio.run(scenario(server))
+    stats = metrics.snapshot()["GET /api/days/{id}/tasks"]
+    assert stats["count"] == 5 and stats["errors"] == 0
+    assert stats["bytes_in"] > 0
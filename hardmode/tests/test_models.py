@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the typed wire records and the pluggable JSON codec."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.core.models import DailyTask, Day, Pomodoro, Statistics, decode_records
+from hardmode.net import codec as codec_module
+from hardmode.net.codec import STDLIB, JSONCodec, get_codec, set_codec
+from hardmode.testing.fake_server import FakeServer
+from hardmode.ui.task_list_dialog import TaskItem
+
+SCHEMA = Path(__file__).resolve().parents[2] / "schema.sql"
+DATE = "2024-03-01"
+
+
+def test_records_ignore_unknown_keys_and_default_missing_ones() -> None:
+    day = Day.from_dict({"id": 3, "date": DATE, "target_pomos": 8, "rev": 12})
+    assert (day.id, day.date, day.target_pomos, day.day_rating) == (3, DATE, 8, None)
+    assert Day.from_dict(day.to_dict()) == day
+    assert Statistics.from_dict({}) == Statistics()
+    assert not hasattr(day, "__dict__")
+    assert sys.getsizeof(day) < sys.getsizeof(day.to_dict())
+
+
+def test_records_decode_sqlite_rows() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA.read_text())
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO day (date, target_pomos) VALUES (?, 8)", (DATE,))
+    conn.execute("INSERT INTO daily_tasks (day_id, task_name, completed, created_at) "
+                 "VALUES (1, 'Spec', 1, '2024-03-01T09:00:00')")
+    task = DailyTask.from_dict(conn.execute("SELECT * FROM daily_tasks").fetchone())
+    conn.close()
+    assert task.completed is True and task.added_mid_day is False
+
+    item = TaskItem.from_record(task)
+    assert (item.name, item.completed, item.pomodoros_spent) == ("Spec", True, 0)
+    assert TaskItem.from_record(task.to_dict()).completed is True
+
+
+def test_decode_records_uses_the_given_codec() -> None:
+    calls = []
+
+    def loads(body):
+        calls.append(body)
+        return STDLIB.loads(body)
+
+    tracing = JSONCodec("tracing", STDLIB.dumps, loads)
+    body = b'[{"start_time": "2024-03-01T09:00:00Z", "duration_sec": 1500, "aborted": 0}]'
+    assert decode_records(Pomodoro, body, tracing) == [
+        Pomodoro(start_time="2024-03-01T09:00:00Z", duration_sec=1500)]
+    assert calls == [body]
+
+
+def test_default_codec_prefers_orjson_when_installed() -> None:
+    expected = "orjson" if codec_module.orjson is not None else "json"
+    assert get_codec().name == expected
+
+
+@pytest.fixture
+def stdlib_codec():
+    previous = get_codec()
+    set_codec(STDLIB)
+    yield STDLIB
+    set_codec(previous)
+
+
+def test_client_returns_records_on_request(stdlib_codec) -> None:
+    with FakeServer() as server, APIClient(base_url=server.url) as client:
+        assert client.codec is stdlib_codec
+        day = client.create_or_update_day(DATE, target_pomos=8)
+        client.create_daily_task(day["id"], "Spec", planned_pomodoros=2)
+        client.create_pomodoro(day["id"], f"{DATE}T09:00:00Z", 1500, task="Spec")
+
+        assert client.get_day(DATE, records=True) == Day.from_dict(day)
+        assert isinstance(client.get_day(DATE), dict)  # Cached dict, untouched
+        tasks = client.get_daily_tasks(day["id"], records=True)
+        assert [(t.task_name, t.planned_pomodoros) for t in tasks] == [("Spec", 2)]
+        pomos = list(client.iter_pomodoros(records=True))
+        assert [p.task for p in pomos] == ["Spec"]
+        assert isinstance(next(client.iter_pomodoros(page_size=None, records=True)), Pomodoro)
+        assert isinstance(client.get_statistics(records=True), Statistics)
+
+
+def test_async_client_returns_records() -> None:
+    async def scenario(server: FakeServer) -> list:
+        async with AsyncAPIClient(base_url=server.url) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=4)
+            await client.create_pomodoro(day["id"], f"{DATE}T09:00:00Z", 1500, task="Spec")
+            return [await client.get_day(DATE, records=True),
+                    [p async for p in client.iter_pomodoros(records=True)]]
+
+    with FakeServer() as server:
+        day, pomos = asyncio.run(scenario(server))
+    assert isinstance(day, Day) and day.target_pomos == 4
+    assert [type(p) for p in pomos] == [Pomodoro]
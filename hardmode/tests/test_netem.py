@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the fault-injecting proxy and the sync benchmark."""
+
+from __future__ import annotations
+
+import time
+
+from hardmode.api_client import APIClient
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.loadgen import LoadProfile
+from hardmode.testing.netem import FaultProxy, NetProfile
+from hardmode.testing.sync_bench import run_scenario
+
+
+def test_proxy_forwards_and_adds_latency(api_server) -> None:
+    with FaultProxy(api_server.url, NetProfile(latency=0.1)) as proxy, \
+            APIClient(base_url=proxy.url) as client:
+        started = time.perf_counter()
+        assert client.check_health()
+        assert time.perf_counter() - started >= 0.1
+    assert proxy.stats["requests"] == 1 and proxy.stats["bytes_down"] > 0
+
+
+def test_bandwidth_cap_paces_bodies(api_client, api_server) -> None:
+    day = api_client.create_or_update_day("2024-03-01", target_pomos=8)
+    api_client.create_pomodoros_bulk([
+        {"day_id": day["id"], "start_time": f"2024-03-01T10:{i:02d}:00Z", "duration_sec": 1500,
+         "task": "x" * 200} for i in range(40)])
+    with FaultProxy(api_server.url, NetProfile(bandwidth=20_000)) as proxy, \
+            APIClient(base_url=proxy.url) as client:
+        started = time.perf_counter()
+        assert len(list(client.iter_pomodoros(page_size=100))) == 40
+        elapsed = time.perf_counter() - started
+    assert elapsed >= proxy.stats["bytes_down"] / 20_000 * 0.9
+
+
+def test_error_burst_is_retried(api_server) -> None:
+    policy = RetryPolicy(max_retries=3, backoff_factor=0.0)
+    with FaultProxy(api_server.url) as proxy, \
+            APIClient(base_url=proxy.url, retry=policy) as client:
+        proxy.start_burst(2)
+        assert client.get_statistics() is not None
+        assert client.metrics_snapshot()["GET /api/statistics"]["retries"] == 2
+        proxy.start_burst(5)
+        assert client.get_statistics() is None
+    assert proxy.stats["errors"] == 6
+
+
+def test_reset_fails_the_request(api_server) -> None:
+    with FaultProxy(api_server.url, NetProfile(reset_rate=1.0)) as proxy, \
+            APIClient(base_url=proxy.url, retry=RetryPolicy(max_retries=1,
+                                                            backoff_factor=0.0)) as client:
+        assert client.check_health() is False
+    assert proxy.stats["resets"] == 2
+
+
+def test_scenario_reports_wasted_retries() -> None:
+    workload = LoadProfile(days=1, tasks_per_day=2, pomodoros_per_day=2, pulls_per_day=1)
+    clean = run_scenario("lan", NetProfile(), workload)
+    assert clean["failed_steps"] == 0 and clean["retries"] == 0
+    assert clean["requests"] > 5
+
+    down = run_scenario("down", NetProfile(error_rate=1.0), workload,
+                        retry=RetryPolicy(max_retries=1, backoff_factor=0.0))
+    assert down["failed_steps"] > 0
+    assert down["wasted_retries"] == down["retries"] > 0
@@ -0,0 +1,178 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the persistent offline outbox."""
+
+from __future__ import annotations
+
+import socket
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.net.outbox import Outbox, OutboxFull, OutboxWorker
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeServer, Faults
+
+DATE = "2024-03-01"
+
+
+def _dead_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def outbox():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    yield Outbox(conn)
+    conn.close()
+
+
+@pytest.fixture
+def offline_client(outbox):
+    client = APIClient(base_url=_dead_url(), timeout=1,
+                       retry=RetryPolicy(max_retries=0), outbox=outbox)
+    yield client
+    client.close()
+
+
+def test_offline_writes_are_queued_and_coalesced(offline_client, outbox) -> None:
+    assert offline_client.create_or_update_day(DATE, target_pomos=8) is None
+    offline_client.create_or_update_day(DATE, target_pomos=10)
+    offline_client.create_daily_task(1, "Write spec", planned_pomodoros=2)
+    for spent in range(1, 6):
+        offline_client.update_daily_task(2, pomodoros_spent=spent)
+    offline_client.update_daily_task(2, completed=True)
+
+    entries = outbox.pending()
+    assert [(e.method, e.endpoint) for e in entries] == [
+        ("POST", "/api/days"),
+        ("POST", "/api/days/1/tasks"),
+        ("PUT", "/api/daily-tasks/2"),
+    ]
+    assert entries[0].body["target_pomos"] == 10
+    assert entries[2].body == {"pomodoros_spent": 5, "completed": True}
+
+
+def test_drain_replays_in_order(offline_client, outbox) -> None:
+    offline_client.create_or_update_day(DATE, target_pomos=8)
+    offline_client.create_daily_task(1, "Write spec", planned_pomodoros=2)
+    offline_client.update_daily_task(2, pomodoros_spent=3)
+
+    with FakeServer() as server:
+        offline_client.base_url = server.url
+        assert outbox.drain(offline_client) == 3
+        assert server.backend.requests == [
+            ("POST", "/api/days"),
+            ("POST", "/api/days/1/tasks"),
+            ("PUT", "/api/daily-tasks/2"),
+        ]
+        assert server.backend.daily_tasks[2]["pomodoros_spent"] == 3
+    assert len(outbox) == 0
+
+
+def test_writes_stay_behind_queued_entries(outbox) -> None:
+    outbox.enqueue("POST", "/api/days", {"date": DATE, "target_pomos": 8})
+    with FakeServer() as server, APIClient(base_url=server.url, outbox=outbox) as client:
+        # The API is up, but the day create is still queued ahead of this
+        assert client.create_daily_task(1, "Write spec") is None
+        assert server.backend.requests == []
+        assert outbox.drain(client) == 2
+        assert [path for _, path in server.backend.requests] == [
+            "/api/days", "/api/days/1/tasks"]
+
+
+def test_rejected_entries_are_dropped(outbox) -> None:
+    outbox.enqueue("PUT", "/api/daily-tasks/99", {"completed": True})
+    outbox.enqueue("POST", "/api/days", {"date": DATE, "target_pomos": 8})
+    with FakeServer() as server, APIClient(base_url=server.url, outbox=outbox) as client:
+        assert outbox.drain(client) == 1
+        assert len(server.backend.days) == 1
+    assert outbox.dropped == 1
+    assert len(outbox) == 0
+
+
+def test_rejected_writes_are_not_queued(outbox) -> None:
+    with FakeServer() as server, APIClient(base_url=server.url, outbox=outbox) as client:
+        assert client.update_daily_task(99, completed=True) is None  # 404
+    assert len(outbox) == 0
+
+
+def test_server_errors_are_queued(outbox) -> None:
+    faults = Faults(error_rate=1.0, error_status=503)
+    with FakeServer(faults=faults) as server, \
+            APIClient(base_url=server.url, retry=RetryPolicy(max_retries=0),
+                      outbox=outbox) as client:
+        assert client.create_pomodoro(1, f"{DATE}T09:00:00", 1500) is None
+        assert client.update_daily_task(2, completed=True) is None
+    assert [(e.method, e.endpoint) for e in outbox.pending()] == [
+        ("POST", "/api/pomodoros"), ("PUT", "/api/daily-tasks/2")]
+
+
+def test_full_queue_refuses_new_writes() -> None:
+    outbox = Outbox(sqlite3.connect(":memory:"), max_entries=3)
+    for i in range(3):
+        outbox.enqueue("POST", "/api/pomodoros", {"n": i})
+    with pytest.raises(OutboxFull):
+        outbox.enqueue("POST", "/api/pomodoros", {"n": 3})
+    assert len(outbox) == 3
+    assert [e.body["n"] for e in outbox.pending()] == [0, 1, 2]  # Nothing queued was lost
+
+    client = APIClient(base_url=_dead_url(), timeout=1, retry=RetryPolicy(max_retries=0),
+                       outbox=outbox)
+    assert client.create_pomodoro(1, f"{DATE}T09:00:00", 1500) is None  # Refused, not raised
+    client.close()
+    assert len(outbox) == 3
+
+
+def test_queued_delete_is_final(outbox) -> None:
+    outbox.enqueue("PUT", "/api/daily-tasks/2", {"pomodoros_spent": 1})
+    entry_id = outbox.enqueue("DELETE", "/api/daily-tasks/2")
+    assert outbox.enqueue("PUT", "/api/daily-tasks/2", {"completed": True}) == entry_id
+    assert outbox.enqueue("PATCH", "/api/daily-tasks/2", {"completed": True}) == entry_id
+    entries = outbox.pending()
+    assert [(e.method, e.body) for e in entries] == [("DELETE", None)]
+
+
+def test_queue_survives_restart(tmp_path) -> None:
+    db_path = tmp_path / "hardmode.db"
+    first = Outbox.open(db_path)
+    first.enqueue("PUT", "/api/daily-tasks/2", {"pomodoros_spent": 1})
+    first.conn.close()
+    second = Outbox.open(db_path)
+    assert len(second) == 1
+    assert second.pending()[0].body == {"pomodoros_spent": 1}
+    second.conn.close()
+
+
+def test_concurrent_drains_send_each_entry_once(outbox) -> None:
+    for n in range(5):
+        outbox.enqueue("POST", "/api/pomodoros", {"day_id": 1, "start_time": f"{DATE}T0{n}:00:00",
+                                                  "duration_sec": 1500})
+    with FakeServer(faults=Faults(latency=0.02)) as server, \
+            APIClient(base_url=server.url) as client:
+        threads = [threading.Thread(target=outbox.drain, args=(client,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(server.backend.requests) == 5
+    assert len(outbox) == 0
+
+
+def test_worker_drains_when_woken(outbox) -> None:
+    outbox.enqueue("POST", "/api/days", {"date": DATE, "target_pomos": 8})
+    with FakeServer() as server, APIClient(base_url=server.url) as client:
+        worker = OutboxWorker(outbox, client, interval=60)
+        worker.start()
+        worker.wake()
+        deadline = time.monotonic() + 5
+        while len(outbox) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        worker.stop()
+        assert len(server.backend.days) == 1
+    assert len(outbox) == 0
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the keyset-paginated history iterators."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+DATE = "2024-03-01"
+
+
+def _seed(client: APIClient, count: int) -> None:
+    day = client.create_or_update_day(DATE, target_pomos=count)
+    # Pairs share a start time so the id tie-breaker is exercised
+    pomos = [{"day_id": day["id"], "start_time": f"{DATE}T09:{i // 2:02d}:00Z",
+              "duration_sec": 1500, "task": f"task {i}"} for i in range(count)]
+    client.create_pomodoros_bulk(pomos)
+
+
+def _page_requests(server: FakeServer, path: str = "/api/pomodoros") -> int:
+    return sum(1 for method, p in server.backend.requests if (method, p) == ("GET", path))
+
+
+@pytest.fixture
+def server():
+    with FakeServer() as server:
+        yield server
+
+
+def test_pages_cover_every_row_once_in_order(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        _seed(client, 25)
+        rows = list(client.iter_pomodoros(start_date=DATE, end_date=DATE, page_size=4))
+    keys = [(r["start_time"], r["id"]) for r in rows]
+    assert len(set(keys)) == 25
+    assert keys == sorted(keys, reverse=True)
+    assert _page_requests(server) == 7
+
+
+def test_early_exit_stops_paging(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        _seed(client, 30)
+        first = list(itertools.islice(client.iter_pomodoros(page_size=2), 5))
+    assert len(first) == 5
+    # Three pages consumed, at most one more prefetched
+    assert _page_requests(server) <= 4
+
+
+def test_next_page_is_prefetched(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        _seed(client, 10)
+        rows = client.iter_pomodoros(page_size=5)
+        next(rows)
+        deadline = time.monotonic() + 5
+        while _page_requests(server) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _page_requests(server) == 2
+        assert len(list(rows)) == 9
+
+
+def test_server_without_paging_is_read_once() -> None:
+    class LegacyBackend(FakeBackend):
+        def get_pomodoros(self, query, **_):
+            return 200, [dict(p) for p in self.pomodoros.values()]
+
+    with FakeServer(LegacyBackend()) as server, APIClient(base_url=server.url) as client:
+        _seed(client, 12)
+        assert len(list(client.iter_pomodoros(page_size=5))) == 12
+        assert _page_requests(server) == 1
+
+
+def test_sessions_are_paginated_by_task(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        for minute in range(7):
+            for task_id in (1, 2):
+                client.create_session(task_id, 25, start_time=f"{DATE}T10:{minute:02d}:00")
+        sessions = list(client.iter_sessions(task_id=1, page_size=3))
+    assert len(sessions) == 7
+    assert {s["task_id"] for s in sessions} == {1}
+    assert _page_requests(server, "/api/sessions") == 3
+
+
+def test_async_pages(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        _seed(client, 11)
+
+    async def scenario() -> list[dict]:
+        async with AsyncAPIClient(base_url=server.url) as client:
+            return [p async for p in client.iter_pomodoros(page_size=3)]
+
+    rows = asyncio.run(scenario())
+    assert len({r["id"] for r in rows}) == 11
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: MIT
+"""Tests for dirty-field tracking and sparse PATCH updates."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.core.models import DailyTask, Day
+from hardmode.net.outbox import Outbox
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+DATE = "2024-03-01"
+NOTES = "A long reflection. " * 200
+
+
+def test_records_track_assigned_fields() -> None:
+    day = Day.from_dict({"date": DATE, "id": 1, "finished_pomos": 2, "comment": "x"})
+    assert day.changes() == {}
+    day.finished_pomos += 1
+    day.comment = "x"  # Same value: not a change
+    day.id = 5  # Identity fields are never sent
+    assert day.changes() == {"finished_pomos": 3}
+    sent = day.changes()
+    day.finished_pomos = 4  # Assigned again while the first write was in flight
+    day.mark_clean(sent)
+    assert day.dirty_fields == {"finished_pomos"}
+    day.mark_clean()
+    assert not day.dirty_fields
+    day.mark_dirty("comment")
+    assert day.changes() == {"comment": "x"}
+    with pytest.raises(AttributeError):
+        day.mark_dirty("colour")
+    assert Day(DATE, finished_pomos=4, comment="x", id=5) == day  # Tracking is not compared
+
+
+def test_save_day_sends_only_changed_fields() -> None:
+    events = []
+    with FakeServer() as server, APIClient(base_url=server.url, on_request=events.append,
+                                           compress_min_bytes=None) as client:
+        day_id = client.create_or_update_day(DATE, target_pomos=8)["id"]
+        client.update_day_reflection(day_id, 3, reflection_notes=NOTES)
+        day = client.get_day(DATE, records=True)
+        day.finished_pomos += 1
+        result = client.save_day(day)
+        assert client.save_day(day) == {}  # Nothing left to send
+    patch = events[-1]
+    assert (patch.method, patch.endpoint) == ("PATCH", "/api/days/{id}")
+    assert patch.bytes_out < 64 < len(NOTES)
+    assert result["finished_pomos"] == 1 and result["target_pomos"] == 8
+    assert server.backend.days[day.id]["reflection_notes"] == NOTES
+    assert not day.dirty_fields
+
+
+def test_sqlite_backend_merges_partial_task_updates() -> None:
+    with FakeServer(SQLiteBackend()) as server, APIClient(base_url=server.url) as client:
+        day_id = client.create_or_update_day(DATE, target_pomos=4)["id"]
+        client.create_daily_task(day_id, "Spec", planned_pomodoros=3, reason_added="scope")
+        task, = client.get_daily_tasks(day_id, records=True)
+        task.pomodoros_spent = 2
+        task.completed = True
+        assert client.save_daily_task(task)["completed"] is True
+        stored, = client.get_daily_tasks(day_id, records=True)
+    assert (stored.pomodoros_spent, stored.planned_pomodoros, stored.reason_added) == (2, 3, "scope")
+
+
+def test_patch_rejects_read_only_fields() -> None:
+    with FakeServer() as server, APIClient(base_url=server.url) as client:
+        day_id = client.create_or_update_day(DATE)["id"]
+        assert client.patch_day(day_id, {"date": "2024-03-02"}) is None
+        assert client.patch_day(day_id, {"target_pomos": 6})["target_pomos"] == 6
+        assert client.patch_daily_task(999, {"completed": True}) is None
+
+
+def test_servers_without_patch_get_whole_records() -> None:
+    with FakeServer(FakeBackend(patch=False)) as server, \
+            APIClient(base_url=server.url) as client:
+        day_id = client.create_or_update_day(DATE, target_pomos=8, comment="keep")["id"]
+        client.create_daily_task(day_id, "Spec", planned_pomodoros=3)
+        day = client.get_day(DATE, records=True)
+        day.finished_pomos = 2
+        day.reflection_notes = "calm"
+        assert client.save_day(day) is not None
+        task, = client.get_daily_tasks(day_id, records=True)
+        task.completed = True
+        assert client.save_daily_task(task) is not None
+        assert not client._patch_supported
+        assert not day.dirty_fields and not task.dirty_fields
+    stored = server.backend.days[day_id]
+    assert (stored["finished_pomos"], stored["comment"], stored["reflection_notes"]) == (
+        2, "keep", "calm")
+    assert server.backend.daily_tasks[task.id]["completed"] is True
+    assert ("PATCH", f"/api/days/{day_id}") in server.backend.requests  # Probed once
+    assert ("PATCH", f"/api/daily-tasks/{task.id}") not in server.backend.requests
+
+
+def test_offline_patches_fold_in_the_outbox() -> None:
+    outbox = Outbox(sqlite3.connect(":memory:"))
+    with FakeServer() as server, APIClient(base_url=server.url, outbox=outbox) as client:
+        day_id = client.create_or_update_day(DATE, target_pomos=8)["id"]
+        task = DailyTask("Spec", id=client.create_daily_task(day_id, "Spec")["id"])
+        server.faults.drop_rate = 1.0
+        task.pomodoros_spent = 1
+        client.save_daily_task(task)
+        task.completed = True
+        client.save_daily_task(task)
+        assert task.dirty_fields == {"pomodoros_spent", "completed"}  # Not confirmed yet
+        server.faults.drop_rate = 0.0
+        entry, = outbox.pending()
+        assert entry.body == {"pomodoros_spent": 1, "completed": True}
+        assert outbox.drain(client) == 1
+    stored = server.backend.daily_tasks[task.id]
+    assert (stored["pomodoros_spent"], stored["completed"]) == (1, True)
+
+
+def test_async_client_saves_records() -> None:
+    async def scenario() -> Day:
+        async with AsyncAPIClient(base_url=server.url) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=2)
+            await client.update_day_reflection(day["id"], 3, reflection_notes=NOTES)
+            day = await client.get_day(DATE, records=True)
+            day.day_rating = 4
+            await client.save_day(day)
+            return day
+
+    with FakeServer() as server:
+        day = asyncio.run(scenario())
+    assert server.backend.days[day.id]["day_rating"] == 4
+    assert server.backend.days[day.id]["reflection_notes"] == NOTES
+    assert not day.dirty_fields
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: MIT
+"""Tests for client-side rate limiting and jittered reconnection."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.breaker import CircuitBreaker
+from hardmode.net.ratelimit import RateLimiter, TokenBucket, endpoint_class
+
+
+def test_bucket_allows_a_burst_then_paces() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=2, burst=3, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0  # Queued behind the previous reservation
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0  # Refilled, but never beyond the burst
+    assert bucket.reserve() == 0.0 and bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+
+
+def test_endpoint_classes_have_their_own_buckets() -> None:
+    assert endpoint_class("GET", "/api/changes") == "sync"
+    assert endpoint_class("POST", "/api/pomodoros/bulk") == "bulk"
+    assert endpoint_class("PUT", "/api/days/3/tasks") == "write"
+    assert endpoint_class("GET", "/health") == "health"
+
+    now = [0.0]
+    limiter = RateLimiter(rate=100, classes={"bulk": (1, 1)}, clock=lambda: now[0])
+    assert limiter.delay("POST", "/api/pomodoros/bulk") == 0.0
+    assert limiter.delay("POST", "/api/pomodoros/bulk") == 1.0
+    assert limiter.delay("GET", "/api/statistics") == 0.0  # Only the global bucket
+    assert limiter.stats() == {"throttled": 1, "waited": 1.0}
+
+
+def test_reconnect_hold_is_randomised() -> None:
+    now = [0.0]
+    limiter = RateLimiter(reconnect_spread=20, clock=lambda: now[0], rand=lambda: 0.25)
+    assert limiter.delay("GET", "/health") == 0.0
+    assert limiter.after_outage() == 5.0
+    now[0] = 2.0
+    assert limiter.delay("GET", "/health") == 3.0
+    now[0] = 5.0
+    assert limiter.delay("GET", "/health") == 0.0
+
+
+def test_breaker_cool_down_is_jittered() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, jitter=0.5,
+                             clock=lambda: now[0], rand=lambda: 0.8)
+    breaker.record_failure()
+    now[0] = 13.9
+    assert not breaker.allow()
+    now[0] = 14.0
+    assert breaker.allow()
+    assert breaker.record_success() is True
+    assert breaker.record_success() is False
+
+
+def test_client_paces_requests(api_server) -> None:
+    limiter = RateLimiter(rate=20, burst=1)
+    with APIClient(base_url=api_server.url, rate_limit=limiter) as client:
+        started = time.perf_counter()
+        for _ in range(5):
+            assert client.check_health()
+        assert time.perf_counter() - started >= 0.19
+    assert limiter.throttled == 4
+
+
+def test_client_holds_requests_after_recovery(api_server) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=lambda: now[0])
+    limiter = RateLimiter(reconnect_spread=0.2, rand=lambda: 1.0)
+    with APIClient(base_url=api_server.url, breaker=breaker, rate_limit=limiter) as client:
+        breaker.record_failure()
+        now[0] = 1.0
+        assert client.check_health()  # The trial request goes straight out
+        started = time.perf_counter()
+        assert client.check_health()
+        assert time.perf_counter() - started >= 0.19
+
+
+def test_async_client_paces_requests(api_server) -> None:
+    async def scenario() -> float:
+        limiter = RateLimiter(classes={"health": (20, 1)})
+        async with AsyncAPIClient(base_url=api_server.url, rate_limit=limiter,
+                                  single_flight=False) as client:
+            started = time.perf_counter()
+            assert all(await asyncio.gather(*(client.check_health() for _ in range(5))))
+            return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) >= 0.19
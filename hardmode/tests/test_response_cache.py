@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the conditional-GET response cache."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.cache import ResponseCache
+from hardmode.testing.fake_server import FakeServer
+
+DATE = "2024-03-01"
+
+
+@pytest.fixture
+def server():
+    with FakeServer() as server:
+        yield server
+
+
+def _gets(server: FakeServer) -> int:
+    return sum(1 for method, _ in server.backend.requests if method == "GET")
+
+
+def test_unchanged_read_is_revalidated_with_304(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        client.create_or_update_day(DATE, target_pomos=8)
+        first = client.get_day(DATE)
+        second = client.get_day(DATE)
+        stats = client.cache.stats()
+    assert first == second
+    assert _gets(server) == 2
+    assert stats["misses"] == 1
+    assert stats["revalidations"] == 1
+
+
+def test_fresh_entries_are_served_without_a_request(server) -> None:
+    with APIClient(base_url=server.url, cache=ResponseCache(ttl=60)) as client:
+        client.create_or_update_day(DATE, target_pomos=8)
+        for _ in range(3):
+            assert client.get_statistics()["total_sessions"] == 0
+        assert client.cache.stats()["hits"] == 2
+    assert _gets(server) == 1
+
+
+def test_cached_data_is_not_shared_with_callers(server) -> None:
+    with APIClient(base_url=server.url, cache=ResponseCache(ttl=60)) as client:
+        client.create_or_update_day(DATE, target_pomos=8)
+        client.get_day(DATE)["target_pomos"] = 99
+        assert client.get_day(DATE)["target_pomos"] == 8
+
+
+def test_writes_invalidate_matching_reads(server) -> None:
+    with APIClient(base_url=server.url, cache=ResponseCache(ttl=60)) as client:
+        day = client.create_or_update_day(DATE, target_pomos=8)
+        task = client.create_daily_task(day["id"], "Write spec", planned_pomodoros=2)
+        other = client.create_or_update_day("2024-03-02", target_pomos=4)
+        client.get_day(DATE)
+        client.get_day("2024-03-02")
+        client.get_daily_tasks(day["id"])
+
+        client.update_daily_task(task["id"], pomodoros_spent=1)
+        assert client.get_daily_tasks(day["id"])[0]["pomodoros_spent"] == 1
+
+        client.update_day_reflection(day["id"], day_rating=4, reflection_notes="Solid")
+        assert client.get_day(DATE)["day_rating"] == 4
+        # The other day's entry was untouched by either write
+        before = _gets(server)
+        assert client.get_day("2024-03-02")["id"] == other["id"]
+        assert _gets(server) == before
+
+
+def test_lru_evicts_least_recently_used_entry(server) -> None:
+    cache = ResponseCache(max_entries=2, ttl=60)
+    with APIClient(base_url=server.url, cache=cache) as client:
+        for date in ("2024-03-01", "2024-03-02", "2024-03-03"):
+            client.create_or_update_day(date, target_pomos=1)
+        client.get_day("2024-03-01")
+        client.get_day("2024-03-02")
+        client.get_day("2024-03-01")
+        client.get_day("2024-03-03")
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup(cache.key("GET", f"{server.url}/api/days/2024-03-02")) is None
+    assert cache.lookup(cache.key("GET", f"{server.url}/api/days/2024-03-01")) is not None
+
+
+def test_entries_expire_after_ttl() -> None:
+    now = [0.0]
+    cache = ResponseCache(ttl=10, clock=lambda: now[0])
+    key = cache.key("GET", "http://x/api/statistics")
+    cache.store(key, {"total": 1}, {"ETag": '"abc"'}, ["stats"])
+    entry = cache.lookup(key)
+    assert cache.is_fresh(entry)
+    now[0] = 11.0
+    assert not cache.is_fresh(entry)
+    assert entry.validators() == {"If-None-Match": '"abc"'}
+    assert cache.invalidate("stats") == 1
+    assert len(cache) == 0
+
+
+def test_async_client_revalidates_through_cache(server) -> None:
+    async def scenario():
+        async with AsyncAPIClient(base_url=server.url) as client:
+            await client.create_or_update_day(DATE, target_pomos=8)
+            first = await client.get_day(DATE)
+            second = await client.get_day(DATE)
+            return first, second, client.cache.stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert first == second
+    assert stats["revalidations"] == 1
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: MIT
+"""Tests for coalescing concurrent identical reads."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.singleflight import SingleFlight, request_key
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+DATE = "2024-03-01"
+
+
+class SlowBackend(FakeBackend):
+    """Holds every GET long enough for concurrent callers to overlap."""
+
+    delay = 0.2
+
+    def get_day(self, **kwargs):
+        time.sleep(self.delay)
+        return super().get_day(**kwargs)
+
+    def get_daily_tasks(self, **kwargs):
+        time.sleep(self.delay)
+        return super().get_daily_tasks(**kwargs)
+
+
+def _gets(server: FakeServer, path: str) -> int:
+    return server.backend.requests.count(("GET", path))
+
+
+def _run_together(count: int, fn) -> list:
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(lambda _: call(), range(count)))
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    group = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        release.wait(5)
+        return {"rows": [1, 2]}
+
+    threading.Timer(0.2, release.set).start()
+    results = _run_together(6, lambda: group.do("k", fetch))
+    assert len(executions) == 1
+    assert group.stats() == {"calls": 1, "collapsed": 5, "in_flight": 0}
+    assert all(r == {"rows": [1, 2]} for r in results)
+    assert len({id(r) for r in results}) == 6  # Each caller has its own copy
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered() -> None:
+    group = SingleFlight()
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            return group.do("k", fail)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_together(3, call) == ["boom"] * 3
+    assert group.do("k", lambda: "fresh") == "fresh"
+
+
+def test_keys_include_params_and_options() -> None:
+    assert request_key("/a", {"x": 1, "y": None}) == request_key("/a", {"x": "1"})
+    assert request_key("/a", {"x": 1}) != request_key("/a", {"x": 2})
+    assert request_key("/a", None, "model") != request_key("/a")
+
+
+@pytest.fixture
+def server():
+    with FakeServer(SlowBackend()) as server:
+        yield server
+
+
+def test_client_collapses_identical_gets(server) -> None:
+    with APIClient(base_url=server.url) as client:
+        client.create_or_update_day(DATE, target_pomos=8)
+        days = _run_together(8, lambda: client.get_day(DATE))
+        assert all(d["target_pomos"] == 8 for d in days)
+        assert _gets(server, f"/api/days/{DATE}") == 1
+        assert client.inflight.collapsed == 7
+
+        # Once finished, the next read goes to the server again
+        client.get_day(DATE)
+        assert _gets(server, f"/api/days/{DATE}") == 2
+
+
+def test_writes_and_disabled_clients_are_not_collapsed(server) -> None:
+    with APIClient(base_url=server.url, single_flight=False) as client:
+        _run_together(3, lambda: client.create_or_update_day(DATE, target_pomos=8))
+        _run_together(3, lambda: client.get_day(DATE))
+    assert server.backend.requests.count(("POST", "/api/days")) == 3
+    assert _gets(server, f"/api/days/{DATE}") == 3
+
+
+def test_async_client_collapses_identical_gets(server) -> None:
+    async def scenario() -> tuple:
+        async with AsyncAPIClient(base_url=server.url) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=4)
+            await client.create_daily_task(day["id"], "Spec")
+            lists = await client.gather(*(client.get_daily_tasks(day["id"]) for _ in range(5)))
+            return day, lists, client.inflight.stats()
+
+    day, lists, stats = asyncio.run(scenario())
+    assert all(tasks[0]["task_name"] == "Spec" for tasks in lists)
+    lists[0][0]["task_name"] = "mutated"
+    assert lists[1][0]["task_name"] == "Spec"
+    assert _gets(server, f"/api/days/{day['id']}/tasks") == 1
+    assert stats["collapsed"] == 4
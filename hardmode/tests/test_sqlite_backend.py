@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the SQLite stand-in backend and fault injection."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.net.delta import DeltaSync
+from hardmode.net.retry import RetryPolicy
+from hardmode.testing.fake_server import FakeBackend, FakeServer, Faults
+from hardmode.testing.sqlite_backend import SQLiteBackend
+
+SCHEMA = Path(__file__).resolve().parents[2] / "schema.sql"
+DATE = "2024-03-01"
+
+
+def test_day_task_and_pomodoro_round_trip(api_client, api_backend) -> None:
+    assert api_client.check_health()
+    day = api_client.create_or_update_day(DATE, target_pomos=8)
+    assert api_client.create_or_update_day(DATE, target_pomos=10)["id"] == day["id"]
+    task = api_client.create_daily_task(day["id"], "Spec", planned_pomodoros=2)
+    assert api_client.create_daily_task(day["id"], "Spec") is None  # Duplicate name
+    assert api_client.update_daily_task(task["id"], completed=True)["completed"] is True
+    api_client.create_pomodoro(day["id"], f"{DATE}T09:00:00Z", 1500, task="Spec")
+    api_client.create_pomodoro(day["id"], f"{DATE}T09:30:00Z", 600, aborted=True)
+
+    assert api_client.get_day(DATE)["target_pomos"] == 10
+    assert [t["task_name"] for t in api_client.get_daily_tasks(day["id"])] == ["Spec"]
+    stats = api_client.get_statistics()
+    assert (stats["total_sessions"], stats["completed_sessions"]) == (2, 1)
+    assert (stats["total_minutes"], stats["tasks_completed"]) == (25, 1)
+    assert api_client.delete_daily_task(task["id"])
+    assert api_backend.count("daily_tasks") == 0
+
+
+@pytest.mark.parametrize("backend", [FakeBackend, SQLiteBackend])
+def test_task_routes(backend) -> None:
+    with FakeServer(backend()) as server, APIClient(base_url=server.url) as client:
+        first = client.create_task("Read paper", "Section 3")
+        second = client.create_task("Write notes")
+        assert (first["name"], first["description"], first["is_completed"]) == (
+            "Read paper", "Section 3", False)
+        assert first["created_at"] and first["completed_at"] is None
+        assert [t["id"] for t in client.get_tasks()] == [second["id"], first["id"]]
+
+        done = client.update_task(first["id"], name="Read paper", is_completed=True,
+                                  completed_at=f"{DATE}T10:00:00Z")
+        assert (done["is_completed"], done["completed_at"]) == (True, f"{DATE}T10:00:00Z")
+        assert done["description"] == ""  # A PUT replaces the fields it omits
+        assert client.update_task(999, name="Ghost") is None
+
+        assert client.delete_task(second["id"])
+        assert not client.delete_task(second["id"])
+        assert [t["name"] for t in client.get_tasks()] == ["Read paper"]
+
+
+def test_bulk_paging_and_change_feed(api_client, api_backend) -> None:
+    day = api_client.create_or_update_day(DATE, target_pomos=8)
+    pomos = [{"day_id": day["id"], "start_time": f"{DATE}T10:{i:02d}:00Z",
+              "duration_sec": 1500, "task": "Spec"} for i in range(12)]
+    pomos.append({"day_id": 999, "start_time": f"{DATE}T11:00:00Z", "duration_sec": 1})
+    results = api_client.create_pomodoros_bulk(pomos)
+    assert [r["ok"] for r in results] == [True] * 12 + [False]
+
+    rows = list(api_client.iter_pomodoros(start_date=DATE, end_date=DATE, page_size=5))
+    assert [r["start_time"] for r in rows] == sorted((p["start_time"] for p in pomos[:12]),
+                                                     reverse=True)
+
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA.read_text())
+    result = DeltaSync(conn, api_client, page_size=4).pull()
+    assert (result["days"], result["pomodoros"]) == (1, 12)
+    assert result["watermark"] == str(api_backend.rev)
+    conn.close()
+
+
+def test_data_persists_in_a_database_file(tmp_path) -> None:
+    path = str(tmp_path / "api.db")
+    backend = SQLiteBackend(path)
+    with FakeServer(backend) as server, APIClient(base_url=server.url) as client:
+        day = client.create_or_update_day(DATE, target_pomos=6)
+        client.create_daily_task(day["id"], "Spec")
+    backend.close()
+
+    reopened = SQLiteBackend(path)
+    with FakeServer(reopened) as server, APIClient(base_url=server.url) as client:
+        assert client.get_day(DATE)["target_pomos"] == 6
+        task = client.create_daily_task(day["id"], "Review")
+    assert reopened.rev == 3 and task["rev"] == 3
+    reopened.close()
+
+
+@pytest.mark.api_faults(latency=0.1)
+def test_marker_configures_latency(api_client) -> None:
+    started = time.perf_counter()
+    assert api_client.check_health()
+    assert time.perf_counter() - started >= 0.1
+
+
+def test_injected_errors_and_drops(api_server) -> None:
+    policy = RetryPolicy(max_retries=2, backoff_factor=0.0)
+    with APIClient(base_url=api_server.url, retry=policy) as client:
+        api_server.faults.error_rate = 1.0
+        assert client.get_statistics() is None
+        assert client.metrics_snapshot()["GET /api/statistics"]["retries"] == 2
+
+        api_server.faults.error_rate = 0.0
+        api_server.faults.drop_rate = 1.0
+        api_server.faults.match = r"^GET /health"
+        assert client.check_health() is False
+        assert client.get_statistics() is not None  # Not matched
+    assert api_server.faults.injected == 6
+
+
+def test_fault_rates_are_reproducible() -> None:
+    def pattern(seed: int) -> list:
+        faults = Faults(error_rate=0.3, drop_rate=0.1, seed=seed)
+        return [faults.draw("GET", "/health")[1] for _ in range(200)]
+
+    drawn = pattern(42)
+    assert drawn == pattern(42)
+    assert 40 <= drawn.count("error") <= 80 and 5 <= drawn.count("drop") <= 40
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+"""Tests for compressed bodies and streaming JSON array decoding."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net.compression import decode_body, encode_json
+from hardmode.net.retry import RetryPolicy
+from hardmode.net.stream import iter_json_array
+from hardmode.testing.fake_server import FakeBackend, FakeServer
+
+DATE = "2024-03-01"
+
+
+def _pomos(count: int) -> list[dict]:
+    return [
+        {"start_time": f"{DATE}T{i // 60:02d}:{i % 60:02d}:00Z", "duration_sec": 1500,
+         "task": "Write spec", "focus_score": 4, "note": "ok"}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_array_decodes_across_any_chunk_boundary(size: int) -> None:
+    rows = [{"id": i, "note": "héllo, [w]orld", "n": [1, 2.5, None, True]} for i in range(20)]
+    rows += [12345, "tail", [], {}]
+    raw = json.dumps(rows).encode()
+    chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+    assert list(iter_json_array(chunks)) == rows
+
+
+def test_empty_and_malformed_arrays() -> None:
+    assert list(iter_json_array([b" [ ", b" ] "])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"a": 1}']))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1, 2']))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[1 2]']))
+
+
+def test_elements_are_yielded_before_the_body_ends() -> None:
+    def chunks():
+        yield b'[{"id": 1}, '
+        yield b'{"id": 2}, '
+        raise AssertionError("read past the second element")
+
+    items = iter_json_array(chunks())
+    assert next(items) == {"id": 1}
+
+
+def test_large_bodies_are_gzipped() -> None:
+    body, headers = encode_json({"note": "x" * 4096})
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(decode_body(body, "gzip")) == {"note": "x" * 4096}
+    body, headers = encode_json({"note": "short"})
+    assert "Content-Encoding" not in headers
+    assert decode_body(body, None) == body
+
+
+def test_client_compresses_requests_and_streams_responses() -> None:
+    with FakeServer() as server, APIClient(base_url=server.url, bulk_max_bytes=10**7) as client:
+        day = client.create_or_update_day(DATE, target_pomos=8)
+        pomos = [{**p, "day_id": day["id"]} for p in _pomos(300)]
+        assert all(r["ok"] for r in client.create_pomodoros_bulk(pomos))
+        assert server.backend.compressed_requests == 1
+
+        response = client.session.get(f"{server.url}/api/pomodoros", stream=True)
+        assert response.headers["Content-Encoding"] == "gzip"
+        response.close()
+
+        streamed = client.iter_pomodoros(start_date=DATE, end_date=DATE)
+        assert next(streamed)["start_time"] == f"{DATE}T04:59:00Z"
+        assert 1 + sum(1 for _ in streamed) == 300
+
+
+def test_compression_falls_back_when_server_rejects_it() -> None:
+    with FakeServer(FakeBackend(gzip=False)) as server, APIClient(base_url=server.url) as client:
+        day = client.create_or_update_day(DATE, target_pomos=8)
+        pomos = [{**p, "day_id": day["id"]} for p in _pomos(50)]
+        assert all(r["ok"] for r in client.create_pomodoros_bulk(pomos))
+        assert client._gzip_requests is False
+        assert len(server.backend.pomodoros) == 50
+
+
+def test_stream_yields_nothing_when_offline() -> None:
+    client = APIClient(base_url="http://127.0.0.1:9", timeout=0.5,
+                       retry=RetryPolicy(max_retries=0))
+    assert list(client.iter_pomodoros()) == []
+    assert client._online is False
+    client.close()
+
+
+def test_async_client_compresses_and_iterates() -> None:
+    async def scenario(server: FakeServer) -> list[dict]:
+        async with AsyncAPIClient(base_url=server.url, bulk_max_bytes=10**7) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=8)
+            await client.create_pomodoros_bulk(
+                [{**p, "day_id": day["id"]} for p in _pomos(100)])
+            return [p async for p in client.iter_pomodoros(day_id=day["id"])]
+
+    with FakeServer() as server:
+        rows = asyncio.run(scenario(server))
+        assert server.backend.compressed_requests == 1
+    assert len(rows) == 100
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+from hardmode.core.clock import VirtualClock
 from hardmode.core.timer_fsm import (
     NullHooks,
     Scheme,
@@ -79,3 +80,39 @@ def test_change_task_sets_context_switch_flag() -> None:
     assert fsm.current_task == "Code review"
     assert fsm.context_switch is True
     assert hooks.tasks[-1] == "Code review"
+
+
+def test_poll_derives_remaining_time_from_the_deadline() -> None:
+    hooks = RecorderHooks()
+    clock = VirtualClock(start=1000.0)
+    fsm = TimerFSM(scheme=Scheme(work_min=25), hooks=hooks, clock=clock)
+    fsm.start_day(target=4)
+    assert fsm.poll() is None  # Nothing counts down while planning
+    fsm.start_pomo("Deep work")
+    assert fsm.next_wakeup() == 1.0
+    clock.advance(10.3)  # Stalled event loop: one catch-up tick, not ten
+    assert abs(fsm.poll() - 0.7) < 1e-9  # 1489.7 s left shows 1490
+    assert hooks.ticks == [1490]
+    clock.advance(0.1)  # Early wake-up: same second, nothing fired
+    fsm.poll()
+    assert hooks.ticks == [1490]
+    clock.advance(1500)
+    assert fsm.poll() is None
+    assert fsm.state is State.REVIEW and hooks.ticks[-1] == 0
+
+
+def test_poll_starts_the_next_pomo_from_the_break_end() -> None:
+    hooks = RecorderHooks()
+    clock = VirtualClock(start=1000.0)
+    fsm = TimerFSM(scheme=Scheme(work_min=25, short_min=5), hooks=hooks, clock=clock)
+    fsm.start_day(target=4)
+    fsm.start_pomo("Focus")
+    clock.advance(1500)
+    fsm.poll()
+    fsm.save_review(focus=4, reason="", note="")
+    assert fsm.state is State.SHORT_BREAK
+    clock.advance(300 + 60)  # The break ended a minute ago
+    fsm.poll()
+    assert fsm.state is State.POMO and fsm.current_task == "Focus"
+    assert fsm.seconds_left == 1440
+    assert fsm.deadline == clock.monotonic() + 1440
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the virtual clock and the headless TimerFSM simulator."""
+
+from __future__ import annotations
+
+import pytest
+
+from hardmode.core.clock import VirtualClock
+from hardmode.core.timer_fsm import Scheme, State
+from hardmode.testing.timer_sim import DAY_START, TimerSimulator, run_bench, simulate_day
+
+
+def test_virtual_clock_only_moves_forward() -> None:
+    clock = VirtualClock(start=5.0, wall=1000.0)
+    clock.advance(2.5)
+    assert (clock.monotonic(), clock.time()) == (7.5, 1002.5)
+    with pytest.raises(ValueError):
+        clock.set(7.0)
+
+
+def test_scripted_day_jumps_between_events() -> None:
+    sim = TimerSimulator(scheme=Scheme(work_min=25, short_min=5), target=2)
+    sim.script([
+        (60, "start_pomo", "Spec"),
+        (600, "change_task", "Review"),
+        (1600, "review", 4, "", ""),
+    ])
+    sim.run()
+    assert sim.transitions == [
+        (0, State.PLANNING), (60, State.POMO), (1560, State.REVIEW),
+        (1600, State.SHORT_BREAK), (1900, State.POMO), (3400, State.REVIEW),
+    ]  # Then waits for a review that is not scripted
+    assert sim.fsm.started_at == DAY_START.timestamp() + 1900
+    assert sim.fsm.current_task == "Review"  # The break restarts the current task
+    assert sim.context_switches == 1 and sim.focus_seconds == 3000
+    assert sim.ticks < 10  # No per-second work
+
+
+def test_advance_and_abort() -> None:
+    sim = TimerSimulator(target=4, auto_review=30)
+    sim.at(0, "start_pomo", "Deep work")
+    sim.advance(600.5)
+    assert sim.fsm.state is State.POMO and sim.fsm.seconds_left == 900
+    sim.after(0, "abort")
+    sim.advance(1)
+    assert sim.fsm.state is State.PLANNING and sim.aborted == 1
+    sim.after(10, "change_task", "Other")  # Invalid outside a pomodoro
+    with pytest.raises(RuntimeError):
+        sim.advance(60)
+    lenient = TimerSimulator(strict=False)
+    lenient.at(0, "review", 3, "", "")
+    lenient.advance(1)
+    assert lenient.rejected == 1
+    with pytest.raises(ValueError):
+        lenient.at(5, "snooze")
+
+
+def test_random_days_are_reproducible() -> None:
+    first, again = simulate_day(seed=7), simulate_day(seed=7)
+    assert first.summary() == again.summary()
+    assert first.fsm.done_today == 16
+    assert first.focus_seconds == pytest.approx(16 * 25 * 60)
+    report = run_bench(days=20, target=8)
+    assert report["pomodoros"] == 160 and report["us_per_day"] > 0
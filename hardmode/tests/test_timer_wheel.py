@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: MIT
+"""Tests for the timing wheel and the many-timer host."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from hardmode.core.clock import VirtualClock
+from hardmode.core.timer_fsm import NullHooks, Scheme, State, TimerFSM
+from hardmode.core.timer_host import TimerHost
+from hardmode.core.timer_wheel import TimingWheel
+from hardmode.testing.timer_host_bench import run_bench
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.states: list = []
+        self.tasks: list = []
+
+    def on_states(self, changes) -> None:
+        self.states.append(changes)
+
+    def on_task_updates(self, changes) -> None:
+        self.tasks.append(changes)
+
+
+def test_wheel_fires_each_item_on_its_tick_across_levels() -> None:
+    rng = random.Random(3)
+    wheel = TimingWheel(tick=1000, level_bits=(4, 3, 3))  # Small levels: many cascades and wraps
+    pending = {}
+    for item in range(2000):
+        due = 1000 + rng.choice([0, 1, 15, 16, 17, 127, 128, 1023, 1024, 5000]) + rng.randrange(40)
+        wheel.schedule(due, item)
+        pending[item] = due
+    now = 1000
+    while pending:
+        now += rng.choice([1, 1, 1, 7, 300])
+        fired = wheel.advance(now)
+        assert sorted(fired) == sorted(i for i, due in pending.items() if due <= now)
+        for item in fired:
+            del pending[item]
+    assert len(wheel) == 0
+    wheel.schedule(now - 5, "late")  # Already due: out on the next advance
+    assert wheel.advance(now) == ["late"]
+
+
+def test_host_follows_timer_fsm() -> None:
+    scheme = Scheme(work_min=25, short_min=5, long_min=15, cadence=2)
+    clock = VirtualClock(wall=1_700_000_000.0)
+    fsm = TimerFSM(scheme=scheme, hooks=NullHooks(), clock=clock)
+    host = TimerHost(scheme=scheme, clock=clock)
+    tid = host.add()
+    script = {0: [("start_day", 3)], 10: [("start_pomo", "Spec")], 700: [("change_task", "Mail")],
+              1600: [("save_review", 4, "", "")], 3450: [("save_review", 2, "", "")],
+              4500: [("abort",)], 4600: [("start_pomo", "Again")]}
+    for second in range(0, 6000):
+        clock.set(second)
+        for name, *args in script.get(second, ()):
+            getattr(fsm, name)(*args)
+            getattr(host, name)(tid, *args)
+        fsm.poll()
+        host.advance()
+        timer = host.timer(tid)
+        assert (timer.state, timer.current_task, timer.done_today, timer.context_switch) == \
+            (fsm.state, fsm.current_task, fsm.done_today, fsm.context_switch), second
+        assert host.seconds_left(tid) == fsm.seconds_left
+        assert timer.started_at == fsm.started_at
+    with pytest.raises(RuntimeError):
+        host.save_review(tid, 3, "", "")
+
+
+def test_batched_hooks_and_stale_entries() -> None:
+    clock = VirtualClock()
+    hooks = Recorder()
+    host = TimerHost(hooks=hooks, clock=clock)
+    ids = [host.add() for _ in range(500)]
+    for tid in ids:
+        host.start_day(tid, 4)
+        host.start_pomo(tid, f"Task {tid}")
+    host.abort(ids[0])
+    host.remove(ids[1])
+    assert hooks.states == []  # Queued until advance/flush
+    assert host.advance() is not None
+    assert len(hooks.states) == 1 and len(hooks.states[0]) == 500 * 2 + 1
+    assert hooks.tasks == [[(tid, f"Task {tid}") for tid in ids]]
+    reused = host.add()
+    assert reused == ids[1]
+    host.start_day(reused, 4)
+    hooks.states.clear()
+    clock.set(25 * 60)
+    host.advance()
+    fired = hooks.states[-1]
+    assert fired[0] == (reused, State.PLANNING)
+    assert {tid for tid, state in fired if state is State.REVIEW} == set(ids[2:])  # Not 0 or 1
+
+
+def test_stall_catches_up_through_break_and_pomodoro() -> None:
+    clock = VirtualClock()
+    hooks = Recorder()
+    host = TimerHost(hooks=hooks, clock=clock)
+    tid = host.add()
+    host.start_day(tid, 4)
+    host.start_pomo(tid, "Spec")
+    clock.set(25 * 60)
+    host.advance()
+    host.save_review(tid, 3, "", "")
+    host.advance()
+    hooks.states.clear()
+    clock.set(25 * 60 + 5 * 60 + 25 * 60 + 42)  # Break and next pomodoro both over
+    assert host.advance() is None
+    assert hooks.states == [[(tid, State.POMO), (tid, State.REVIEW)]]
+
+
+def test_bench_smoke() -> None:
+    report = run_bench(timers=2000, minutes=40)
+    assert report["completed"] > 0 and report["batches"] <= 40 * 60
+    assert report["cpu_us_per_10k_per_second"] > 0
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MIT
+"""Tests for talking to the API over a Unix domain socket."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from hardmode.api_client import APIClient
+from hardmode.async_api_client import AsyncAPIClient
+from hardmode.net import unix
+from hardmode.testing.fake_server import FakeServer
+from hardmode.testing.transport_bench import compare
+
+DATE = "2024-03-01"
+
+
+@pytest.fixture
+def unix_server(tmp_path):
+    with FakeServer(unix_socket=str(tmp_path / "api.sock")) as server:
+        yield server
+
+
+def test_socket_path_parsing() -> None:
+    assert unix.socket_path("unix:///run/hardmode/api.sock") == "/run/hardmode/api.sock"
+    assert unix.socket_path("http://localhost:8080") is None
+    assert unix.http_url("/run/api.sock") == "http+unix://%2Frun%2Fapi.sock"
+    with pytest.raises(ValueError):
+        unix.socket_path("unix://")
+
+
+def test_client_round_trips_over_a_pooled_socket(unix_server) -> None:
+    with APIClient(base_url=unix_server.url) as client:
+        assert client.socket_path == unix_server.unix_socket
+        day = client.create_or_update_day(DATE, target_pomos=4)
+        client.create_daily_task(day["id"], "Spec", planned_pomodoros=2)
+        assert client.get_day(DATE)["target_pomos"] == 4
+        assert [t["task_name"] for t in client.get_daily_tasks(day["id"])] == ["Spec"]
+        assert client.metrics_snapshot()["GET /api/days/{date}"]["count"] == 1
+        pool = client.session.get_adapter(client.base_url)._pools[unix_server.unix_socket]
+        assert pool.num_connections == 1  # Kept alive between requests
+
+
+def test_async_client_over_socket(unix_server) -> None:
+    async def scenario() -> list:
+        async with AsyncAPIClient(base_url=unix_server.url) as client:
+            day = await client.create_or_update_day(DATE, target_pomos=2)
+            return await asyncio.gather(client.check_health(), client.get_day(DATE),
+                                        client.get_daily_tasks(day["id"]))
+
+    healthy, day, tasks = asyncio.run(scenario())
+    assert healthy and day["target_pomos"] == 2 and tasks == []
+
+
+def test_unreachable_socket_marks_client_offline(tmp_path) -> None:
+    with APIClient(base_url=f"unix://{tmp_path / 'missing.sock'}") as client:
+        assert client.get_statistics() is None
+        assert client.metrics_snapshot()["GET /api/statistics"]["errors"] == 1
+
+
+def test_socket_file_is_removed_on_stop(tmp_path) -> None:
+    path = str(tmp_path / "api.sock")
+    with FakeServer(unix_socket=path):
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+    with FakeServer(unix_socket=path) as server:  # Path reusable afterwards
+        with APIClient(base_url=server.url) as client:
+            assert client.check_health()
+
+
+def test_transport_comparison_reports_both() -> None:
+    report = compare(requests=20)
+    assert set(report) == {"tcp", "unix"}
+    assert all(row["requests"] == 20 and row["p50"] > 0 for row in report.values())
@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import math
+import sqlite3
 from datetime import date, datetime, timedelta
 
 try:
@@ -10,7 +12,10 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     QtCore = QtGui = QtWidgets = None
 
-from hardmode.core.timer_fsm import State, TimerFSM
+from hardmode.core.eta_model import ETAEstimate, ETAModel
+from hardmode.core.journal import TimerJournal, midnight
+from hardmode.core.timer_fsm import BREAK_STATES, State, TimerFSM
+from hardmode.net.breaker import CLOSED, HALF_OPEN
 from hardmode.data.db import PomodoroRepository
 from hardmode.ui.review_dialog import ReviewDialog
 from hardmode.ui.daily_intent_dialog import show_daily_intent_dialog
@@ -40,12 +45,14 @@ class _TimerHooks:
 class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
     """Main application window."""
 
-    def __init__(self, timer: TimerFSM, repository: PomodoroRepository):
+    def __init__(self, timer: TimerFSM, repository: PomodoroRepository,
+                 journal: TimerJournal | None = None):
         if QtWidgets is None:
             raise RuntimeError("PySide6 is required for MainWindow.")
         super().__init__()
         self.timer = timer
         self.repository = repository
+        self.journal = journal  # Lets a killed app resume the running pomodoro
         self.timer.hooks = _TimerHooks(self)
 
         self.day_id: int | None = None
@@ -53,6 +60,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         self._recent_task_change: bool = False
         self.session_start_time: datetime | None = None
         self.daily_tasks: list[TaskItem] = []  # Track daily tasks
+        self.eta_model = self._load_eta_model()
 
         self.setWindowTitle("Hardmode Pomodoro")
         self.resize(450, 320)
@@ -70,19 +78,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
             
             # Restore daily tasks from database with full planning/execution data
             saved_tasks = self.repository.get_daily_tasks(existing_day['id'])
-            for task_data in saved_tasks:
-                task = TaskItem(name=task_data['task_name'])
-                # Planning fields
-                task.planned_pomodoros = task_data.get('planned_pomodoros', 0)
-                task.planned_at = task_data.get('planned_at')
-                task.plan_priority = task_data.get('plan_priority')
-                # Execution fields
-                task.pomodoros_spent = task_data['pomodoros_spent']
-                task.completed = bool(task_data['completed'])
-                # Metadata
-                task.added_mid_day = bool(task_data.get('added_mid_day', 0))
-                task.reason_added = task_data.get('reason_added')
-                self.daily_tasks.append(task)
+            self.daily_tasks.extend(TaskItem.from_record(t) for t in saved_tasks)
             
             if self.daily_tasks:
                 print(f"✓ Restored {len(self.daily_tasks)} tasks from today")
@@ -307,10 +303,18 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         self.tray.action_open.triggered.connect(self._restore_from_tray)
         self.tray.action_quit.triggered.connect(self._handle_quit_requested)
 
+        # Single-shot: armed for the next second change of a running
+        # countdown only, so IDLE/PLANNING/REVIEW never wake the process
         self.tick_timer = QtCore.QTimer(self)
-        self.tick_timer.setInterval(1000)
+        self.tick_timer.setSingleShot(True)
+        self.tick_timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
         self.tick_timer.timeout.connect(self._drive_timer)
-        self.tick_timer.start()
+
+        # Connection status only reads the API circuit breaker, so polling is cheap
+        self.connection_timer = QtCore.QTimer(self)
+        self.connection_timer.setInterval(5000)
+        self.connection_timer.timeout.connect(self._update_connection_status)
+        self.connection_timer.start()
 
         self.timer.start_day(target=target)
         
@@ -327,6 +331,10 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
                 except (ValueError, TypeError):
                     self.session_start_time = datetime.now()
         
+        if self.journal is not None:
+            resumable = existing_day is not None and existing_day.get('day_rating') is None
+            self._resume_timer(resumable)
+        
         self._update_status_views()
         self._update_eta_display()
         
@@ -334,9 +342,28 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         self._update_sync_status()
         QtCore.QTimer.singleShot(2000, self._sync_on_startup)  # Sync after 2 seconds
 
+    def _resume_timer(self, resumable: bool) -> None:
+        """Restore the timer state journaled before the app last stopped."""
+        app_fields = self.journal.restore(self.timer, since=midnight()) if resumable else None
+        self.journal.attach(self.timer)
+        if app_fields is None:
+            return
+        self.current_pomo_id = app_fields.get('pomo_id')
+        state = self.timer.state
+        print(f"✓ Restored timer: {state.name} {self.timer.current_task}".rstrip())
+        self.start_button.setEnabled(state in {State.IDLE, State.PLANNING})
+        self.abort_button.setEnabled(state is State.POMO)
+        self.tray.set_quit_enabled(state is not State.POMO)
+        if state is State.REVIEW:
+            QtCore.QTimer.singleShot(0, self._prompt_review)
+        else:
+            # Catch up once the window is up: the countdown may be over
+            QtCore.QTimer.singleShot(0, self._drive_timer)
+
     # ----- Timer hooks -----
 
     def handle_state_change(self, state: State) -> None:
+        self._schedule_timer(self.timer.next_wakeup())
         self._update_status_views()
         if state is State.POMO:
             self._on_focus_started()
@@ -707,11 +734,15 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         self._refresh_task_list()
 
     def _drive_timer(self) -> None:
-        if self.timer.state is State.POMO:
-            self.timer.tick()
-        elif self.timer.state in {State.SHORT_BREAK, State.LONG_BREAK}:
-            self.timer.break_tick()
-        self._update_status_views()
+        # Remaining time comes from the FSM deadline, so a late wake-up
+        # (modal dialog, blocking sync) just shows the right second
+        self._schedule_timer(self.timer.poll())
+
+    def _schedule_timer(self, delay: float | None) -> None:
+        if delay is None:
+            self.tick_timer.stop()
+        else:
+            self.tick_timer.start(max(1, math.ceil(delay * 1000)))
 
     def _handle_start_clicked(self) -> None:
         # Get selected task from list
@@ -767,11 +798,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         ) != QtWidgets.QMessageBox.StandardButton.Yes:
             return
         self._log_abort(reason="user_abort")
-        self.timer.state = State.PLANNING
-        self.timer.seconds_left = 0
-        self.timer.current_task = ""
-        self.timer.context_switch = False
-        self.handle_state_change(self.timer.state)
+        self.timer.abort()
     
     def _handle_manual_entry(self) -> None:
         """Handle manual pomodoro entry for work done outside the app."""
@@ -1020,18 +1047,26 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
             duration_sec=duration,
             context_switch=self.timer.context_switch,
         )
+        self._journal_pomo_id()
 
     def _on_break_started(self) -> None:
         self.start_button.setEnabled(False)
         self.abort_button.setEnabled(False)
         self.tray.set_quit_enabled(True)
         self.current_pomo_id = None
+        self._journal_pomo_id()
 
     def _on_idle(self) -> None:
         self.start_button.setEnabled(True)
         self.abort_button.setEnabled(False)
         self.tray.set_quit_enabled(True)
         self.current_pomo_id = None
+        self._journal_pomo_id()
+
+    def _journal_pomo_id(self) -> None:
+        # The review after a restart must complete the same pomo row
+        if self.journal is not None:
+            self.journal.note(pomo_id=self.current_pomo_id)
 
     def _prompt_review(self) -> None:
         self.start_button.setEnabled(False)
@@ -1054,6 +1089,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
             actual_duration=elapsed,
             context_switch=context_switch,
         )
+        self._observe_pomo(aborted=False)
         self.repository.log_event(
             "info",
             "pomo_completed",
@@ -1097,6 +1133,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         if self.current_pomo_id is None:
             return
         self.repository.abort_pomo(self.current_pomo_id, reason=reason)
+        self._observe_pomo(aborted=True)
         self.repository.log_event(
             "warn",
             "pomo_aborted",
@@ -1138,11 +1175,23 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         super().closeEvent(event)
     
     def _update_connection_status(self) -> None:
-        """Update the connection status indicator."""
+        """Update the connection status indicator.
+
+        Uses the API client's circuit breaker state rather than a /health
+        request, so an unreachable host never blocks the GUI thread.
+        """
         try:
-            if hasattr(self.repository, 'is_online') and self.repository.is_online():
+            api = getattr(self.repository, 'api', None)
+            breaker = getattr(api, 'breaker', None)
+            if breaker is None:
+                raise AttributeError("repository has no API client")
+            state = breaker.state
+            if state == CLOSED:
                 self.connection_label.setText("☁️ Connected to API - Data syncing")
                 self.connection_label.setStyleSheet("font-size: 10px; color: green;")
+            elif state == HALF_OPEN:
+                self.connection_label.setText("🔄 Reconnecting to API...")
+                self.connection_label.setStyleSheet("font-size: 10px; color: orange;")
             else:
                 self.connection_label.setText("📴 Offline - Data stored locally")
                 self.connection_label.setStyleSheet("font-size: 10px; color: orange;")
@@ -1150,6 +1199,44 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
             self.connection_label.setText("📴 Local mode")
             self.connection_label.setStyleSheet("font-size: 10px; color: gray;")
     
+    def _load_eta_model(self) -> ETAModel:
+        # Calibrate on the local pomo history; plain scheme durations
+        # until there is enough of it
+        conn = getattr(self.repository, 'conn', None)
+        if conn is not None:
+            try:
+                return ETAModel.from_db(conn, self.timer.scheme)
+            except (sqlite3.Error, ValueError, TypeError) as exc:
+                print(f"ETA history unavailable: {exc}")
+        return ETAModel(self.timer.scheme)
+
+    def _observe_pomo(self, aborted: bool) -> None:
+        """Feed the pomodoro that just ended to the ETA model."""
+        if self.timer.started_at is None:
+            return
+        started = datetime.fromtimestamp(self.timer.started_at)
+        self.eta_model.observe_pomo(self.day_id, started, datetime.now(), aborted=aborted)
+
+    def _estimate_finish(self, remaining: int) -> ETAEstimate:
+        """Finish-time estimate for ``remaining`` pomodoros, from where the timer is."""
+        timer = self.timer
+        now = datetime.now()
+        left = timer.remaining() or 0.0
+        if timer.state is State.POMO:
+            # The running pomodoro ends first, then its break
+            start = now + timedelta(seconds=left)
+            return self.eta_model.estimate(start, remaining - 1, timer.done_today + 1,
+                                           break_first=True)
+        if timer.state is State.REVIEW:
+            return self.eta_model.estimate(now, remaining, timer.done_today + 1,
+                                           break_first=True)
+        if timer.state in BREAK_STATES:
+            scheme = timer.scheme
+            length = (scheme.long_min if timer.state is State.LONG_BREAK else scheme.short_min) * 60
+            start = now - timedelta(seconds=max(0.0, length - left))  # When the break began
+            return self.eta_model.estimate(start, remaining, timer.done_today, break_first=True)
+        return self.eta_model.estimate(now, remaining, timer.done_today)
+
     def _update_eta_display(self) -> None:
         """Update the ETA display based on current progress."""
         target = self.timer.target or self.daily_target
@@ -1168,29 +1255,14 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
             """)
             return
         
-        # Calculate time remaining
-        pomo_duration = 25  # minutes
-        remaining_focus_time = remaining * pomo_duration
-        
-        # Add one lunch break if we have significant work left
-        estimated_breaks = 30 if remaining >= 4 else 0
-        total_remaining = remaining_focus_time + estimated_breaks
-        
-        # Calculate ETA
-        if self.session_start_time is None:
-            # Not started yet, assume starting now
-            finish_time = datetime.now() + timedelta(minutes=total_remaining)
-        else:
-            # Started, calculate from session start
-            elapsed_minutes = (datetime.now() - self.session_start_time).total_seconds() / 60
-            completed_focus = completed * pomo_duration
-            total_needed = target * pomo_duration + estimated_breaks
-            remaining_from_now = total_needed - elapsed_minutes
-            finish_time = datetime.now() + timedelta(minutes=remaining_from_now)
-        
-        finish_str = finish_time.strftime("%I:%M %p").lstrip('0')
+        # Calculate ETA from the scheme and the learned breaks and aborts
+        eta = self._estimate_finish(remaining)
+        finish_str = eta.point.strftime("%I:%M %p").lstrip('0')
+        low_str = eta.p10.strftime("%I:%M %p").lstrip('0')
+        high_str = eta.p90.strftime("%I:%M %p").lstrip('0')
         
         # Calculate total focus time
+        pomo_duration = self.timer.scheme.work_min  # minutes
         total_focus_hours = (target * pomo_duration) // 60
         total_focus_mins = (target * pomo_duration) % 60
         
@@ -1200,7 +1272,7 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         
         self.eta_label.setText(
             f"🎯 Progress: {completed}/{target} ({progress_pct:.0f}%) {progress_bar}\n"
-            f"⏱️  ETA: Finish around {finish_str}\n"
+            f"⏱️  ETA: Finish around {finish_str} (likely {low_str}–{high_str})\n"
             f"📊 Total focus today: {total_focus_hours}h {total_focus_mins}m"
         )
         self.eta_label.setStyleSheet("""
@@ -1301,6 +1373,23 @@ class MainWindow(QtWidgets.QMainWindow if QtWidgets else object):
         today = date.today().isoformat()
         
         try:
+            # Pull only rows changed since the last sync when the server supports it
+            delta_sync = getattr(self.repository, 'delta_sync', None)
+            if delta_sync is not None:
+                result = delta_sync.pull()
+                if result['supported']:
+                    if result['success'] and today in result['dates']:
+                        print(f"✓ Pulled changes from cloud: {result['tasks']} tasks")
+                        self._refresh_task_list()
+                        self._update_eta_display()
+                    return
+            
+            # Send queued local edits first so the pull cannot overwrite them
+            api = getattr(self.repository, 'api', None)
+            outbox = getattr(api, 'outbox', None)
+            if outbox is not None and len(outbox):
+                outbox.drain(api)
+
             # Pull today's data from cloud (non-blocking, silent)
             result = self.repository.pull_from_cloud(today)
             
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 
 try:
@@ -11,6 +11,8 @@ try:
 except ImportError:  # pragma: no cover
     QtCore = QtWidgets = None
 
+from hardmode.core.models import DailyTask
+
 
 class TaskItem:
     """Represents a task with planning and execution tracking."""
@@ -32,6 +34,21 @@ class TaskItem:
         self.added_mid_day = False
         self.reason_added = None
 
+    @classmethod
+    def from_record(cls, record: Union[DailyTask, Dict]) -> "TaskItem":
+        """Build a TaskItem from a stored daily task (record or dict)."""
+        if not isinstance(record, DailyTask):
+            record = DailyTask.from_dict(record)
+        task = cls(name=record.task_name)
+        task.planned_pomodoros = record.planned_pomodoros or 0
+        task.planned_at = record.planned_at
+        task.plan_priority = record.plan_priority
+        task.pomodoros_spent = record.pomodoros_spent
+        task.completed = record.completed
+        task.added_mid_day = record.added_mid_day
+        task.reason_added = record.reason_added
+        return task
+
 
 class TaskListDialog(QtWidgets.QDialog if QtWidgets else object):
     """Dialog to manage daily tasks and select what to work on."""
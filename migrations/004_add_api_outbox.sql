@@ -0,0 +1,16 @@
+-- Migration: Add api_outbox table
+-- Date: 2026-10-17
+-- Purpose: Persist API writes made while the backend is unreachable so they are replayed in order
+
+CREATE TABLE IF NOT EXISTS api_outbox (
+id INTEGER PRIMARY KEY,
+method TEXT NOT NULL,
+endpoint TEXT NOT NULL,
+body TEXT, -- JSON payload
+coalesce_key TEXT, -- same key = same remote resource
+created_at TEXT NOT NULL,
+revision INTEGER NOT NULL DEFAULT 0, -- bumped when a later write is folded in
+attempts INTEGER NOT NULL DEFAULT 0,
+last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_api_outbox_key ON api_outbox(coalesce_key);
@@ -0,0 +1,5 @@
+-- Migration: Add idempotency_key field to api_outbox table
+-- Date: 2026-10-17
+-- Purpose: Resend each queued write with the Idempotency-Key it was first sent with, so replays are deduplicated by the server
+
+ALTER TABLE api_outbox ADD COLUMN idempotency_key TEXT;
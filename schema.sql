@@ -70,11 +70,26 @@ metadata TEXT -- JSON blob
 );
 
 
+CREATE TABLE IF NOT EXISTS api_outbox (
+id INTEGER PRIMARY KEY,
+method TEXT NOT NULL,
+endpoint TEXT NOT NULL,
+body TEXT, -- JSON payload
+coalesce_key TEXT, -- same key = same remote resource
+created_at TEXT NOT NULL,
+revision INTEGER NOT NULL DEFAULT 0, -- bumped when a later write is folded in
+attempts INTEGER NOT NULL DEFAULT 0,
+last_error TEXT,
+idempotency_key TEXT -- resent with every replay of the write
+);
+
+
 -- Helpful indexes
 CREATE INDEX IF NOT EXISTS idx_pomo_day ON pomo(day_id);
 CREATE INDEX IF NOT EXISTS idx_pomo_start ON pomo(start_time);
 CREATE INDEX IF NOT EXISTS idx_daily_tasks_day ON daily_tasks(day_id);
 CREATE INDEX IF NOT EXISTS idx_daily_tasks_planning ON daily_tasks(day_id, planned_at, added_mid_day);
+CREATE INDEX IF NOT EXISTS idx_api_outbox_key ON api_outbox(coalesce_key);
 
 
 CREATE VIEW IF NOT EXISTS v_day_summary AS
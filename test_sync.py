@@ -4,6 +4,7 @@ Test script for cloud sync functionality
 Demonstrates full sync workflow
 """
 
+import os
 import sys
 import sqlite3
 from datetime import datetime
@@ -33,7 +34,7 @@ def test_sync_workflow():
     initialize_database(conn, schema_path)
     
     # Initialize manager with local API
-    api_url = "http://localhost:8080"
+    api_url = os.getenv("API_URL", "http://localhost:8080")
     manager = DataManager(conn, api_url=api_url)
     
     # Check API availability
@@ -43,6 +44,8 @@ def test_sync_workflow():
     else:
         print(f"   ❌ API is offline! Make sure backend is running:")
         print(f"      cd backend && go run main.go")
+        print(f"   or the Python stand-in:")
+        print(f"      python -m hardmode.testing.sqlite_backend --port 8080")
         return False
     
     # Get today's date
@@ -212,7 +215,7 @@ def test_auto_sync():
     conn.row_factory = sqlite3.Row
     schema_path = project_root / "schema.sql"
     initialize_database(conn, schema_path)
-    manager = DataManager(conn, api_url="http://localhost:8080")
+    manager = DataManager(conn, api_url=os.getenv("API_URL", "http://localhost:8080"))
     
     if not manager._api_online:
         print("❌ API offline, skipping auto-sync test")